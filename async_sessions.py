@@ -0,0 +1,1204 @@
+# async_sessions.py
+import asyncio
+import copy
+import logging
+import math
+import os
+import random
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from display_geometry import pack_point
+from input_emitter import MessageEmitter, DROPPED
+from lazy_imports import lazy_import
+from run_metrics import RunMetrics
+
+"""
+Asyncio session runtime - thousands of simulated users in one process.
+
+The threaded testers run one OS thread and one window per tester, and block in
+time.sleep() between keystrokes. That is fine for a handful of testers but cannot
+reach thousands of concurrent users. Here every simulated user is a lightweight
+coroutine (a virtual session) that awaits its own deadlines on a single event loop,
+and all sessions emit through one shared backend.
+
+A session takes its behaviour from a template tester (a SafeKeyboardTester or
+SafeMouseTester instance): typing and movement settings, pacing and activity
+calendar all come from the template's validated configuration, so sessions behave
+like the threaded testers without each owning a window, a logger or a monitor.
+
+This module has no Windows dependency of its own. The WindowBackend posts to a real
+test window through a template tester; CountingBackend and QueueBackend work anywhere.
+Keyboard sessions type through the template's virtual-key tables, so they use
+the keyboard layout that the threaded keyboard tester uses.
+"""
+
+# Only loaded once a runtime is created
+psutil = lazy_import("psutil")
+
+# Window message identifiers (same values as win32con)
+WM_KEYDOWN = 0x0100
+WM_KEYUP = 0x0101
+WM_CHAR = 0x0102
+WM_MOUSEMOVE = 0x0200
+WM_LBUTTONDOWN = 0x0201
+WM_LBUTTONUP = 0x0202
+WM_LBUTTONDBLCLK = 0x0203
+WM_RBUTTONDOWN = 0x0204
+WM_RBUTTONUP = 0x0205
+WM_MBUTTONDOWN = 0x0207
+WM_MBUTTONUP = 0x0208
+WM_MOUSEWHEEL = 0x020A
+
+# Virtual key codes used by the typing patterns (same values as win32con)
+VK_BACK = 0x08
+VK_TAB = 0x09
+VK_RETURN = 0x0D
+VK_SPACE = 0x20
+
+# Low byte of VkKeyScan for a character the keyboard layout cannot type
+NO_KEY = 0xFF
+
+# Code fragments typed by the code_snippet pattern (same as SafeKeyboardTester)
+CODE_PATTERNS = [
+    "if(x>0){{return true;}}",
+    "for(int i=0;i<10;i++){{}}",
+    "function test(){{return null;}}",
+    "const x = [];",
+    "let result = a + b;",
+    "class Test{{constructor(){{}}}}",
+    "import os\nprint('hello')",
+    "def main():\n    return 0",
+    "while(true){{break;}}"
+]
+
+# Time a key or button is held down, in seconds
+KEY_HOLD_TIME = 0.08
+# Time between the two clicks of a double-click, in seconds
+DOUBLE_CLICK_GAP = 0.05
+
+
+class EmitBackend:
+    """
+    Destination shared by every virtual session.
+
+    Subclasses implement emit(); the other methods are optional hooks that the
+    runtime calls from its housekeeping task.
+    """
+
+    async def start(self):
+        """
+        Prepare the backend before the sessions start.
+        """
+
+    async def close(self):
+        """
+        Release the backend after the sessions have stopped.
+        """
+
+    def emit(self, session_id, msg, wparam, lparam):
+        """
+        Emit one message on behalf of a session.
+
+        Args:
+            session_id (int): Session that emits the message.
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+
+        Returns:
+            bool: True if the message was accepted, False if it was dropped.
+        """
+        raise NotImplementedError("Subclasses must implement emit()")
+
+    def emit_move(self, session_id, msg, wparam, lparam):
+        """
+        Emit a mouse move on behalf of a session.
+
+        Backends that can coalesce redundant moves override this.
+
+        Returns:
+            bool: True if the move was accepted or coalesced, False if it was dropped.
+        """
+        return self.emit(session_id, msg, wparam, lparam)
+
+    def pump(self):
+        """
+        Drain the backend's target queue, if it has one.
+        """
+
+    def backpressure_delay(self):
+        """
+        Get the extra delay sessions should add before their next burst.
+
+        Returns:
+            float: Extra delay in seconds.
+        """
+        return 0.0
+
+    def stats(self):
+        """
+        Get the backend counters.
+
+        Returns:
+            dict: Backend statistics.
+        """
+        return {}
+
+
+class CountingBackend(EmitBackend):
+    """
+    Backend that only counts messages.
+
+    Useful to measure how many sessions the event loop itself can drive, on any platform.
+
+    Attributes:
+        messages (int): Number of messages emitted.
+        messages_by_id (dict): Number of messages per message identifier.
+    """
+
+    def __init__(self):
+        """
+        Initialize the CountingBackend.
+        """
+        self.messages = 0
+        self.messages_by_id = {}
+
+    def emit(self, session_id, msg, wparam, lparam):
+        """
+        Count the message.
+        """
+        self.messages += 1
+        self.messages_by_id[msg] = self.messages_by_id.get(msg, 0) + 1
+        return True
+
+    def stats(self):
+        """
+        Get the message counts.
+        """
+        return {
+            "backend": "counting",
+            "messages": self.messages,
+            "messages_by_id": {f"0x{msg:04X}": count for msg, count in sorted(self.messages_by_id.items())},
+        }
+
+
+class QueueBackend(EmitBackend):
+    """
+    Backend that hands messages to an async consumer through a bounded queue.
+
+    The consumer is where a real target is driven, for example a client connection
+    to a collaboration server. Queue occupancy is tracked by a MessageEmitter, so a
+    slow consumer produces the same backpressure and drop statistics as a full
+    window message queue.
+
+    Attributes:
+        consumer (callable): Coroutine function called as consumer(session_id, msg, wparam, lparam).
+        workers (int): Number of consumer tasks.
+        emitter (MessageEmitter): Tracks queue occupancy and applies backpressure.
+        consumer_errors (int): Messages whose delivery raised an error.
+    """
+
+    def __init__(self, consumer, capacity=10000, workers=1, high_watermark=0.8, low_watermark=0.5):
+        """
+        Initialize the QueueBackend.
+
+        Args:
+            consumer (callable): Coroutine function that delivers one message.
+            capacity (int, optional): Queue capacity. Defaults to 10000.
+            workers (int, optional): Number of consumer tasks. Defaults to 1.
+            high_watermark (float, optional): Fraction of capacity at which backpressure starts.
+                Defaults to 0.8.
+            low_watermark (float, optional): Fraction of capacity at which backpressure is released.
+                Defaults to 0.5.
+        """
+        self.consumer = consumer
+        self.workers = max(1, int(workers))
+        self._queue = asyncio.Queue(maxsize=capacity)
+        self._tasks = []
+        self.consumer_errors = 0
+        self.emitter = MessageEmitter(self._put, queue_capacity=capacity,
+                                      high_watermark=high_watermark, low_watermark=low_watermark)
+
+    def _put(self, session_id, msg, wparam, lparam):
+        """
+        Put a message on the queue; raises asyncio.QueueFull when it is full.
+        """
+        self._queue.put_nowait((session_id, msg, wparam, lparam))
+
+    async def _consume(self):
+        """
+        Deliver queued messages to the consumer until cancelled.
+        """
+        while True:
+            session_id, msg, wparam, lparam = await self._queue.get()
+            try:
+                await self.consumer(session_id, msg, wparam, lparam)
+            except Exception:
+                self.consumer_errors += 1
+            finally:
+                self.emitter.note_drained(1)
+
+    async def start(self):
+        """
+        Start the consumer tasks.
+        """
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def close(self):
+        """
+        Cancel the consumer tasks.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def emit(self, session_id, msg, wparam, lparam):
+        """
+        Queue the message, or drop it if the queue is full.
+        """
+        return self.emitter.post(session_id, msg, wparam, lparam)
+
+    def emit_move(self, session_id, msg, wparam, lparam):
+        """
+        Queue a mouse move, coalescing it while the queue is saturated.
+        """
+        return self.emitter.post_mouse_move(session_id, msg, wparam, lparam) != DROPPED
+
+    def backpressure_delay(self):
+        """
+        Get the emitter's backpressure delay.
+        """
+        return self.emitter.backpressure_delay()
+
+    def stats(self):
+        """
+        Get the queue and emitter counters.
+        """
+        stats = {"backend": "queue", "queued": self._queue.qsize(), "consumer_errors": self.consumer_errors}
+        stats.update(self.emitter.stats())
+        return stats
+
+
+class WindowBackend(EmitBackend):
+    """
+    Backend that posts every session's messages to the test window of a tester.
+
+    The tester creates the window when the backend starts and destroys it when the
+    backend closes; its MessageEmitter tracks the shared queue.
+
+    Attributes:
+        tester (BaseInputTester): Tester that owns the window and emitter.
+    """
+
+    def __init__(self, tester):
+        """
+        Initialize the WindowBackend.
+
+        Args:
+            tester (BaseInputTester): Tester whose window receives the messages.
+        """
+        self.tester = tester
+        self._window = ExitStack()
+
+    async def start(self):
+        """
+        Create the test window.
+        """
+        self._window.enter_context(self.tester.test_window_context())
+
+    async def close(self):
+        """
+        Destroy the test window.
+        """
+        self._window.close()
+
+    def emit(self, session_id, msg, wparam, lparam):
+        """
+        Post the message to the test window.
+        """
+        return self.tester.emitter.post(self.tester.test_window, msg, wparam, lparam)
+
+    def emit_move(self, session_id, msg, wparam, lparam):
+        """
+        Post a mouse move, coalescing it while the queue is saturated.
+        """
+        return self.tester.emitter.post_mouse_move(self.tester.test_window, msg, wparam, lparam) != DROPPED
+
+    def pump(self):
+        """
+        Process the test window's messages.
+        """
+        self.tester.process_messages()
+
+    def backpressure_delay(self):
+        """
+        Get the emitter's backpressure delay.
+        """
+        return self.tester.emitter.backpressure_delay()
+
+    def stats(self):
+        """
+        Get the emitter counters.
+        """
+        stats = {"backend": "window"}
+        stats.update(self.tester.emitter.stats())
+        return stats
+
+
+class VirtualSession:
+    """
+    One simulated user, run as a coroutine.
+
+    Subclasses implement simulate_input_event() with awaitable delays instead of
+    blocking sleeps.
+
+    Attributes:
+        session_id (int): Identifier of the session within its runtime.
+        profile (BaseInputTester): Template tester whose settings the session uses.
+        runtime (AsyncSessionRuntime): Runtime that hosts the session.
+        interval_source (object): The session's own source of waits between bursts.
+        event_count (int): Events emitted by the session.
+        burst_count (int): Bursts run by the session.
+    """
+
+    def __init__(self, session_id, profile, runtime, interval_source):
+        """
+        Initialize the session.
+
+        Args:
+            session_id (int): Identifier of the session.
+            profile (BaseInputTester): Template tester.
+            runtime (AsyncSessionRuntime): Hosting runtime.
+            interval_source (object): Source of waits between bursts.
+        """
+        self.session_id = session_id
+        self.profile = profile
+        self.runtime = runtime
+        self.interval_source = interval_source
+        self.event_count = 0
+        self.burst_count = 0
+
+    def emit(self, msg, wparam, lparam):
+        """
+        Emit one message through the runtime's backend.
+
+        Returns:
+            bool: True if the message was accepted, False if it was dropped.
+        """
+        return self.runtime.backend.emit(self.session_id, msg, wparam, lparam)
+
+    def record_event(self, event_type):
+        """
+        Count a successfully emitted event.
+
+        Args:
+            event_type (str): Event type, such as "keystroke" or "move".
+        """
+        self.event_count += 1
+        self.runtime.record_event(event_type)
+
+    async def run(self, first_delay):
+        """
+        Run bursts at the pace of the interval source until cancelled.
+
+        Args:
+            first_delay (float): Wait before the first burst, in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        due = loop.time() + first_delay
+        while True:
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            self.runtime.metrics.timing_error.record(loop.time() - due)
+
+            events_before = self.event_count
+            try:
+                await self.simulate_input_event()
+            except Exception as e:
+                self.runtime.logger.error(f"Error in session {self.session_id}: {e}")
+            self.burst_count += 1
+            self.runtime.record_burst()
+
+            interval = self.interval_source.next_interval(self.event_count - events_before)
+            interval = self.profile.apply_activity_calendar(interval + self.runtime.backpressure)
+            due = loop.time() + interval
+
+    async def simulate_input_event(self):
+        """
+        Simulate one input burst.
+
+        This is an abstract method that should be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement simulate_input_event()")
+
+    @classmethod
+    def check_profile(cls, profile):
+        """
+        Check that sessions of this class can run every pattern a profile selects.
+
+        Called once per profile before its sessions are created; subclasses also
+        prepare shared data such as lookup tables here, so that the first burst of
+        every session does not pay for it on the event loop.
+
+        Args:
+            profile (BaseInputTester): Template tester.
+
+        Raises:
+            ValueError: If the profile selects a pattern the sessions do not implement.
+        """
+
+
+class KeyboardSession(VirtualSession):
+    """
+    Virtual typist using the typing settings of a SafeKeyboardTester.
+    """
+
+    def key_code(self, char):
+        """
+        Get the virtual-key code of a character from the profile's key tables.
+
+        Args:
+            char (str): A single character.
+
+        Returns:
+            int: The virtual-key code, or 0 if the keyboard layout has no key for the character.
+        """
+        vk_code = self.profile.key_code(char)
+        return 0 if vk_code == NO_KEY else vk_code
+
+    async def press_key(self, vk_code, char=None):
+        """
+        Press and release a key, sending the character message if one is given.
+
+        Args:
+            vk_code (int): Virtual key code.
+            char (str, optional): Character for the WM_CHAR message. Defaults to None.
+
+        Returns:
+            bool: True if the keystroke was emitted, False if it was dropped.
+        """
+        if not self.emit(WM_KEYDOWN, vk_code, 0):
+            return False
+        delivered = self.emit(WM_CHAR, ord(char), 0) if char else True
+        await asyncio.sleep(KEY_HOLD_TIME)
+        # Key up is always attempted so the key is not left pressed
+        delivered = self.emit(WM_KEYUP, vk_code, 0) and delivered
+        if delivered:
+            self.record_event("keystroke")
+        return delivered
+
+    async def pause_between_keys(self):
+        """
+        Wait a random time between keystrokes.
+        """
+        profile = self.profile
+        await asyncio.sleep(random.uniform(profile.key_interval_min, profile.key_interval_max))
+
+    async def type_char(self, char, typos=True):
+        """
+        Type one character, possibly with a typo that is then corrected.
+
+        Args:
+            char (str): Character to type.
+            typos (bool, optional): Whether typos are allowed. Defaults to True.
+        """
+        profile = self.profile
+        if typos and random.random() < profile.typo_probability:
+            typo = profile.generate_typo(char)
+            typo_code = self.key_code(typo)
+            if typo_code and await self.press_key(typo_code, typo):
+                await self.pause_between_keys()
+                if random.random() < profile.correction_probability and await self.press_key(VK_BACK):
+                    await self.pause_between_keys()
+                    await self.press_key(self.key_code(char), char)
+            return
+
+        vk_code = self.key_code(char)
+        if vk_code and await self.press_key(vk_code, char):
+            await self.pause_between_keys()
+
+    async def type_word(self, word, typos=True):
+        """
+        Type a word followed, with the configured probability, by a space.
+
+        Args:
+            word (str): Word to type.
+            typos (bool, optional): Whether typos are allowed. Defaults to True.
+        """
+        for char in word:
+            await self.type_char(char, typos)
+        if random.random() < self.profile.space_after_word_probability:
+            await self.press_key(VK_SPACE, " ")
+
+    async def simulate_common_word(self):
+        """
+        Type a common word, sometimes capitalized.
+        """
+        profile = self.profile
+        word = random.choice(profile.common_words)
+        if random.random() < profile.capitalization_probability:
+            word = word.capitalize()
+        await self.type_word(word)
+
+    async def simulate_random_word(self):
+        """
+        Type a random sequence of letters.
+        """
+        profile = self.profile
+        length = random.randint(profile.word_length_min, profile.word_length_max)
+        await self.type_word(''.join(random.choice(profile.letters) for _ in range(length)))
+
+    async def simulate_sentence(self):
+        """
+        Type a capitalized sentence of common and random words with end punctuation.
+        """
+        profile = self.profile
+        words = []
+        for _ in range(random.randint(3, 8)):
+            if random.random() < profile.common_words_probability and profile.common_words:
+                words.append(random.choice(profile.common_words))
+            else:
+                words.append(''.join(random.choice(profile.letters) for _ in range(random.randint(2, 7))))
+        words[0] = words[0].capitalize()
+
+        for i, word in enumerate(words):
+            for char in word:
+                await self.type_char(char, typos=False)
+            if i < len(words) - 1:
+                await self.press_key(VK_SPACE, " ")
+        punctuation = random.choice(['.', '!', '?'])
+        await self.press_key(self.key_code(punctuation), punctuation)
+
+    async def simulate_code_snippet(self):
+        """
+        Type a short fragment of code.
+        """
+        previous = None
+        for char in random.choice(CODE_PATTERNS):
+            if char == '\n':
+                await self.press_key(VK_RETURN)
+            elif char == '\t' or (char == ' ' and previous == '\n'):
+                await self.press_key(VK_TAB)
+            else:
+                vk_code = self.key_code(char)
+                if vk_code:
+                    await self.press_key(vk_code, char)
+            previous = char
+            await self.pause_between_keys()
+
+    async def simulate_number_sequence(self):
+        """
+        Type a random sequence of digits.
+        """
+        for _ in range(random.randint(3, 10)):
+            await self.type_char(str(random.randint(0, 9)), typos=False)
+
+    async def simulate_input_event(self):
+        """
+        Simulate a special key or a typing pattern, as SafeKeyboardTester does.
+        """
+        profile = self.profile
+        if random.random() < profile.special_key_probability:
+            await self.press_key(random.choice(list(profile.special_keys.values())))
+            return
+
+        pattern = random.choices(profile.typing_patterns, weights=profile.typing_pattern_weights, k=1)[0]
+        await getattr(self, f"simulate_{pattern}")()
+
+    @classmethod
+    def check_profile(cls, profile):
+        """
+        Check that every typing pattern of the profile is implemented.
+
+        Args:
+            profile (BaseInputTester): Template SafeKeyboardTester.
+
+        Raises:
+            ValueError: If a typing pattern has no simulate_<pattern> coroutine.
+        """
+        missing = [pattern for pattern in profile.typing_patterns if not hasattr(cls, f"simulate_{pattern}")]
+        if missing:
+            raise ValueError(f"Keyboard sessions do not support the typing patterns: {', '.join(missing)}")
+
+
+class MouseSession(VirtualSession):
+    """
+    Virtual mouse user using the movement settings of a SafeMouseTester.
+
+    Attributes:
+        current_x (int): Cursor x-coordinate of this session.
+        current_y (int): Cursor y-coordinate of this session.
+    """
+
+    def __init__(self, session_id, profile, runtime, interval_source):
+        """
+        Initialize the session with its cursor at the center of the primary screen.
+        """
+        super().__init__(session_id, profile, runtime, interval_source)
+        primary = profile.geometry.primary
+        self.current_x = (primary.left + primary.right) // 2
+        self.current_y = (primary.top + primary.bottom) // 2
+
+    def move_to(self, x, y):
+        """
+        Move the session's cursor, clamped to the monitors in use.
+
+        Returns:
+            bool: True if the move was emitted or coalesced, False if it was dropped.
+        """
+        x, y = self.profile.geometry.clamp(int(x), int(y))
+        if not self.runtime.backend.emit_move(self.session_id, WM_MOUSEMOVE, 0, pack_point(x, y)):
+            return False
+        self.current_x, self.current_y = x, y
+        self.record_event("move")
+        return True
+
+    async def follow(self, points, delays):
+        """
+        Move through a sequence of points, waiting between steps.
+
+        Args:
+            points (iterable): (x, y) positions.
+            delays (callable): Function of the step index returning the wait after that step.
+        """
+        for step, (x, y) in enumerate(points):
+            if not self.move_to(x, y):
+                return
+            await asyncio.sleep(delays(step))
+
+    def random_delta(self):
+        """
+        Get a random displacement of at least the minimum movement distance.
+
+        Returns:
+            tuple: (delta x, delta y).
+        """
+        profile = self.profile
+        delta_x = random.randint(-profile.movement_max_distance, profile.movement_max_distance)
+        delta_y = random.randint(-profile.movement_max_distance, profile.movement_max_distance)
+        distance = math.hypot(delta_x, delta_y)
+        if distance < profile.movement_min_distance:
+            scale = profile.movement_min_distance / max(distance, 1.0)
+            delta_x, delta_y = int(delta_x * scale), int(delta_y * scale)
+        return delta_x, delta_y
+
+    async def simulate_random_movement(self):
+        """
+        Move the cursor by a random displacement in one step.
+        """
+        delta_x, delta_y = self.random_delta()
+        self.move_to(self.current_x + delta_x, self.current_y + delta_y)
+
+    async def simulate_linear_movement(self):
+        """
+        Move the cursor in a straight line, in steps.
+        """
+        profile = self.profile
+        delta_x, delta_y = self.random_delta()
+        start_x, start_y = self.current_x, self.current_y
+        steps = random.randint(profile.linear_min_steps, profile.linear_max_steps)
+        points = ((start_x + delta_x * step / steps, start_y + delta_y * step / steps)
+                  for step in range(1, steps + 1))
+        await self.follow(points, lambda step: 0.01)
+
+    async def simulate_circular_movement(self):
+        """
+        Move the cursor around a circle near its current position.
+        """
+        profile = self.profile
+        radius = random.randint(profile.circular_min_radius, profile.circular_max_radius)
+        steps = random.randint(profile.circular_min_steps, profile.circular_max_steps)
+        monitor = profile.geometry.nearest_monitor(self.current_x, self.current_y)
+        center_x = max(monitor.left + radius, min(monitor.right - radius, self.current_x))
+        center_y = max(monitor.top + radius, min(monitor.bottom - radius, self.current_y))
+        points = ((center_x + radius * math.cos(2 * math.pi * step / steps),
+                   center_y + radius * math.sin(2 * math.pi * step / steps)) for step in range(steps))
+        await self.follow(points, lambda step: 0.02)
+
+    async def simulate_targeted_movement(self):
+        """
+        Move the cursor along a slight curve to one of the configured targets.
+        """
+        profile = self.profile
+        if not profile.targeted_targets:
+            await self.simulate_random_movement()
+            return
+
+        monitor = profile.geometry.random_monitor()
+        width, height = monitor.right - monitor.left, monitor.bottom - monitor.top
+        targets = [(monitor.left + int(target["x_ratio"] * width), monitor.top + int(target["y_ratio"] * height))
+                   for target in profile.targeted_targets]
+        weights = [target.get("weight", 1) for target in profile.targeted_targets]
+        target_x, target_y = random.choices(targets, weights=weights, k=1)[0]
+
+        start_x, start_y = self.current_x, self.current_y
+        distance = math.hypot(target_x - start_x, target_y - start_y)
+        steps = max(5, min(20, int(distance / 10)))
+        curve_offset = int(distance * 0.1)
+        midpoint_x = (start_x + target_x) / 2 + random.randint(-curve_offset, curve_offset)
+        midpoint_y = (start_y + target_y) / 2 + random.randint(-curve_offset, curve_offset)
+
+        # Quadratic Bezier curve, slower at the start and end
+        points = (((1 - t) ** 2 * start_x + 2 * (1 - t) * t * midpoint_x + t ** 2 * target_x,
+                   (1 - t) ** 2 * start_y + 2 * (1 - t) * t * midpoint_y + t ** 2 * target_y)
+                  for t in (step / steps for step in range(1, steps + 1)))
+        await self.follow(points, lambda step: 0.03 if step + 1 < steps * 0.2 or step + 1 > steps * 0.8 else 0.02)
+
+    async def simulate_trajectory_movement(self):
+        """
+        Move the cursor along a path shape from the profile's trajectory library.
+
+        The shape is mapped onto a random displacement, as SafeMouseTester does. Falls
+        back to a linear movement if the library holds no shapes.
+        """
+        profile = self.profile
+        library = profile.get_trajectory_library()
+        if library is None:
+            await self.simulate_linear_movement()
+            return
+
+        delta_x, delta_y = self.random_delta()
+        start_x, start_y = self.current_x, self.current_y
+        end_x, end_y = profile.geometry.clamp(start_x + delta_x, start_y + delta_y)
+        steps = max(5, min(20, int(math.hypot(delta_x, delta_y) / 10)))
+        shape = library.choose(random.choice(library.kinds))
+        points = profile.geometry.clamp_points(library.path(start_x, start_y, end_x, end_y, steps, shape))
+        await self.follow(points, lambda step: 0.01)
+
+    async def simulate_click(self, button_type, double_click):
+        """
+        Click a button at the session's cursor position.
+
+        Args:
+            button_type (str): "left", "right" or "middle".
+            double_click (bool): Whether to double-click.
+        """
+        messages = {
+            "left": (WM_LBUTTONDOWN, WM_LBUTTONUP),
+            "right": (WM_RBUTTONDOWN, WM_RBUTTONUP),
+            "middle": (WM_MBUTTONDOWN, WM_MBUTTONUP),
+        }
+        if button_type not in messages:
+            return
+        down_msg, up_msg = messages[button_type]
+        lparam = pack_point(self.current_x, self.current_y)
+
+        if double_click and button_type == "left":
+            delivered = self.emit(WM_LBUTTONDBLCLK, 0, lparam)
+            await asyncio.sleep(DOUBLE_CLICK_GAP)
+            delivered = self.emit(up_msg, 0, lparam) and delivered
+        else:
+            delivered = self.emit(down_msg, 0, lparam)
+            await asyncio.sleep(KEY_HOLD_TIME)
+            delivered = self.emit(up_msg, 0, lparam) and delivered
+
+        if delivered:
+            self.record_event("double_click" if double_click else "click")
+
+    @classmethod
+    def check_profile(cls, profile):
+        """
+        Check that every movement pattern of the profile is implemented.
+
+        The trajectory library is built here if the "trajectory" pattern is selected.
+
+        Args:
+            profile (BaseInputTester): Template SafeMouseTester.
+
+        Raises:
+            ValueError: If a movement pattern has no simulate_<pattern>_movement coroutine.
+        """
+        missing = [pattern for pattern in profile.movement_patterns
+                   if not hasattr(cls, f"simulate_{pattern}_movement")]
+        if missing:
+            raise ValueError(f"Mouse sessions do not support the movement patterns: {', '.join(missing)}")
+        if "trajectory" in profile.movement_patterns:
+            profile.get_trajectory_library()
+
+    async def simulate_input_event(self):
+        """
+        Simulate a movement pattern, a click or a scroll, as SafeMouseTester does.
+        """
+        profile = self.profile
+        random_value = random.random()
+
+        if random_value >= profile.click_probability + profile.scroll_probability:
+            pattern = random.choices(
+                profile.movement_patterns,
+                weights=profile.movement_pattern_weights[:len(profile.movement_patterns)],
+                k=1
+            )[0]
+            await getattr(self, f"simulate_{pattern}_movement")()
+        elif random_value < profile.click_probability:
+            button_type = random.choices(
+                profile.button_types,
+                weights=profile.button_weights[:len(profile.button_types)],
+                k=1
+            )[0]
+            double_click = random.random() < profile.double_click_probability and button_type == "left"
+            await self.simulate_click(button_type, double_click)
+        else:
+            delta = random.randint(1, 3) * 120 * (1 if random.random() > 0.5 else -1)
+            if self.emit(WM_MOUSEWHEEL, delta << 16, pack_point(self.current_x, self.current_y)):
+                self.record_event("scroll")
+
+
+class AsyncSessionRuntime:
+    """
+    Run many virtual sessions on one asyncio event loop.
+
+    Sessions start at random offsets within the first interval so they do not all
+    fire at once. A housekeeping task pumps the backend, refreshes the backpressure
+    delay that sessions add to their waits, samples resource usage and checks for
+    Escape; the run ends when a bound is reached, Escape is pressed or stop() is called.
+
+    Attributes:
+        backend (EmitBackend): Destination of every session's messages.
+        keyboard_profile (BaseInputTester): Template for keyboard sessions, or None.
+        mouse_profile (BaseInputTester): Template for mouse sessions, or None.
+        keyboard_sessions (int): Number of keyboard sessions.
+        mouse_sessions (int): Number of mouse sessions.
+        sessions (list): Sessions of the current run.
+        event_count (int): Events emitted by all sessions.
+        burst_count (int): Bursts run by all sessions.
+        backpressure (float): Extra wait sessions currently add between bursts.
+        seed (int): Random seed of the current run.
+        stop_reason (str): Why the last run ended, or None while running.
+        metrics (RunMetrics): Events by type, burst timing error and resource samples.
+        escape_check (callable): Returns True when the run should stop for Escape, or None.
+    """
+
+    def __init__(self, backend, keyboard_profile=None, keyboard_sessions=0,
+                 mouse_profile=None, mouse_sessions=0, pump_interval=0.05):
+        """
+        Initialize the runtime.
+
+        Args:
+            backend (EmitBackend): Destination of every session's messages.
+            keyboard_profile (BaseInputTester, optional): Template for keyboard sessions.
+            keyboard_sessions (int, optional): Number of keyboard sessions. Defaults to 0.
+            mouse_profile (BaseInputTester, optional): Template for mouse sessions.
+            mouse_sessions (int, optional): Number of mouse sessions. Defaults to 0.
+            pump_interval (float, optional): Seconds between housekeeping passes. Defaults to 0.05.
+
+        Raises:
+            ValueError: If sessions are requested without a matching profile, or none at all.
+        """
+        if keyboard_sessions and keyboard_profile is None:
+            raise ValueError("Keyboard sessions need a keyboard profile")
+        if mouse_sessions and mouse_profile is None:
+            raise ValueError("Mouse sessions need a mouse profile")
+        if keyboard_sessions + mouse_sessions <= 0:
+            raise ValueError("AsyncSessionRuntime needs at least one session")
+
+        self.backend = backend
+        self.keyboard_profile = keyboard_profile
+        self.keyboard_sessions = keyboard_sessions
+        self.mouse_profile = mouse_profile
+        self.mouse_sessions = mouse_sessions
+        self.pump_interval = pump_interval
+        self.escape_check = None
+
+        self.sessions = []
+        self.event_count = 0
+        self.burst_count = 0
+        self.backpressure = 0.0
+        self.seed = None
+        self.stop_reason = None
+        self.metrics = RunMetrics()
+        self.max_events = None
+        self.max_duration = None
+        self.max_bursts = None
+
+        self.process = psutil.Process(os.getpid())
+        self._stopped = None
+
+    @property
+    def logger(self):
+        """
+        Get the logger instance.
+
+        Returns:
+            logging.Logger: The logger instance.
+        """
+        return logging.getLogger()
+
+    def record_event(self, event_type):
+        """
+        Count an event emitted by a session and stop at max_events.
+
+        Args:
+            event_type (str): Event type, such as "keystroke" or "move".
+        """
+        self.event_count += 1
+        self.metrics.count_event(event_type)
+        if self.max_events is not None and self.event_count >= self.max_events:
+            self.stop("max_events")
+
+    def record_burst(self):
+        """
+        Count a burst run by a session and stop at max_bursts.
+        """
+        self.burst_count += 1
+        if self.max_bursts is not None and self.burst_count >= self.max_bursts:
+            self.stop("max_bursts")
+
+    def stop(self, reason="stopped"):
+        """
+        End the current run.
+
+        Args:
+            reason (str, optional): Stop reason recorded in the summary. Defaults to "stopped".
+        """
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def create_sessions(self, min_interval=None, max_interval=None):
+        """
+        Create the sessions of a run, each with its own copy of its profile's pacing.
+
+        Args:
+            min_interval (float, optional): Minimum time between bursts, or None for the profile's config.
+            max_interval (float, optional): Maximum time between bursts, or None for the profile's config.
+
+        Returns:
+            list: (session, first delay) pairs.
+
+        Raises:
+            ValueError: If a profile selects a pattern its sessions do not implement.
+        """
+        sessions = []
+        for session_class, profile, count in ((KeyboardSession, self.keyboard_profile, self.keyboard_sessions),
+                                               (MouseSession, self.mouse_profile, self.mouse_sessions)):
+            if not count:
+                continue
+            session_class.check_profile(profile)
+            low = min_interval or profile.config.get("event_interval_min", 1.0)
+            high = max_interval or profile.config.get("event_interval_max", 5.0)
+
+            # Build the pacing once (validated and logged) and give every session a copy
+            template = profile.create_interval_source(
+                low, high, profile.config.get("target_rate"), profile.config.get("activity_model"))
+            for _ in range(count):
+                session = session_class(len(sessions), profile, self, copy.deepcopy(template))
+                sessions.append((session, random.uniform(0.0, high)))
+        return sessions
+
+    async def housekeeping(self):
+        """
+        Pump the backend, refresh backpressure, sample resources and check for Escape.
+        """
+        resource_interval = min(profile.resource_monitor_interval
+                                for profile in (self.keyboard_profile, self.mouse_profile) if profile)
+        last_sample = time.time()
+        self.process.cpu_percent(interval=None)
+        while True:
+            await asyncio.sleep(self.pump_interval)
+            self.backend.pump()
+            self.backpressure = self.backend.backpressure_delay()
+
+            if self.escape_check is not None and self.escape_check():
+                self.stop("escape")
+
+            if time.time() - last_sample >= resource_interval:
+                self.sample_resources()
+                last_sample = time.time()
+
+    def sample_resources(self):
+        """
+        Sample and log process resource usage.
+        """
+        try:
+            cpu_percent = self.process.cpu_percent(interval=None)
+            memory_mb = self.process.memory_info().rss / (1024 * 1024)
+            self.metrics.add_resource_sample(cpu_percent, memory_mb)
+            self.logger.info(f"Resource usage - CPU: {cpu_percent:.1f}%, Memory: {memory_mb:.2f} MB, "
+                             f"events: {self.event_count}, backend: {self.backend.stats()}")
+        except Exception as e:
+            self.logger.error(f"Error monitoring resources: {e}")
+
+    async def run(self, min_interval=None, max_interval=None, max_events=None, max_duration=None,
+                  max_bursts=None, seed=None):
+        """
+        Run every session until a bound is reached or the run is stopped.
+
+        Args:
+            min_interval (float, optional): Minimum time between bursts of each session.
+            max_interval (float, optional): Maximum time between bursts of each session.
+            max_events (int, optional): Stop after this many events across all sessions.
+            max_duration (float, optional): Stop after this many seconds.
+            max_bursts (int, optional): Stop after this many bursts across all sessions.
+            seed (int, optional): Random seed for a reproducible run.
+
+        Returns:
+            dict: Run summary.
+        """
+        self.max_events = max_events
+        self.max_duration = max_duration
+        self.max_bursts = max_bursts
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), "big")
+        random.seed(self.seed)
+
+        self.event_count = 0
+        self.burst_count = 0
+        self.stop_reason = None
+        self.metrics = RunMetrics()
+        self._stopped = asyncio.Event()
+
+        planned = self.create_sessions(min_interval, max_interval)
+        self.sessions = [session for session, _ in planned]
+        self.logger.info(f"Starting {self.keyboard_sessions} keyboard and {self.mouse_sessions} mouse sessions "
+                         f"(seed {self.seed})")
+
+        started_at = datetime.now()
+        await self.backend.start()
+        tasks = []
+        try:
+            tasks = [asyncio.create_task(session.run(first_delay)) for session, first_delay in planned]
+            tasks.append(asyncio.create_task(self.housekeeping()))
+            try:
+                await asyncio.wait_for(self._stopped.wait(), max_duration)
+            except asyncio.TimeoutError:
+                self.stop("max_duration")
+        finally:
+            self.stop()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.backend.close()
+
+        self.sample_resources()
+        summary = self.build_summary(started_at, datetime.now())
+        self.logger.info(f"Sessions completed ({self.stop_reason}). Total events simulated: {self.event_count}")
+        return summary
+
+    def start(self, *args, **kwargs):
+        """
+        Run the sessions on a new event loop; takes the same arguments as run().
+
+        Returns:
+            dict: Run summary.
+        """
+        try:
+            return asyncio.run(self.run(*args, **kwargs))
+        except KeyboardInterrupt:
+            self.stop("interrupted")
+            raise
+
+    def build_summary(self, started_at, ended_at):
+        """
+        Build the machine-readable summary of a finished run.
+
+        Args:
+            started_at (datetime): Start time of the run.
+            ended_at (datetime): End time of the run.
+
+        Returns:
+            dict: Run summary suitable for JSON serialization.
+        """
+        duration = (ended_at - started_at).total_seconds()
+        per_session = [session.event_count for session in self.sessions] or [0]
+        return {
+            "sessions": {
+                "keyboard": self.keyboard_sessions,
+                "mouse": self.mouse_sessions,
+                "events_min": min(per_session),
+                "events_mean": round(sum(per_session) / len(per_session), 2),
+                "events_max": max(per_session),
+            },
+            "seed": self.seed,
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "ended_at": ended_at.isoformat(timespec="seconds"),
+            "duration_s": round(duration, 3),
+            "stop_reason": self.stop_reason,
+            "bounds": {
+                "max_events": self.max_events,
+                "max_duration": self.max_duration,
+                "max_bursts": self.max_bursts,
+            },
+            "events": {
+                "total": self.event_count,
+                "bursts": self.burst_count,
+                "by_type": dict(self.metrics.events_by_type),
+            },
+            "rates_per_sec": self.metrics.rates(duration),
+            "timing_error": self.metrics.timing_error.summary(),
+            "backend": self.backend.stats(),
+            "resources": self.metrics.resource_summary(),
+        }
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for running many virtual sessions in one process.
+
+    Example:
+        python async_sessions.py --keyboard-sessions 5000 --max-duration 600
+
+    Sessions use the settings of skt-1.8.config.json and smt-1.8.config.json (or the
+    files given with --keyboard-config and --mouse-config). With the default window
+    backend all sessions post to a single test window; --backend counting only counts
+    the messages, which measures how many sessions the event loop can drive.
+    """
+    from tester_runtime import load_tester_class, TESTER_SCRIPTS
+    from base_input_tester_1_8 import build_argument_parser
+
+    parser = build_argument_parser("Input Testing Utility Suite v1.8 - Thousands of virtual sessions in one process")
+    parser.add_argument("--keyboard-sessions", type=int, default=0, help="Number of virtual typists")
+    parser.add_argument("--mouse-sessions", type=int, default=0, help="Number of virtual mouse users")
+    parser.add_argument("--keyboard-config", default=None, help="Configuration file for keyboard sessions")
+    parser.add_argument("--mouse-config", default=None, help="Configuration file for mouse sessions")
+    parser.add_argument("--backend", choices=("window", "counting"), default="window",
+                        help="Where session messages go (default: window)")
+    args = parser.parse_args()
+
+    if args.keyboard_sessions <= 0 and args.mouse_sessions <= 0:
+        parser.error("request at least one session, e.g. --keyboard-sessions 100")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    profiles = {}
+    for option, sessions, config_path in (("keyboard", args.keyboard_sessions, args.keyboard_config),
+                                          ("mouse", args.mouse_sessions, args.mouse_config)):
+        if sessions <= 0:
+            continue
+        script, class_name = TESTER_SCRIPTS[option]
+        config_path = config_path or os.path.join(script_dir, script.replace(".py", ".config.json"))
+        profiles[option] = load_tester_class(script, class_name)(config_path if os.path.exists(config_path) else None)
+
+    owner = profiles.get("keyboard") or profiles.get("mouse")
+    backend = WindowBackend(owner) if args.backend == "window" else CountingBackend()
+    runtime = AsyncSessionRuntime(
+        backend,
+        keyboard_profile=profiles.get("keyboard"),
+        keyboard_sessions=max(0, args.keyboard_sessions),
+        mouse_profile=profiles.get("mouse"),
+        mouse_sessions=max(0, args.mouse_sessions),
+    )
+    runtime.escape_check = owner.escape_pressed
+
+    print("Input Testing Utility Suite v1.8 - Virtual sessions")
+    print("Use 'ESC' key to stop testing")
+
+    try:
+        summary = runtime.start(
+            args.min_interval,
+            args.max_interval,
+            max_events=args.max_events,
+            max_duration=args.max_duration,
+            max_bursts=args.max_bursts,
+            seed=args.seed,
+        )
+        summary_file = args.summary or os.path.splitext(owner.log_filename)[0] + "_sessions_summary.json"
+        owner.write_run_summary(summary, summary_file)
+    except Exception as e:
+        logging.error(f"\nAn error occurred: {e}")
+        print(f"\nError: {e}")
+        print("Check the log file for more details.")
+        # Only wait for a keypress when someone is watching the console
+        if sys.stdin and sys.stdin.isatty():
+            input("Press Enter to exit...")
+        raise
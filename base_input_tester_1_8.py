@@ -1,21 +1,30 @@
 # base_input_tester_1_7.py
-import win32api
-import win32gui
-import win32con
-import random
 import time
-from ctypes import (
-    windll,
-    byref,
-    c_ulong,
-)
 import threading
 from contextlib import contextmanager
 import logging
 from datetime import datetime
 import os
-import psutil
 import json
+import random
+import argparse
+import queue
+from config_compiler import ConfigError, compile_config
+from config_watcher import ConfigWatcher
+from control_channel import ControlServer, default_control_address
+from event_bus import EventBusWriter
+from delivery_tracker import DeliveryTracker
+from flood_ramp import DEFAULT_MAX_RATE, DEFAULT_START_RATE, DEFAULT_STEP_DURATION, DEFAULT_STEPS, FloodRamp, ramp_rates
+from gc_monitor import GCMonitor, apply_gc_tuning
+from input_emitter import MessageEmitter
+from input_events import EventBatch, InputEvent
+from input_scheduler import UniformIntervals, TokenBucketGovernor, ActivityProcess, ActivityCalendar
+from leak_detector import LeakDetector, describe_report
+from lazy_imports import lazy_import
+from phase_profiler import PhaseProfiler, ProfiledLogger
+from run_metrics import RunMetrics
+from stack_sampler import DEFAULT_INTERVAL, StackSampler
+from tester_settings import BaseSettings
 
 """
 BaseInputTester - Base class for isolated input testing utilities.
@@ -29,10 +38,83 @@ Version 1.8 Updates:
 - Removed duplicate code in testing loop
 - Enhanced error handling in configuration loading
 - Added support for console_logging_enabled configuration option
+- Added backpressure-aware MessageEmitter that tracks undrained messages and reports drops
+- Added target-rate mode (events/sec, keystrokes/sec or WPM) paced by a token-bucket governor
+- Added bursty activity models (Poisson, Hawkes, on/off) with block-precomputed gaps
+- Added time-of-day activity calendars; idle waits are a single tickless sleep instead of 100 ms polling
+- Added bounded runs (max events, duration, bursts) and a JSON end-of-run performance summary
+- Split the run lifecycle into prepare_run/run_burst/next_event_interval/finish_run so that
+  several testers can share one scheduler, window and monitor (see tester_runtime.py)
+- Added an optional shared-memory event bus that publishes every emitted message for
+  external readers (see event_bus.py)
+- Added an optional control socket for pausing, resuming, re-pacing, re-weighting,
+  recycling and stopping a running test (see control_channel.py)
+- Added optional hot reloading of the configuration file: edits are validated off the
+  testing thread and swapped in between events, and invalid edits are rejected
+- Configuration files are parsed by a JSON-with-comments tokenizer with a disk cache
+  (see config_compiler.py) and validated against typed settings classes (see tester_settings.py);
+  invalid values are reported together instead of silently replaced by defaults
+- Faster startup: pywin32, psutil and ctypes are imported on first use, the process handle
+  for resource monitoring is created on first use, the log file is opened on the first
+  record and large configuration lists are summarized in the log (see lazy_imports.py and
+  import_benchmark.py)
+- Added optional phase profiling: pattern selection, generation, key lookups, posting,
+  message processing, logging and sleeps each feed a latency histogram, reported in the
+  run summary and live stats (see phase_profiler.py)
+- Added an optional sampling profiler that writes the testing thread's stacks in the
+  collapsed format read by flamegraph tools, from the configuration or the "profile"
+  control command (see stack_sampler.py)
+- Added optional memory leak detection to resource monitoring: tracemalloc snapshots are
+  compared to find the fastest-growing allocation sites, RSS growth is split between the
+  tester, logging and untraced (Windows) memory, and sustained growth is flagged (see leak_detector.py)
+- Added optional garbage-collector monitoring (pauses overall, per generation and inside bursts,
+  and inter-key timing error) and tuning (gc.freeze() of the startup heap, generation
+  thresholds) (see gc_monitor.py)
+- Emitted messages are recorded in a reusable, array-backed EventBatch instead of per-burst
+  lists of typed characters; bursts are logged from the batch (see input_events.py)
+- Added a flood mode ("flood_mode" or --flood) that ramps single keypresses or mouse moves
+  from a start rate to a maximum without pacing and records a saturation curve of achieved
+  rate, PostMessage failures, queue depth and pump latency (see flood_ramp.py)
+- Added optional delivery tracking: every posted message is matched to its dispatch in the
+  window procedure, and loss, reordering and post-to-dispatch latency are reported in the
+  run summary and the resource log (see delivery_tracker.py)
+- The emitter can skip mouse moves that leave the pointer where it is and hold moves back to a
+  report rate, posting the latest position once per report interval
 """
 
-# Make sure that GetWindowThreadProcessId(hwnd) is defined
-if not hasattr(win32gui, "GetWindowThreadProcessId"):
+# Only loaded once a tester is created or resources are first monitored
+win32api = lazy_import("win32api")
+win32gui = lazy_import("win32gui")
+win32con = lazy_import("win32con")
+psutil = lazy_import("psutil")
+
+# Configuration keys that only affect how the next wait is chosen
+PACING_KEYS = {
+    "event_interval_min": "min_interval",
+    "event_interval_max": "max_interval",
+    "target_rate": "target_rate",
+    "activity_model": "activity_model",
+}
+
+# Configuration keys that bound a run
+BOUND_KEYS = ("max_events", "max_duration", "max_bursts")
+
+# Lists longer than this are shown by their length when the configuration is logged
+LOGGED_LIST_ITEMS = 20
+
+
+def install_window_thread_process_id():
+    """
+    Make sure that win32gui.GetWindowThreadProcessId(hwnd) is defined.
+
+    Called when the first tester is created rather than at import time, so that
+    importing this module loads neither win32gui nor ctypes.
+    """
+    if hasattr(win32gui, "GetWindowThreadProcessId"):
+        return
+
+    from ctypes import windll, byref, c_ulong
+
     def GetWindowThreadProcessId(hwnd):
         """
         Replacement for win32gui.GetWindowThreadProcessId using ctypes.
@@ -55,6 +137,24 @@ if not hasattr(win32gui, "GetWindowThreadProcessId"):
     win32gui.GetWindowThreadProcessId = GetWindowThreadProcessId
 
 
+def summarize_config(config):
+    """
+    Shorten a configuration for logging.
+
+    Vocabulary and target lists can hold thousands of entries; logging them in full
+    slows startup and buries the settings that matter.
+
+    Args:
+        config (dict): Configuration parameters.
+
+    Returns:
+        dict: The configuration with long lists replaced by a count.
+    """
+    return {key: f"<{len(value)} items>" if isinstance(value, (list, tuple)) and len(value) > LOGGED_LIST_ITEMS
+            else value
+            for key, value in config.items()}
+
+
 class BaseInputTester:
     """
     Base class for input testing in isolated environments.
@@ -74,9 +174,55 @@ class BaseInputTester:
         last_message_process_time (float): Timestamp of the last message processing.
         resource_monitor_interval (int): Number of seconds between resource monitoring.
         last_resource_monitor_time (float): Timestamp of the last resource monitoring.
-        process (psutil.Process): Current process for resource monitoring.
+        process (psutil.Process): Current process for resource monitoring, created on first use.
+        emitter (MessageEmitter): Emit layer used to post messages to the test window.
+        burst_events (EventBatch): Messages emitted by the current burst.
+        last_event (InputEvent): Record reused by last_emitted_event().
+        interval_source (object): Source of the waits between events (UniformIntervals,
+            TokenBucketGovernor or ActivityProcess), set when testing starts.
+        activity_calendar (ActivityCalendar): Time-of-day schedule that modulates event rates, or None.
+        metrics (RunMetrics): Event, timing and resource metrics for the current run.
+        burst_count (int): Number of input bursts simulated in the current run.
+        seed (int): Random seed of the current run.
+        stop_reason (str): Why the last run ended ("escape", "max_events", "max_duration",
+            "max_bursts", "control", "flood_complete" or "stopped").
+        log_filename (str): Absolute path of the log file.
+        runtime (MultiTesterRuntime): Runtime that shares its window, message pump and monitoring
+            with this tester, or None when the tester runs on its own.
+        pacing (dict): Interval settings of the current run ("min_interval", "max_interval",
+            "target_rate" and "activity_model"), which the set_rate control command changes.
+        paused (bool): Whether a control command has paused the run.
+        control_server (ControlServer): Control socket of the current run, or None.
+        config_file (str): Path of the configuration file, or None.
+        config_watcher (ConfigWatcher): Watcher that reloads the configuration file, or None.
+        settings (BaseSettings): Typed, validated form of the configuration.
+        phase_profiler (PhaseProfiler): Per-phase timings of the current run, or None when
+            phase profiling is off.
+        stack_sampler (StackSampler): Sampling profiler of the current run, or None if none was started.
+        leak_detector (LeakDetector): Memory growth detector, or None when leak detection is off.
+        leak_check_interval (float): Number of seconds between memory leak checks.
+        last_leak_check_time (float): Timestamp of the last memory leak check.
+        gc_monitor (GCMonitor): Garbage-collection pause monitor, or None when GC monitoring is off.
+        gc_tuning (dict): Garbage-collector tuning that was applied, or None.
+        flood_result (dict): Saturation curve of the last flood ramp, or None.
+        delivery_tracker (DeliveryTracker): Matches posted messages to their dispatch in the
+            window procedure, or None when delivery tracking is off.
     """
 
+    # Settings class that defines and validates the configuration keys
+    SETTINGS_CLASS = BaseSettings
+
+    # Configuration keys whose changes are applied by reload_config(); subclasses add their own
+    RELOADABLE_KEYS = ("cleanup_interval", "message_process_interval", "resource_monitor_interval",
+                       "run_summary_file", "activity_calendar") + tuple(PACING_KEYS) + BOUND_KEYS
+
+    # Methods timed by phase profiling, by phase; subclasses add their own
+    PROFILED_PHASES = {
+        "process_messages": "pump",
+        "sleep": "sleep",
+        "wait_for_next_event": "wait",
+    }
+
     def __init__(self, config_file=None):
         """
         Initialize the BaseInputTester with default or config file parameters.
@@ -87,6 +233,34 @@ class BaseInputTester:
         self.running = False
         self.test_window = None
         self.event_count = 0
+        self.burst_count = 0
+        self.seed = None
+        self.stop_reason = None
+        self.log_filename = None
+        self.metrics = RunMetrics()
+        self.runtime = None
+        self.run_started_at = None
+        self.pacing = {}
+        self.paused = False
+        self.control_server = None
+        self.config_file = config_file
+        self.config_watcher = None
+        self.phase_profiler = None
+        self._profiled_logger = None
+        self.stack_sampler = None
+        self.leak_detector = None
+        self.leak_check_interval = None
+        self.last_leak_check_time = None
+        self.gc_monitor = None
+        self.gc_tuning = None
+        self.flood_result = None
+        self.delivery_tracker = None
+
+        # Run bounds, set when testing starts
+        self.max_events = None
+        self.max_duration = None
+        self.max_bursts = None
+        self._run_deadline = None
 
         # Load configuration if file provided, otherwise use defaults
         self.config = self.load_config(config_file)
@@ -103,69 +277,107 @@ class BaseInputTester:
         self.resource_monitor_interval = self.config.get("resource_monitor_interval", 30)
         self.last_resource_monitor_time = time.time()
 
-        # Process for resource monitoring
-        self.process = psutil.Process(os.getpid())
+        # Process for resource monitoring, created when resources are first monitored
+        self._process = None
+
+        install_window_thread_process_id()
+
+        # Emit layer with queue tracking and backpressure
+        self.emitter = MessageEmitter.from_config(self.config, win32gui.PostMessage, drain=self.process_messages)
+        self.burst_events = EventBatch()
+        self.last_event = InputEvent()
+        self.emitter.event_batch = self.burst_events
+        self.emitter.on_deferred_post = self._count_deferred_event
+
+        # Pacing between events, chosen when testing starts
+        self.interval_source = None
+
+        # Wakes the testing thread when testing ends or a control command arrives
+        self._wake_event = threading.Event()
+
+        # Control commands waiting to be applied between events, as (request, reply slot) pairs
+        self._control_commands = queue.SimpleQueue()
 
         # Set up logging
         self.setup_logging()
 
+        # Time-of-day schedule (needs logging to report configuration errors)
+        self.activity_calendar = self.create_activity_calendar(self.config.get("activity_calendar"))
+
+        # Shared-memory stream of emitted messages for external readers
+        self.emitter.event_bus = self.create_event_bus(self.config.get("event_bus"))
+
     def load_config(self, config_file):
         """
         Load configuration from a JSON file.
 
-        Reads parameters from a JSON configuration file if provided,
-        otherwise returns default configuration values. Supports both
-        "config" and "config.json" file patterns.
+        Reads parameters from a JSON configuration file (comments allowed) if provided,
+        otherwise returns default configuration values. Keys missing from the file take
+        their defaults from SETTINGS_CLASS, which also validates every value and is kept
+        as the settings attribute.
 
         Args:
             config_file (str): Path to configuration file.
 
         Returns:
             dict: Configuration parameters.
+
+        Raises:
+            ConfigError: If the file cannot be parsed or contains invalid values.
         """
-        default_config = {
-            "cleanup_interval": 600,  # 10 minutes
-            "message_process_interval": 5,  # 5 seconds
-            "resource_monitor_interval": 30,  # 30 seconds
-            "log_level": "INFO",
-            "console_logging_enabled": True,  # Default to showing console logs
-        }
+        if not config_file:
+            self._print_message("No config file specified. Using default values.")
+            self.settings, config = self.build_settings({})
+            return config
 
-        if config_file:
-            try:
-                # Handle JSON with comments
-                with open(config_file, 'r') as f:
-                    content = ""
-                    for line in f:
-                        # Remove comments (// style)
-                        line_no_comment = line.split('//')[0] if '//' in line else line
-                        # Also handle JSON /* */ style comments
-                        if '/*' in line_no_comment and '*/' in line_no_comment:
-                            line_no_comment = line_no_comment.split('/*')[0] + line_no_comment.split('*/')[1]
-                        elif '/*' in line_no_comment:
-                            line_no_comment = line_no_comment.split('/*')[0]
-                        elif '*/' in line_no_comment:
-                            line_no_comment = line_no_comment.split('*/')[1]
-
-                        if line_no_comment.strip():
-                            content += line_no_comment
-
-                try:
-                    config = json.loads(content)
-                    # Merge with defaults (to ensure all required keys exist)
-                    merged_config = default_config.copy()
-                    merged_config.update(config)
-                    self._print_message(f"Successfully loaded config from: {config_file}")
-                    return merged_config
-                except json.JSONDecodeError as e:
-                    self._print_message(f"Error parsing JSON from {config_file}: {e}")
-                    return default_config
-            except Exception as e:
-                self._print_message(f"Error loading config file {config_file}: {e}")
-                return default_config
+        try:
+            self.settings, config = self.build_settings(self.read_config_file(config_file))
+        except OSError as e:
+            self._print_message(f"Error loading config file {config_file}: {e}. Using default values.")
+            self.settings, config = self.build_settings({})
+            return config
+        except ConfigError as e:
+            raise ConfigError([f"{config_file}: {problem}" for problem in e.problems]) from None
+
+        self._print_message(f"Successfully loaded config from: {config_file}")
+        return config
+
+    def build_settings(self, config):
+        """
+        Validate configuration parameters against SETTINGS_CLASS.
+
+        Args:
+            config (dict): Parameters read from a configuration file.
+
+        Returns:
+            tuple: (settings, configuration dict with every key, including unknown ones).
+
+        Raises:
+            ConfigError: Listing every invalid value.
+        """
+        settings, unknown = self.SETTINGS_CLASS.from_config(config)
+        if unknown:
+            self._print_message(f"Ignoring unknown configuration keys: {', '.join(unknown)}")
+        merged_config = settings.to_dict()
+        merged_config.update((key, config[key]) for key in unknown)
+        return settings, merged_config
+
+    @staticmethod
+    def read_config_file(config_file):
+        """
+        Read a JSON configuration file, ignoring comments.
 
-        self._print_message("No config file specified. Using default values.")
-        return default_config
+        Args:
+            config_file (str): Path to configuration file.
+
+        Returns:
+            dict: The parameters in the file, without defaults.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ConfigError: If the file is not a valid JSON object once comments are removed.
+        """
+        return compile_config(config_file)
 
     def _print_message(self, message):
         """
@@ -189,8 +401,7 @@ class BaseInputTester:
         logs_dir = os.path.join(script_dir, "logs")
 
         # Create logs directory relative to script location
-        if not os.path.exists(logs_dir):
-            os.makedirs(logs_dir)
+        os.makedirs(logs_dir, exist_ok=True)
 
         # Create log filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -199,8 +410,8 @@ class BaseInputTester:
         # Configure logging
         log_level = getattr(logging, self.config.get("log_level", "INFO"))
 
-        # Setup handlers based on configuration
-        handlers = [logging.FileHandler(log_filename)]
+        # Setup handlers based on configuration; the file is opened when the first record is written
+        handlers = [logging.FileHandler(log_filename, delay=True)]
 
         # Add console handler only if enabled in config
         if self.config.get("console_logging_enabled", True):
@@ -213,8 +424,9 @@ class BaseInputTester:
         )
 
         self.logger.info(f"Starting new {self.__class__.__name__} session (v1.8)")
-        self.logger.info(f"Log file: {os.path.abspath(log_filename)}")
-        self.logger.info(f"Configuration: {self.config}")
+        self.log_filename = os.path.abspath(log_filename)
+        self.logger.info(f"Log file: {self.log_filename}")
+        self.logger.info(f"Configuration: {summarize_config(self.config)}")
 
     def window_proc(self, hwnd, msg, wparam, lparam):
         """
@@ -222,7 +434,8 @@ class BaseInputTester:
 
         This function is called by Windows whenever a message is sent to the
         test window. It passes the message to the default window
-        procedure for standard handling.
+        procedure for standard handling, after reporting it to delivery
+        tracking if that is on.
 
         Args:
             hwnd (int): Handle to the window.
@@ -233,8 +446,29 @@ class BaseInputTester:
         Returns:
             int: The result of the message processing.
         """
+        if self.delivery_tracker is not None:
+            self.record_delivery(msg, wparam, lparam)
         return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
 
+    def record_delivery(self, msg, wparam, lparam):
+        """
+        Match a dispatched message to the post it came from.
+
+        A window shared through a runtime receives every tester's messages, so each
+        tester's tracker is offered the message until one matches it.
+
+        Args:
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+        """
+        now = time.perf_counter()
+        testers = self.runtime.testers if self.runtime is not None else (self,)
+        for tester in testers:
+            if tester.delivery_tracker is not None and tester.delivery_tracker.match(msg, wparam, lparam, now):
+                return
+        self.delivery_tracker.record_unmatched(msg)
+
     def create_test_window(self):
         """
         Create a test window for input event simulation.
@@ -251,17 +485,82 @@ class BaseInputTester:
         This function retrieves and dispatches all queued messages for the window,
         helping to prevent the Windows message queue from becoming too full and
         causing resource exhaustion.
+
+        When the tester belongs to a shared runtime, the runtime's pump is used so that
+        every tester sharing the window sees the queue drain.
         """
-        if not self.test_window:
+        if self.runtime is not None:
+            self.runtime.process_messages()
             return
 
+        # Let the emitter know how much of the queue has drained
+        self.emitter.note_drained(self.pump_window_messages())
+
+    def pump_window_messages(self):
+        """
+        Retrieve and dispatch every queued message for the test window.
+
+        Returns:
+            int: Number of messages dispatched.
+        """
+        if not self.test_window:
+            return 0
+
         # Create a MSG structure
         msg = win32gui.MSG()
 
         # Use PeekMessage with the correct number of arguments
+        dispatched = 0
         while win32gui.PeekMessage(msg, self.test_window, 0, 0, win32con.PM_REMOVE):
             win32gui.TranslateMessage(msg)
             win32gui.DispatchMessage(msg)
+            dispatched += 1
+        return dispatched
+
+    def attach_window(self, hwnd):
+        """
+        Use a window created elsewhere as the test window.
+
+        Used by a shared runtime so that several testers post to a single window.
+        Subclasses that keep their own window attribute extend this to set it too.
+
+        Args:
+            hwnd (int): Handle of the shared window, or None to detach.
+        """
+        self.test_window = hwnd
+        self.emitter.reset_queue()
+
+    def record_event(self, event_type):
+        """
+        Count one simulated event.
+
+        Args:
+            event_type (str): Event type for the per-type rates in the run summary,
+                such as "keystroke", "move", "click" or "scroll".
+        """
+        self.event_count += 1
+        self.metrics.count_event(event_type)
+
+    def last_emitted_event(self):
+        """
+        Get the latest message emitted by the current burst.
+
+        The same record is filled on every call, so it is only valid until the next one.
+
+        Returns:
+            InputEvent: The message, or None if the burst has emitted none.
+        """
+        if not self.burst_events:
+            return None
+        return self.burst_events.read(-1, self.last_event)
+
+    def _count_deferred_event(self):
+        """
+        Count a coalesced event that the emitter flushed after the queue drained.
+
+        Only mouse moves are coalesced, so the flushed event is always a move.
+        """
+        self.record_event("move")
 
     def cleanup_window(self):
         """
@@ -274,6 +573,7 @@ class BaseInputTester:
         if self.test_window:
             win32gui.DestroyWindow(self.test_window)
             self.test_window = None
+            self.emitter.reset_queue()
 
         # Short delay to ensure cleanup completes
         time.sleep(0.5)
@@ -300,6 +600,18 @@ class BaseInputTester:
 
             # Log resource usage
             self.logger.info(f"Resource usage - CPU: {cpu_percent:.1f}%, Memory: {memory_mb:.2f} MB")
+            self.metrics.add_resource_sample(cpu_percent, memory_mb)
+
+            # Log emit statistics so drops are visible during long runs
+            self.logger.info(f"Emit statistics: {self.emitter.stats()}")
+            if self.interval_source:
+                self.logger.info(f"Pacing statistics: {self.interval_source.stats()}")
+            if self.phase_profiler:
+                self.logger.info(f"Phase timings (p50/p99): {self.phase_profiler.brief()}")
+            if self.gc_monitor:
+                self.logger.info(f"Garbage collection: {self.gc_monitor.brief()}")
+            if self.delivery_tracker:
+                self.logger.info(f"Delivery: {self.delivery_tracker.brief()}")
 
             # Update last monitor time
             self.last_resource_monitor_time = time.time()
@@ -318,7 +630,11 @@ class BaseInputTester:
     def check_and_cleanup_window(self):
         """
         Check if it's time to perform window cleanup and do so if needed.
+
+        Testers in a shared runtime leave window cleanup to the runtime.
         """
+        if self.runtime is not None:
+            return
         current_time = time.time()
         if current_time - self.last_cleanup_time >= self.cleanup_interval:
             self.cleanup_window()
@@ -331,10 +647,61 @@ class BaseInputTester:
         last monitored. If sufficient time has passed (based on the configured
         resource_monitor_interval), it calls the monitor_resources method to
         check CPU and memory usage.
+
+        If leak detection is on, memory is also checked for leaks every
+        leak_check_interval seconds.
+
+        Testers in a shared runtime leave resource monitoring and leak checks to the runtime.
         """
+        if self.runtime is not None:
+            return
         current_time = time.time()
         if current_time - self.last_resource_monitor_time >= self.resource_monitor_interval:
             self.monitor_resources()
+        if self.leak_detector is not None and current_time - self.last_leak_check_time >= self.leak_check_interval:
+            self.check_memory_growth()
+
+    def start_leak_detector(self):
+        """
+        Start tracing allocations for leak detection, with a fresh baseline for the run.
+        """
+        try:
+            rss_mb = self.process.memory_info().rss / (1024 * 1024)
+        except Exception:
+            rss_mb = None
+        if self.leak_detector is None:
+            self.leak_detector = LeakDetector(frames=self.config.get("leak_trace_frames", 1),
+                                              top_sites=self.config.get("leak_top_sites", 10),
+                                              growth_threshold=self.config.get("leak_growth_threshold", 20.0))
+        self.leak_check_interval = self.config.get("leak_check_interval", 600)
+        self.leak_detector.start(rss_mb)
+        self.last_leak_check_time = time.time()
+        self.logger.info(f"Leak detection enabled: checking memory every {self.leak_check_interval}s")
+
+    def check_memory_growth(self):
+        """
+        Compare allocations with the previous check and log the fastest-growing sites.
+
+        Logs a warning when the resident set size has grown faster than
+        "leak_growth_threshold" over the recent checks.
+
+        Returns:
+            dict: The detector's report, or None if the check failed.
+        """
+        self.last_leak_check_time = time.time()
+        try:
+            rss_mb = self.process.memory_info().rss / (1024 * 1024)
+            report = self.leak_detector.check(rss_mb)
+        except Exception as e:
+            self.logger.error(f"Error checking memory growth: {e}")
+            return None
+
+        for line in describe_report(report):
+            self.logger.info(line)
+        if report["sustained_growth"]:
+            self.logger.warning(f"Sustained memory growth: RSS is rising {report['rss_slope_mb_per_hour']:.2f} MB/h, "
+                                f"above the {self.leak_detector.growth_threshold} MB/h threshold")
+        return report
 
     @property
     def logger(self):
@@ -344,11 +711,30 @@ class BaseInputTester:
         This property provides access to the logging module's logger,
         allowing for consistent logging across the class.
 
+        While phase profiling is on, the logger also times each record it writes.
+
         Returns:
             logging.Logger: The logger instance.
         """
+        if self._profiled_logger is not None:
+            return self._profiled_logger
         return logging.getLogger()
 
+    @property
+    def process(self):
+        """
+        Get the current process for resource monitoring.
+
+        The psutil handle is created on first use, so that testers that are built
+        but never run (or never monitored) do not load psutil.
+
+        Returns:
+            psutil.Process: The current process.
+        """
+        if self._process is None:
+            self._process = psutil.Process(os.getpid())
+        return self._process
+
     @contextmanager
     def test_window_context(self):
         """
@@ -368,6 +754,7 @@ class BaseInputTester:
             if self.test_window:
                 win32gui.DestroyWindow(self.test_window)
                 self.test_window = None
+                self.emitter.reset_queue()
                 self.logger.info("Window destroyed during context exit")
 
     def simulate_input_event(self):
@@ -379,35 +766,335 @@ class BaseInputTester:
         """
         raise NotImplementedError("Subclasses must implement simulate_input_event()")
 
-    def start_testing(self, min_interval=None, max_interval=None):
+    def flood_event(self):
+        """
+        Emit the smallest unit of input, as fast as possible, for a flood ramp.
+
+        This is an abstract method that subclasses implement with their single-event
+        primitive (a keypress or a mouse move).
+
+        Returns:
+            bool: True if the event was delivered, False otherwise.
+        """
+        raise NotImplementedError("Subclasses must implement flood_event()")
+
+    def create_interval_source(self, min_interval, max_interval, target_rate=None, activity_model=None):
+        """
+        Create the source of waits between events.
+
+        Uses a TokenBucketGovernor when a target rate is given, an ActivityProcess when
+        an activity model is given, and otherwise uniformly distributed waits between
+        min_interval and max_interval. An invalid specification is logged and the next
+        option is used instead.
+
+        Args:
+            min_interval (float): Minimum time between events in seconds.
+            max_interval (float): Maximum time between events in seconds.
+            target_rate (float or dict, optional): Target rate specification. Defaults to None.
+            activity_model (dict, optional): Activity process specification. Defaults to None.
+
+        Returns:
+            object: UniformIntervals, TokenBucketGovernor or ActivityProcess instance.
+        """
+        if target_rate:
+            try:
+                governor = TokenBucketGovernor.from_config(target_rate)
+                self.logger.info(f"Rate-governed mode: target {governor.rate:.2f} events/s ({target_rate})")
+                return governor
+            except (TypeError, ValueError) as e:
+                self.logger.error(f"Invalid target_rate {target_rate}: {e}. Using random intervals.")
+
+        if activity_model:
+            try:
+                process = ActivityProcess.from_config(activity_model)
+                self.logger.info(f"Activity model mode: {activity_model}")
+                return process
+            except (TypeError, ValueError, AttributeError) as e:
+                self.logger.error(f"Invalid activity_model {activity_model}: {e}. Using random intervals.")
+
+        self.logger.info(f"Random interval mode: min={min_interval}s, max={max_interval}s")
+        return UniformIntervals(min_interval, max_interval)
+
+    def create_activity_calendar(self, activity_calendar):
+        """
+        Create the time-of-day activity calendar.
+
+        An invalid calendar, or one that is never active, is logged and ignored.
+
+        Args:
+            activity_calendar (dict): Calendar specification with a "rules" list, or None.
+
+        Returns:
+            ActivityCalendar: The calendar, or None if none is configured or it is invalid.
+        """
+        if not activity_calendar:
+            return None
+
+        try:
+            calendar = ActivityCalendar.from_config(activity_calendar)
+        except (TypeError, ValueError, AttributeError) as e:
+            self.logger.error(f"Invalid activity_calendar: {e}. Running without a calendar.")
+            return None
+
+        if calendar.next_active_time(datetime.now()) is None:
+            self.logger.error("activity_calendar is never active. Running without a calendar.")
+            return None
+
+        self.logger.info(f"Activity calendar enabled with {len(calendar.rules)} rules")
+        return calendar
+
+    def create_event_bus(self, event_bus):
+        """
+        Create the shared-memory event bus that the emitter publishes to.
+
+        A bus that cannot be created (for example because the name is already in use)
+        is logged and ignored.
+
+        Args:
+            event_bus (dict or str): Bus settings with optional "name", "capacity" and "source"
+                keys, or just the name, or None.
+
+        Returns:
+            EventBusWriter: The bus, or None if none is configured or it could not be created.
+        """
+        if not event_bus:
+            return None
+
+        try:
+            bus = EventBusWriter.from_config(event_bus)
+        except (OSError, TypeError, ValueError, AttributeError) as e:
+            self.logger.error(f"Could not create event_bus: {e}. Running without an event bus.")
+            return None
+
+        self.logger.info(f"Publishing emitted messages to event bus '{bus.name}' ({bus.capacity} records)")
+        return bus
+
+    def apply_activity_calendar(self, interval):
+        """
+        Stretch a wait according to the activity calendar.
+
+        The wait is treated as activity time that passes at the calendar's current rate
+        multiplier, so waits lengthen during quiet periods and skip idle windows.
+
+        Args:
+            interval (float): Wait in seconds before the calendar is applied.
+
+        Returns:
+            float: Wall-clock wait in seconds.
+        """
+        if not self.activity_calendar:
+            return interval
+
+        now = datetime.now()
+        wake_time = self.activity_calendar.advance(now, interval)
+        if wake_time is None:
+            return interval
+
+        wait = max(0.0, (wake_time - now).total_seconds())
+        if wait > interval + self.message_process_interval:
+            self.logger.info(f"Activity calendar: next event at {wake_time:%Y-%m-%d %H:%M:%S}")
+        return wait
+
+    def wait_for_next_event(self, interval):
+        """
+        Wait until the next event is due, or until testing stops.
+
+        The wait is a single sleep unless messages are still waiting in the queue, in
+        which case it also wakes up to process them at the message processing interval.
+        Stopping the test interrupts the wait immediately, control commands are applied
+        as soon as they arrive, and a wait that would run past
+        max_duration ends the run instead. How late the wait finished is recorded as the
+        timing error of the next event.
+
+        Args:
+            interval (float): Time to wait in seconds.
+        """
+        deadline = time.time() + interval
+        bounded = self._run_deadline is not None and deadline >= self._run_deadline
+        if bounded:
+            deadline = self._run_deadline
+
+        while self.running:
+            now = time.time()
+            timeout = deadline - now
+            if timeout <= 0:
+                break
+
+            # Only wake early when there is something to pump
+            if self.emitter.in_flight:
+                next_process_time = self.last_message_process_time + self.message_process_interval
+                timeout = min(timeout, max(0.0, next_process_time - now))
+
+            if self._wake_event.wait(timeout):
+                self._wake_event.clear()
+                self.apply_control_commands()
+                continue
+            self.check_and_process_messages()
+
+        if bounded:
+            self.check_run_bounds()
+        elif self.running:
+            self.metrics.timing_error.record(time.time() - deadline)
+
+    def check_run_bounds(self):
+        """
+        Stop testing if any of the configured run bounds has been reached.
+
+        Returns:
+            bool: True if a bound was reached, False otherwise.
+        """
+        if self.max_events is not None and self.event_count >= self.max_events:
+            reason = "max_events"
+        elif self.max_bursts is not None and self.burst_count >= self.max_bursts:
+            reason = "max_bursts"
+        elif self._run_deadline is not None and time.time() >= self._run_deadline:
+            reason = "max_duration"
+        else:
+            return False
+
+        if self.running:
+            self.logger.info(f"Run bound reached: {reason}")
+            self.stop_reason = reason
+            self.stop_testing()
+        return True
+
+    def build_run_summary(self, started_at, ended_at):
+        """
+        Build the machine-readable summary of a finished run.
+
+        Args:
+            started_at (datetime): Start time of the run.
+            ended_at (datetime): End time of the run.
+
+        Returns:
+            dict: Run summary suitable for JSON serialization.
+        """
+        duration = (ended_at - started_at).total_seconds()
+        try:
+            cpu_times = self.process.cpu_times()
+            cpu_profile = {"user_s": round(cpu_times.user, 3), "system_s": round(cpu_times.system, 3)}
+        except Exception:
+            cpu_profile = {}
+
+        resources = self.metrics.resource_summary()
+        resources["cpu_time"] = cpu_profile
+
+        return {
+            "tester": self.__class__.__name__,
+            "version": "1.8",
+            "seed": self.seed,
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "ended_at": ended_at.isoformat(timespec="seconds"),
+            "duration_s": round(duration, 3),
+            "stop_reason": self.stop_reason,
+            "bounds": {
+                "max_events": self.max_events,
+                "max_duration": self.max_duration,
+                "max_bursts": self.max_bursts,
+            },
+            "events": {
+                "total": self.event_count,
+                "bursts": self.burst_count,
+                "by_type": dict(self.metrics.events_by_type),
+            },
+            "rates_per_sec": self.metrics.rates(duration),
+            "timing_error": self.metrics.timing_error.summary(),
+            "emit_latency": self.metrics.emit_latency.summary(),
+            "emit": self.emitter.stats(),
+            "pacing": self.interval_source.stats() if self.interval_source else None,
+            "resources": resources,
+            "phases": self.phase_profiler.summary() if self.phase_profiler else None,
+            "stack_sampler": self.stack_sampler.stats() if self.stack_sampler else None,
+            "memory": self.leak_detector.summary() if self.leak_detector else None,
+            "gc": self.gc_monitor.summary() if self.gc_monitor else None,
+            "flood": self.flood_result,
+            "delivery": self.delivery_tracker.summary() if self.delivery_tracker else None,
+        }
+
+    def write_run_summary(self, summary, summary_file=None):
+        """
+        Write a run summary to a JSON file.
+
+        Args:
+            summary (dict): Run summary from build_run_summary().
+            summary_file (str, optional): Output path. Defaults to the log file path with
+                a "_summary.json" suffix.
+
+        Returns:
+            str: Path of the written file, or None if it could not be written.
+        """
+        if not summary_file:
+            if not self.log_filename:
+                return None
+            summary_file = os.path.splitext(self.log_filename)[0] + "_summary.json"
+
+        try:
+            with open(summary_file, "w") as f:
+                json.dump(summary, f, indent=2)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error(f"Error writing run summary to {summary_file}: {e}")
+            return None
+
+        self.logger.info(f"Run summary written to: {os.path.abspath(summary_file)}")
+        return summary_file
+
+    def stop_testing(self):
+        """
+        Stop the testing process.
+
+        Clears the running flag and wakes the testing thread if it is waiting or paused.
+        """
+        self.running = False
+        self._wake_event.set()
+
+    def start_testing(self, min_interval=None, max_interval=None, target_rate=None, activity_model=None,
+                      max_events=None, max_duration=None, max_bursts=None, seed=None, summary_file=None):
         """
         Start the input testing process.
 
-        Creates a dedicated thread for simulating input at random intervals.
-        The main thread monitors for the Escape key to terminate testing.
-        All activity is logged to the log file.
+        Creates a dedicated thread for simulating input at random intervals, or at a
+        governed target rate if one is configured.
+        The main thread monitors for the Escape key to terminate testing; the run also
+        ends when any configured bound (events, duration or bursts) is reached, or when
+        a "stop" command arrives on the control socket (if "control_address" is configured).
+        All activity is logged to the log file, and a JSON performance summary is
+        written when the run ends.
 
         Args:
             min_interval (float, optional): Minimum time between events in seconds.
                 If None, uses the value from config. Defaults to None.
             max_interval (float, optional): Maximum time between events in seconds.
                 If None, uses the value from config. Defaults to None.
-        """
-        # Use provided intervals or fall back to config values
-        min_interval = min_interval or self.config.get("event_interval_min", 1.0)
-        max_interval = max_interval or self.config.get("event_interval_max", 5.0)
+            target_rate (float or dict, optional): Target event rate, either events per second
+                or a dict such as {"value": 60, "unit": "wpm", "jitter": "normal"}.
+                If None, uses "target_rate" from config. Defaults to None.
+            activity_model (dict, optional): Activity process for bursty pacing, such as
+                {"process": "hawkes", "rate": 0.1, "excitation": 0.6, "decay": 0.5}.
+                Ignored when a target rate is set. If None, uses "activity_model" from config.
+                Defaults to None.
+            max_events (int, optional): Stop after this many events. Bounds are checked
+                between bursts, so the final count can exceed this by up to one burst.
+                If None, uses "max_events" from config. Defaults to None.
+            max_duration (float, optional): Stop after this many seconds. If None, uses
+                "max_duration" from config. Defaults to None.
+            max_bursts (int, optional): Stop after this many input bursts. If None, uses
+                "max_bursts" from config. Defaults to None.
+            seed (int, optional): Random seed for a reproducible run. If None, uses
+                "random_seed" from config, or a fresh random seed. Defaults to None.
+            summary_file (str, optional): Path of the JSON run summary. If None, uses
+                "run_summary_file" from config, or a file next to the log. Defaults to None.
 
-        self.logger.info(f"Starting {self.__class__.__name__} with intervals: min={min_interval}s, max={max_interval}s")
+        Returns:
+            dict: The run summary.
+        """
+        self.prepare_run(min_interval, max_interval, target_rate, activity_model,
+                         max_events, max_duration, max_bursts, seed)
         self.logger.info("Press 'Esc' to stop testing")
 
-        self.running = True
-        self.event_count = 0
-        self.last_cleanup_time = time.time()
-        self.last_message_process_time = time.time()
-        self.last_resource_monitor_time = time.time()
-
         # Initial resource monitoring
         self.monitor_resources()
+        self.start_control_server()
+        self.start_config_watcher()
 
         def testing_loop():
             """
@@ -417,29 +1104,39 @@ class BaseInputTester:
             until the testing is stopped. Includes periodic message processing,
             window cleanup, and resource monitoring to prevent resource exhaustion.
             """
+            if self.config.get("sampling_profiler", False):
+                self.start_stack_sampler()
+
             with self.test_window_context():
+                # A flood ramp replaces the paced loop and ends the run when it finishes
+                if self.config.get("flood_mode", False):
+                    self.run_flood()
+                    if self.running:
+                        self.stop_reason = "flood_complete"
+                        self.stop_testing()
+                    return
+
+                # Start at the first active moment of the calendar
+                self.wait_for_next_event(self.apply_activity_calendar(0.0))
+
                 while self.running:
                     try:
-                        # Simulate input event
-                        self.simulate_input_event()
+                        self.apply_control_commands()
+                        self.wait_while_paused()
+                        # Commands and reloads can tighten the bounds or stop the run
+                        if not self.running or self.check_run_bounds():
+                            break
 
-                        # Process messages after each event
-                        self.process_messages()
+                        events = self.run_burst()
 
-                        # Check for window cleanup and resource monitoring
-                        self.check_and_cleanup_window()
-                        self.check_and_monitor_resources()
+                        if self.check_run_bounds():
+                            break
 
                         # Wait until next event
-                        interval = random.uniform(min_interval, max_interval)
+                        interval = self.next_event_interval(events)
                         self.logger.info(f"Waiting {interval:.2f} seconds until next event...")
 
-                        # Break the waiting period into chunks to allow for more responsive termination
-                        wait_end_time = time.time() + interval
-                        while time.time() < wait_end_time and self.running:
-                            time.sleep(0.1)
-                            # Check if we should process messages during this wait
-                            self.check_and_process_messages()
+                        self.wait_for_next_event(interval)
 
                     except Exception as e:
                         self.logger.error(f"Error in testing loop: {e}")
@@ -456,17 +1153,765 @@ class BaseInputTester:
 
         try:
             while self.running:
-                if win32api.GetAsyncKeyState(win32con.VK_ESCAPE) & 0x8000:
+                if self.escape_pressed():
+                    self.stop_reason = "escape"
                     break
                 time.sleep(0.1)
         finally:
-            self.running = False
+            if self.stop_reason is None:
+                self.stop_reason = "stopped"
+            self.stop_testing()
             test_thread.join(timeout=1.0)
+            self.stop_control_server()
+            self.stop_config_watcher()
+
+        return self.finish_run(summary_file)
+
+    def prepare_run(self, min_interval=None, max_interval=None, target_rate=None, activity_model=None,
+                    max_events=None, max_duration=None, max_bursts=None, seed=None):
+        """
+        Reset counters and set up pacing, bounds and seeding for a new run.
+
+        Arguments that are None fall back to the configuration, as in start_testing().
+
+        Args:
+            min_interval (float, optional): Minimum time between events in seconds.
+            max_interval (float, optional): Maximum time between events in seconds.
+            target_rate (float or dict, optional): Target event rate.
+            activity_model (dict, optional): Activity process for bursty pacing.
+            max_events (int, optional): Stop after this many events.
+            max_duration (float, optional): Stop after this many seconds.
+            max_bursts (int, optional): Stop after this many input bursts.
+            seed (int, optional): Random seed for a reproducible run.
+        """
+        # Use provided intervals or fall back to config values
+        min_interval = min_interval or self.config.get("event_interval_min", 1.0)
+        max_interval = max_interval or self.config.get("event_interval_max", 5.0)
+        target_rate = target_rate or self.config.get("target_rate")
+        activity_model = activity_model or self.config.get("activity_model")
+        self.max_events = max_events if max_events is not None else self.config.get("max_events")
+        self.max_duration = max_duration if max_duration is not None else self.config.get("max_duration")
+        self.max_bursts = max_bursts if max_bursts is not None else self.config.get("max_bursts")
+
+        # Seed every run so that it can be reproduced from its summary
+        self.seed = seed if seed is not None else self.config.get("random_seed")
+        if self.seed is None:
+            self.seed = int.from_bytes(os.urandom(4), "big")
+        random.seed(self.seed)
+
+        self.logger.info(f"Starting {self.__class__.__name__} with intervals: min={min_interval}s, max={max_interval}s")
+        self.logger.info(f"Random seed: {self.seed}")
+        if self.max_events is not None or self.max_duration is not None or self.max_bursts is not None:
+            self.logger.info(f"Run bounds: max_events={self.max_events}, max_duration={self.max_duration}s, "
+                             f"max_bursts={self.max_bursts}")
+        self.pacing = {"min_interval": min_interval, "max_interval": max_interval,
+                       "target_rate": target_rate, "activity_model": activity_model}
+        self.interval_source = self.create_interval_source(**self.pacing)
+
+        self.running = True
+        self.paused = False
+        self._wake_event.clear()
+        self.event_count = 0
+        self.burst_count = 0
+        self.stop_reason = None
+        self.stack_sampler = None
+        self.flood_result = None
+        self.metrics = RunMetrics()
+        if self.config.get("leak_detection", False):
+            self.start_leak_detector()
+        if self.gc_tuning is None and (self.config.get("gc_freeze") or self.config.get("gc_thresholds")):
+            self.tune_gc()
+        if self.config.get("gc_monitoring", False):
+            if self.gc_monitor is None:
+                self.bind_gc_monitor()
+            self.gc_monitor.reset()
+        self.emitter.latency_histogram = self.metrics.emit_latency
+        if self.config.get("delivery_tracking", False):
+            if self.delivery_tracker is None:
+                self.delivery_tracker = DeliveryTracker(self.config.get("delivery_loss_timeout", 5.0))
+                self.emitter.delivery_tracker = self.delivery_tracker
+            self.delivery_tracker.reset()
+        if self.config.get("phase_profiling", False):
+            if self.phase_profiler is None:
+                self.bind_phase_hooks()
+            self.phase_profiler.reset()
+        self.run_started_at = datetime.now()
+        self._run_deadline = time.time() + self.max_duration if self.max_duration is not None else None
+        self.last_cleanup_time = time.time()
+        self.last_message_process_time = time.time()
+        self.last_resource_monitor_time = time.time()
+
+    def bind_phase_hooks(self):
+        """
+        Start phase profiling by wrapping the methods of each phase with timing wrappers.
+
+        The wrappers are bound once, as instance attributes, so a tester that never
+        enables profiling keeps its unwrapped methods and pays nothing for it.
+        """
+        self.phase_profiler = PhaseProfiler()
+        for name, phase in self.PROFILED_PHASES.items():
+            setattr(self, name, self.phase_profiler.wrap(phase, getattr(self, name)))
+        self.emitter.post = self.phase_profiler.wrap("post", self.emitter.post)
+        self.emitter.post_mouse_move = self.phase_profiler.wrap("post", self.emitter.post_mouse_move)
+        self.simulate_input_event = self.phase_profiler.wrap_burst(self.simulate_input_event)
+        self._profiled_logger = ProfiledLogger(logging.getLogger(), self.phase_profiler)
+        self.logger.info("Phase profiling enabled")
+
+    def tune_gc(self):
+        """
+        Apply the configured garbage-collector thresholds and freeze the startup heap.
+
+        Applied once, before the first run, so that everything loaded at startup is frozen.
+        """
+        try:
+            self.gc_tuning = apply_gc_tuning(self.config.get("gc_thresholds"), self.config.get("gc_freeze", False))
+        except (TypeError, ValueError) as e:
+            self.logger.error(f"Error tuning the garbage collector: {e}. Using the current settings.")
+            return
+        self.logger.info(f"Garbage collector tuned: thresholds {self.gc_tuning['thresholds_before']} -> "
+                         f"{self.gc_tuning['thresholds']}, {self.gc_tuning['frozen_objects']} objects frozen")
+
+    def bind_gc_monitor(self):
+        """
+        Start measuring garbage-collection pauses and in-burst timing error.
+
+        As with phase profiling, the in-burst sleep and the burst function are wrapped
+        once, so testers without GC monitoring keep their unwrapped methods.
+        """
+        self.gc_monitor = GCMonitor()
+        self.gc_monitor.tuning = self.gc_tuning
+        self.gc_monitor.install()
+        self.sleep = self.gc_monitor.wrap_sleep(self.sleep)
+        self.simulate_input_event = self.gc_monitor.wrap_burst(self.simulate_input_event)
+        self.logger.info("GC monitoring enabled")
+
+    def run_flood(self, start_rate=None, max_rate=None, steps=None, step_duration=None, output_file=None):
+        """
+        Ramp the event rate without human-like pacing to find where the target saturates.
+
+        flood_event() is fired at each rate of a geometric ramp with the in-burst sleeps
+        disabled, and the achieved rate, PostMessage failures, queue depth and pump latency
+        of each step are recorded (see flood_ramp.py). Arguments that are None fall back
+        to the configuration.
+
+        Args:
+            start_rate (float, optional): Rate of the first step in events per second.
+            max_rate (float, optional): Rate of the last step in events per second.
+            steps (int, optional): Number of steps.
+            step_duration (float, optional): Seconds each step is held.
+            output_file (str, optional): Path of the JSON saturation curve. If None, uses
+                "flood_output" from config, or a file next to the log; False writes no file.
+
+        Returns:
+            dict: The saturation curve.
+        """
+        start_rate = start_rate or self.config.get("flood_start_rate", DEFAULT_START_RATE)
+        max_rate = max_rate or self.config.get("flood_max_rate", DEFAULT_MAX_RATE)
+        steps = steps or self.config.get("flood_steps", DEFAULT_STEPS)
+        step_duration = step_duration or self.config.get("flood_step_duration", DEFAULT_STEP_DURATION)
+        rates = ramp_rates(start_rate, max_rate, steps)
+        self.logger.info(f"Flood ramp: {len(rates)} steps of {step_duration}s from {rates[0]:.0f} "
+                         f"to {rates[-1]:.0f} events/s")
+
+        # Pauses between key down and key up would cap the rate, so they are skipped
+        bound_sleep = self.__dict__.get("sleep")
+        self.sleep = lambda seconds: None
+        try:
+            self.flood_result = FloodRamp(self, rates, step_duration).run()
+        finally:
+            if bound_sleep is None:
+                del self.sleep
+            else:
+                self.sleep = bound_sleep
+
+        steps_run = self.flood_result["steps"]
+        if self.flood_result["saturation_rate"] is not None:
+            outcome = f"saturated at {self.flood_result['saturation_rate']:.0f} events/s"
+        elif steps_run:
+            outcome = f"no saturation up to {steps_run[-1]['target_rate']:.0f} events/s"
+        else:
+            outcome = "no steps run"
+        self.logger.info(f"Flood ramp finished: {outcome}, max sustained rate "
+                         f"{self.flood_result['max_sustained_rate']} events/s")
+
+        if output_file is None:
+            output_file = self.config.get("flood_output")
+            if not output_file and self.log_filename:
+                output_file = os.path.splitext(self.log_filename)[0] + "_saturation.json"
+        if output_file:
+            try:
+                with open(output_file, "w") as f:
+                    json.dump(self.flood_result, f, indent=2)
+                self.logger.info(f"Saturation curve written to: {os.path.abspath(output_file)}")
+            except (OSError, TypeError, ValueError) as e:
+                self.logger.error(f"Error writing saturation curve to {output_file}: {e}")
+        return self.flood_result
+
+    def sleep(self, seconds):
+        """
+        Pause inside a burst, between keys, clicks or movement steps.
+
+        Args:
+            seconds (float): How long to pause.
+        """
+        time.sleep(seconds)
+
+    def run_burst(self):
+        """
+        Simulate one input burst followed by the per-burst housekeeping.
+
+        Returns:
+            int: Number of events emitted by the burst.
+        """
+        # Simulate input event
+        events_before = self.event_count
+        self.burst_events.clear()
+        self.simulate_input_event()
+        self.burst_count += 1
+
+        # Process messages after each event
+        self.process_messages()
+
+        # Check for window cleanup and resource monitoring
+        self.check_and_cleanup_window()
+        self.check_and_monitor_resources()
+
+        return self.event_count - events_before
+
+    def next_event_interval(self, events):
+        """
+        Get the wait before the next burst.
+
+        Combines the interval source, backpressure from a saturated target queue,
+        and the activity calendar.
+
+        Args:
+            events (int): Number of events emitted by the burst that just finished.
+
+        Returns:
+            float: Wall-clock wait in seconds.
+        """
+        interval = self.interval_source.next_interval(events)
+        interval += self.emitter.backpressure_delay()
+        return self.apply_activity_calendar(interval)
+
+    def start_control_server(self):
+        """
+        Start listening for control commands if "control_address" is configured.
+
+        "control_address" may be a named pipe or socket path, or true for a default
+        address based on the class name and process ID. A server that cannot be started
+        is logged and the run continues without one.
+        """
+        address = self.config.get("control_address")
+        if not address:
+            return
+        if address is True:
+            address = default_control_address(self.__class__.__name__)
+
+        try:
+            self.control_server = ControlServer(address, self.submit_control_command,
+                                                authkey=self.config.get("control_authkey"), logger=self.logger)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error(f"Could not open control socket {address}: {e}. Running without one.")
+            return
+        self.logger.info(f"Listening for control commands on {address}")
+
+    def stop_control_server(self):
+        """
+        Close the control socket, if one is open.
+        """
+        if self.control_server is not None:
+            self.control_server.close()
+            self.control_server = None
+
+    def submit_control_command(self, request, timeout=5.0):
+        """
+        Hand a control request to the testing thread and wait for its reply.
+
+        Called from the control server's threads. The request is applied by the testing
+        thread between events, so that it never takes effect in the middle of a burst.
+
+        Args:
+            request (dict): The request, with a "command" key and the command's arguments.
+            timeout (float, optional): Seconds to wait for the testing thread. Defaults to 5.0.
+
+        Returns:
+            dict: The reply, with "ok" and either "result" or "error".
+        """
+        if not self.running:
+            return {"ok": False, "error": "testing is not running"}
+
+        reply = {}
+        done = threading.Event()
+        self._control_commands.put((request, reply, done))
+        self._wake_event.set()
+        if not done.wait(timeout):
+            return {"ok": False, "error": f"no reply from the testing thread within {timeout} seconds"}
+        return reply
+
+    def apply_control_commands(self):
+        """
+        Apply the control commands that have arrived since the last call.
+
+        Runs on the testing thread. An invalid command is answered with an error and
+        changes nothing.
+        """
+        while True:
+            try:
+                request, reply, done = self._control_commands.get_nowait()
+            except queue.Empty:
+                return
+            command = request.get("command")
+            try:
+                reply["result"] = self.handle_control_command(command, request)
+                reply["ok"] = True
+                self.logger.info(f"Control command applied: {request}")
+            except (TypeError, ValueError, AttributeError) as e:
+                reply["ok"] = False
+                reply["error"] = str(e)
+                self.logger.warning(f"Control command rejected: {request}: {e}")
+            except Exception as e:
+                reply["ok"] = False
+                reply["error"] = f"{command} failed: {e}"
+                self.logger.error(f"Error applying control command {request}: {e}")
+            done.set()
+
+    def handle_control_command(self, command, request):
+        """
+        Apply one control command.
+
+        Args:
+            command (str): The command name.
+            request (dict): The full request, including the command's arguments.
+
+        Returns:
+            object: The command's result, sent back to the client.
+
+        Raises:
+            ValueError: If the command or its arguments are invalid.
+        """
+        if command == "pause":
+            self.paused = True
+            return {"paused": True}
+        if command == "resume":
+            self.paused = False
+            return {"paused": False}
+        if command == "set_rate":
+            return self.set_pacing({key: request[key] for key in self.pacing if key in request})
+        if command == "set_weights":
+            weights = request.get("weights")
+            if not isinstance(weights, dict):
+                raise ValueError('set_weights needs a "weights" object mapping patterns to weights')
+            return self.set_pattern_weights(weights)
+        if command == "recycle":
+            if self.runtime is not None:
+                raise ValueError("the window belongs to a shared runtime and cannot be recycled here")
+            self.cleanup_window()
+            return {"window": self.test_window}
+        if command == "stats":
+            summary = self.build_run_summary(self.run_started_at, datetime.now())
+            summary["paused"] = self.paused
+            summary["pacing"] = self.pacing
+            return summary
+        if command == "profile":
+            action = request.get("action", "status")
+            if action == "start":
+                return self.start_stack_sampler(request.get("interval"), request.get("duration"),
+                                                request.get("output"))
+            if action == "stop":
+                return self.stop_stack_sampler()
+            if action == "status":
+                return self.stack_sampler.stats() if self.stack_sampler else None
+            raise ValueError(f'profile "action" must be "start", "stop" or "status", got {action!r}')
+        if command == "stop":
+            self.stop_reason = "control"
+            self.stop_testing()
+            return {"stopping": True}
+        if command == "apply_settings":
+            # Sent by reload_config(), never by the control server
+            self.apply_settings(request["settings"])
+            self.config = request["config"]
+            return sorted(request["settings"])
+        raise ValueError(f"unknown command {command!r}")
+
+    def set_pacing(self, changes):
+        """
+        Change the interval settings of the running test.
+
+        The new interval source replaces the old one only if it is valid; the wait in
+        progress is not shortened.
+
+        Args:
+            changes (dict): New values for any of "min_interval", "max_interval",
+                "target_rate" and "activity_model" (null clears a target rate or model).
+
+        Returns:
+            dict: The interval settings now in effect.
+
+        Raises:
+            ValueError: If no setting is given or the new settings are invalid.
+        """
+        if not changes:
+            raise ValueError(f"set_rate needs at least one of {', '.join(self.pacing)}")
+
+        pacing = dict(self.pacing, **changes)
+        self.interval_source = self.build_interval_source(pacing)
+        self.pacing = pacing
+        return pacing
+
+    def build_interval_source(self, pacing):
+        """
+        Create an interval source, rejecting invalid settings instead of falling back.
+
+        Args:
+            pacing (dict): Interval settings, as in the pacing attribute.
+
+        Returns:
+            object: UniformIntervals, TokenBucketGovernor or ActivityProcess instance.
+
+        Raises:
+            ValueError: If the settings are invalid.
+        """
+        min_interval, max_interval = pacing["min_interval"], pacing["max_interval"]
+        if not 0 <= min_interval <= max_interval:
+            raise ValueError(f"intervals must satisfy 0 <= min_interval <= max_interval, "
+                             f"got {min_interval} and {max_interval}")
+        # Validate first: create_interval_source falls back to random intervals on errors
+        if pacing["target_rate"]:
+            TokenBucketGovernor.from_config(pacing["target_rate"])
+        elif pacing["activity_model"]:
+            ActivityProcess.from_config(pacing["activity_model"])
+        return self.create_interval_source(**pacing)
+
+    def set_pattern_weights(self, weights):
+        """
+        Change the weights used to choose input patterns.
+
+        Subclasses that choose between weighted patterns override this.
+
+        Args:
+            weights (dict): New weight for each pattern name to change.
+
+        Returns:
+            dict: The weight of every pattern now in effect.
+
+        Raises:
+            ValueError: Always, since the base class has no patterns.
+        """
+        raise ValueError(f"{self.__class__.__name__} has no pattern weights")
+
+    @staticmethod
+    def merge_pattern_weights(patterns, current, weights):
+        """
+        Apply weight changes to a list of pattern weights.
+
+        Args:
+            patterns (list): Pattern names.
+            current (list): Current weight of each pattern.
+            weights (dict): New weight for each pattern name to change.
+
+        Returns:
+            list: The new weights, in the order of patterns.
+
+        Raises:
+            ValueError: If a pattern is unknown, a weight is negative, or every weight would be zero.
+        """
+        unknown = set(weights) - set(patterns)
+        if unknown:
+            raise ValueError(f"unknown patterns {sorted(unknown)}, expected some of {patterns}")
+
+        merged = list(current)
+        for index, pattern in enumerate(patterns):
+            if pattern in weights:
+                weight = float(weights[pattern])
+                if weight < 0:
+                    raise ValueError(f"weight of {pattern} must not be negative")
+                merged[index] = weight
+        if not any(merged):
+            raise ValueError("at least one pattern must have a positive weight")
+        return merged
+
+    def start_stack_sampler(self, interval=None, duration=None, output_file=None):
+        """
+        Start sampling the calling thread's stack, replacing any sampler already running.
+
+        Must be called on the testing thread; control commands are applied there.
+        Arguments that are None fall back to the "sampling_*" configuration keys.
+
+        Args:
+            interval (float, optional): Seconds between samples.
+            duration (float, optional): Stop sampling after this many seconds.
+            output_file (str, optional): Path of the collapsed-stack file. Defaults to the log
+                file path with a "_stacks.folded" suffix.
+
+        Returns:
+            dict: The new sampler's statistics.
+
+        Raises:
+            ValueError: If interval or duration is not positive.
+        """
+        if interval is None:
+            interval = self.config.get("sampling_interval", DEFAULT_INTERVAL)
+        if duration is None:
+            duration = self.config.get("sampling_duration")
+        output_file = output_file or self.config.get("sampling_output")
+        if not output_file and self.log_filename:
+            output_file = os.path.splitext(self.log_filename)[0] + "_stacks.folded"
+
+        sampler = StackSampler(threading.get_ident(), interval, duration, output_file, logger=self.logger)
+        self.stop_stack_sampler()
+        self.stack_sampler = sampler
+        sampler.start()
+        self.logger.info(f"Sampling the testing thread every {interval}s"
+                         f"{f' for {duration}s' if duration else ''}, writing {output_file}")
+        return sampler.stats()
+
+    def stop_stack_sampler(self):
+        """
+        Stop the sampling profiler, if one is running, and write its stacks file.
+
+        Returns:
+            dict: The sampler's statistics, or None if no sampler was started.
+        """
+        if self.stack_sampler is None:
+            return None
+        if not self.stack_sampler.running:
+            return self.stack_sampler.stats()
+        stats = self.stack_sampler.stop()
+        self.logger.info(f"Stack sampling stopped after {stats['samples']} samples; "
+                         f"stacks written to {stats['output_file']}")
+        return stats
+
+    def start_config_watcher(self):
+        """
+        Start reloading the configuration file on changes if "watch_config" is enabled.
+        """
+        if not self.config.get("watch_config") or not self.config_file:
+            return
+        self.config_watcher = ConfigWatcher(self.config_file, lambda path: self.reload_config(),
+                                            interval=self.config.get("watch_config_interval", 2.0),
+                                            logger=self.logger)
+        self.config_watcher.start()
+        mode = "change notifications" if self.config_watcher.native else "polling"
+        self.logger.info(f"Watching {self.config_file} for changes ({mode})")
+
+    def stop_config_watcher(self):
+        """
+        Stop watching the configuration file, if it is watched.
+        """
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+            self.config_watcher = None
+
+    def reload_config(self):
+        """
+        Re-read the configuration file and swap in the settings that changed.
+
+        The file is parsed and validated against SETTINGS_CLASS, and every derived
+        structure rebuilt, on the calling thread. The finished settings are then handed
+        to the testing thread, which applies them all at once between events. A file that cannot be parsed
+        or fails validation is rejected and the current configuration stays in effect.
+
+        Changes to keys outside RELOADABLE_KEYS are logged and take effect after a restart.
+
+        Returns:
+            bool: True if a changed configuration was applied, False otherwise.
+        """
+        try:
+            typed_settings, config = self.build_settings(self.read_config_file(self.config_file))
+            changed = sorted(key for key in set(config) | set(self.config)
+                             if config.get(key) != self.config.get(key))
+            if not changed:
+                return False
+
+            settings = self.derive_settings(typed_settings)
+            settings["settings"] = typed_settings
+            settings.update(self.derive_run_settings(config, changed))
+        except (OSError, TypeError, ValueError, AttributeError, KeyError) as e:
+            problem = f"missing key {e}" if isinstance(e, KeyError) else e
+            self.logger.error(f"Rejected configuration change in {self.config_file}: {problem}. "
+                              f"Keeping the current configuration.")
+            return False
+
+        restart_keys = [key for key in changed if key not in self.RELOADABLE_KEYS]
+        if restart_keys:
+            self.logger.warning(f"Changes to {', '.join(restart_keys)} take effect after a restart")
+
+        if self.running:
+            reply = self.submit_control_command({"command": "apply_settings", "config": config, "settings": settings})
+            if not reply.get("ok"):
+                self.logger.error(f"Could not apply configuration change: {reply.get('error')}")
+                return False
+        else:
+            self.apply_settings(settings)
+            self.config = config
+
+        self.logger.info(f"Configuration reloaded from {self.config_file}; changed: {', '.join(changed)}")
+        return True
+
+    def derive_settings(self, settings):
+        """
+        Build the attribute values that depend on the configuration.
+
+        Subclasses extend the result with their own settings. Nothing is assigned
+        here, so a configuration can be prepared without disturbing a running test.
+
+        Args:
+            settings (BaseSettings): Validated settings.
+
+        Returns:
+            dict: Attribute name to value.
+        """
+        return {
+            "cleanup_interval": settings.cleanup_interval,
+            "message_process_interval": settings.message_process_interval,
+            "resource_monitor_interval": settings.resource_monitor_interval,
+        }
+
+    def derive_run_settings(self, config, changed):
+        """
+        Build the pacing, bound and calendar settings that changed in the configuration.
+
+        These are only replaced when their own keys changed, so that values given on the
+        command line survive unrelated edits.
+
+        Args:
+            config (dict): Configuration parameters.
+            changed (list): Configuration keys whose values changed.
+
+        Returns:
+            dict: Attribute name to value.
+
+        Raises:
+            ValueError: If a changed setting is invalid.
+        """
+        settings = {}
+        if self.running and any(key in PACING_KEYS for key in changed):
+            pacing = dict(self.pacing)
+            pacing.update({name: config.get(key) for key, name in PACING_KEYS.items() if key in changed})
+            settings["interval_source"] = self.build_interval_source(pacing)
+            settings["pacing"] = pacing
+
+        for key in BOUND_KEYS:
+            if key in changed:
+                settings[key] = config.get(key)
+
+        if "activity_calendar" in changed:
+            calendar = None
+            if config.get("activity_calendar"):
+                calendar = ActivityCalendar.from_config(config["activity_calendar"])
+                if calendar.next_active_time(datetime.now()) is None:
+                    raise ValueError("activity_calendar is never active")
+            settings["activity_calendar"] = calendar
+        return settings
+
+    def apply_settings(self, settings):
+        """
+        Assign settings built by derive_settings() and derive_run_settings().
+
+        Runs on the testing thread between events while testing, so that no event sees
+        a mix of old and new settings.
+
+        Args:
+            settings (dict): Attribute name to value.
+        """
+        for name, value in settings.items():
+            setattr(self, name, value)
+        if "max_duration" in settings and self.running and self.run_started_at is not None:
+            self._run_deadline = (self.run_started_at.timestamp() + self.max_duration
+                                  if self.max_duration is not None else None)
+
+    def wait_while_paused(self):
+        """
+        Block the testing thread while a control command has paused the run.
+
+        Messages are still pumped and control commands still applied while paused.
+        """
+        if not self.paused:
+            return
+
+        self.logger.info("Testing paused")
+        while self.running and self.paused:
+            timeout = self.message_process_interval if self.emitter.in_flight else None
+            if self._wake_event.wait(timeout):
+                self._wake_event.clear()
+                self.apply_control_commands()
+            else:
+                self.check_and_process_messages()
+        self.logger.info("Testing resumed")
+
+    def escape_pressed(self):
+        """
+        Check whether the Escape key is currently held down.
+
+        Returns:
+            bool: True if Escape is pressed, False otherwise.
+        """
+        return bool(win32api.GetAsyncKeyState(win32con.VK_ESCAPE) & 0x8000)
+
+    def finish_run(self, summary_file=None):
+        """
+        Log the end of a run and write its JSON summary.
+
+        Args:
+            summary_file (str, optional): Path of the JSON run summary. If None, uses
+                "run_summary_file" from config, or a file next to the log.
+
+        Returns:
+            dict: The run summary.
+        """
+        self._run_deadline = None
+        self.stop_stack_sampler()
 
         # Final resource monitoring
-        self.monitor_resources()
+        if self.runtime is None:
+            self.monitor_resources()
 
         self.logger.info(f"Testing completed. Total events simulated: {self.event_count}")
+        self.logger.info(f"Emit statistics: {self.emitter.stats()}")
+
+        # Final memory check, then stop tracing so that it costs nothing between runs
+        if self.leak_detector is not None and self.leak_detector.tracing:
+            self.check_memory_growth()
+            self.leak_detector.stop()
+
+        summary = self.build_run_summary(self.run_started_at, datetime.now())
+        self.write_run_summary(summary, summary_file or self.config.get("run_summary_file"))
+        return summary
+
+
+def build_argument_parser(description):
+    """
+    Build the command-line parser shared by the tester scripts.
+
+    The parser accepts the optional positional min and max intervals used by earlier
+    versions, plus run bounds, a random seed, the run summary path and flood mode.
+
+    Args:
+        description (str): Description shown in the help text.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("min_interval", nargs="?", type=float, default=None,
+                        help="Minimum time between events in seconds (overrides the config file)")
+    parser.add_argument("max_interval", nargs="?", type=float, default=None,
+                        help="Maximum time between events in seconds (overrides the config file)")
+    parser.add_argument("--max-events", type=int, default=None,
+                        help="Stop after this many events")
+    parser.add_argument("--max-duration", type=float, default=None,
+                        help="Stop after this many seconds")
+    parser.add_argument("--max-bursts", type=int, default=None,
+                        help="Stop after this many input bursts")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for a reproducible run")
+    parser.add_argument("--summary", default=None,
+                        help="Path of the JSON run summary written when the run ends")
+    parser.add_argument("--flood", action="store_true",
+                        help="Ramp the event rate without pacing to find the saturation point")
+    return parser
 
 
 if __name__ == "__main__":
@@ -0,0 +1,1007 @@
+# benchmark_suite.py
+import argparse
+import ctypes
+import importlib
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+from config_compiler import parse_jsonc
+from display_geometry import FakeDisplayGeometry
+from import_benchmark import run_child
+from tester_runtime import load_tester_class
+
+"""
+BenchmarkSuite - Measure the testers' throughput and overhead without a window.
+
+The testers are run headless: the win32gui module seen by the tester modules is
+replaced by a stand-in that counts posted messages and lets the message pump drain
+them, and time.sleep() does nothing while a benchmark runs, so the numbers measure
+the Python work per event (pattern generation, key lookup, the emit layer, logging
+and the loop's bookkeeping) rather than the configured delays.
+Where pywin32 is not installed, pure-Python stand-ins for win32gui, win32api and
+win32con are put in sys.modules (see install_stand_in_modules), so the suite also
+runs on systems other than Windows.
+
+Benchmarks:
+    keyboard.<pattern>          Keystrokes per second for each SafeKeyboardTester typing pattern
+    mouse.<pattern>             Points per second for each SafeMouseTester movement pattern
+    loop.<tester>               Microseconds per pass of the testing loop around a no-op event
+    logging.record              Microseconds per log record through the tester's handlers
+    startup.<tester>.import     Milliseconds to import the tester script in a fresh interpreter
+    startup.<tester>.construct  Milliseconds to construct the tester
+
+Results are written as JSON and can be compared against a stored baseline; a
+benchmark that is worse than the baseline by more than the tolerance counts as a
+regression. Run one tester version per process (--version), save its results, and
+compare another version's run against them to catch regressions between versions.
+"""
+
+# Version of the results file format
+SUITE_VERSION = 1
+
+# Tester scripts of each version: version -> kind -> (script, class, configuration file)
+TESTER_VERSIONS = {
+    "1.7": {
+        "keyboard": ("skt-1.7.py", "SafeKeyboardTester", "skt-1.7.config.json"),
+        "mouse": ("smt-1.7.py", "SafeMouseTester", "smt-1.7.config.json"),
+    },
+    "1.8": {
+        "keyboard": ("skt-1.8.py", "SafeKeyboardTester", "skt-1.8.config.json"),
+        "mouse": ("smt-1.8.py", "SafeMouseTester", "smt-1.8.config.json"),
+    },
+}
+
+# Patterns benchmarked for each kind of tester; each is a simulate_<pattern> method
+KEYBOARD_PATTERNS = ("common_word", "random_word", "sentence", "code_snippet", "number_sequence", "special_key")
+MOUSE_PATTERNS = ("random_movement", "linear_movement", "circular_movement", "targeted_movement",
+                  "trajectory_movement")
+
+# Benchmark groups that can be selected with --only
+BENCHMARK_GROUPS = ("keyboard", "mouse", "loop", "logging", "startup")
+
+# Configuration values that keep a headless tester quiet and its window untouched
+HEADLESS_OVERRIDES = {
+    "console_logging_enabled": False,
+    "log_level": "INFO",
+    "cleanup_interval": 1e9,
+    "resource_monitor_interval": 1e9,
+}
+
+# Window handle given to headless testers
+HEADLESS_WINDOW = 1
+
+# Window messages counted as keystrokes and as mouse points
+WM_KEYDOWN = 0x0100
+WM_MOUSEMOVE = 0x0200
+
+# Default allowed slowdown before a benchmark counts as a regression
+DEFAULT_TOLERANCE = 0.10
+
+# Error code of a PostMessage call rejected because the target queue is full
+ERROR_NOT_ENOUGH_QUOTA = 1816
+
+# VkKeyScan results of the typed punctuation on a US keyboard layout; 0x100 is the Shift state
+US_PUNCTUATION_KEYS = {
+    ' ': 0x20, '\t': 0x09, '\n': 0x0D, ';': 0xBA, '=': 0xBB, ',': 0xBC, '-': 0xBD, '.': 0xBE,
+    '/': 0xBF, '`': 0xC0, '[': 0xDB, '\\': 0xDC, ']': 0xDD, "'": 0xDE,
+    ':': 0x1BA, '+': 0x1BB, '<': 0x1BC, '_': 0x1BD, '>': 0x1BE, '?': 0x1BF, '~': 0x1C0,
+    '{': 0x1DB, '|': 0x1DC, '}': 0x1DD, '"': 0x1DE, '!': 0x131, '@': 0x132, '#': 0x133,
+    '$': 0x134, '%': 0x135, '^': 0x136, '&': 0x137, '*': 0x138, '(': 0x139, ')': 0x130,
+}
+
+
+class StandInWin32con:
+    """
+    Pure-Python stand-in for the win32con constants the testers use, where pywin32 is missing.
+    """
+
+    VK_BACK = 0x08
+    VK_TAB = 0x09
+    VK_RETURN = 0x0D
+    VK_SHIFT = 0x10
+    VK_CONTROL = 0x11
+    VK_MENU = 0x12
+    VK_CAPITAL = 0x14
+    VK_ESCAPE = 0x1B
+    VK_SPACE = 0x20
+    PM_REMOVE = 0x0001
+    LWA_ALPHA = 0x00000002
+    WS_EX_TOPMOST = 0x00000008
+    WS_EX_TRANSPARENT = 0x00000020
+    WS_EX_LAYERED = 0x00080000
+    WS_POPUP = 0x80000000
+    FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+    FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+
+
+class StandInWin32api:
+    """
+    Pure-Python stand-in for the win32api functions the testers use, where pywin32 is missing.
+
+    Reports a single 1920x1080 display, a US keyboard layout and no keys held down.
+    """
+
+    def GetSystemMetrics(self, index):
+        """
+        Get a system metric of a single 1920x1080 display.
+
+        Returns:
+            int: The metric; 0 for metrics other than the screen size and monitor count.
+        """
+        return {0: 1920, 1: 1080, 78: 1920, 79: 1080, 80: 1}.get(index, 0)
+
+    def GetModuleHandle(self, name):
+        """
+        Get a module handle; headless windows do not use it.
+        """
+        return 0
+
+    def GetAsyncKeyState(self, vk_code):
+        """
+        Get the state of a key; no key is ever held down.
+        """
+        return 0
+
+    def GetKeyboardLayout(self, thread_id):
+        """
+        Get the keyboard layout identifier of US English.
+        """
+        return 0x04090409
+
+    def VkKeyScan(self, char):
+        """
+        Get the virtual-key code and Shift state that type a character on a US layout.
+
+        Returns:
+            int: The code in the low byte and 0x100 for Shift, or -1 if no key types it.
+        """
+        if char.isascii() and char.isdigit():
+            return ord(char)
+        if char.isascii() and char.isalpha():
+            return ord(char.upper()) | (0x100 if char.isupper() else 0)
+        return US_PUNCTUATION_KEYS.get(char, -1)
+
+
+class StandInWin32gui:
+    """
+    Pure-Python stand-in for the win32gui functions the testers use, where pywin32 is missing.
+
+    Windows are never created: every window gets HEADLESS_WINDOW and posted messages
+    are discarded. Wrap it in a HeadlessWin32gui to count or queue them.
+    """
+
+    WNDCLASS = SimpleNamespace
+
+    def RegisterClass(self, window_class):
+        """
+        Register a window class; returns a dummy class atom.
+        """
+        return 1
+
+    def CreateWindowEx(self, *args):
+        """
+        Create a window; returns HEADLESS_WINDOW.
+        """
+        return HEADLESS_WINDOW
+
+    def SetLayeredWindowAttributes(self, hwnd, key, alpha, flags):
+        """
+        Do nothing; there is no window to make transparent.
+        """
+
+    def DestroyWindow(self, hwnd):
+        """
+        Do nothing; there is no window to destroy.
+        """
+
+    def GetWindowThreadProcessId(self, hwnd):
+        """
+        Get the thread and process that own a window; the current ones own every window.
+        """
+        return threading.get_native_id(), os.getpid()
+
+    def DefWindowProc(self, hwnd, msg, wparam, lparam):
+        """
+        Handle a message by default; returns 0.
+        """
+        return 0
+
+    def PostMessage(self, hwnd, msg, wparam, lparam):
+        """
+        Discard a message.
+        """
+
+    def PeekMessage(self, msg, hwnd, first, last, remove):
+        """
+        Report an empty message queue.
+        """
+        return 0
+
+    def MSG(self):
+        """
+        Create a message structure; headless pumping does not need one.
+        """
+        return None
+
+    def TranslateMessage(self, msg):
+        """
+        Do nothing; there is no message to translate.
+        """
+
+    def DispatchMessage(self, msg):
+        """
+        Do nothing; there is no window procedure to call.
+        """
+
+
+class StandInWindll:
+    """
+    Stand-in for ctypes.windll on systems without it; every function of every DLL returns 0.
+    """
+
+    def __getattr__(self, name):
+        """
+        Get a DLL or one of its functions.
+        """
+        return self
+
+    def __call__(self, *args):
+        """
+        Call a DLL function; returns 0.
+        """
+        return 0
+
+
+def install_stand_in_modules():
+    """
+    Put pure-Python stand-ins in sys.modules for the pywin32 modules that cannot be imported.
+
+    The testers can then be constructed and run headless on any platform. ctypes.windll
+    is given a stand-in as well where ctypes has none. Modules that import are left alone.
+
+    Returns:
+        list: Names of the modules that were replaced by stand-ins.
+    """
+    replaced = []
+    for name, stand_in in (("win32con", StandInWin32con), ("win32api", StandInWin32api),
+                           ("win32gui", StandInWin32gui)):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            sys.modules[name] = stand_in()
+            replaced.append(name)
+    if not hasattr(ctypes, "windll"):
+        ctypes.windll = StandInWindll()
+        replaced.append("ctypes.windll")
+    return replaced
+
+
+def load_win32gui():
+    """
+    Get the win32gui module for a headless stand-in to wrap.
+
+    Returns:
+        module: The pywin32 module, or a StandInWin32gui if pywin32 is not installed.
+    """
+    install_stand_in_modules()
+    return importlib.import_module("win32gui")
+
+
+class HeadlessWin32gui:
+    """
+    Stand-in for the win32gui module that counts posted messages instead of sending them.
+
+    Posted messages wait in a virtual queue until the tester's message pump peeks
+    them, so the emit layer sees its queue fill and drain as it would with a window.
+    Every other attribute is taken from the real module.
+
+    Attributes:
+        counts (Counter): Number of messages posted, by message identifier.
+        pending (int): Messages posted but not yet pumped.
+    """
+
+    def __init__(self, real_module):
+        """
+        Initialize the HeadlessWin32gui.
+
+        Args:
+            real_module (module): The win32gui module to fall back to.
+        """
+        self._real_module = real_module
+        self.counts = Counter()
+        self.pending = 0
+
+    def __getattr__(self, name):
+        """
+        Get an attribute of the real module.
+
+        Args:
+            name (str): Name of the attribute.
+
+        Returns:
+            object: The real module's attribute.
+        """
+        return getattr(self._real_module, name)
+
+    def PostMessage(self, hwnd, msg, wparam, lparam):
+        """
+        Count a message and add it to the virtual queue.
+        """
+        self.counts[msg] += 1
+        self.pending += 1
+
+    def PeekMessage(self, msg, hwnd, first, last, remove):
+        """
+        Remove one message from the virtual queue.
+
+        Returns:
+            int: 1 if a message was removed, otherwise 0.
+        """
+        if self.pending:
+            self.pending -= 1
+            return 1
+        return 0
+
+    def MSG(self):
+        """
+        Create a message structure; headless pumping does not need one.
+        """
+        return None
+
+    def TranslateMessage(self, msg):
+        """
+        Do nothing; there is no message to translate.
+        """
+
+    def DispatchMessage(self, msg):
+        """
+        Do nothing; there is no window procedure to call.
+        """
+
+
+class BoundedQueueWin32gui(HeadlessWin32gui):
+    """
+    Headless stand-in whose virtual queue has a capacity and a slow consumer.
+
+    PostMessage fails as it does on Windows when the queue already holds capacity
+    messages, and the message pump removes at most service_rate messages per second,
+    so a flood of input can outrun the target and fill its queue.
+
+    Attributes:
+        capacity (int): Number of messages the queue holds.
+        service_rate (float): Messages per second the target handles, or None for no limit.
+        rejected (int): Number of posts rejected because the queue was full.
+        max_pending (int): Deepest the queue has been.
+    """
+
+    def __init__(self, real_module, capacity=10000, service_rate=None):
+        """
+        Initialize the BoundedQueueWin32gui.
+
+        Args:
+            real_module (module): The win32gui module to fall back to.
+            capacity (int, optional): Number of messages the queue holds. Defaults to 10000,
+                the default per-thread limit of Windows.
+            service_rate (float, optional): Messages per second the target handles. Defaults
+                to None (no limit).
+        """
+        super().__init__(real_module)
+        self.capacity = max(1, int(capacity))
+        self.service_rate = service_rate
+        self.rejected = 0
+        self.max_pending = 0
+        self._allowance = 0.0
+        self._last_service = time.perf_counter()
+
+    def PostMessage(self, hwnd, msg, wparam, lparam):
+        """
+        Add a message to the virtual queue, failing if the queue is full.
+
+        Raises:
+            error: The real module's error type (OSError if it has none) when the queue is full.
+        """
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise getattr(self._real_module, "error", OSError)(
+                ERROR_NOT_ENOUGH_QUOTA, "PostMessage", "Not enough quota is available to process this command.")
+        super().PostMessage(hwnd, msg, wparam, lparam)
+        self.max_pending = max(self.max_pending, self.pending)
+
+    def PeekMessage(self, msg, hwnd, first, last, remove):
+        """
+        Remove one message from the virtual queue if the target has had time to handle it.
+
+        Returns:
+            int: 1 if a message was removed, otherwise 0.
+        """
+        if self.service_rate is not None:
+            # An idle target cannot bank time to handle messages that have not arrived yet
+            now = time.perf_counter()
+            elapsed, self._last_service = now - self._last_service, now
+            self._allowance = min(self.pending, self._allowance + elapsed * self.service_rate)
+            if self._allowance < 1.0:
+                return 0
+            self._allowance -= 1.0
+        return super().PeekMessage(msg, hwnd, first, last, remove)
+
+
+class LocalQueueWin32gui(BoundedQueueWin32gui):
+    """
+    Headless stand-in that keeps the posted messages and dispatches them to a window procedure.
+
+    Messages travel through a local FIFO queue from PostMessage to DispatchMessage, so a
+    window procedure sees exactly what was posted, as on Windows. Loss and reordering
+    can be injected to check that they are detected.
+
+    Attributes:
+        window_proc (callable): Called as window_proc(hwnd, msg, wparam, lparam) for each
+            dispatched message, or None.
+        loss_rate (float): Probability that a posted message is silently discarded.
+        reorder_rate (float): Probability that a posted message jumps ahead of the one before it.
+        lost (int): Number of messages discarded.
+        reordered (int): Number of messages moved ahead.
+        max_reorder_distance (int): Largest number of messages, lost ones included, posted
+            after a message and dispatched before it.
+    """
+
+    def __init__(self, real_module, window_proc=None, capacity=10000, service_rate=None,
+                 loss_rate=0.0, reorder_rate=0.0, seed=None):
+        """
+        Initialize the LocalQueueWin32gui.
+
+        Args:
+            real_module (module): The win32gui module to fall back to.
+            window_proc (callable, optional): Window procedure of the test window. Defaults to None.
+            capacity (int, optional): Number of messages the queue holds. Defaults to 10000.
+            service_rate (float, optional): Messages per second the target handles. Defaults
+                to None (no limit).
+            loss_rate (float, optional): Probability of discarding a message. Defaults to 0.0.
+            reorder_rate (float, optional): Probability of moving a message ahead. Defaults to 0.0.
+            seed (int, optional): Seed of the loss and reordering choices. Defaults to None.
+        """
+        super().__init__(real_module, capacity, service_rate)
+        self.window_proc = window_proc
+        self.loss_rate = loss_rate
+        self.reorder_rate = reorder_rate
+        self.lost = 0
+        self.reordered = 0
+        self.max_reorder_distance = 0
+        self._queue = deque()
+        self._random = random.Random(seed)
+        self._posts = 0  # messages accepted by PostMessage, lost ones included
+        self._last_post = 0  # _posts when the message at the end of the queue was posted
+
+    def PostMessage(self, hwnd, msg, wparam, lparam):
+        """
+        Add a message to the local queue, unless it is chosen to be lost.
+        """
+        super().PostMessage(hwnd, msg, wparam, lparam)
+        self._posts += 1
+        if self.loss_rate and self._random.random() < self.loss_rate:
+            self.pending -= 1
+            self.lost += 1
+            return
+        if self._queue and self.reorder_rate and self._random.random() < self.reorder_rate:
+            # Every message inserted before the last one moves it one further back
+            self._queue.insert(len(self._queue) - 1, (hwnd, msg, wparam, lparam))
+            self.reordered += 1
+            self.max_reorder_distance = max(self.max_reorder_distance, self._posts - self._last_post)
+        else:
+            self._queue.append((hwnd, msg, wparam, lparam))
+            self._last_post = self._posts
+
+    def PeekMessage(self, msg, hwnd, first, last, remove):
+        """
+        Move the oldest queued message into a message structure.
+
+        Returns:
+            int: 1 if a message was removed, otherwise 0.
+        """
+        if not super().PeekMessage(msg, hwnd, first, last, remove):
+            return 0
+        msg.hwnd, msg.message, msg.wParam, msg.lParam = self._queue.popleft()
+        return 1
+
+    def MSG(self):
+        """
+        Create a message structure.
+
+        Returns:
+            SimpleNamespace: A structure with hwnd, message, wParam and lParam.
+        """
+        return SimpleNamespace(hwnd=0, message=0, wParam=0, lParam=0)
+
+    def DispatchMessage(self, msg):
+        """
+        Call the window procedure with a peeked message.
+
+        Returns:
+            int: The window procedure's result, or 0 without one.
+        """
+        if self.window_proc is None:
+            return 0
+        return self.window_proc(msg.hwnd, msg.message, msg.wParam, msg.lParam)
+
+    def DefWindowProc(self, hwnd, msg, wparam, lparam):
+        """
+        Do nothing; there is no default handling without a window.
+
+        Returns:
+            int: 0.
+        """
+        return 0
+
+
+@contextmanager
+def sleeps_disabled():
+    """
+    Make time.sleep() return immediately, so benchmarks measure work rather than delays.
+
+    Yields:
+        None
+    """
+    original = time.sleep
+    time.sleep = lambda seconds: None
+    try:
+        yield
+    finally:
+        time.sleep = original
+
+
+def write_headless_config(config_file, directory):
+    """
+    Write a plain JSON copy of a configuration file with HEADLESS_OVERRIDES applied.
+
+    Plain JSON is written so that testers which cannot parse comments read the same values.
+
+    Args:
+        config_file (str): Path of the tester's configuration file.
+        directory (str): Directory for the copy.
+
+    Returns:
+        str: Path of the copy.
+    """
+    with open(config_file, encoding="utf-8-sig") as f:
+        config = parse_jsonc(f.read())
+    config.update(HEADLESS_OVERRIDES)
+    path = os.path.join(directory, os.path.basename(config_file))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    return path
+
+
+def create_headless_tester(version, kind, stand_in, directory):
+    """
+    Construct a tester that posts to the headless stand-in.
+
+    Args:
+        version (str): Key of TESTER_VERSIONS.
+        kind (str): "keyboard" or "mouse".
+        stand_in (HeadlessWin32gui): Stand-in installed in the tester's modules.
+        directory (str): Directory for the headless configuration copy.
+
+    Returns:
+        tuple: (tester, seconds taken by the constructor).
+    """
+    script, class_name, config_file = TESTER_VERSIONS[version][kind]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    tester_class = load_tester_class(script, class_name)
+
+    # The emit layer binds PostMessage when the tester is constructed
+    for klass in tester_class.__mro__:
+        module = sys.modules.get(klass.__module__)
+        if module is not None and hasattr(module, "win32gui"):
+            module.win32gui = stand_in
+
+    config_path = write_headless_config(os.path.join(script_dir, config_file), directory)
+    start = time.perf_counter()
+    tester = tester_class(config_path)
+    elapsed = time.perf_counter() - start
+
+    # Keep the log file but not the console output
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if type(handler) is logging.StreamHandler:
+            root.removeHandler(handler)
+
+    for attribute in ("transparent_window", "hidden_window", "test_window"):
+        setattr(tester, attribute, HEADLESS_WINDOW)
+    if kind == "mouse":
+        # Fixed geometry, so that runs on different machines generate the same movements
+        tester.geometry = FakeDisplayGeometry()
+        tester.current_x, tester.current_y = 960, 540
+    return tester, elapsed
+
+
+def measure(function, duration, errors=None):
+    """
+    Call a function repeatedly for at least the given time.
+
+    Args:
+        function (callable): The function.
+        duration (float): Minimum measuring time in seconds.
+        errors (Counter, optional): Counts the exceptions the function raises,
+            by "Type: message", and keeps measuring. Without it the first exception propagates.
+
+    Returns:
+        tuple: (number of calls, elapsed seconds).
+    """
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while True:
+        try:
+            function()
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[f"{type(e).__name__}: {e}"] += 1
+        calls += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls, now - start
+
+
+def result(value, unit, higher_is_better, **details):
+    """
+    Build one benchmark result.
+
+    Args:
+        value (float): The measured value.
+        unit (str): Unit of the value.
+        higher_is_better (bool): Whether a larger value is an improvement.
+        **details: Extra information kept with the result.
+
+    Returns:
+        dict: The result.
+    """
+    return dict(details, value=round(value, 3), unit=unit, higher_is_better=higher_is_better)
+
+
+def benchmark_patterns(tester, kind, stand_in, duration, failures):
+    """
+    Measure the message throughput of every pattern the tester implements.
+
+    A pattern that raises is measured to the end all the same; its failed bursts are kept
+    with its result and the most common error is recorded in failures.
+
+    Args:
+        tester (BaseInputTester): A headless tester.
+        kind (str): "keyboard" or "mouse".
+        stand_in (HeadlessWin32gui): The stand-in the tester posts to.
+        duration (float): Seconds per pattern.
+        failures (dict): Benchmark name to error description, filled in for failing patterns.
+
+    Returns:
+        dict: Benchmark name to result.
+    """
+    patterns, message, unit = ((KEYBOARD_PATTERNS, WM_KEYDOWN, "keystrokes/s") if kind == "keyboard"
+                               else (MOUSE_PATTERNS, WM_MOUSEMOVE, "points/s"))
+    # Only the 1.8 testers record their bursts in an EventBatch
+    batch = getattr(tester, "burst_events", None)
+    results = {}
+    for pattern in patterns:
+        method = getattr(tester, f"simulate_{pattern}", None)
+        if method is None:
+            continue
+
+        def burst():
+            """
+            Run the pattern once and drain the queue, as the testing loop does.
+            """
+            if batch is not None:
+                batch.clear()
+            method()
+            tester.process_messages()
+
+        name = f"{kind}.{pattern}"
+        errors = Counter()
+        measure(burst, 0.0, errors)  # Warm up
+        before = stand_in.counts[message]
+        calls, elapsed = measure(burst, duration, errors)
+        produced = stand_in.counts[message] - before
+        details = {"bursts_per_s": round(calls / elapsed, 1)}
+        if errors:
+            failures[name] = errors.most_common(1)[0][0]
+            details["failed_bursts"] = sum(errors.values())
+        results[name] = result(produced / elapsed, unit, True, **details)
+    return results
+
+
+def benchmark_loop(tester, kind, duration):
+    """
+    Measure the testing loop's own cost per event.
+
+    Each pass mirrors the body of the testing loop (bounds checks, the burst with its
+    message pump, window and resource checks, choosing and logging the next interval)
+    around an event that only counts itself, and skips the wait.
+
+    Args:
+        tester (BaseInputTester): A headless tester.
+        kind (str): "keyboard" or "mouse".
+        duration (float): Seconds to measure for.
+
+    Returns:
+        dict: Benchmark name to result.
+    """
+    def single_event():
+        """
+        Stand in for simulate_input_event(), counting one event.
+        """
+        if hasattr(tester, "record_event"):
+            tester.record_event("benchmark")
+        else:
+            tester.event_count += 1
+        return True
+
+    tester.simulate_input_event = single_event
+
+    if hasattr(tester, "run_burst"):
+        tester.prepare_run(seed=0)
+
+        def iteration():
+            """
+            One pass of the lifecycle-based testing loop, without the wait.
+            """
+            tester.apply_control_commands()
+            tester.check_run_bounds()
+            events = tester.run_burst()
+            tester.check_run_bounds()
+            interval = tester.next_event_interval(events)
+            tester.logger.info(f"Waiting {interval:.2f} seconds until next event...")
+    else:
+        tester.running = True
+
+        def iteration():
+            """
+            One pass of the original testing loop, without the wait.
+            """
+            tester.simulate_input_event()
+            tester.process_messages()
+            tester.check_and_cleanup_window()
+            tester.check_and_monitor_resources()
+            interval = random.uniform(1.0, 5.0)
+            tester.logger.info(f"Waiting {interval:.2f} seconds until next event...")
+
+    iteration()  # Warm up
+    calls, elapsed = measure(iteration, duration)
+    del tester.simulate_input_event
+    tester.running = False
+    return {f"loop.{kind}": result(elapsed / calls * 1e6, "us/event", False)}
+
+
+def benchmark_logging(tester, duration):
+    """
+    Measure the cost of one log record through the tester's handlers.
+
+    Args:
+        tester (BaseInputTester): A headless tester.
+        duration (float): Seconds to measure for.
+
+    Returns:
+        dict: Benchmark name to result.
+    """
+    counter = iter(range(10 ** 12))
+
+    def record():
+        """
+        Log one record shaped like the testers' per-burst records.
+        """
+        tester.logger.info(f"Burst {next(counter)}: Simulated common word 'benchmark '")
+
+    record()  # Warm up
+    calls, elapsed = measure(record, duration)
+    return {"logging.record": result(elapsed / calls * 1e6, "us/record", False)}
+
+
+def benchmark_startup(version, kind, construct_seconds, runs):
+    """
+    Measure how long a tester takes to import and construct.
+
+    Args:
+        version (str): Key of TESTER_VERSIONS.
+        kind (str): "keyboard" or "mouse".
+        construct_seconds (float): Constructor time measured in this process.
+        runs (int): Fresh interpreters to import the script in.
+
+    Returns:
+        dict: Benchmark name to result.
+    """
+    script = TESTER_VERSIONS[version][kind][0]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = [run_child(script, script_dir)[0]["seconds"] * 1000.0 for _ in range(runs)]
+    return {
+        f"startup.{kind}.import": result(statistics.median(timings), "ms", False, runs=runs),
+        f"startup.{kind}.construct": result(construct_seconds * 1000.0, "ms", False),
+    }
+
+
+def run_suite(version, groups, duration, seed, startup_runs):
+    """
+    Run the selected benchmark groups for one tester version.
+
+    Args:
+        version (str): Key of TESTER_VERSIONS.
+        groups (tuple): Names from BENCHMARK_GROUPS.
+        duration (float): Seconds per throughput or overhead benchmark.
+        seed (int): Random seed applied before each benchmark.
+        startup_runs (int): Fresh interpreters per import-time measurement.
+
+    Returns:
+        dict: The results document.
+    """
+    stand_in = HeadlessWin32gui(load_win32gui())
+    results, failures = {}, {}
+    with tempfile.TemporaryDirectory() as directory:
+        testers = {kind: create_headless_tester(version, kind, stand_in, directory) for kind in ("keyboard", "mouse")}
+
+        with sleeps_disabled():
+            for kind, (tester, _) in testers.items():
+                if kind in groups:
+                    random.seed(seed)
+                    results.update(benchmark_patterns(tester, kind, stand_in, duration, failures))
+            if "loop" in groups:
+                for kind, (tester, _) in testers.items():
+                    random.seed(seed)
+                    results.update(benchmark_loop(tester, kind, duration))
+            if "logging" in groups:
+                results.update(benchmark_logging(testers["keyboard"][0], duration))
+
+        if "startup" in groups:
+            for kind, (_, construct_seconds) in testers.items():
+                try:
+                    results.update(benchmark_startup(version, kind, construct_seconds, startup_runs))
+                except RuntimeError as e:
+                    # e.g. a script that imports pywin32 at module level, on a machine without it
+                    failures[f"startup.{kind}"] = str(e).strip().splitlines()[-1]
+
+    return {
+        "suite_version": SUITE_VERSION,
+        "tester_version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "duration_s": duration,
+        "results": results,
+        "failures": failures,
+    }
+
+
+def run_other_version(version, args):
+    """
+    Run the suite for another tester version in a fresh interpreter.
+
+    The testers of one version patch module-level state (win32gui, logging handlers), so
+    each version gets its own process.
+
+    Args:
+        version (str): Key of TESTER_VERSIONS.
+        args (argparse.Namespace): Options of this run, reused for the other one.
+
+    Returns:
+        dict: The results document of the other version.
+
+    Raises:
+        RuntimeError: If the child wrote no results.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, f"bench-{version}.json")
+        command = [sys.executable, os.path.abspath(__file__), "--version", version, "--only", *args.only,
+                   "--duration", str(args.duration), "--seed", str(args.seed),
+                   "--startup-runs", str(args.startup_runs), "--output", output]
+        # A non-zero status may only mean failures or regressions, which the document records
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if not os.path.exists(output):
+            raise RuntimeError(f"benchmarking tester version {version} failed:\n{completed.stderr.strip()}")
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare benchmark results against a baseline.
+
+    Args:
+        current (dict): Results document of this run.
+        baseline (dict): Results document to compare against.
+        tolerance (float, optional): Fraction by which a benchmark may be worse before it
+            counts as a regression. Defaults to 0.10.
+
+    Returns:
+        list: One dict per benchmark with "name", "baseline", "current", "change" (fraction,
+            positive is better) and "status" ("ok", "improved", "regressed", "new" or "missing").
+    """
+    rows = []
+    current_results, baseline_results = current["results"], baseline.get("results", {})
+    for name in sorted(set(current_results) | set(baseline_results)):
+        now, before = current_results.get(name), baseline_results.get(name)
+        if now is None or before is None:
+            rows.append({"name": name, "baseline": before and before["value"], "current": now and now["value"],
+                         "change": None, "status": "missing" if now is None else "new"})
+            continue
+
+        if before["value"] == 0:
+            change = 0.0
+        elif now["higher_is_better"]:
+            change = now["value"] / before["value"] - 1.0
+        else:
+            change = before["value"] / now["value"] - 1.0 if now["value"] else 0.0
+        status = "regressed" if change < -tolerance else "improved" if change > tolerance else "ok"
+        rows.append({"name": name, "baseline": before["value"], "current": now["value"],
+                     "change": round(change, 4), "status": status})
+    return rows
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for the benchmark suite.
+
+    Example:
+        python benchmark_suite.py --version 1.7 --output bench-1.7.json
+        python benchmark_suite.py --version 1.8 --baseline bench-1.7.json --output bench-1.8.json
+        python benchmark_suite.py --version 1.8 --against 1.7 --tolerance 0.25
+        python benchmark_suite.py --only keyboard mouse --duration 0.5
+
+    Exits with status 1 if any benchmark failed or regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Benchmark suite")
+    parser.add_argument("--version", choices=sorted(TESTER_VERSIONS), default="1.8", help="Tester version to measure")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARK_GROUPS, default=list(BENCHMARK_GROUPS),
+                        help="Benchmark groups to run (default: all)")
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per throughput or overhead benchmark")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed applied before each benchmark")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters per import-time measurement")
+    parser.add_argument("--output", default=None, help="Path of the JSON results file")
+    baseline_group = parser.add_mutually_exclusive_group()
+    baseline_group.add_argument("--baseline", default=None, help="Results file to compare against")
+    baseline_group.add_argument("--against", choices=sorted(TESTER_VERSIONS), default=None,
+                                help="Tester version to run in a child process and compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Fraction by which a benchmark may be worse than the baseline")
+    args = parser.parse_args()
+
+    document = run_suite(args.version, tuple(args.only), args.duration, args.seed, max(1, args.startup_runs))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    print(f"Input Testing Utility Suite - benchmarks of tester version {args.version}")
+    for name, entry in document["results"].items():
+        print(f"  {name:<32} {entry['value']:>14,.3f} {entry['unit']}")
+    if document["failures"]:
+        print("\nFailures:")
+        for name, error in document["failures"].items():
+            print(f"  {name:<32} {error}")
+
+    regressed = False
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        source = args.baseline
+    elif args.against:
+        baseline = run_other_version(args.against, args)
+        source = "a run"
+    if baseline is not None:
+        print(f"\nCompared with {source} (tester version {baseline.get('tester_version')}, "
+              f"tolerance {args.tolerance:.0%}):")
+        for row in compare_results(document, baseline, args.tolerance):
+            change = "" if row["change"] is None else f"{row['change']:+.1%}"
+            print(f"  {row['name']:<32} {change:>8}  {row['status']}")
+            regressed = regressed or row["status"] == "regressed"
+
+    sys.exit(1 if regressed or document["failures"] else 0)
@@ -0,0 +1,217 @@
+# config_compiler.py
+import json
+import os
+import re
+import sys
+from lazy_imports import lazy_import
+
+"""
+ConfigCompiler - Parse JSON-with-comments configuration files, with a disk cache.
+
+The tester configuration files are JSON with // line comments, /* */ block
+comments and, occasionally, a trailing comma. Comments are removed by a tokenizer
+that understands string literals, so a "//" or "/*" inside a value (a URL, a code
+snippet in a word list) is left alone. Comments are replaced by spaces rather than
+removed, so that line and column numbers in parse errors still point into the file.
+
+Parsed configurations are cached on disk, keyed by a hash of the file's contents,
+so that a large configuration (megabytes of vocabulary or target maps) is only
+tokenized and parsed the first time it is seen.
+"""
+
+# Only loaded when the cache is first used
+hashlib = lazy_import("hashlib")
+pickle = lazy_import("pickle")
+tempfile = lazy_import("tempfile")
+
+# Bump when the parsed form changes, to invalidate existing cache entries
+COMPILER_VERSION = 1
+
+# A JSON string literal
+_STRING = r'"(?:[^"\\\n]+|\\.)*"'
+
+# Runs of code and strings are matched whole, so that only comments cost a callback
+_COMMENT = re.compile(rf'(?:[^"/]+|{_STRING})+|//[^\n]*|/\*.*?(?:\*/|\Z)|.', re.DOTALL)
+
+# The same for commas that only have whitespace before a closing bracket or brace
+_TRAILING_COMMA = re.compile(rf'(?:[^",]+|{_STRING}|,(?!\s*[}}\]]))+|.', re.DOTALL)
+_TRAILING_COMMA_CANDIDATE = re.compile(r',\s*[}\]]')
+
+
+class ConfigError(ValueError):
+    """
+    A configuration file that cannot be parsed, or a value that is invalid.
+
+    Attributes:
+        problems (list): One message per problem found.
+    """
+
+    def __init__(self, problems):
+        """
+        Initialize the ConfigError.
+
+        Args:
+            problems (str or list): The problem, or every problem found.
+        """
+        self.problems = [problems] if isinstance(problems, str) else list(problems)
+        super().__init__("; ".join(self.problems))
+
+
+def strip_comments(text):
+    """
+    Replace the comments in JSON-with-comments text by whitespace, and drop trailing commas.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: Plain JSON text with the same line and column positions.
+
+    Raises:
+        ConfigError: If a block comment is not closed.
+    """
+    def blank(match):
+        """
+        Keep code and strings; turn comments into spaces, keeping their line breaks.
+
+        Args:
+            match (re.Match): A run of code and strings, or a comment.
+
+        Returns:
+            str: The replacement.
+        """
+        token = match.group()
+        if token.startswith("//"):
+            return " " * len(token)
+        if token.startswith("/*"):
+            if len(token) < 4 or not token.endswith("*/"):
+                line = text.count("\n", 0, match.start()) + 1
+                raise ConfigError(f"unterminated /* comment starting on line {line}")
+            return re.sub(r"[^\n]", " ", token)
+        return token
+
+    text = _COMMENT.sub(blank, text)
+    # Most files have no trailing commas; only tokenize again if one may be present
+    if _TRAILING_COMMA_CANDIDATE.search(text) is None:
+        return text
+    return _TRAILING_COMMA.sub(lambda match: " " if match.group() == "," else match.group(), text)
+
+
+def parse_jsonc(text):
+    """
+    Parse JSON-with-comments text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        dict: The parsed object.
+
+    Raises:
+        ConfigError: If the text is not a JSON object once comments are removed.
+    """
+    try:
+        config = json.loads(strip_comments(text))
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{e.msg} (line {e.lineno}, column {e.colno})") from e
+    if not isinstance(config, dict):
+        raise ConfigError("the configuration must be a JSON object")
+    return config
+
+
+def cache_directory():
+    """
+    Get the directory of the compiled-configuration cache.
+
+    Uses INPUT_TESTER_CACHE_DIR if set, otherwise %LOCALAPPDATA% on Windows and
+    $XDG_CACHE_HOME (or ~/.cache) elsewhere.
+
+    Returns:
+        str: Path of the cache directory (not necessarily existing yet).
+    """
+    override = os.environ.get("INPUT_TESTER_CACHE_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "InputTestingUtilitySuite")
+
+
+def read_cache(name):
+    """
+    Load an entry from the cache.
+
+    Args:
+        name (str): File name of the entry.
+
+    Returns:
+        object: The cached value, or None if there is no usable entry.
+    """
+    try:
+        with open(os.path.join(cache_directory(), name), "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def write_cache(name, value):
+    """
+    Store an entry in the cache, replacing it atomically.
+
+    Failures are ignored: the cache only saves time.
+
+    Args:
+        name (str): File name of the entry.
+        value (object): A picklable value.
+    """
+    directory = cache_directory()
+    temp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, os.path.join(directory, name))
+    except Exception:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def compile_config(config_file, use_cache=True):
+    """
+    Read and parse a configuration file, using the cache when its contents are unchanged.
+
+    Args:
+        config_file (str): Path of the file.
+        use_cache (bool, optional): Whether to read and update the disk cache. Defaults to True.
+
+    Returns:
+        dict: The parsed configuration. Callers must not modify it.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ConfigError: If the file cannot be parsed.
+    """
+    with open(config_file, "rb") as f:
+        data = f.read()
+
+    name = None
+    if use_cache:
+        digest = hashlib.sha256(data)
+        digest.update(f"config-compiler-{COMPILER_VERSION}".encode())
+        name = f"config-{digest.hexdigest()}.pickle"
+        config = read_cache(name)
+        if isinstance(config, dict):
+            return config
+
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ConfigError(f"the file is not UTF-8 text ({e})") from e
+    config = parse_jsonc(text)
+
+    if use_cache:
+        write_cache(name, config)
+    return config
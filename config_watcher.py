@@ -0,0 +1,153 @@
+# config_watcher.py
+import os
+import threading
+from lazy_imports import lazy_import
+
+"""
+ConfigWatcher - Detect edits to a tester configuration file.
+
+On Windows the watcher waits on a directory change notification, so an edit is
+noticed within milliseconds without polling; elsewhere, or if the notification
+cannot be set up, it polls the file's modification time and size. Either way a
+change is only reported once the file has stopped changing for a short settle
+time, because editors often write a file in several steps.
+
+The watcher only reports changes: reading, validating and applying the new
+configuration is up to the callback.
+"""
+
+# Only loaded when a watcher starts; missing outside Windows, where the watcher polls
+win32con = lazy_import("win32con")
+win32event = lazy_import("win32event")
+win32file = lazy_import("win32file")
+
+# Seconds the file must stay unchanged before a change is reported
+SETTLE_TIME = 0.2
+
+
+def file_signature(path):
+    """
+    Get a signature that changes whenever the file is rewritten.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        tuple: (modification time in ns, size), or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigWatcher:
+    """
+    Call a function whenever a file changes.
+
+    Attributes:
+        path (str): Absolute path of the watched file.
+        on_change (callable): Called with the path, on the watcher thread, after each change.
+        interval (float): Seconds between checks when polling.
+        logger (logging.Logger): Logger for watcher errors, or None.
+        native (bool): Whether an operating-system change notification is used instead of polling.
+    """
+
+    def __init__(self, path, on_change, interval=2.0, logger=None):
+        """
+        Initialize the ConfigWatcher.
+
+        Args:
+            path (str): Path of the file to watch.
+            on_change (callable): Function called with the path after each change.
+            interval (float, optional): Seconds between checks when polling. Defaults to 2.0.
+            logger (logging.Logger, optional): Logger for watcher errors. Defaults to None.
+        """
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.interval = interval
+        self.logger = logger
+        self.native = False
+        self._signature = file_signature(self.path)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start watching on a daemon thread.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching and wait for the watcher thread to finish.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def _watch(self):
+        """
+        Wait for changes until stopped, using a change notification if one is available.
+        """
+        handle = self._open_notification()
+        try:
+            while not self._stop_event.is_set():
+                if handle is not None:
+                    # Wake on any write in the directory, or at the polling interval as a safety net
+                    win32event.WaitForSingleObject(handle, int(self.interval * 1000))
+                    win32file.FindNextChangeNotification(handle)
+                else:
+                    self._stop_event.wait(self.interval)
+                self._check()
+        finally:
+            if handle is not None:
+                win32file.FindCloseChangeNotification(handle)
+
+    def _open_notification(self):
+        """
+        Set up a change notification for the file's directory.
+
+        Returns:
+            object: The notification handle, or None if polling must be used.
+        """
+        try:
+            handle = win32file.FindFirstChangeNotification(
+                os.path.dirname(self.path), False,
+                win32con.FILE_NOTIFY_CHANGE_LAST_WRITE | win32con.FILE_NOTIFY_CHANGE_FILE_NAME)
+        except ImportError:  # Not on Windows
+            return None
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"Change notifications unavailable for {self.path}: {e}. Polling instead.")
+            return None
+        self.native = True
+        return handle
+
+    def _check(self):
+        """
+        Report the file as changed once its signature differs and has settled.
+        """
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return
+
+        # Wait until the writer has finished
+        while not self._stop_event.wait(SETTLE_TIME):
+            settled = file_signature(self.path)
+            if settled == signature:
+                break
+            signature = settled
+        if signature is None or self._stop_event.is_set():
+            return
+
+        self._signature = signature
+        try:
+            self.on_change(self.path)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error handling change to {self.path}: {e}")
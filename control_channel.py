@@ -0,0 +1,230 @@
+# control_channel.py
+import json
+import os
+import sys
+import threading
+from lazy_imports import lazy_import
+
+"""
+ControlChannel - Local control socket for running testers.
+
+A tester that is started with a control address listens on a local socket (a
+named pipe on Windows, a Unix domain socket elsewhere) for small JSON commands,
+so that a long run can be paused, resumed, re-paced or stopped without editing
+its configuration and restarting it.
+
+Each request is a JSON object with a "command" key and the command's arguments;
+each reply is a JSON object with "ok" and either "result" or "error". The server
+only receives and answers requests: it hands each one to a submit function
+supplied by the tester, which applies it on the testing thread between events.
+
+Commands understood by the testers:
+    pause                       Stop emitting until resumed
+    resume                      Continue emitting
+    set_rate                    Change "min_interval", "max_interval", "target_rate" or "activity_model"
+    set_weights                 Change pattern weights, e.g. {"weights": {"sentence": 3}}
+    recycle                     Destroy and recreate the test window
+    stats                       Get the live run summary
+    profile                     Start, stop or query the stack sampler, e.g. {"action": "start", "interval": 0.02}
+    stop                        End the run
+"""
+
+# Only loaded when a control socket is used
+multiprocessing_connection = lazy_import("multiprocessing.connection")
+tempfile = lazy_import("tempfile")
+
+# Commands a client may send
+CONTROL_COMMANDS = ("pause", "resume", "set_rate", "set_weights", "recycle", "stats", "profile", "stop")
+
+# Seconds a client waits for a reply
+DEFAULT_REPLY_TIMEOUT = 10.0
+
+
+def default_control_address(name):
+    """
+    Get the default control address for a tester.
+
+    Args:
+        name (str): Name that identifies the tester, such as its class name.
+
+    Returns:
+        str: A named pipe path on Windows, or a socket path in the temporary directory elsewhere.
+    """
+    if sys.platform == "win32":
+        return rf"\\.\pipe\input-tester-{name}-{os.getpid()}"
+    return os.path.join(tempfile.gettempdir(), f"input-tester-{name}-{os.getpid()}.sock")
+
+
+def address_family(address):
+    """
+    Get the multiprocessing.connection family of a control address.
+
+    Args:
+        address (str): The control address.
+
+    Returns:
+        str: "AF_PIPE" for named pipes, otherwise "AF_UNIX".
+    """
+    return "AF_PIPE" if address.startswith("\\\\") else "AF_UNIX"
+
+
+class ControlServer:
+    """
+    Accept control connections and answer their requests.
+
+    Every connection is served by its own daemon thread, so a slow client never
+    holds up another one, and the tester never waits for a client.
+
+    Attributes:
+        address (str): Address the server listens on.
+        submit (callable): Function that takes a request dict and returns the reply dict.
+        logger (logging.Logger): Logger for connection errors, or None.
+    """
+
+    def __init__(self, address, submit, authkey=None, logger=None):
+        """
+        Start listening.
+
+        Args:
+            address (str): Named pipe or Unix socket path to listen on.
+            submit (callable): Function that takes a request dict and returns the reply dict.
+            authkey (str, optional): Shared secret clients must present. Defaults to None.
+            logger (logging.Logger, optional): Logger for connection errors. Defaults to None.
+        """
+        family = address_family(address)
+        if family == "AF_UNIX" and os.path.exists(address):
+            # A socket file left behind by a crashed run
+            os.unlink(address)
+
+        self.address = address
+        self.submit = submit
+        self.logger = logger
+        self._listener = multiprocessing_connection.Listener(address, family=family, authkey=authkey.encode() if authkey else None)
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept_loop, name="control-server", daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        """
+        Accept connections until the server is closed.
+        """
+        while not self._closed:
+            try:
+                connection = self._listener.accept()
+            except Exception as e:
+                if not self._closed and self.logger:
+                    self.logger.warning(f"Control connection rejected: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(connection,), name="control-client", daemon=True).start()
+
+    def _serve(self, connection):
+        """
+        Answer the requests of one connection until the client disconnects.
+
+        Args:
+            connection (multiprocessing.connection.Connection): The client connection.
+        """
+        with connection:
+            while not self._closed:
+                try:
+                    data = connection.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                try:
+                    request = json.loads(data)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                    if request.get("command") not in CONTROL_COMMANDS:
+                        raise ValueError(f"unknown command {request.get('command')!r}, "
+                                         f"expected one of {', '.join(CONTROL_COMMANDS)}")
+                    reply = self.submit(request)
+                except ValueError as e:
+                    reply = {"ok": False, "error": str(e)}
+                try:
+                    connection.send_bytes(json.dumps(reply, default=str).encode())
+                except (EOFError, OSError):
+                    return
+
+    def close(self):
+        """
+        Stop accepting connections and remove the socket.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # Wake the accept loop so that it sees the closed flag
+            multiprocessing_connection.Client(self.address, family=address_family(self.address)).close()
+        except Exception:
+            pass
+        self._listener.close()
+
+
+class ControlClient:
+    """
+    Send commands to a tester's control server.
+    """
+
+    def __init__(self, address, authkey=None):
+        """
+        Connect to a control server.
+
+        Args:
+            address (str): Address the server listens on.
+            authkey (str, optional): Shared secret configured on the server. Defaults to None.
+        """
+        self._connection = multiprocessing_connection.Client(address, family=address_family(address),
+                                                             authkey=authkey.encode() if authkey else None)
+
+    def send(self, command, timeout=DEFAULT_REPLY_TIMEOUT, **arguments):
+        """
+        Send a command and wait for its reply.
+
+        Args:
+            command (str): One of CONTROL_COMMANDS.
+            timeout (float, optional): Seconds to wait for the reply. Defaults to 10.
+            **arguments: Arguments of the command.
+
+        Returns:
+            dict: The reply, with "ok" and either "result" or "error".
+
+        Raises:
+            TimeoutError: If no reply arrives in time.
+        """
+        self._connection.send_bytes(json.dumps(dict(arguments, command=command)).encode())
+        if not self._connection.poll(timeout):
+            raise TimeoutError(f"No reply to {command} within {timeout} seconds")
+        return json.loads(self._connection.recv_bytes())
+
+    def close(self):
+        """
+        Disconnect from the server.
+        """
+        self._connection.close()
+
+
+if __name__ == "__main__":
+    """
+    Send one command to a running tester.
+
+    Example:
+        python control_channel.py /tmp/input-tester-SafeKeyboardTester-1234.sock pause
+        python control_channel.py ADDRESS set_rate '{"target_rate": {"value": 60, "unit": "wpm"}}'
+        python control_channel.py ADDRESS set_weights '{"weights": {"sentence": 3, "code_snippet": 0}}'
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Control a running tester")
+    parser.add_argument("address", help="Control address logged by the tester when it started")
+    parser.add_argument("command", choices=CONTROL_COMMANDS, help="Command to send")
+    parser.add_argument("arguments", nargs="?", default="{}", help="Command arguments as a JSON object")
+    parser.add_argument("--authkey", help="Shared secret configured as control_authkey")
+    args = parser.parse_args()
+
+    client = ControlClient(args.address, authkey=args.authkey)
+    try:
+        reply = client.send(args.command, **json.loads(args.arguments))
+    finally:
+        client.close()
+    print(json.dumps(reply, indent=2))
+    sys.exit(0 if reply.get("ok") else 1)
@@ -0,0 +1,380 @@
+# delivery_tracker.py
+import time
+from collections import Counter, OrderedDict, deque
+
+from event_bus import MESSAGE_NAMES
+from run_metrics import LatencyHistogram
+
+"""
+DeliveryTracker - Prove that posted messages reach the test window, and how fast.
+
+PostMessage succeeding only means the message was queued. The tracker follows
+each message to the other end: the emitter gives every successful post a sequence
+number and a timestamp, and the test window's window procedure reports every
+message it dispatches. Deliveries are matched back to posts to measure:
+    latency     Time from PostMessage to dispatch in the window procedure
+    reordering  Messages dispatched after a message that was posted later
+    loss        Messages still undelivered after loss_timeout seconds, or discarded
+                with a destroyed window
+    late        Messages dispatched after they had been counted as lost; they are
+                then counted as delivered instead
+    unmatched   Dispatched messages of a tracked type that match no post
+
+The sequence and timestamp are kept in a table on the posting side rather than in
+the message itself: lparam already carries the key flags and cursor coordinates the
+testers send, and posted messages have no other field to carry them. A dispatched
+message is matched to an undelivered post with the same message, wparam and lparam.
+Identical posts trailing the last delivery by more than REORDER_WINDOW posts are
+skipped as lost, so that one lost message does not shift the matching of every later
+identical one and no match is further out of order than the window. Of the rest, the
+newest post trailing the last delivery (arriving out of order) and the oldest later
+one (arriving in order after lost posts) are weighed, and the one that needs fewer
+messages to have moved or been lost is taken; the next post in order needs neither.
+Identical messages are interchangeable, so when a post passed over for an identical
+later one arrives next, the two are swapped back. Long runs of identical messages
+that were reordered, such as a repeated keystroke, can still be paired with a larger distance
+than they moved; the window does not see the difference either.
+"""
+
+# Default seconds after which an undelivered message counts as lost
+DEFAULT_LOSS_TIMEOUT = 5.0
+
+# Largest number of pending posts, and of posts counted as lost that can still arrive late
+MAX_PENDING = 100000
+
+# Largest number of later posts an identical undelivered post may trail the last delivery
+# by and still be taken as arriving out of order; older ones are taken as lost
+REORDER_WINDOW = 32
+
+
+class DeliveryTracker:
+    """
+    Match dispatched messages to posted ones and record loss, reordering and latency.
+
+    Attributes:
+        loss_timeout (float): Seconds after which an undelivered message counts as lost.
+        latency (LatencyHistogram): Post-to-dispatch latency of every delivered message.
+        posted (int): Messages posted while tracking.
+        delivered (int): Posted messages that were dispatched.
+        lost (int): Posted messages not dispatched within loss_timeout, or discarded.
+        late (int): Messages dispatched after they had been counted as lost.
+        reordered (int): Messages dispatched after a message posted later than them.
+        max_reorder_distance (int): Largest number of later messages dispatched before one.
+        unmatched (int): Dispatched messages of a tracked type that matched no post.
+        posted_by_type (Counter): Posted messages by message identifier.
+        delivered_by_type (Counter): Delivered messages by message identifier.
+    """
+
+    def __init__(self, loss_timeout=DEFAULT_LOSS_TIMEOUT):
+        """
+        Initialize the DeliveryTracker.
+
+        Args:
+            loss_timeout (float, optional): Seconds after which an undelivered message counts
+                as lost. Defaults to DEFAULT_LOSS_TIMEOUT.
+        """
+        self.loss_timeout = loss_timeout
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every post and start new counters, for a new run.
+        """
+        self.latency = LatencyHistogram()
+        self.posted = 0
+        self.delivered = 0
+        self.lost = 0
+        self.late = 0
+        self.reordered = 0
+        self.max_reorder_distance = 0
+        self.unmatched = 0
+        self.posted_by_type = Counter()
+        self.delivered_by_type = Counter()
+        self._next_sequence = 0
+        self._highest_delivered = -1
+        self._pending = OrderedDict()  # sequence -> (post time, message key), oldest first
+        self._expired = OrderedDict()  # the same for posts counted as lost, oldest first
+        self._by_message = {}  # message key -> deque of undelivered sequences, oldest first
+        self._in_order = {}  # message key -> (sequence, highest delivered before) of a post taken over a trailing one
+
+    @property
+    def in_flight(self):
+        """
+        Get the number of posted messages not yet delivered or counted as lost.
+
+        Returns:
+            int: The number of pending posts.
+        """
+        return len(self._pending)
+
+    def record_post(self, msg, wparam, lparam, timestamp=None):
+        """
+        Give a successfully posted message the next sequence number.
+
+        Args:
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+            timestamp (float, optional): time.perf_counter() when the message was posted.
+                Defaults to now.
+
+        Returns:
+            int: The message's sequence number.
+        """
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        key = (msg, wparam, lparam)
+        self._pending[sequence] = (time.perf_counter() if timestamp is None else timestamp, key)
+        undelivered = self._by_message.get(key)
+        if undelivered is None:
+            self._by_message[key] = undelivered = deque()
+        undelivered.append(sequence)
+        self.posted += 1
+        self.posted_by_type[msg] += 1
+        if len(self._pending) > MAX_PENDING:
+            self._expire_oldest()
+        return sequence
+
+    def match(self, msg, wparam, lparam, timestamp=None):
+        """
+        Match a dispatched message to its post.
+
+        Args:
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+            timestamp (float, optional): time.perf_counter() at dispatch. Defaults to now.
+
+        Returns:
+            bool: True if the message matched a post, False otherwise.
+        """
+        key = (msg, wparam, lparam)
+        undelivered = self._by_message.get(key)
+        if not undelivered:
+            return False
+
+        # An identical post trailing the last delivery by more than the window was lost
+        highest = self._highest_delivered
+        while undelivered and undelivered[0] < highest - REORDER_WINDOW:
+            self._skip(undelivered.popleft())
+
+        # One trailing within the window is either arriving out of order or was lost, and
+        # the first later one is either arriving in order after lost posts or still to come.
+        # Whichever needs fewer messages to have been lost or moved is taken, the trailing
+        # one on a tie; the next post in order needs none, so it always is.
+        trailing = 0
+        while trailing < len(undelivered) and undelivered[trailing] < highest:
+            trailing += 1
+        later = undelivered[trailing] if trailing < len(undelivered) else None
+        if later is not None and (not trailing or later - highest - 1 < highest - undelivered[trailing - 1]):
+            sequence = later
+            del undelivered[trailing]
+        elif trailing:
+            sequence = undelivered[trailing - 1]
+            del undelivered[trailing - 1]
+        else:
+            sequence = None
+        in_order = self._in_order.pop(key, None)
+        if not undelivered:
+            del self._by_message[key]
+        if sequence is None:
+            return False
+
+        if sequence in self._pending:
+            posted_at, _ = self._pending.pop(sequence)
+        else:
+            posted_at, _ = self._expired.pop(sequence)
+            self.lost -= 1
+            self.late += 1
+
+        now = time.perf_counter() if timestamp is None else timestamp
+        self.latency.record(max(0.0, now - posted_at))
+        self.delivered += 1
+        self.delivered_by_type[msg] += 1
+        if sequence > highest:
+            self._highest_delivered = sequence
+            if trailing:
+                # Remember which identical post was passed over, in case it arrives next
+                self._in_order[key] = (sequence, highest)
+            return True
+
+        self.reordered += 1
+        if in_order is not None and in_order[0] > sequence:
+            # Identical posts are interchangeable: the earlier delivery taken in order was this
+            # post arriving out of order, and this delivery is the one taken in order
+            passed, highest_then = in_order
+            distance = max(highest_then - sequence, highest - passed)
+        else:
+            distance = highest - sequence
+        self.max_reorder_distance = max(self.max_reorder_distance, distance)
+        return True
+
+    def record_unmatched(self, msg):
+        """
+        Count a dispatched message that matched no post, if it is of a tracked type.
+
+        Args:
+            msg (int): The message identifier.
+        """
+        if msg in self.posted_by_type:
+            self.unmatched += 1
+
+    def expire(self, now=None):
+        """
+        Count the posts older than loss_timeout as lost.
+
+        They can still be matched if they arrive later, and are then counted as late.
+
+        Args:
+            now (float, optional): time.perf_counter() to measure ages from. Defaults to now.
+
+        Returns:
+            int: Number of posts counted as lost.
+        """
+        deadline = (time.perf_counter() if now is None else now) - self.loss_timeout
+        expired = 0
+        while self._pending and self._pending[next(iter(self._pending))][0] <= deadline:
+            self._expire_oldest()
+            expired += 1
+        return expired
+
+    def discard_pending(self):
+        """
+        Count every pending post as lost, as when the window they were posted to is destroyed.
+
+        Returns:
+            int: Number of posts counted as lost.
+        """
+        discarded = len(self._pending)
+        self.lost += discarded
+        self._pending.clear()
+        self._expired.clear()
+        self._by_message.clear()
+        self._in_order.clear()
+        return discarded
+
+    def _skip(self, sequence):
+        """
+        Stop matching a post that another delivery showed was lost.
+
+        Args:
+            sequence (int): Sequence number of the post, already removed from its message's deque.
+        """
+        if sequence in self._pending:
+            del self._pending[sequence]
+            self.lost += 1
+        else:
+            del self._expired[sequence]
+
+    def _expire_oldest(self):
+        """
+        Count the oldest pending post as lost, keeping it matchable for a late arrival.
+        """
+        sequence, entry = self._pending.popitem(last=False)
+        self._expired[sequence] = entry
+        self.lost += 1
+        if len(self._expired) > MAX_PENDING:
+            # Too old to arrive: stop matching it
+            oldest, (_, key) = self._expired.popitem(last=False)
+            undelivered = self._by_message[key]
+            undelivered.remove(oldest)
+            if not undelivered:
+                del self._by_message[key]
+                self._in_order.pop(key, None)
+
+    def summary(self):
+        """
+        Summarize deliveries, first counting expired posts as lost.
+
+        Returns:
+            dict: Message counts, delivery ratio, reordering, latency in milliseconds and
+                posted and delivered counts by message name.
+        """
+        self.expire()
+        return {
+            "posted": self.posted,
+            "delivered": self.delivered,
+            "delivery_ratio": round(self.delivered / self.posted, 6) if self.posted else None,
+            "lost": self.lost,
+            "late": self.late,
+            "in_flight": self.in_flight,
+            "reordered": self.reordered,
+            "max_reorder_distance": self.max_reorder_distance,
+            "unmatched": self.unmatched,
+            "latency": self.latency.summary(),
+            "posted_by_type": {MESSAGE_NAMES.get(msg, hex(msg)): count for msg, count in self.posted_by_type.items()},
+            "delivered_by_type": {MESSAGE_NAMES.get(msg, hex(msg)): count
+                                  for msg, count in self.delivered_by_type.items()},
+        }
+
+    def brief(self):
+        """
+        Describe deliveries in one line, for the periodic log.
+
+        Returns:
+            str: Delivered, lost and reordered counts and latency percentiles.
+        """
+        self.expire()
+        return (f"{self.delivered}/{self.posted} delivered, {self.lost} lost, {self.late} late, "
+                f"{self.reordered} reordered, {self.in_flight} in flight, latency p50/p99 "
+                f"{self.latency.percentile(50) * 1000:.2f}/{self.latency.percentile(99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    """
+    Run a tester against the local queue stand-in and report what was delivered.
+
+    Example:
+        python delivery_tracker.py --kind keyboard --duration 10 --loss-rate 0.001 --reorder-rate 0.01
+    """
+    import argparse
+    import sys
+    import tempfile
+    from benchmark_suite import LocalQueueWin32gui, create_headless_tester, load_win32gui, sleeps_disabled
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Delivery tracking")
+    parser.add_argument("--kind", choices=("keyboard", "mouse"), default="keyboard", help="Tester to run")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run for")
+    parser.add_argument("--loss-rate", type=float, default=0.0, help="Probability that the stand-in loses a message")
+    parser.add_argument("--reorder-rate", type=float, default=0.0,
+                        help="Probability that the stand-in moves a message ahead of the one before it")
+    parser.add_argument("--service-rate", type=float, default=None,
+                        help="Messages per second the stand-in target handles (default: unlimited)")
+    parser.add_argument("--loss-timeout", type=float, default=1.0, help="Seconds before an undelivered message is lost")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the run and of the stand-in")
+    args = parser.parse_args()
+
+    stand_in = LocalQueueWin32gui(load_win32gui(), service_rate=args.service_rate,
+                                  loss_rate=args.loss_rate, reorder_rate=args.reorder_rate, seed=args.seed)
+    with tempfile.TemporaryDirectory() as directory, sleeps_disabled():
+        tester, _ = create_headless_tester("1.8", args.kind, stand_in, directory)
+        stand_in.window_proc = tester.window_proc
+        tester.config = dict(tester.config, delivery_tracking=True, delivery_loss_timeout=args.loss_timeout)
+        tester.prepare_run(seed=args.seed)
+        deadline = time.time() + args.duration
+        while time.time() < deadline:
+            tester.run_burst()
+        # Whatever the emptied queue did not deliver is gone, as when the window is destroyed
+        while stand_in.pending:
+            tester.process_messages()
+        tester.emitter.reset_queue()
+        summary = tester.finish_run()
+
+    delivery = summary["delivery"]
+    latency = delivery["latency"]
+    print(f"{tester.event_count} events, {delivery['posted']} messages posted, {delivery['delivered']} delivered "
+          f"(ratio {delivery['delivery_ratio']})")
+    print(f"Lost: {delivery['lost']} (stand-in lost {stand_in.lost}), late: {delivery['late']}; reordered: {delivery['reordered']} "
+          f"(stand-in moved {stand_in.reordered}), max distance {delivery['max_reorder_distance']} "
+          f"(stand-in {stand_in.max_reorder_distance}); "
+          f"unmatched: {delivery['unmatched']}")
+    print(f"Latency: p50 {latency.get('p50_ms', 0.0):.3f} ms, p99 {latency.get('p99_ms', 0.0):.3f} ms, "
+          f"max {latency.get('max_ms', 0.0):.3f} ms")
+    for name, count in delivery["posted_by_type"].items():
+        print(f"  {name:<18} {delivery['delivered_by_type'].get(name, 0):>8} of {count} delivered")
+
+    # A distance the stand-in never produced means deliveries were matched to the wrong posts
+    if delivery["max_reorder_distance"] > stand_in.max_reorder_distance:
+        print(f"FAILED: measured reorder distance {delivery['max_reorder_distance']} exceeds the "
+              f"{stand_in.max_reorder_distance} the stand-in produced")
+        sys.exit(1)
@@ -0,0 +1,500 @@
+# display_geometry.py
+import random
+import sys
+import time
+from collections import namedtuple
+from lazy_imports import lazy_import
+
+"""
+DisplayGeometry - Monitor layout of the virtual desktop, cached until the display changes.
+
+Windows places every monitor in one virtual-desktop coordinate space. The primary
+monitor's top-left corner is (0, 0), and monitors to its left or above it have
+negative coordinates. GetSystemMetrics(SM_CXSCREEN) only describes the primary
+monitor, so a mouse tester that relies on it never reaches the other screens. It
+also keeps stale bounds after a resolution change.
+
+A geometry provider enumerates the monitors once and caches their bounds and DPI,
+along with the virtual-desktop rectangle that encloses them. The cache is dropped
+by invalidate(), which the mouse tester calls on WM_DISPLAYCHANGE. The cache is
+also checked every check_interval seconds against a cheap fingerprint of the
+layout, in case the change message was missed.
+
+Positions are clamped against the monitor set rather than the enclosing
+rectangle, so a point in the gap between two monitors of different sizes moves to
+the nearest point of the nearest monitor, as the real cursor does. clamp_points()
+first compares a whole path's bounding box against each monitor; a path that stays
+on one monitor is returned as it is, and only paths that leave it are clamped point
+by point.
+
+Two providers are included:
+    Win32DisplayGeometry    EnumDisplayMonitors, GetMonitorInfo and GetDpiForMonitor
+    FakeDisplayGeometry     A fixed layout from the configuration, used on other
+                            platforms and by the headless benchmarks; set_layout()
+                            simulates a display change
+"""
+
+# Only loaded once the Windows layout is first queried
+win32api = lazy_import("win32api")
+ctypes = lazy_import("ctypes")
+
+# GetSystemMetrics indexes
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+SM_CMONITORS = 80
+
+# GetMonitorInfo flag of the primary monitor, and GetDpiForMonitor's effective DPI type
+MONITORINFOF_PRIMARY = 1
+MDT_EFFECTIVE_DPI = 0
+
+# DPI of a monitor at 100% scaling
+DEFAULT_DPI = 96
+
+# Messages sent to top-level windows when the display layout or a window's DPI changes
+WM_DISPLAYCHANGE = 0x007E
+WM_DPICHANGED = 0x02E0
+
+# Seconds between checks of the layout fingerprint
+DEFAULT_CHECK_INTERVAL = 2.0
+
+# Which monitors events are spread over
+MONITOR_SELECTIONS = ("all", "primary")
+
+# Layout of the fake provider when none is configured
+DEFAULT_FAKE_LAYOUT = ({"left": 0, "top": 0, "width": 1920, "height": 1080, "dpi": DEFAULT_DPI, "primary": True},)
+
+# One monitor; right and bottom are exclusive, as in a Windows RECT
+Monitor = namedtuple("Monitor", "left top right bottom dpi primary")
+
+
+def pack_point(x, y):
+    """
+    Pack a position into a mouse message's lparam, as MAKELPARAM does.
+
+    Coordinates are stored as signed 16-bit words, so positions on monitors left of
+    or above the primary monitor survive the round trip.
+
+    Args:
+        x (int): The x-coordinate.
+        y (int): The y-coordinate.
+
+    Returns:
+        int: The lparam value.
+    """
+    return (y & 0xFFFF) << 16 | (x & 0xFFFF)
+
+
+def monitors_from_layout(layout):
+    """
+    Build monitors from a configured layout.
+
+    Args:
+        layout (sequence): One dictionary per monitor, with "left", "top", "width" and
+            "height" in pixels, and optionally "dpi" and "primary". Without a primary
+            monitor the first one is primary.
+
+    Returns:
+        list: Monitor of each entry.
+    """
+    has_primary = any(entry.get("primary") for entry in layout)
+    monitors = []
+    for index, entry in enumerate(layout):
+        left, top = entry["left"], entry["top"]
+        primary = bool(entry.get("primary")) if has_primary else index == 0
+        monitors.append(Monitor(left, top, left + entry["width"], top + entry["height"],
+                                entry.get("dpi", DEFAULT_DPI), primary))
+    return monitors
+
+
+def check_layout(layout):
+    """
+    Check a configured layout.
+
+    Args:
+        layout (sequence): Monitor dictionaries, as for monitors_from_layout().
+
+    Returns:
+        list: One message per problem found.
+    """
+    problems = []
+    if not layout:
+        problems.append("display_layout must hold at least one monitor")
+    for index, entry in enumerate(layout):
+        values = [entry.get(name) for name in ("left", "top", "width", "height")]
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            problems.append(f"display_layout[{index}] needs whole-number left, top, width and height")
+        elif values[2] < 1 or values[3] < 1:
+            problems.append(f"display_layout[{index}] must have a positive width and height")
+        dpi = entry.get("dpi", DEFAULT_DPI)
+        if isinstance(dpi, bool) or not isinstance(dpi, (int, float)) or dpi <= 0:
+            problems.append(f"display_layout[{index}] dpi must be a positive number")
+    return problems
+
+
+class DisplayGeometry:
+    """
+    Cached monitor layout, with clamping and random positions over the chosen monitors.
+
+    Subclasses implement query() and, to detect changes without a message, signature().
+
+    Attributes:
+        selection (str): "all" to use every monitor, "primary" for the primary monitor only.
+        check_interval (float): Seconds between fingerprint checks, or 0 to rely on invalidate().
+        changes (int): Number of times the layout was found to have changed.
+    """
+
+    def __init__(self, selection="all", check_interval=DEFAULT_CHECK_INTERVAL):
+        """
+        Initialize the DisplayGeometry; the layout is queried when first needed.
+
+        Args:
+            selection (str, optional): "all" or "primary". Defaults to "all".
+            check_interval (float, optional): Seconds between fingerprint checks. Defaults to
+                DEFAULT_CHECK_INTERVAL.
+        """
+        self.selection = selection
+        self.check_interval = check_interval
+        self.changes = 0
+        self._all_monitors = None
+        self._monitors = None
+        self._virtual = None
+        self._weights = None
+        self._last = None
+        self._signature = None
+        self._checked_at = 0.0
+
+    def query(self):
+        """
+        Enumerate the monitors.
+
+        Returns:
+            list: Monitor of each display, in any order.
+        """
+        raise NotImplementedError("Subclasses must implement query()")
+
+    def signature(self):
+        """
+        Get a cheap fingerprint of the layout, which changes when the layout does.
+
+        Returns:
+            object: The fingerprint; None if changes are only reported through invalidate().
+        """
+        return None
+
+    def invalidate(self):
+        """
+        Drop the cached layout, so that it is queried again when next needed.
+        """
+        self._monitors = None
+
+    def refresh(self):
+        """
+        Query the layout now and rebuild the cache.
+
+        Returns:
+            list: The monitors in use.
+        """
+        previous = self._all_monitors
+        # Primary monitor first, the others from left to right and top to bottom
+        monitors = sorted(self.query(), key=lambda monitor: (not monitor.primary, monitor.left, monitor.top))
+        self._all_monitors = monitors
+        self._monitors = [monitors[0]] if self.selection == "primary" else monitors
+        self._virtual = (min(monitor.left for monitor in monitors), min(monitor.top for monitor in monitors),
+                         max(monitor.right for monitor in monitors), max(monitor.bottom for monitor in monitors))
+        # Monitors are picked in proportion to their area
+        self._weights = [(monitor.right - monitor.left) * (monitor.bottom - monitor.top) for monitor in self._monitors]
+        self._last = self._monitors[0]
+        self._signature = self.signature()
+        self._checked_at = time.monotonic()
+        if previous is not None and previous != monitors:
+            self.changes += 1
+        return self._monitors
+
+    def _layout(self):
+        """
+        Get the monitors in use, refreshing the cache if it was dropped or is out of date.
+
+        Returns:
+            list: The monitors in use.
+        """
+        if self._monitors is None:
+            return self.refresh()
+        if self.check_interval:
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                if self.signature() != self._signature:
+                    return self.refresh()
+        return self._monitors
+
+    @property
+    def monitors(self):
+        """
+        list: The monitors in use, primary first.
+        """
+        return list(self._layout())
+
+    @property
+    def virtual_rect(self):
+        """
+        tuple: (left, top, right, bottom) of the virtual desktop, enclosing every monitor.
+        """
+        self._layout()
+        return self._virtual
+
+    @property
+    def primary(self):
+        """
+        Monitor: The primary monitor.
+        """
+        self._layout()
+        return self._all_monitors[0]
+
+    def monitor_at(self, x, y):
+        """
+        Find the monitor in use that contains a position.
+
+        Args:
+            x (int): The x-coordinate.
+            y (int): The y-coordinate.
+
+        Returns:
+            Monitor: The monitor, or None if the position is on none of them.
+        """
+        monitors = self._layout()
+        last = self._last
+        if last.left <= x < last.right and last.top <= y < last.bottom:
+            return last
+        for monitor in monitors:
+            if monitor.left <= x < monitor.right and monitor.top <= y < monitor.bottom:
+                self._last = monitor
+                return monitor
+        return None
+
+    def nearest_monitor(self, x, y):
+        """
+        Find the monitor in use that contains a position or is closest to it.
+
+        Args:
+            x (int): The x-coordinate.
+            y (int): The y-coordinate.
+
+        Returns:
+            Monitor: The monitor.
+        """
+        monitor = self.monitor_at(x, y)
+        if monitor is not None:
+            return monitor
+        best, best_distance = None, None
+        for candidate in self._monitors:
+            dx = max(candidate.left - x, 0, x - candidate.right + 1)
+            dy = max(candidate.top - y, 0, y - candidate.bottom + 1)
+            distance = dx * dx + dy * dy
+            if best is None or distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def clamp(self, x, y):
+        """
+        Move a position onto the nearest monitor in use.
+
+        Args:
+            x (int): The x-coordinate.
+            y (int): The y-coordinate.
+
+        Returns:
+            tuple: (x, y), unchanged if the position is on a monitor.
+        """
+        monitor = self.nearest_monitor(x, y)
+        return (min(max(x, monitor.left), monitor.right - 1), min(max(y, monitor.top), monitor.bottom - 1))
+
+    def clamp_points(self, points):
+        """
+        Move every position of a path onto the monitors in use.
+
+        Args:
+            points (list): (x, y) positions.
+
+        Returns:
+            list: The positions; the same list if the whole path is on one monitor.
+        """
+        if not points:
+            return points
+        xs, ys = zip(*points)
+        left, right, top, bottom = min(xs), max(xs), min(ys), max(ys)
+        for monitor in self._layout():
+            if monitor.left <= left and right < monitor.right and monitor.top <= top and bottom < monitor.bottom:
+                return points
+        clamp = self.clamp
+        return [clamp(x, y) for x, y in points]
+
+    def random_monitor(self):
+        """
+        Pick a monitor in use, in proportion to its area.
+
+        Returns:
+            Monitor: The monitor.
+        """
+        monitors = self._layout()
+        if len(monitors) == 1:
+            return monitors[0]
+        return random.choices(monitors, weights=self._weights, k=1)[0]
+
+    def random_point(self):
+        """
+        Pick a position uniformly over the monitors in use.
+
+        Returns:
+            tuple: (x, y).
+        """
+        monitor = self.random_monitor()
+        return random.randrange(monitor.left, monitor.right), random.randrange(monitor.top, monitor.bottom)
+
+    def describe(self):
+        """
+        Describe the layout in one line, for the log.
+
+        Returns:
+            str: Virtual-desktop size and each monitor's bounds and DPI.
+        """
+        monitors = self._layout()
+        left, top, right, bottom = self._virtual
+        parts = [f"{monitor.right - monitor.left}x{monitor.bottom - monitor.top} at ({monitor.left}, {monitor.top}) "
+                 f"{monitor.dpi} dpi{' (primary)' if monitor.primary else ''}" for monitor in self._all_monitors]
+        return (f"virtual desktop {right - left}x{bottom - top} at ({left}, {top}), "
+                f"{len(monitors)} of {len(self._all_monitors)} monitors in use: {'; '.join(parts)}")
+
+
+class Win32DisplayGeometry(DisplayGeometry):
+    """
+    Monitor layout read from Windows.
+    """
+
+    def query(self):
+        """
+        Enumerate the monitors with EnumDisplayMonitors and GetMonitorInfo.
+
+        Falls back to the primary monitor's size from GetSystemMetrics if enumeration fails.
+
+        Returns:
+            list: Monitor of each display.
+        """
+        monitors = []
+        try:
+            for handle, _, _ in win32api.EnumDisplayMonitors(None, None):
+                info = win32api.GetMonitorInfo(handle)
+                left, top, right, bottom = info["Monitor"]
+                monitors.append(Monitor(left, top, right, bottom, self.monitor_dpi(handle),
+                                        bool(info["Flags"] & MONITORINFOF_PRIMARY)))
+        except Exception:
+            monitors = []
+        if not monitors:
+            monitors = [Monitor(0, 0, win32api.GetSystemMetrics(SM_CXSCREEN), win32api.GetSystemMetrics(SM_CYSCREEN),
+                                DEFAULT_DPI, True)]
+        return monitors
+
+    def signature(self):
+        """
+        Get the monitor count and the virtual-desktop and primary-monitor sizes.
+
+        Returns:
+            tuple: The system metrics.
+        """
+        return tuple(win32api.GetSystemMetrics(index) for index in (
+            SM_CMONITORS, SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN,
+            SM_CXSCREEN, SM_CYSCREEN))
+
+    @staticmethod
+    def monitor_dpi(handle):
+        """
+        Get a monitor's effective DPI.
+
+        Args:
+            handle (PyHANDLE): The monitor handle.
+
+        Returns:
+            int: The horizontal DPI, or DEFAULT_DPI before Windows 8.1 or on error.
+        """
+        try:
+            dpi_x, dpi_y = ctypes.c_uint(), ctypes.c_uint()
+            result = ctypes.windll.shcore.GetDpiForMonitor(
+                ctypes.c_void_p(int(handle)), MDT_EFFECTIVE_DPI, ctypes.byref(dpi_x), ctypes.byref(dpi_y))
+            return dpi_x.value if result == 0 and dpi_x.value else DEFAULT_DPI
+        except Exception:
+            return DEFAULT_DPI
+
+
+class FakeDisplayGeometry(DisplayGeometry):
+    """
+    A fixed monitor layout, for platforms without a Windows desktop and for headless runs.
+    """
+
+    def __init__(self, layout=DEFAULT_FAKE_LAYOUT, selection="all", check_interval=DEFAULT_CHECK_INTERVAL):
+        """
+        Initialize the FakeDisplayGeometry.
+
+        Args:
+            layout (sequence, optional): Monitor dictionaries, as for monitors_from_layout().
+                Defaults to DEFAULT_FAKE_LAYOUT.
+            selection (str, optional): "all" or "primary". Defaults to "all".
+            check_interval (float, optional): Seconds between fingerprint checks. Defaults to
+                DEFAULT_CHECK_INTERVAL.
+        """
+        super().__init__(selection, check_interval)
+        self.layout = list(layout)
+        self._generation = 0
+
+    def set_layout(self, layout):
+        """
+        Replace the layout, as a display change would.
+
+        The cache is not dropped, so the change is found by the next fingerprint check or
+        invalidate(), as on Windows.
+
+        Args:
+            layout (sequence): Monitor dictionaries, as for monitors_from_layout().
+        """
+        self.layout = list(layout)
+        self._generation += 1
+
+    def query(self):
+        """
+        Build the monitors of the layout.
+
+        Returns:
+            list: Monitor of each entry.
+        """
+        return monitors_from_layout(self.layout)
+
+    def signature(self):
+        """
+        Get the number of layout changes.
+
+        Returns:
+            int: The layout generation.
+        """
+        return self._generation
+
+
+def create_display_geometry(config):
+    """
+    Create the geometry provider for a tester configuration.
+
+    Args:
+        config (dict): Configuration parameters; "display_layout", "display_monitors" and
+            "display_check_interval" are used.
+
+    Returns:
+        DisplayGeometry: A FakeDisplayGeometry if a layout is configured or the platform
+            is not Windows, a Win32DisplayGeometry otherwise.
+    """
+    selection = config.get("display_monitors", "all")
+    check_interval = config.get("display_check_interval", DEFAULT_CHECK_INTERVAL)
+    layout = config.get("display_layout")
+    if layout or sys.platform != "win32":
+        return FakeDisplayGeometry(layout or DEFAULT_FAKE_LAYOUT, selection, check_interval)
+    return Win32DisplayGeometry(selection, check_interval)
@@ -0,0 +1,333 @@
+# event_bus.py
+import atexit
+import struct
+import sys
+import time
+from collections import namedtuple
+from lazy_imports import lazy_import
+
+"""
+EventBus - Shared-memory ring buffer of emitted input messages.
+
+Every message a tester posts (or drops, or coalesces) can be published into a ring
+buffer in multiprocessing.shared_memory, so that monitoring, assertion and
+visualization processes can follow the live stream without parsing log files and
+without adding work to the testing thread.
+
+The ring has a single producer and any number of readers, and uses no locks. Each
+record has a fixed size. The producer writes a record into its slot and then
+advances the shared write sequence; readers copy records straight out of the shared
+buffer and use the write sequence to detect records that were overwritten before
+they were read. Publishing costs two struct.pack_into calls and never blocks, so a
+slow or missing reader has no effect on the emitter.
+
+Layout of the shared block:
+    header: magic (8s), version (I), capacity (I), record size (I), reserved (I), write sequence (Q)
+    records: capacity x (sequence (Q), time (d), source (H), status (H), msg (I), wparam (q), lparam (q))
+"""
+
+# Only loaded when a bus is created or attached
+shared_memory = lazy_import("multiprocessing.shared_memory")
+
+MAGIC = b"SKTBUS01"
+VERSION = 1
+
+HEADER = struct.Struct("<8sIIIIQ")
+WRITE_SEQUENCE_OFFSET = 24
+WRITE_SEQUENCE = struct.Struct("<Q")
+RECORD = struct.Struct("<QdHHIqq")
+
+# Status of a published message (same meanings as the MessageEmitter results)
+STATUS_POSTED = 0
+STATUS_DROPPED = 1
+STATUS_COALESCED = 2
+STATUS_NAMES = {STATUS_POSTED: "posted", STATUS_DROPPED: "dropped", STATUS_COALESCED: "coalesced"}
+
+# Default number of records in the ring
+DEFAULT_CAPACITY = 65536
+
+# Names of the messages the testers post, for display
+MESSAGE_NAMES = {
+    0x0100: "WM_KEYDOWN", 0x0101: "WM_KEYUP", 0x0102: "WM_CHAR",
+    0x0200: "WM_MOUSEMOVE", 0x0201: "WM_LBUTTONDOWN", 0x0202: "WM_LBUTTONUP",
+    0x0203: "WM_LBUTTONDBLCLK", 0x0204: "WM_RBUTTONDOWN", 0x0205: "WM_RBUTTONUP",
+    0x0207: "WM_MBUTTONDOWN", 0x0208: "WM_MBUTTONUP", 0x020A: "WM_MOUSEWHEEL",
+}
+
+BusEvent = namedtuple("BusEvent", "sequence time source status msg wparam lparam")
+
+
+def _open_shared_memory(name):
+    """
+    Attach to an existing shared memory block without taking ownership of it.
+
+    On POSIX, Python's resource tracker would otherwise unlink the block when the
+    reader exits, destroying it for the producer and every other reader.
+
+    Args:
+        name (str): Name of the block.
+
+    Returns:
+        SharedMemory: The attached block.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(block._name, "shared_memory")
+    except Exception:
+        pass
+    return block
+
+
+class EventBusWriter:
+    """
+    Producer end of the ring buffer.
+
+    Only one thread may publish to a given bus.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        capacity (int): Number of record slots (a power of two).
+        source (int): Identifier stored in every record, to tell producers apart.
+        published (int): Number of records published.
+    """
+
+    def __init__(self, name=None, capacity=DEFAULT_CAPACITY, source=0):
+        """
+        Create the shared memory block.
+
+        Args:
+            name (str, optional): Name of the block. Defaults to a generated name.
+            capacity (int, optional): Minimum number of record slots; rounded up to a power
+                of two. Defaults to 65536.
+            source (int, optional): Producer identifier (0-65535). Defaults to 0.
+        """
+        capacity = 1 << max(1, int(capacity) - 1).bit_length()
+        self._block = shared_memory.SharedMemory(name=name, create=True,
+                                                 size=HEADER.size + capacity * RECORD.size)
+        self.name = self._block.name
+        self.capacity = capacity
+        self.source = source & 0xFFFF
+        self.published = 0
+
+        self._buffer = self._block.buf
+        self._mask = capacity - 1
+        HEADER.pack_into(self._buffer, 0, MAGIC, VERSION, capacity, RECORD.size, 0, 0)
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, event_bus):
+        """
+        Create a writer from the "event_bus" configuration value.
+
+        Args:
+            event_bus (dict or str): A dict with optional "name", "capacity" and "source"
+                keys, or just the name.
+
+        Returns:
+            EventBusWriter: The writer.
+        """
+        if isinstance(event_bus, str):
+            event_bus = {"name": event_bus}
+        return cls(
+            name=event_bus.get("name"),
+            capacity=event_bus.get("capacity", DEFAULT_CAPACITY),
+            source=event_bus.get("source", 0),
+        )
+
+    def publish(self, msg, wparam, lparam, status=STATUS_POSTED):
+        """
+        Publish one message.
+
+        Args:
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+            status (int, optional): STATUS_POSTED, STATUS_DROPPED or STATUS_COALESCED.
+        """
+        sequence = self.published
+        RECORD.pack_into(self._buffer, HEADER.size + (sequence & self._mask) * RECORD.size,
+                         sequence, time.time(), self.source, status, msg, wparam, lparam)
+        self.published = sequence + 1
+        # Advancing the write sequence makes the record visible to readers
+        WRITE_SEQUENCE.pack_into(self._buffer, WRITE_SEQUENCE_OFFSET, sequence + 1)
+
+    def close(self):
+        """
+        Release and remove the shared memory block.
+
+        Readers that are still attached keep their mapping until they close it.
+        """
+        if self._block is None:
+            return
+        self._buffer = None
+        self._block.close()
+        try:
+            self._block.unlink()
+        except FileNotFoundError:
+            pass
+        self._block = None
+        atexit.unregister(self.close)
+
+
+class EventBusReader:
+    """
+    Consumer end of the ring buffer.
+
+    Any number of readers can follow the same bus. A reader that falls more than
+    one ring behind skips ahead and counts the records it missed.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        capacity (int): Number of record slots.
+        next_sequence (int): Sequence number of the next record to read.
+        lost (int): Records that were overwritten before this reader got to them.
+    """
+
+    def __init__(self, name, from_start=False):
+        """
+        Attach to a bus.
+
+        Args:
+            name (str): Name of the shared memory block.
+            from_start (bool, optional): Read the records still in the ring instead of
+                only new ones. Defaults to False.
+
+        Raises:
+            ValueError: If the block is not an event bus of a supported version.
+        """
+        self._block = _open_shared_memory(name)
+        self._buffer = self._block.buf
+        magic, version, capacity, record_size, _, write_sequence = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{name} is not a version {VERSION} event bus")
+
+        self.name = name
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self.lost = 0
+        self.next_sequence = max(0, write_sequence - capacity) if from_start else write_sequence
+
+    def write_sequence(self):
+        """
+        Get the number of records published so far.
+
+        Returns:
+            int: The producer's write sequence.
+        """
+        return WRITE_SEQUENCE.unpack_from(self._buffer, WRITE_SEQUENCE_OFFSET)[0]
+
+    def poll(self, max_records=None):
+        """
+        Read the records published since the last call.
+
+        Args:
+            max_records (int, optional): Largest number of records to return. Defaults to all.
+
+        Returns:
+            list: BusEvent records in publication order.
+        """
+        available = self.write_sequence()
+        if available - self.next_sequence > self.capacity:
+            self.lost += available - self.capacity - self.next_sequence
+            self.next_sequence = available - self.capacity
+        end = available if max_records is None else min(available, self.next_sequence + max_records)
+
+        events = []
+        buffer, mask = self._buffer, self._mask
+        for sequence in range(self.next_sequence, end):
+            events.append(BusEvent._make(RECORD.unpack_from(buffer, HEADER.size + (sequence & mask) * RECORD.size)))
+
+        # Records the producer may have overwritten while they were copied are discarded
+        overwritten_before = self.write_sequence() - self.capacity
+        if overwritten_before > self.next_sequence:
+            valid = [event for event in events if event.sequence >= overwritten_before]
+            self.lost += len(events) - len(valid)
+            events = valid
+        self.next_sequence = end
+        return events
+
+    def follow(self, interval=0.05, stop=None):
+        """
+        Yield records as they are published.
+
+        Args:
+            interval (float, optional): Seconds to sleep when no records are waiting. Defaults to 0.05.
+            stop (threading.Event, optional): Ends the iteration when set. Defaults to never.
+
+        Yields:
+            BusEvent: The next record.
+        """
+        while stop is None or not stop.is_set():
+            events = self.poll()
+            if not events:
+                time.sleep(interval)
+                continue
+            yield from events
+
+    def close(self):
+        """
+        Detach from the bus.
+        """
+        if self._block is None:
+            return
+        self._buffer = None
+        self._block.close()
+        self._block = None
+
+
+def describe(event):
+    """
+    Format a record for display.
+
+    Args:
+        event (BusEvent): The record.
+
+    Returns:
+        str: One line describing the record.
+    """
+    name = MESSAGE_NAMES.get(event.msg, f"0x{event.msg:04X}")
+    status = STATUS_NAMES.get(event.status, str(event.status))
+    stamp = time.strftime("%H:%M:%S", time.localtime(event.time)) + f".{int(event.time * 1000) % 1000:03d}"
+    return (f"{stamp} #{event.sequence} source {event.source} {name} wparam={event.wparam} "
+            f"lparam={event.lparam} {status}")
+
+
+if __name__ == "__main__":
+    """
+    Follow an event bus from the command line.
+
+    Example:
+        python event_bus.py skt-events
+        python event_bus.py skt-events --stats
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Follow a tester event bus")
+    parser.add_argument("name", help="Name of the event bus (the \"name\" of the tester's event_bus setting)")
+    parser.add_argument("--from-start", action="store_true", help="Show the records still in the ring first")
+    parser.add_argument("--stats", action="store_true", help="Print message rates once per second instead of records")
+    args = parser.parse_args()
+
+    reader = EventBusReader(args.name, from_start=args.from_start)
+    try:
+        if args.stats:
+            while True:
+                time.sleep(1.0)
+                events = reader.poll()
+                counts = {}
+                for event in events:
+                    key = MESSAGE_NAMES.get(event.msg, f"0x{event.msg:04X}")
+                    counts[key] = counts.get(key, 0) + 1
+                print(f"{len(events)} messages/s, lost {reader.lost}: {counts}")
+        else:
+            for event in reader.follow():
+                print(describe(event))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
@@ -0,0 +1,659 @@
+# fleet_runner.py
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+import psutil
+from run_metrics import LatencyHistogram
+
+"""
+Fleet runner - shard keyboard and mouse testers across worker processes.
+
+One tester process only uses one core, and the testers' own pacing and emit work
+competes with everything else in that process. The fleet runner starts a set of
+worker processes, sized to the available cores and optionally pinned to one core
+each, and spreads the requested testers over them. A worker that receives more
+than one tester runs them in a MultiTesterRuntime.
+
+Every worker gets its own seed and streams snapshots of its counters and latency
+histograms back to the runner over a multiprocessing queue. The runner merges them
+into a live view (total event rate, emit latency and timing error percentiles,
+drops, host CPU) and, when the workers finish, into one fleet summary.
+"""
+
+# Seconds between worker snapshots and live-view lines
+DEFAULT_REPORT_INTERVAL = 5.0
+
+# Host CPU usage (percent) at or above which a sample counts as saturated
+CPU_SATURATION_PERCENT = 90.0
+
+# Emit counters that are summed across testers and workers
+EMIT_COUNTERS = ("posted", "dropped", "failures", "coalesced", "deferred_posted", "saturation_events")
+
+
+def plan_workers(testers, workers=None, seed=None, affinity=False):
+    """
+    Spread tester assignments over worker processes.
+
+    Testers are dealt to workers in turn, so keyboard and mouse testers are mixed
+    evenly. Each worker gets a distinct seed derived from the fleet seed.
+
+    Args:
+        testers (list): (kind, config file) pairs, where kind is "keyboard" or "mouse".
+        workers (int, optional): Number of worker processes. Defaults to the number of
+            usable cores, and is never more than the number of testers.
+        seed (int, optional): Fleet seed. Defaults to a random seed.
+        affinity (bool, optional): Whether to pin each worker to one core. Defaults to False.
+
+    Returns:
+        tuple: (fleet seed, list of worker specifications).
+    """
+    cores = available_cores()
+    workers = max(1, min(len(testers), workers or len(cores)))
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), "big")
+
+    specs = []
+    for index in range(workers):
+        specs.append({
+            "worker": index,
+            "seed": (seed + index) % 2 ** 32,
+            "cpu": cores[index % len(cores)] if affinity else None,
+            "testers": [],
+        })
+    for index, assignment in enumerate(testers):
+        specs[index % workers]["testers"].append(assignment)
+    return seed, specs
+
+
+def available_cores():
+    """
+    Get the cores this process may run on.
+
+    Returns:
+        list: Core numbers.
+    """
+    try:
+        return sorted(psutil.Process().cpu_affinity())
+    except (AttributeError, NotImplementedError, psutil.Error):
+        return list(range(os.cpu_count() or 1))
+
+
+def snapshot_testers(testers, process):
+    """
+    Collect the counters and histograms of the testers in a worker.
+
+    Args:
+        testers (list): Testers run by the worker.
+        process (psutil.Process): The worker process.
+
+    Returns:
+        dict: Snapshot that can be sent to the fleet runner.
+    """
+    by_type = {}
+    emit = dict.fromkeys(EMIT_COUNTERS, 0)
+    timing_error = LatencyHistogram()
+    emit_latency = LatencyHistogram()
+    for tester in testers:
+        for event_type, count in tester.metrics.events_by_type.items():
+            by_type[event_type] = by_type.get(event_type, 0) + count
+        stats = tester.emitter.stats()
+        for counter in EMIT_COUNTERS:
+            emit[counter] += stats.get(counter, 0)
+        timing_error.merge(tester.metrics.timing_error)
+        emit_latency.merge(tester.metrics.emit_latency)
+
+    try:
+        cpu_percent = process.cpu_percent(interval=None)
+        rss_mb = process.memory_info().rss / (1024 * 1024)
+    except psutil.Error:
+        cpu_percent, rss_mb = 0.0, 0.0
+
+    return {
+        "time": time.time(),
+        "events": sum(tester.event_count for tester in testers),
+        "bursts": sum(tester.burst_count for tester in testers),
+        "by_type": by_type,
+        "emit": emit,
+        "timing_error": timing_error.to_dict(),
+        "emit_latency": emit_latency.to_dict(),
+        "cpu_percent": round(cpu_percent, 1),
+        "rss_mb": round(rss_mb, 2),
+    }
+
+
+def merge_snapshots(snapshots):
+    """
+    Merge worker snapshots.
+
+    Args:
+        snapshots (iterable): Snapshots from snapshot_testers().
+
+    Returns:
+        dict: Total events and bursts, events by type, summed emit counters and
+            merged timing-error and emit-latency histograms.
+    """
+    merged = {
+        "events": 0,
+        "bursts": 0,
+        "by_type": {},
+        "emit": dict.fromkeys(EMIT_COUNTERS, 0),
+        "timing_error": LatencyHistogram(),
+        "emit_latency": LatencyHistogram(),
+    }
+    for snapshot in snapshots:
+        merged["events"] += snapshot["events"]
+        merged["bursts"] += snapshot["bursts"]
+        for event_type, count in snapshot["by_type"].items():
+            merged["by_type"][event_type] = merged["by_type"].get(event_type, 0) + count
+        for counter in EMIT_COUNTERS:
+            merged["emit"][counter] += snapshot["emit"].get(counter, 0)
+        merged["timing_error"].merge(LatencyHistogram.from_dict(snapshot["timing_error"]))
+        merged["emit_latency"].merge(LatencyHistogram.from_dict(snapshot["emit_latency"]))
+    return merged
+
+
+def create_testers(assignments):
+    """
+    Create the testers of a worker.
+
+    Args:
+        assignments (list): (kind, config file) pairs, where kind is "keyboard" or "mouse".
+
+    Returns:
+        list: Tester instances.
+    """
+    from tester_runtime import load_tester_class, TESTER_SCRIPTS
+
+    testers = []
+    for kind, config_file in assignments:
+        script, class_name = TESTER_SCRIPTS[kind]
+        tester_class = load_tester_class(script, class_name)
+        testers.append(tester_class(config_file if config_file and os.path.exists(config_file) else None))
+    return testers
+
+
+def create_runner(testers):
+    """
+    Get functions that run and stop a worker's testers.
+
+    A single tester runs through its own start_testing(); several testers share a
+    MultiTesterRuntime.
+
+    Args:
+        testers (list): Tester instances.
+
+    Returns:
+        tuple: (start function taking run bounds and a seed, stop function taking a stop reason).
+    """
+    from tester_runtime import MultiTesterRuntime
+
+    if len(testers) == 1:
+        tester = testers[0]
+
+        def stop_tester(reason):
+            """
+            Stop the tester, recording the reason unless it already stopped.
+            """
+            tester.stop_reason = tester.stop_reason or reason
+            tester.stop_testing()
+
+        return tester.start_testing, stop_tester
+
+    runtime = MultiTesterRuntime(testers)
+
+    def stop_runtime(reason):
+        """
+        Stop the runtime, recording the reason unless it already stopped.
+        """
+        runtime.stop_reason = runtime.stop_reason or reason
+        runtime.stop()
+
+    return runtime.start, stop_runtime
+
+
+def run_worker(spec, reports, stop_event, bounds, report_interval=DEFAULT_REPORT_INTERVAL):
+    """
+    Run the testers of one worker process and report back to the fleet runner.
+
+    Sends ("snapshot", worker, snapshot) messages every report_interval seconds, then
+    ("final", worker, snapshot, summary) when the testers finish, or ("error", worker,
+    message) if they could not run.
+
+    Args:
+        spec (dict): Worker specification from plan_workers().
+        reports (multiprocessing.Queue): Queue to the fleet runner.
+        stop_event (multiprocessing.Event): Set by the runner to stop every worker.
+        bounds (dict): max_events, max_duration and max_bursts for each worker.
+        report_interval (float, optional): Seconds between snapshots.
+    """
+    worker_id = spec["worker"]
+    process = psutil.Process(os.getpid())
+    if spec.get("cpu") is not None:
+        try:
+            process.cpu_affinity([spec["cpu"]])
+        except (AttributeError, NotImplementedError, psutil.Error) as e:
+            logging.warning(f"Worker {worker_id}: could not pin to CPU {spec['cpu']}: {e}")
+
+    try:
+        testers = create_testers(spec["testers"])
+    except Exception as e:
+        reports.put(("error", worker_id, f"{type(e).__name__}: {e}"))
+        return
+
+    start, stop_runner = create_runner(testers)
+
+    done = threading.Event()
+
+    def report_loop():
+        """
+        Send snapshots to the runner and watch for the fleet stop signal.
+        """
+        process.cpu_percent(interval=None)
+        next_report = time.time() + report_interval
+        while not done.wait(0.1):
+            if stop_event.is_set():
+                stop_runner("fleet_stop")
+            if time.time() >= next_report:
+                reports.put(("snapshot", worker_id, snapshot_testers(testers, process)))
+                next_report += report_interval
+
+    reporter = threading.Thread(target=report_loop)
+    reporter.daemon = True
+    reporter.start()
+
+    summary = None
+    try:
+        summary = start(
+            max_events=bounds.get("max_events"),
+            max_duration=bounds.get("max_duration"),
+            max_bursts=bounds.get("max_bursts"),
+            seed=spec["seed"],
+        )
+    except Exception as e:
+        reports.put(("error", worker_id, f"{type(e).__name__}: {e}"))
+    finally:
+        done.set()
+        reporter.join(timeout=1.0)
+
+    reports.put(("final", worker_id, snapshot_testers(testers, process), summary))
+
+
+class FleetRunner:
+    """
+    Start tester workers, merge their live counters and build the fleet summary.
+
+    Attributes:
+        specs (list): Worker specifications.
+        seed (int): Fleet seed; worker seeds are derived from it.
+        bounds (dict): Run bounds applied to each worker.
+        report_interval (float): Seconds between snapshots and live-view lines.
+        snapshots (dict): Latest snapshot per worker.
+        finals (dict): Final (snapshot, summary) per finished worker.
+        errors (dict): Error message per failed worker.
+        host_cpu (list): (elapsed seconds, host CPU percent, busiest core percent) samples.
+        stop_reason (str): Why the fleet stopped ("completed", "interrupted" or "stopped").
+    """
+
+    def __init__(self, testers, workers=None, seed=None, affinity=False,
+                 max_events=None, max_duration=None, max_bursts=None,
+                 report_interval=DEFAULT_REPORT_INTERVAL):
+        """
+        Initialize the FleetRunner.
+
+        Args:
+            testers (list): (kind, config file) pairs, where kind is "keyboard" or "mouse".
+            workers (int, optional): Number of worker processes. Defaults to the number of cores.
+            seed (int, optional): Fleet seed. Defaults to a random seed.
+            affinity (bool, optional): Pin each worker to one core. Defaults to False.
+            max_events (int, optional): Stop each worker after this many events.
+            max_duration (float, optional): Stop each worker after this many seconds.
+            max_bursts (int, optional): Stop each worker after this many bursts.
+            report_interval (float, optional): Seconds between snapshots. Defaults to 5.
+
+        Raises:
+            ValueError: If no testers are given.
+        """
+        if not testers:
+            raise ValueError("FleetRunner needs at least one tester")
+        self.seed, self.specs = plan_workers(testers, workers, seed, affinity)
+        self.bounds = {"max_events": max_events, "max_duration": max_duration, "max_bursts": max_bursts}
+        self.report_interval = report_interval
+
+        self.snapshots = {}
+        self.finals = {}
+        self.errors = {}
+        self.host_cpu = []
+        self.stop_reason = None
+
+        self._context = multiprocessing.get_context()
+        self._stop_event = self._context.Event()
+        self._processes = []
+
+    @property
+    def logger(self):
+        """
+        Get the logger instance.
+
+        Returns:
+            logging.Logger: The logger instance.
+        """
+        return logging.getLogger()
+
+    def stop(self):
+        """
+        Ask every worker to stop.
+        """
+        self._stop_event.set()
+
+    def run(self, summary_file=None):
+        """
+        Run the fleet until every worker has finished.
+
+        Args:
+            summary_file (str, optional): Path of the JSON fleet summary, or None to not write one.
+
+        Returns:
+            dict: Fleet summary.
+        """
+        reports = self._context.Queue()
+        started_at = datetime.now()
+        start_time = time.time()
+
+        tester_count = sum(len(spec["testers"]) for spec in self.specs)
+        self.logger.info(f"Starting fleet: {tester_count} testers on {len(self.specs)} workers (seed {self.seed})")
+        for spec in self.specs:
+            process = self._context.Process(
+                target=run_worker,
+                args=(spec, reports, self._stop_event, self.bounds, self.report_interval),
+                name=f"tester-worker-{spec['worker']}",
+            )
+            process.daemon = True
+            process.start()
+            self._processes.append(process)
+            pinned = f" pinned to CPU {spec['cpu']}" if spec["cpu"] is not None else ""
+            self.logger.info(f"Worker {spec['worker']} (pid {process.pid}){pinned}: "
+                             f"{[kind for kind, _ in spec['testers']]}, seed {spec['seed']}")
+
+        psutil.cpu_percent(interval=None, percpu=True)
+        last_view = (start_time, 0)
+        next_view = start_time + self.report_interval
+        try:
+            while len(self.finals) + len(self.errors) < len(self.specs):
+                try:
+                    self.handle_report(reports.get(timeout=min(1.0, self.report_interval)))
+                except queue.Empty:
+                    if not any(process.is_alive() for process in self._processes):
+                        break
+
+                if time.time() >= next_view:
+                    last_view = self.log_live_view(start_time, last_view)
+                    next_view += self.report_interval
+        except KeyboardInterrupt:
+            self.stop_reason = "interrupted"
+            self.stop()
+            self.drain_reports(reports)
+        finally:
+            for process in self._processes:
+                process.join(timeout=5.0)
+                if process.is_alive():
+                    process.terminate()
+
+        if self.stop_reason is None:
+            self.stop_reason = "stopped" if self._stop_event.is_set() else "completed"
+
+        summary = self.build_summary(started_at, datetime.now())
+        self.logger.info(f"Fleet completed. Total events simulated: {summary['fleet']['events']['total']}")
+        if summary_file:
+            self.write_summary(summary, summary_file)
+        return summary
+
+    def handle_report(self, report):
+        """
+        Store a message received from a worker.
+
+        Args:
+            report (tuple): Message sent by run_worker().
+        """
+        kind, worker_id = report[0], report[1]
+        if kind == "snapshot":
+            self.snapshots[worker_id] = report[2]
+        elif kind == "final":
+            self.snapshots[worker_id] = report[2]
+            self.finals[worker_id] = (report[2], report[3])
+        elif kind == "error":
+            self.errors[worker_id] = report[2]
+            self.logger.error(f"Worker {worker_id} failed: {report[2]}")
+
+    def drain_reports(self, reports, timeout=5.0):
+        """
+        Collect the final reports of stopping workers.
+
+        Args:
+            reports (multiprocessing.Queue): Queue from the workers.
+            timeout (float, optional): Longest time to wait in seconds. Defaults to 5.
+        """
+        deadline = time.time() + timeout
+        while len(self.finals) + len(self.errors) < len(self.specs) and time.time() < deadline:
+            try:
+                self.handle_report(reports.get(timeout=0.5))
+            except queue.Empty:
+                pass
+            except KeyboardInterrupt:
+                break
+
+    def log_live_view(self, start_time, last_view):
+        """
+        Log one line of the live fleet view and sample host CPU usage.
+
+        Args:
+            start_time (float): Time the fleet started.
+            last_view (tuple): (time, total events) of the previous line.
+
+        Returns:
+            tuple: (time, total events) of this line.
+        """
+        now = time.time()
+        merged = merge_snapshots(self.snapshots.values())
+        rate = (merged["events"] - last_view[1]) / max(now - last_view[0], 1e-6)
+
+        per_core = psutil.cpu_percent(interval=None, percpu=True) or [0.0]
+        host_cpu = sum(per_core) / len(per_core)
+        self.host_cpu.append((round(now - start_time, 3), round(host_cpu, 1), round(max(per_core), 1)))
+
+        worker_cpu = ", ".join(f"{worker}:{snapshot['cpu_percent']:.0f}%"
+                               for worker, snapshot in sorted(self.snapshots.items()))
+        self.logger.info(
+            f"Fleet: {rate:.1f} events/s (total {merged['events']}) | "
+            f"emit p99 {merged['emit_latency'].percentile(99) * 1000:.3f} ms | "
+            f"timing p99 {merged['timing_error'].percentile(99) * 1000:.1f} ms | "
+            f"dropped {merged['emit']['dropped']} | host CPU {host_cpu:.0f}% (busiest core {max(per_core):.0f}%) | "
+            f"workers [{worker_cpu}]"
+        )
+        return now, merged["events"]
+
+    def build_summary(self, started_at, ended_at):
+        """
+        Build the fleet summary from the final worker snapshots.
+
+        Args:
+            started_at (datetime): Start time of the fleet.
+            ended_at (datetime): End time of the fleet.
+
+        Returns:
+            dict: Fleet summary suitable for JSON serialization.
+        """
+        duration = (ended_at - started_at).total_seconds()
+        merged = merge_snapshots(self.snapshots.values())
+        rates = {}
+        if duration > 0:
+            rates = {event_type: round(count / duration, 4) for event_type, count in merged["by_type"].items()}
+            rates["total"] = round(merged["events"] / duration, 4)
+
+        host_cpu = {}
+        if self.host_cpu:
+            usage = [sample[1] for sample in self.host_cpu]
+            saturated = sum(1 for sample in self.host_cpu if sample[1] >= CPU_SATURATION_PERCENT)
+            host_cpu = {
+                "mean": round(sum(usage) / len(usage), 1),
+                "max": max(usage),
+                "busiest_core_max": max(sample[2] for sample in self.host_cpu),
+                "saturated_fraction": round(saturated / len(usage), 3),
+                "samples": [{"elapsed_s": elapsed, "cpu_percent": cpu, "busiest_core_percent": core}
+                            for elapsed, cpu, core in self.host_cpu],
+            }
+
+        workers = []
+        for spec in self.specs:
+            worker_id = spec["worker"]
+            snapshot, summary = self.finals.get(worker_id, (self.snapshots.get(worker_id), None))
+            workers.append({
+                "worker": worker_id,
+                "seed": spec["seed"],
+                "cpu": spec["cpu"],
+                "testers": [kind for kind, _ in spec["testers"]],
+                "events": snapshot["events"] if snapshot else 0,
+                "cpu_percent": snapshot["cpu_percent"] if snapshot else None,
+                "rss_mb": snapshot["rss_mb"] if snapshot else None,
+                "error": self.errors.get(worker_id),
+                "summary": summary,
+            })
+
+        return {
+            "fleet": {
+                "workers": len(self.specs),
+                "testers": sum(len(spec["testers"]) for spec in self.specs),
+                "seed": self.seed,
+                "started_at": started_at.isoformat(timespec="seconds"),
+                "ended_at": ended_at.isoformat(timespec="seconds"),
+                "duration_s": round(duration, 3),
+                "stop_reason": self.stop_reason,
+                "bounds_per_worker": self.bounds,
+                "events": {
+                    "total": merged["events"],
+                    "bursts": merged["bursts"],
+                    "by_type": merged["by_type"],
+                },
+                "rates_per_sec": rates,
+                "timing_error": merged["timing_error"].summary(),
+                "emit_latency": merged["emit_latency"].summary(),
+                "emit": merged["emit"],
+                "host_cpu": host_cpu,
+            },
+            "workers": workers,
+        }
+
+    def write_summary(self, summary, summary_file):
+        """
+        Write the fleet summary to a JSON file.
+
+        Args:
+            summary (dict): Fleet summary from build_summary().
+            summary_file (str): Output path.
+
+        Returns:
+            str: Path of the written file, or None if it could not be written.
+        """
+        try:
+            with open(summary_file, "w") as f:
+                json.dump(summary, f, indent=2)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error(f"Error writing fleet summary to {summary_file}: {e}")
+            return None
+        self.logger.info(f"Fleet summary written to: {os.path.abspath(summary_file)}")
+        return summary_file
+
+
+def setup_fleet_logging(name="fleet_runner"):
+    """
+    Log the fleet runner to the console and to a timestamped file in the 'logs' directory.
+
+    Args:
+        name (str, optional): Prefix of the log file name. Defaults to "fleet_runner".
+
+    Returns:
+        str: Absolute path of the log file.
+    """
+    logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_filename = os.path.join(logs_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.FileHandler(log_filename), logging.StreamHandler()]
+    )
+    return os.path.abspath(log_filename)
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for the fleet runner.
+
+    Example:
+        python fleet_runner.py --keyboard 4 --mouse 4 --affinity --max-duration 600
+
+    Each tester option may be followed by --keyboard-config/--mouse-config to choose the
+    configuration file; without one the tester's default configuration is used. Run
+    bounds apply to each worker.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Fleet runner")
+    parser.add_argument("--keyboard", type=int, default=0, help="Number of keyboard testers")
+    parser.add_argument("--mouse", type=int, default=0, help="Number of mouse testers")
+    parser.add_argument("--keyboard-config", action="append", default=None,
+                        help="Keyboard configuration file; repeat to give testers different configurations")
+    parser.add_argument("--mouse-config", action="append", default=None,
+                        help="Mouse configuration file; repeat to give testers different configurations")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: cores)")
+    parser.add_argument("--affinity", action="store_true", help="Pin each worker to one core")
+    parser.add_argument("--report-interval", type=float, default=DEFAULT_REPORT_INTERVAL,
+                        help="Seconds between live-view lines")
+    parser.add_argument("--max-events", type=int, default=None, help="Stop each worker after this many events")
+    parser.add_argument("--max-duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--max-bursts", type=int, default=None, help="Stop each worker after this many bursts")
+    parser.add_argument("--seed", type=int, default=None, help="Fleet seed; worker seeds are derived from it")
+    parser.add_argument("--summary", default=None, help="Path of the JSON fleet summary")
+    args = parser.parse_args()
+
+    if args.keyboard <= 0 and args.mouse <= 0:
+        parser.error("request at least one tester, e.g. --keyboard 4")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    assignments = []
+    for kind, count, configs in (("keyboard", args.keyboard, args.keyboard_config),
+                                 ("mouse", args.mouse, args.mouse_config)):
+        default_config = os.path.join(script_dir, f"{'skt' if kind == 'keyboard' else 'smt'}-1.8.config.json")
+        configs = [os.path.abspath(config) for config in configs] if configs else [default_config]
+        for index in range(max(0, count)):
+            assignments.append((kind, configs[index % len(configs)]))
+
+    log_filename = setup_fleet_logging()
+    print("Input Testing Utility Suite v1.8 - Fleet runner")
+    print("Use 'ESC' or Ctrl+C to stop testing")
+
+    try:
+        fleet = FleetRunner(
+            assignments,
+            workers=args.workers,
+            seed=args.seed,
+            affinity=args.affinity,
+            max_events=args.max_events,
+            max_duration=args.max_duration,
+            max_bursts=args.max_bursts,
+            report_interval=args.report_interval,
+        )
+        fleet.run(args.summary or os.path.splitext(log_filename)[0] + "_summary.json")
+    except Exception as e:
+        logging.error(f"\nAn error occurred: {e}")
+        print(f"\nError: {e}")
+        print("Check the log file for more details.")
+        # Only wait for a keypress when someone is watching the console
+        if sys.stdin and sys.stdin.isatty():
+            input("Press Enter to exit...")
+        raise
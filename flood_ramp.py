@@ -0,0 +1,262 @@
+# flood_ramp.py
+import argparse
+import time
+from run_metrics import LatencyHistogram
+
+"""
+FloodRamp - Find the event rate at which the target stops keeping up.
+
+Human-like pacing hides the limits of input handling: a tester waiting seconds
+between bursts never fills the target's message queue. A flood ramp removes the
+pacing and drives the tester's single-event primitive (a keypress for the keyboard
+tester, a mouse move for the mouse tester) at a fixed rate, then raises the rate
+step by step. Rates grow geometrically from the start rate to the maximum, and
+each step is held for a fixed time while the ramp records:
+    achieved rate       Events delivered per second, against the step's target rate
+    failures            PostMessage calls that failed (the queue was full)
+    drops               Messages the emit layer gave up on
+    queue depth         Messages posted but not yet pumped, sampled before each pump
+    pump latency        Time taken by each call of the message pump
+
+A step is saturated when the achieved rate falls short of the target by more than
+RATE_TOLERANCE, or when any message failed, was dropped or was coalesced (the emit
+layer only coalesces mouse moves under backpressure). The list of steps is
+the saturation curve; the ramp ends after SATURATED_STEPS_TO_STOP saturated steps
+in a row, so that a real target is not flooded for longer than needed.
+
+Run this file directly to ramp a tester against the benchmark suite's headless
+stand-in with a bounded queue, which works on Linux as well as Windows:
+
+    python flood_ramp.py --kind keyboard --capacity 2000 --service-rate 3000
+"""
+
+# Default first and last target rates, in events per second
+DEFAULT_START_RATE = 50.0
+DEFAULT_MAX_RATE = 2000.0
+
+# Default number of rate steps and seconds each step is held
+DEFAULT_STEPS = 8
+DEFAULT_STEP_DURATION = 10.0
+
+# Seconds between calls of the message pump during a step
+PUMP_INTERVAL = 0.01
+
+# Fraction by which the achieved rate may fall short of the target before a step is saturated
+RATE_TOLERANCE = 0.05
+
+# Saturated steps in a row after which the ramp ends
+SATURATED_STEPS_TO_STOP = 2
+
+
+def ramp_rates(start_rate, max_rate, steps):
+    """
+    Get the target rates of a ramp, growing geometrically from start_rate to max_rate.
+
+    Args:
+        start_rate (float): Rate of the first step, in events per second.
+        max_rate (float): Rate of the last step, in events per second.
+        steps (int): Number of steps.
+
+    Returns:
+        list: Target rates, one per step.
+    """
+    if steps <= 1 or max_rate <= start_rate:
+        return [float(start_rate)]
+    factor = (max_rate / start_rate) ** (1.0 / (steps - 1))
+    return [round(start_rate * factor ** index, 3) for index in range(steps)]
+
+
+class FloodRamp:
+    """
+    Drive a tester's flood event at rising rates and record the saturation curve.
+
+    Attributes:
+        tester (BaseInputTester): The tester; its flood_event(), process_messages(),
+            emitter and running flag are used.
+        rates (list): Target rate of each step, in events per second.
+        step_duration (float): Seconds each step is held.
+        pump_interval (float): Seconds between calls of the message pump.
+        steps (list): Result of each finished step, as from run_step().
+    """
+
+    def __init__(self, tester, rates, step_duration=DEFAULT_STEP_DURATION, pump_interval=PUMP_INTERVAL):
+        """
+        Initialize the FloodRamp.
+
+        Args:
+            tester (BaseInputTester): The tester to drive.
+            rates (list): Target rate of each step, in events per second.
+            step_duration (float, optional): Seconds each step is held. Defaults to DEFAULT_STEP_DURATION.
+            pump_interval (float, optional): Seconds between pumps. Defaults to PUMP_INTERVAL.
+        """
+        self.tester = tester
+        self.rates = list(rates)
+        self.step_duration = step_duration
+        self.pump_interval = pump_interval
+        self.steps = []
+
+    def run(self):
+        """
+        Run every step, stopping early when the tester stops or the target stays saturated.
+
+        Returns:
+            dict: The saturation curve, as from curve().
+        """
+        saturated_in_a_row = 0
+        for rate in self.rates:
+            if not self.tester.running:
+                break
+            step = self.run_step(rate)
+            self.steps.append(step)
+            self.tester.logger.info(f"Flood step: {describe_step(step)}")
+            saturated_in_a_row = saturated_in_a_row + 1 if step["saturated"] else 0
+            if saturated_in_a_row >= SATURATED_STEPS_TO_STOP:
+                break
+        return self.curve()
+
+    def run_step(self, rate):
+        """
+        Hold one target rate for step_duration seconds.
+
+        Events are due at fixed times from the start of the step, so a tester that falls
+        behind fires the late events back to back instead of lowering the rate.
+
+        Args:
+            rate (float): Target rate in events per second.
+
+        Returns:
+            dict: The step's target and achieved rates, message counts, queue depth and
+                pump latency.
+        """
+        tester, emitter = self.tester, self.tester.emitter
+        burst_events = tester.burst_events
+        perf_counter = time.perf_counter
+        pump_latency = LatencyHistogram()
+        posted, dropped, failures, coalesced = emitter.posted, emitter.dropped, emitter.failures, emitter.coalesced
+        attempted = delivered = 0
+        depth_total = depth_samples = depth_max = 0
+
+        start = perf_counter()
+        deadline = start + self.step_duration
+        next_pump = start + self.pump_interval
+        period = 1.0 / rate
+        now = start
+        while now < deadline and tester.running:
+            due = start + attempted * period
+            if due > now:
+                time.sleep(min(due, next_pump, deadline) - now)
+            else:
+                attempted += 1
+                # Each flood event is a burst of its own, so the batch never grows past one event
+                burst_events.clear()
+                if tester.flood_event():
+                    delivered += 1
+
+            now = perf_counter()
+            if now >= next_pump:
+                depth = emitter.in_flight
+                depth_total += depth
+                depth_samples += 1
+                depth_max = max(depth_max, depth)
+                tester.process_messages()
+                pump_latency.record(perf_counter() - now)
+                next_pump = now + self.pump_interval
+                now = perf_counter()
+
+        elapsed = max(now - start, 1e-9)
+        tester.process_messages()
+        step = {
+            "target_rate": rate,
+            "achieved_rate": round(delivered / elapsed, 1),
+            "attempted": attempted,
+            "delivered": delivered,
+            "duration_s": round(elapsed, 3),
+            "messages_posted": emitter.posted - posted,
+            "messages_per_sec": round((emitter.posted - posted) / elapsed, 1),
+            "post_failures": emitter.failures - failures,
+            "dropped": emitter.dropped - dropped,
+            "coalesced": emitter.coalesced - coalesced,
+            "queue_depth": {"mean": round(depth_total / depth_samples, 1) if depth_samples else 0.0,
+                            "max": depth_max},
+            "pump_latency": pump_latency.summary(),
+        }
+        step["saturated"] = bool(step["achieved_rate"] < rate * (1.0 - RATE_TOLERANCE)
+                                 or step["post_failures"] or step["dropped"] or step["coalesced"])
+        return step
+
+    def curve(self):
+        """
+        Summarize the finished steps.
+
+        Returns:
+            dict: The planned rates, the steps, the target rate of the first saturated step
+                (or None) and the highest rate achieved by an unsaturated step.
+        """
+        saturated = [step["target_rate"] for step in self.steps if step["saturated"]]
+        sustained = [step["achieved_rate"] for step in self.steps if not step["saturated"]]
+        return {
+            "rates": self.rates,
+            "step_duration_s": self.step_duration,
+            "steps": self.steps,
+            "saturation_rate": saturated[0] if saturated else None,
+            "max_sustained_rate": max(sustained) if sustained else None,
+        }
+
+
+def describe_step(step):
+    """
+    Describe one step of the curve in one line.
+
+    Args:
+        step (dict): A step, as from FloodRamp.run_step().
+
+    Returns:
+        str: Target and achieved rates, failures, drops, queue depth and pump latency.
+    """
+    latency = step["pump_latency"]
+    return (f"target {step['target_rate']:.0f}/s, achieved {step['achieved_rate']:.0f}/s, "
+            f"{step['post_failures']} post failures, {step['dropped']} dropped, "
+            f"queue depth mean/max {step['queue_depth']['mean']:.0f}/{step['queue_depth']['max']}, "
+            f"pump p50/p99 {latency.get('p50_ms', 0.0):.2f}/{latency.get('p99_ms', 0.0):.2f} ms"
+            f"{' - saturated' if step['saturated'] else ''}")
+
+
+if __name__ == "__main__":
+    """
+    Ramp a tester against the headless stand-in with a bounded queue and print the curve.
+
+    Example:
+        python flood_ramp.py --kind mouse --start-rate 500 --max-rate 50000 --capacity 10000 --service-rate 20000
+    """
+    import tempfile
+    from benchmark_suite import BoundedQueueWin32gui, create_headless_tester, load_win32gui
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Flood ramp")
+    parser.add_argument("--kind", choices=("keyboard", "mouse"), default="keyboard", help="Tester to ramp")
+    parser.add_argument("--start-rate", type=float, default=DEFAULT_START_RATE, help="First target rate (events/s)")
+    parser.add_argument("--max-rate", type=float, default=DEFAULT_MAX_RATE, help="Last target rate (events/s)")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="Number of rate steps")
+    parser.add_argument("--step-duration", type=float, default=2.0, help="Seconds each step is held")
+    parser.add_argument("--capacity", type=int, default=10000, help="Capacity of the stand-in queue (messages)")
+    parser.add_argument("--service-rate", type=float, default=None,
+                        help="Messages per second the stand-in target handles (default: unlimited)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the run")
+    parser.add_argument("--output", default=None, help="Path of the JSON saturation curve")
+    args = parser.parse_args()
+
+    stand_in = BoundedQueueWin32gui(load_win32gui(), args.capacity, args.service_rate)
+    with tempfile.TemporaryDirectory() as directory:
+        tester, _ = create_headless_tester("1.8", args.kind, stand_in, directory)
+        tester.prepare_run(seed=args.seed)
+        result = tester.run_flood(args.start_rate, args.max_rate, args.steps, args.step_duration,
+                                  output_file=args.output or False)
+        tester.finish_run()
+
+    print(f"Flood ramp of the {args.kind} tester: stand-in capacity {args.capacity}, "
+          f"service rate {args.service_rate or 'unlimited'}")
+    for step in result["steps"]:
+        print(f"  {describe_step(step)}")
+    print(f"Saturation rate: {result['saturation_rate']}, max sustained rate: {result['max_sustained_rate']}")
+    print(f"Stand-in queue: {stand_in.rejected} posts rejected, peak depth {stand_in.max_pending}")
+    if args.output:
+        print(f"Curve written to {args.output}")
@@ -0,0 +1,215 @@
+# gc_monitor.py
+import functools
+import gc
+import time
+from run_metrics import LatencyHistogram
+
+"""
+GCMonitor - Garbage-collector pause measurement and tuning.
+
+Every burst allocates: typed-character lists, f-strings, trajectory tuples and
+the lists built by random.choices. Once enough of these survive, the cyclic
+garbage collector runs, and when it runs in the middle of a burst the gap
+between two keystrokes or two movement steps grows by the length of the pause.
+
+The monitor measures this through gc.callbacks. Every collection's pause goes into
+a latency histogram, both overall and per generation, and pauses that fall inside
+a burst are also counted separately. A second histogram measures the inter-key
+timing error: how much longer than the requested delay each gap between two
+in-burst sleeps was. That gap includes any collection that ran between the keys.
+
+Two tuning options can then be compared run against run using those numbers:
+    freeze          Move everything allocated at startup (modules, configuration,
+                    word lists, key tables) into the permanent generation with
+                    gc.freeze(), so that collections no longer traverse it
+    thresholds      Generation thresholds for gc.set_threshold(); a higher first
+                    threshold means fewer, slightly longer young collections
+"""
+
+# Number of generations reported by gc.callbacks
+GENERATIONS = 3
+
+
+def apply_gc_tuning(thresholds=None, freeze=False):
+    """
+    Apply generation thresholds and freeze the current heap.
+
+    Args:
+        thresholds (sequence, optional): One to three generation thresholds. Defaults to
+            None (keep the current thresholds).
+        freeze (bool, optional): Collect, then move every surviving object into the
+            permanent generation. Defaults to False.
+
+    Returns:
+        dict: The thresholds before and after, and the number of frozen objects.
+    """
+    before = gc.get_threshold()
+    if thresholds:
+        gc.set_threshold(*thresholds)
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return {"thresholds_before": list(before), "thresholds": list(gc.get_threshold()),
+            "frozen_objects": gc.get_freeze_count()}
+
+
+class GCMonitor:
+    """
+    Record garbage-collection pauses and inter-key timing error.
+
+    Attributes:
+        pauses (LatencyHistogram): Pause of every collection.
+        generation_pauses (list): LatencyHistogram of the pauses of each generation.
+        burst_pauses (LatencyHistogram): Pauses of the collections that ran inside a burst.
+        key_timing_error (LatencyHistogram): Extra time between in-burst sleeps beyond the
+            requested delay.
+        collected (int): Objects collected.
+        uncollectable (int): Uncollectable objects found.
+        tuning (dict): Result of apply_gc_tuning(), or None if no tuning was applied.
+    """
+
+    def __init__(self):
+        """
+        Initialize the GCMonitor with empty histograms.
+        """
+        self.tuning = None
+        self.installed = False
+        self.reset()
+
+    def reset(self):
+        """
+        Start new histograms and counters, for a new run.
+        """
+        self.pauses = LatencyHistogram()
+        self.generation_pauses = [LatencyHistogram() for _ in range(GENERATIONS)]
+        self.burst_pauses = LatencyHistogram()
+        self.key_timing_error = LatencyHistogram()
+        self.collected = 0
+        self.uncollectable = 0
+        self._collection_start = None
+        self._in_burst = False
+        self._last_key_time = None
+
+    def install(self):
+        """
+        Start receiving collection callbacks.
+        """
+        if not self.installed:
+            gc.callbacks.append(self._callback)
+            self.installed = True
+
+    def remove(self):
+        """
+        Stop receiving collection callbacks.
+        """
+        if self.installed:
+            gc.callbacks.remove(self._callback)
+            self.installed = False
+
+    def _callback(self, phase, info):
+        """
+        Time a collection from its "start" to its "stop" callback.
+
+        Args:
+            phase (str): "start" or "stop".
+            info (dict): Collection details, with "generation", "collected" and "uncollectable".
+        """
+        if phase == "start":
+            self._collection_start = time.perf_counter()
+            return
+        if self._collection_start is None:
+            return
+        pause = time.perf_counter() - self._collection_start
+        self._collection_start = None
+        self.pauses.record(pause)
+        generation = info.get("generation", 0)
+        if 0 <= generation < GENERATIONS:
+            self.generation_pauses[generation].record(pause)
+        if self._in_burst:
+            self.burst_pauses.record(pause)
+        self.collected += info.get("collected", 0)
+        self.uncollectable += info.get("uncollectable", 0)
+
+    def wrap_burst(self, function):
+        """
+        Mark the calls of a burst function, so that pauses inside bursts are counted.
+
+        Args:
+            function (callable): The burst function, such as simulate_input_event.
+
+        Returns:
+            callable: A wrapper with the same signature.
+        """
+        @functools.wraps(function)
+        def monitored(*args, **kwargs):
+            """
+            Call the burst function with the in-burst flag set.
+            """
+            self._in_burst = True
+            self._last_key_time = None
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._in_burst = False
+
+        return monitored
+
+    def wrap_sleep(self, function):
+        """
+        Measure the gap between consecutive in-burst sleeps against the requested delay.
+
+        Args:
+            function (callable): The in-burst sleep function, taking seconds.
+
+        Returns:
+            callable: A wrapper with the same signature.
+        """
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def monitored(seconds):
+            """
+            Sleep, then record how much the gap since the previous sleep exceeded the delay.
+            """
+            function(seconds)
+            now = perf_counter()
+            if self._last_key_time is not None:
+                self.key_timing_error.record(max(0.0, now - self._last_key_time - seconds))
+            self._last_key_time = now
+
+        return monitored
+
+    def summary(self):
+        """
+        Summarize the pauses, timing error and tuning.
+
+        Returns:
+            dict: Pause and timing-error summaries in milliseconds, collection counts, total
+                pause time, the current thresholds and the tuning applied.
+        """
+        return {
+            "collections": self.pauses.count,
+            "collections_by_generation": [histogram.count for histogram in self.generation_pauses],
+            "pause_total_s": round(self.pauses.total / 1_000_000, 3),
+            "pauses": self.pauses.summary(),
+            "pauses_by_generation": [histogram.summary() for histogram in self.generation_pauses],
+            "burst_pauses": self.burst_pauses.summary(),
+            "key_timing_error": self.key_timing_error.summary(),
+            "collected": self.collected,
+            "uncollectable": self.uncollectable,
+            "thresholds": list(gc.get_threshold()),
+            "frozen_objects": gc.get_freeze_count(),
+            "tuning": self.tuning,
+        }
+
+    def brief(self):
+        """
+        Describe the pauses in one line, for the periodic log.
+
+        Returns:
+            str: Collection counts and pause percentiles.
+        """
+        return (f"{self.pauses.count} collections ({self.burst_pauses.count} in bursts), "
+                f"pause p50/p99/max {self.pauses.percentile(50) * 1000:.2f}/"
+                f"{self.pauses.percentile(99) * 1000:.2f}/{(self.pauses.max_value or 0) / 1000:.2f} ms, "
+                f"inter-key error p99 {self.key_timing_error.percentile(99) * 1000:.2f} ms")
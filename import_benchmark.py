@@ -0,0 +1,186 @@
+# import_benchmark.py
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+ImportBenchmark - Measure and guard the import time of the tester modules.
+
+Each case imports one module in a fresh interpreter, so nothing is shared with
+earlier runs except the operating system's file cache, and reports how long the
+import took and which modules it loaded. A case fails when one of its deferred
+modules (pywin32, psutil, ctypes, multiprocessing's socket and shared-memory
+layers) was loaded by the import itself, or when the median import time exceeds
+the given budget, so the script can guard startup in a build or before a release.
+
+With --importtime the slowest modules of one import of each case are listed, as
+reported by Python's -X importtime option.
+"""
+
+# Modules that importing the tester modules must not load; they are loaded when a
+# tester is created or a feature is first used
+DEFERRED_MODULES = ("psutil", "win32api", "win32gui", "win32con", "ctypes", "win32file", "win32event",
+                    "multiprocessing.connection", "multiprocessing.shared_memory")
+
+# Cases: name -> (module or script to import, deferred modules it must not load)
+IMPORT_CASES = {
+    "base": ("base_input_tester_1_8", DEFERRED_MODULES),
+    "keyboard": ("skt-1.8.py", DEFERRED_MODULES),
+    "mouse": ("smt-1.8.py", DEFERRED_MODULES),
+    "runtime": ("tester_runtime", DEFERRED_MODULES),
+}
+
+# Code run by each child interpreter; prints the import time and the loaded modules as JSON
+CHILD_CODE = """
+import importlib, importlib.util, json, sys, time
+target = {target!r}
+start = time.perf_counter()
+if target.endswith(".py"):
+    name = target[:-3].replace("-", "_").replace(".", "_")
+    spec = importlib.util.spec_from_file_location(name, target)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+else:
+    importlib.import_module(target)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def run_child(target, script_dir, extra_options=()):
+    """
+    Import a module or script in a fresh interpreter.
+
+    Args:
+        target (str): Module name, or file name of a tester script.
+        script_dir (str): Directory of the tester modules, used as the working directory.
+        extra_options (tuple, optional): Interpreter options such as ("-X", "importtime").
+
+    Returns:
+        tuple: (result dict with "seconds" and "modules", interpreter's standard error).
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    completed = subprocess.run(
+        [sys.executable, *extra_options, "-c", CHILD_CODE.format(target=target)],
+        cwd=script_dir, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def slowest_imports(importtime_output, count):
+    """
+    Get the modules that took longest to import, from -X importtime output.
+
+    Args:
+        importtime_output (str): Standard error of an interpreter run with -X importtime.
+        count (int): Number of modules to return.
+
+    Returns:
+        list: (self time in microseconds, cumulative time in microseconds, module name)
+            tuples, slowest self time first.
+    """
+    entries = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        entries.append((int(fields[0]), int(fields[1]), fields[2].strip()))
+    return sorted(entries, reverse=True)[:count]
+
+
+def benchmark_case(name, runs, script_dir, budget_ms=None):
+    """
+    Measure one case.
+
+    Args:
+        name (str): Key of IMPORT_CASES.
+        runs (int): Number of fresh interpreters to import in.
+        script_dir (str): Directory of the tester modules.
+        budget_ms (float, optional): Largest acceptable median import time. Defaults to no limit.
+
+    Returns:
+        dict: Timings in milliseconds, the deferred modules that were loaded, and
+            "passed".
+    """
+    target, deferred = IMPORT_CASES[name]
+    timings = []
+    loaded = set()
+    for _ in range(runs):
+        result, _ = run_child(target, script_dir)
+        timings.append(result["seconds"] * 1000.0)
+        loaded.update(module for module in deferred if module in result["modules"])
+
+    median = statistics.median(timings)
+    passed = not loaded and (budget_ms is None or median <= budget_ms)
+    return {
+        "case": name,
+        "target": target,
+        "runs": runs,
+        "median_ms": round(median, 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "loaded_deferred_modules": sorted(loaded),
+        "budget_ms": budget_ms,
+        "passed": passed,
+    }
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for the import-time benchmark.
+
+    Example:
+        python import_benchmark.py
+        python import_benchmark.py --runs 20 --budget-ms 120 --importtime 15
+
+    Exits with status 1 if any case fails.
+    """
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Import-time benchmark")
+    parser.add_argument("cases", nargs="*", help=f"Cases to run: {', '.join(IMPORT_CASES)} (default: all)")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per case")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail a case whose median import time is above this many milliseconds")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Also list the N slowest modules of each case")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    unknown = [case for case in args.cases if case not in IMPORT_CASES]
+    if unknown:
+        parser.error(f"unknown case {unknown[0]!r}, expected one of {', '.join(IMPORT_CASES)}")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for case in args.cases or list(IMPORT_CASES):
+        result = benchmark_case(case, max(1, args.runs), script_dir, args.budget_ms)
+        if args.importtime > 0:
+            _, output = run_child(IMPORT_CASES[case][0], script_dir, ("-X", "importtime"))
+            result["slowest_imports"] = [
+                {"module": module, "self_us": self_us, "cumulative_us": cumulative_us}
+                for self_us, cumulative_us, module in slowest_imports(output, args.importtime)
+            ]
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "ok" if result["passed"] else "FAIL"
+            print(f"{result['case']:<10} {result['median_ms']:8.2f} ms median "
+                  f"({result['min_ms']:.2f}-{result['max_ms']:.2f} ms, {result['runs']} runs)  {status}")
+            if result["loaded_deferred_modules"]:
+                print(f"           loaded at import: {', '.join(result['loaded_deferred_modules'])}")
+            for entry in result.get("slowest_imports", []):
+                print(f"           {entry['self_us'] / 1000:8.2f} ms self {entry['cumulative_us'] / 1000:8.2f} ms "
+                      f"cumulative  {entry['module']}")
+
+    sys.exit(0 if all(result["passed"] for result in results) else 1)
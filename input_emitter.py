@@ -0,0 +1,437 @@
+# input_emitter.py
+import time
+
+from event_bus import STATUS_COALESCED, STATUS_DROPPED, STATUS_POSTED
+
+"""
+MessageEmitter - Backpressure-aware emit layer for the input testing utilities.
+
+Windows caps each thread's posted-message queue (about 10,000 entries by default).
+When the cap is reached PostMessage fails, and events are lost. This module wraps
+the raw post function so that every tester can track how many messages are still
+waiting to be drained, detect saturation before PostMessage starts failing, and
+apply backpressure instead of silently losing events.
+
+Mouse moves can also be filtered before they reach the queue. A move to the
+position of the previous move is skipped as a duplicate, and with a report rate
+set (such as 125, 500 or 1000 Hz for a polled mouse, or a display refresh rate)
+moves closer together than one report interval are held back: only the latest
+position is posted when the next report is due, as a mouse reports where the
+pointer is at each poll. Moves are otherwise posted at the time they are made,
+so trajectory timing is kept.
+
+The emitter has no Windows dependency of its own: the post function and the drain
+callback are supplied by the tester, which keeps this module importable anywhere.
+"""
+
+# Results returned by MessageEmitter.post_mouse_move()
+POSTED = "posted"
+COALESCED = "coalesced"
+DROPPED = "dropped"
+DUPLICATE = "duplicate"
+
+
+class MessageEmitter:
+    """
+    Post window messages while tracking queue occupancy and applying backpressure.
+
+    Every successful post increments the in-flight count; every message dispatched by
+    the tester's message pump decrements it. When the in-flight count reaches the high
+    watermark the emitter drains the queue through the drain callback and enters a
+    saturated state that lasts until the queue falls below the low watermark. While
+    saturated, redundant mouse moves are coalesced into a single pending move and the
+    scheduler is asked to wait longer between events.
+
+    Attributes:
+        post_message (callable): Function with the PostMessage signature (hwnd, msg, wparam, lparam).
+        drain (callable): Function that pumps the target queue, or None.
+        on_deferred_post (callable): Called when a coalesced move is flushed, or None.
+        latency_histogram (LatencyHistogram): Records the duration of each successful post, or None.
+        event_bus (EventBusWriter): Receives every posted, dropped and coalesced message, or None.
+        event_batch (EventBatch): Records every posted, dropped and coalesced message of the
+            current burst, or None.
+        delivery_tracker (DeliveryTracker): Receives every posted message, to be matched to
+            its delivery, or None.
+        dedupe_moves (bool): Whether moves to the position of the previous move are skipped.
+        move_interval (float): Shortest time between two posted moves in seconds (the
+            inverse of the report rate), or 0.0 to post every move.
+        queue_capacity (int): Assumed capacity of the target message queue.
+        high_watermark (int): In-flight count at which backpressure starts.
+        low_watermark (int): In-flight count at which backpressure is released.
+        in_flight (int): Messages posted but not yet drained.
+        max_in_flight (int): Highest in-flight count observed.
+        posted (int): Messages posted successfully.
+        dropped (int): Messages that could not be posted.
+        failures (int): PostMessage calls that raised an error.
+        coalesced (int): Mouse moves merged into a later move while saturated.
+        deferred_posted (int): Coalesced moves that were later flushed to the queue.
+        duplicate_moves (int): Moves skipped because the position had not changed.
+        rate_coalesced (int): Moves merged into a later move by the report rate.
+        saturation_events (int): Number of times the emitter entered the saturated state.
+        throttle_time (float): Total extra delay requested from the scheduler, in seconds.
+        saturated (bool): Whether backpressure is currently applied.
+    """
+
+    def __init__(self, post_message, drain=None, queue_capacity=10000,
+                 high_watermark=0.8, low_watermark=0.5, backoff_base=0.01, backoff_max=0.5,
+                 dedupe_moves=True, move_report_rate=0.0):
+        """
+        Initialize the MessageEmitter.
+
+        Args:
+            post_message (callable): Function used to post a message.
+            drain (callable, optional): Function that pumps the target queue. Defaults to None.
+            queue_capacity (int, optional): Target queue capacity. Defaults to 10000.
+            high_watermark (float, optional): Fraction of capacity at which backpressure starts.
+                Defaults to 0.8.
+            low_watermark (float, optional): Fraction of capacity at which backpressure is released.
+                Defaults to 0.5.
+            backoff_base (float, optional): First extra scheduler delay in seconds. Defaults to 0.01.
+            backoff_max (float, optional): Largest extra scheduler delay in seconds. Defaults to 0.5.
+            dedupe_moves (bool, optional): Skip moves to the position of the previous move.
+                Defaults to True, as the "move_dedup" setting does.
+            move_report_rate (float, optional): Most moves posted per second, or 0.0 for no
+                limit. Defaults to 0.0.
+        """
+        self.post_message = post_message
+        self.drain = drain
+        self.on_deferred_post = None
+        self.latency_histogram = None
+        self.event_bus = None
+        self.event_batch = None
+        self.delivery_tracker = None
+
+        self.queue_capacity = max(1, int(queue_capacity))
+        self.high_watermark = max(1, int(self.queue_capacity * high_watermark))
+        self.low_watermark = min(self.high_watermark - 1, int(self.queue_capacity * low_watermark))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.dedupe_moves = dedupe_moves
+        self.move_interval = 1.0 / move_report_rate if move_report_rate else 0.0
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.posted = 0
+        self.dropped = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.deferred_posted = 0
+        self.duplicate_moves = 0
+        self.rate_coalesced = 0
+        self.saturation_events = 0
+        self.throttle_time = 0.0
+        self.saturated = False
+
+        self._backoff_level = 0
+        self._saturated_since_check = False
+        self._pending_move = None  # (hwnd, msg, wparam, lparam) of the latest coalesced move
+        self._report_move = None  # (hwnd, msg, wparam, lparam) of the move held until the next report
+        self._next_report = 0.0  # time.perf_counter() at which the next move may be posted
+        self._last_move = None  # (hwnd, wparam, lparam) of the latest move posted or held for posting
+
+    @classmethod
+    def from_config(cls, config, post_message, drain=None):
+        """
+        Create an emitter from a tester configuration dictionary.
+
+        Args:
+            config (dict): Configuration parameters.
+            post_message (callable): Function used to post a message.
+            drain (callable, optional): Function that pumps the target queue. Defaults to None.
+
+        Returns:
+            MessageEmitter: The configured emitter.
+        """
+        return cls(
+            post_message,
+            drain=drain,
+            queue_capacity=config.get("emit_queue_capacity", 10000),
+            high_watermark=config.get("emit_high_watermark", 0.8),
+            low_watermark=config.get("emit_low_watermark", 0.5),
+            backoff_base=config.get("emit_backoff_base", 0.01),
+            backoff_max=config.get("emit_backoff_max", 0.5),
+            dedupe_moves=config.get("move_dedup", True),
+            move_report_rate=config.get("move_report_rate", 0.0),
+        )
+
+    def post(self, hwnd, msg, wparam, lparam):
+        """
+        Post a message, draining the queue first if it is near capacity.
+
+        If PostMessage fails, the queue is drained and the post retried once before
+        the message is counted as dropped.
+
+        Args:
+            hwnd (int): Handle of the target window.
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+
+        Returns:
+            bool: True if the message was posted, False if it was dropped.
+        """
+        if self.in_flight >= self.high_watermark:
+            self._enter_saturation()
+            self._relieve()
+            if self.in_flight >= self.queue_capacity:
+                self.dropped += 1
+                if self.event_bus is not None:
+                    self.event_bus.publish(msg, wparam, lparam, STATUS_DROPPED)
+                if self.event_batch is not None:
+                    self.event_batch.append_message(msg, wparam, lparam, time.perf_counter(), STATUS_DROPPED)
+                return False
+
+        for attempt in range(2):
+            start = time.perf_counter()
+            try:
+                self.post_message(hwnd, msg, wparam, lparam)
+            except Exception:
+                self.failures += 1
+                self._enter_saturation()
+                if attempt == 0 and self._relieve():
+                    continue
+                self.dropped += 1
+                if self.event_bus is not None:
+                    self.event_bus.publish(msg, wparam, lparam, STATUS_DROPPED)
+                if self.event_batch is not None:
+                    self.event_batch.append_message(msg, wparam, lparam, start, STATUS_DROPPED)
+                return False
+
+            if self.latency_histogram is not None:
+                self.latency_histogram.record(time.perf_counter() - start)
+            if self.event_bus is not None:
+                self.event_bus.publish(msg, wparam, lparam, STATUS_POSTED)
+            if self.event_batch is not None:
+                self.event_batch.append_message(msg, wparam, lparam, start, STATUS_POSTED)
+            if self.delivery_tracker is not None:
+                self.delivery_tracker.record_post(msg, wparam, lparam, start)
+            self.posted += 1
+            self.in_flight += 1
+            if self.in_flight > self.max_in_flight:
+                self.max_in_flight = self.in_flight
+            return True
+        return False
+
+    def post_mouse_move(self, hwnd, msg, wparam, lparam):
+        """
+        Post a mouse move, coalescing it with later moves while saturated.
+
+        While backpressure is applied only the most recent move is kept; it is
+        flushed once the queue has drained below the low watermark. A move to the
+        position of the previous move is skipped when dedupe_moves is set, and a move
+        made before the next report is due is held back until a later move or
+        flush_report_move() replaces or posts it.
+
+        Args:
+            hwnd (int): Handle of the target window.
+            msg (int): The message identifier (normally WM_MOUSEMOVE).
+            wparam (int): Additional message-specific information.
+            lparam (int): Packed cursor coordinates.
+
+        Returns:
+            str: POSTED, COALESCED, DUPLICATE or DROPPED.
+        """
+        # Give the pump a chance to release backpressure before coalescing
+        if self.saturated:
+            self._relieve()
+
+        # A move that leaves the pointer where it is tells the target nothing
+        position = (hwnd, wparam, lparam)
+        if self.dedupe_moves and position == self._last_move:
+            self.duplicate_moves += 1
+            return DUPLICATE
+
+        if self.saturated:
+            if self._pending_move is not None or self._report_move is not None:
+                self.coalesced += 1
+            self._report_move = None
+            self._pending_move = (hwnd, msg, wparam, lparam)
+            if self.event_bus is not None:
+                self.event_bus.publish(msg, wparam, lparam, STATUS_COALESCED)
+            if self.event_batch is not None:
+                self.event_batch.append_message(msg, wparam, lparam, time.perf_counter(), STATUS_COALESCED)
+            self._last_move = position
+            return COALESCED
+
+        # Hold the move back until the next report is due
+        if self.move_interval:
+            now = time.perf_counter()
+            if now < self._next_report:
+                if self._report_move is not None:
+                    self.rate_coalesced += 1
+                self._report_move = (hwnd, msg, wparam, lparam)
+                if self.event_bus is not None:
+                    self.event_bus.publish(msg, wparam, lparam, STATUS_COALESCED)
+                if self.event_batch is not None:
+                    self.event_batch.append_message(msg, wparam, lparam, now, STATUS_COALESCED)
+                self._last_move = position
+                return COALESCED
+            self._advance_report(now)
+
+        # Any move posted now supersedes a pending or held one
+        if self._pending_move is not None:
+            self._pending_move = None
+            self.coalesced += 1
+        if self._report_move is not None:
+            self._report_move = None
+            self.rate_coalesced += 1
+
+        # A dropped move is not a position the target has seen, so a retry is not a duplicate
+        if not self.post(hwnd, msg, wparam, lparam):
+            return DROPPED
+        self._last_move = position
+        return POSTED
+
+    def flush_report_move(self, sleep=None):
+        """
+        Post the move held back by the report rate, if any.
+
+        Called at the end of a movement, so that its final position is reported.
+
+        Args:
+            sleep (callable, optional): Function taking seconds, used to wait until the
+                report is due. Defaults to None (post at once).
+
+        Returns:
+            bool: True if a held move was posted, False otherwise.
+        """
+        if self._report_move is None:
+            return False
+        if sleep is not None:
+            delay = self._next_report - time.perf_counter()
+            if delay > 0:
+                sleep(delay)
+        if self._report_move is None:
+            return False
+        hwnd, msg, wparam, lparam = self._report_move
+        self._report_move = None
+        self._advance_report(time.perf_counter())
+        if not self.post(hwnd, msg, wparam, lparam):
+            self._last_move = None
+            return False
+        self.deferred_posted += 1
+        if self.on_deferred_post:
+            self.on_deferred_post()
+        return True
+
+    def note_drained(self, count):
+        """
+        Record that the message pump dispatched messages from the target queue.
+
+        Args:
+            count (int): Number of messages dispatched.
+        """
+        self.in_flight = max(0, self.in_flight - count)
+        if self.saturated and self.in_flight <= self.low_watermark:
+            self.saturated = False
+            self._flush_pending_move()
+
+    def reset_queue(self):
+        """
+        Forget all in-flight messages.
+
+        Called when the target window is destroyed, because Windows discards the
+        messages still queued for it.
+        """
+        self.in_flight = 0
+        self._pending_move = None
+        self._report_move = None
+        self._last_move = None
+        if self.delivery_tracker is not None:
+            self.delivery_tracker.discard_pending()
+        self.saturated = False
+        self._backoff_level = 0
+
+    def backpressure_delay(self):
+        """
+        Get the extra delay the scheduler should add before the next event.
+
+        The delay applies if the emitter has been saturated at any point since the
+        previous call, and doubles for every consecutive saturated period, up to backoff_max.
+
+        Returns:
+            float: Extra delay in seconds (0.0 when no saturation was seen).
+        """
+        if not (self.saturated or self._saturated_since_check):
+            self._backoff_level = 0
+            return 0.0
+        self._saturated_since_check = False
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self._backoff_level))
+        self._backoff_level += 1
+        self.throttle_time += delay
+        return delay
+
+    def stats(self):
+        """
+        Get the emitter counters.
+
+        Returns:
+            dict: Current emit statistics.
+        """
+        return {
+            "posted": self.posted,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "deferred_posted": self.deferred_posted,
+            "duplicate_moves": self.duplicate_moves,
+            "rate_coalesced": self.rate_coalesced,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "saturation_events": self.saturation_events,
+            "throttle_time": round(self.throttle_time, 3),
+        }
+
+    def _enter_saturation(self):
+        """
+        Switch to the saturated state if not already in it.
+        """
+        self._saturated_since_check = True
+        if not self.saturated:
+            self.saturated = True
+            self.saturation_events += 1
+
+    def _relieve(self):
+        """
+        Drain the target queue through the drain callback.
+
+        Returns:
+            bool: True if a drain callback was available and ran, False otherwise.
+        """
+        if self.drain is None:
+            return False
+        try:
+            self.drain()
+        except Exception:
+            return False
+        return True
+
+    def _advance_report(self, now):
+        """
+        Set when the next move may be posted, after a move is posted at now.
+
+        Reports stay on a fixed grid while moves keep coming, and the grid restarts
+        after a pause longer than one interval.
+
+        Args:
+            now (float): time.perf_counter() of the posted move.
+        """
+        if now - self._next_report >= self.move_interval:
+            self._next_report = now + self.move_interval
+        else:
+            self._next_report += self.move_interval
+
+    def _flush_pending_move(self):
+        """
+        Post the coalesced mouse move, if any.
+        """
+        if self._pending_move is None:
+            return
+        hwnd, msg, wparam, lparam = self._pending_move
+        self._pending_move = None
+        if self.post(hwnd, msg, wparam, lparam):
+            self.deferred_posted += 1
+            if self.on_deferred_post:
+                self.on_deferred_post()
+        else:
+            self._last_move = None
@@ -0,0 +1,329 @@
+# input_events.py
+from array import array
+
+from event_bus import MESSAGE_NAMES, STATUS_NAMES, STATUS_POSTED
+
+"""
+InputEvents - Compact records of the input messages a tester emits.
+
+Both testers describe what they emit in one format: a message type (the window
+message identifier, such as WM_KEYDOWN or WM_MOUSEMOVE), a timestamp, a code
+(the virtual-key code, character, button state or wheel delta), the cursor
+position for mouse messages, and flags (whether the message was posted, dropped
+or coalesced, as on the event bus).
+
+A single event is an InputEvent, a class with __slots__ and no per-instance
+dictionary; a reader that looks at one event after another reuses one record.
+A whole burst is an EventBatch: one array.array column per field, allocated once
+and reused for every burst. Appending writes six machine values into the columns
+instead of creating an object per message, so recording costs no garbage-collector
+work, and the columns can be handed to struct, NumPy (numpy.frombuffer) or a file
+as they are.
+
+The emitter appends every message it handles to the tester's batch, and the
+tester clears the batch at the start of each burst. Other code (logging, tracing,
+replay, metrics) reads the burst from the batch.
+"""
+
+WM_KEYDOWN = 0x0100
+WM_CHAR = 0x0102
+WM_MOUSEFIRST = 0x0200
+WM_MOUSEWHEEL = 0x020A
+WM_MOUSELAST = 0x020E
+VK_BACK = 0x08
+VK_TAB = 0x09
+VK_RETURN = 0x0D
+
+# Text typed by the key-down of keys that send no WM_CHAR
+KEY_TEXT = {VK_TAB: "\t", VK_RETURN: "\n"}
+
+# Events a batch holds before its columns first grow
+DEFAULT_CAPACITY = 512
+
+# Array type codes of the columns: type, timestamp, code, x, y, flags
+COLUMN_TYPES = (("types", "I"), ("timestamps", "d"), ("codes", "q"), ("xs", "i"), ("ys", "i"), ("flags", "B"))
+
+
+def decode_message(msg, wparam, lparam):
+    """
+    Get the code and cursor position carried by a window message.
+
+    Args:
+        msg (int): The message identifier.
+        wparam (int): Additional message-specific information.
+        lparam (int): Additional message-specific information.
+
+    Returns:
+        tuple: (code, x, y). Mouse messages carry the button state (the signed wheel delta
+            for WM_MOUSEWHEEL) and the packed position, whose coordinates are signed as on
+            monitors left of or above the primary one; other messages carry wparam and no position.
+    """
+    if WM_MOUSEFIRST <= msg <= WM_MOUSELAST:
+        code = wparam
+        if msg == WM_MOUSEWHEEL:
+            code = _signed_word(wparam >> 16)
+        return code, _signed_word(lparam), _signed_word(lparam >> 16)
+    return wparam, 0, 0
+
+
+def _signed_word(value):
+    """
+    Get the low 16 bits of a value as a signed number.
+
+    Args:
+        value (int): The value.
+
+    Returns:
+        int: A number from -32768 to 32767.
+    """
+    value &= 0xFFFF
+    return value - 0x10000 if value >= 0x8000 else value
+
+
+class InputEvent:
+    """
+    One emitted input message.
+
+    Attributes:
+        type (int): The window message identifier.
+        timestamp (float): time.perf_counter() when the message was emitted.
+        code (int): Virtual-key code, character code, button state or wheel delta.
+        x (int): Cursor x-coordinate of mouse messages, 0 otherwise.
+        y (int): Cursor y-coordinate of mouse messages, 0 otherwise.
+        flags (int): Emit status (STATUS_POSTED, STATUS_DROPPED or STATUS_COALESCED).
+    """
+
+    __slots__ = ("type", "timestamp", "code", "x", "y", "flags")
+
+    def __init__(self, type=0, timestamp=0.0, code=0, x=0, y=0, flags=STATUS_POSTED):
+        """
+        Initialize the InputEvent.
+
+        Args:
+            type (int, optional): The window message identifier. Defaults to 0.
+            timestamp (float, optional): Emit time from time.perf_counter(). Defaults to 0.0.
+            code (int, optional): The message's code. Defaults to 0.
+            x (int, optional): Cursor x-coordinate. Defaults to 0.
+            y (int, optional): Cursor y-coordinate. Defaults to 0.
+            flags (int, optional): Emit status. Defaults to STATUS_POSTED.
+        """
+        self.type = type
+        self.timestamp = timestamp
+        self.code = code
+        self.x = x
+        self.y = y
+        self.flags = flags
+
+    def __repr__(self):
+        """
+        Describe the event with its message and status names.
+
+        Returns:
+            str: The description.
+        """
+        name = MESSAGE_NAMES.get(self.type, hex(self.type))
+        return (f"InputEvent({name}, code={self.code}, x={self.x}, y={self.y}, "
+                f"{STATUS_NAMES.get(self.flags, self.flags)}, t={self.timestamp:.6f})")
+
+    def astuple(self):
+        """
+        Get the event's fields in column order.
+
+        Returns:
+            tuple: (type, timestamp, code, x, y, flags).
+        """
+        return (self.type, self.timestamp, self.code, self.x, self.y, self.flags)
+
+
+class EventBatch:
+    """
+    Reusable, array-backed columns of input events.
+
+    Attributes:
+        types (array): Message identifiers.
+        timestamps (array): Emit times.
+        codes (array): Codes.
+        xs (array): Cursor x-coordinates.
+        ys (array): Cursor y-coordinates.
+        flags (array): Emit statuses.
+        capacity (int): Number of events the columns hold before they grow.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Initialize the EventBatch with preallocated columns.
+
+        Args:
+            capacity (int, optional): Events held before the columns first grow.
+                Defaults to DEFAULT_CAPACITY.
+        """
+        self.capacity = max(1, capacity)
+        for name, type_code in COLUMN_TYPES:
+            setattr(self, name, array(type_code, bytes(array(type_code).itemsize * self.capacity)))
+        self._length = 0
+
+    def __len__(self):
+        """
+        Get the number of events in the batch.
+
+        Returns:
+            int: The number of events.
+        """
+        return self._length
+
+    def __getitem__(self, index):
+        """
+        Get one event as an InputEvent.
+
+        Args:
+            index (int): Position in the batch; negative positions count from the end.
+
+        Returns:
+            InputEvent: A new record with the event's fields.
+
+        Raises:
+            IndexError: If the position is outside the batch.
+        """
+        return self.read(index, InputEvent())
+
+    def __iter__(self):
+        """
+        Iterate over the events as InputEvent records.
+
+        Yields:
+            InputEvent: A new record per event.
+        """
+        for index in range(self._length):
+            yield self.read(index, InputEvent())
+
+    def clear(self):
+        """
+        Empty the batch, keeping its columns for reuse.
+        """
+        self._length = 0
+
+    def append(self, type, timestamp, code, x, y, flags):
+        """
+        Add an event.
+
+        Args:
+            type (int): The window message identifier.
+            timestamp (float): Emit time from time.perf_counter().
+            code (int): The message's code.
+            x (int): Cursor x-coordinate.
+            y (int): Cursor y-coordinate.
+            flags (int): Emit status.
+        """
+        index = self._length
+        if index == self.capacity:
+            self._grow()
+        self.types[index] = type
+        self.timestamps[index] = timestamp
+        self.codes[index] = code
+        self.xs[index] = x
+        self.ys[index] = y
+        self.flags[index] = flags
+        self._length = index + 1
+
+    def append_message(self, msg, wparam, lparam, timestamp, flags=STATUS_POSTED):
+        """
+        Add a window message, decoding its code and cursor position.
+
+        Args:
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+            timestamp (float): Emit time from time.perf_counter().
+            flags (int, optional): Emit status. Defaults to STATUS_POSTED.
+        """
+        code, x, y = decode_message(msg, wparam, lparam)
+        self.append(msg, timestamp, code, x, y, flags)
+
+    def read(self, index, event):
+        """
+        Copy one event into an existing record, so that a reader can reuse a single record.
+
+        Args:
+            index (int): Position in the batch; negative positions count from the end.
+            event (InputEvent): The record to fill.
+
+        Returns:
+            InputEvent: The filled record.
+
+        Raises:
+            IndexError: If the position is outside the batch.
+        """
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("event index out of range")
+        event.type = self.types[index]
+        event.timestamp = self.timestamps[index]
+        event.code = self.codes[index]
+        event.x = self.xs[index]
+        event.y = self.ys[index]
+        event.flags = self.flags[index]
+        return event
+
+    def columns(self):
+        """
+        Get read-only views of the filled part of each column, without copying.
+
+        The views are only valid until the next clear() or append: clearing lets the next
+        burst overwrite them, and an append that has to grow the columns raises BufferError
+        while a view is alive. Copy what must outlive the burst, and release the views
+        (memoryview.release() or a with block) before appending.
+
+        Returns:
+            dict: Column name to memoryview.
+        """
+        return {name: memoryview(getattr(self, name))[:self._length].toreadonly() for name, _ in COLUMN_TYPES}
+
+    def count(self, type, flags=STATUS_POSTED, start=0):
+        """
+        Count the events of one message type.
+
+        Args:
+            type (int): The window message identifier.
+            flags (int, optional): Emit status to count. Defaults to STATUS_POSTED.
+            start (int, optional): Position to count from. Defaults to 0.
+
+        Returns:
+            int: The number of matching events.
+        """
+        types, statuses = self.types, self.flags
+        return sum(1 for index in range(start, self._length) if types[index] == type and statuses[index] == flags)
+
+    def typed_text(self, start=0):
+        """
+        Get the text typed by the posted character, backspace, tab and enter messages.
+
+        Args:
+            start (int, optional): Position to start from. Defaults to 0.
+
+        Returns:
+            str: The characters of the posted WM_CHAR messages and tab and enter key-downs,
+                with each posted backspace removing the character before it.
+        """
+        characters = []
+        types, codes, statuses = self.types, self.codes, self.flags
+        for index in range(start, self._length):
+            if statuses[index] != STATUS_POSTED:
+                continue
+            if types[index] == WM_CHAR:
+                characters.append(chr(codes[index]))
+            elif types[index] == WM_KEYDOWN:
+                if codes[index] == VK_BACK:
+                    if characters:
+                        characters.pop()
+                elif codes[index] in KEY_TEXT:
+                    characters.append(KEY_TEXT[codes[index]])
+        return "".join(characters)
+
+    def _grow(self):
+        """
+        Double the capacity of every column.
+        """
+        for name, type_code in COLUMN_TYPES:
+            getattr(self, name).frombytes(bytes(array(type_code).itemsize * self.capacity))
+        self.capacity *= 2
@@ -0,0 +1,631 @@
+# input_scheduler.py
+import math
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, time as dt_time
+
+"""
+Interval sources for the input testing utilities.
+
+The testing loop in BaseInputTester asks an interval source how long to wait after
+each burst of events. Each source implements the same small interface:
+
+    next_interval(events)  -> seconds to wait before the next burst
+    stats()                -> dict of counters for logging and reports
+
+UniformIntervals reproduces the original behavior (i.i.d. uniform gaps between
+event_interval_min and event_interval_max). TokenBucketGovernor paces bursts so
+that the achieved event rate converges to a configured target. ActivityProcess
+draws bursty, human-like gaps from a Poisson, Hawkes or on/off process.
+ActivityCalendar stretches those gaps according to a time-of-day schedule.
+"""
+
+# Average characters per word used to convert words per minute into keystrokes per second
+CHARS_PER_WORD = 5
+
+# Units accepted in the "target_rate" configuration
+RATE_UNITS = ("events_per_sec", "keystrokes_per_sec", "wpm")
+
+# Jitter distributions accepted by TokenBucketGovernor
+JITTER_DISTRIBUTIONS = ("none", "uniform", "normal", "exponential")
+
+# Stochastic processes accepted by ActivityProcess
+ACTIVITY_PROCESSES = ("poisson", "hawkes", "onoff")
+
+SECONDS_PER_DAY = 24 * 3600
+
+# Day names accepted in activity calendar rules, mapped to datetime.weekday() values
+DAY_GROUPS = {
+    "mon": {0}, "tue": {1}, "wed": {2}, "thu": {3}, "fri": {4}, "sat": {5}, "sun": {6},
+    "weekdays": {0, 1, 2, 3, 4},
+    "weekends": {5, 6},
+    "daily": {0, 1, 2, 3, 4, 5, 6},
+}
+
+
+def target_rate_to_events_per_sec(target_rate):
+    """
+    Convert a target rate specification to events per second.
+
+    Args:
+        target_rate (float or dict): Either a number of events per second, or a dict
+            with "value" and "unit" keys, where unit is one of RATE_UNITS.
+
+    Returns:
+        float: The target rate in events per second.
+
+    Raises:
+        ValueError: If the unit is unknown or the value is not positive.
+    """
+    if isinstance(target_rate, dict):
+        value = float(target_rate.get("value", 0))
+        unit = target_rate.get("unit", "events_per_sec")
+    else:
+        value = float(target_rate)
+        unit = "events_per_sec"
+
+    if unit not in RATE_UNITS:
+        raise ValueError(f"Unknown target rate unit: {unit}. Expected one of {', '.join(RATE_UNITS)}")
+    if value <= 0:
+        raise ValueError(f"Target rate must be positive, got {value}")
+
+    if unit == "wpm":
+        return value * CHARS_PER_WORD / 60.0
+    return value
+
+
+class UniformIntervals:
+    """
+    Uniformly distributed waits between bursts (the original pacing).
+
+    Attributes:
+        min_interval (float): Minimum time between bursts in seconds.
+        max_interval (float): Maximum time between bursts in seconds.
+    """
+
+    def __init__(self, min_interval, max_interval):
+        """
+        Initialize the interval source.
+
+        Args:
+            min_interval (float): Minimum time between bursts in seconds.
+            max_interval (float): Maximum time between bursts in seconds.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+    def next_interval(self, events):
+        """
+        Get the wait before the next burst.
+
+        Args:
+            events (int): Number of events emitted by the burst that just finished (unused).
+
+        Returns:
+            float: Seconds to wait.
+        """
+        return random.uniform(self.min_interval, self.max_interval)
+
+    def stats(self):
+        """
+        Get the interval source counters.
+
+        Returns:
+            dict: Configuration of the source.
+        """
+        return {"mode": "uniform", "min_interval": self.min_interval, "max_interval": self.max_interval}
+
+
+class TokenBucketGovernor:
+    """
+    Closed-loop pacing that drives the achieved event rate toward a target.
+
+    Tokens accrue at the target rate and every emitted event consumes one. After each
+    burst the governor waits just long enough for the bucket to refill the deficit, so
+    time spent inside a burst (key delays, message processing, backpressure) is
+    automatically subtracted from the following wait. The wait is then scaled by a
+    mean-one jitter factor so that pacing does not look mechanical; any resulting
+    surplus or deficit is carried in the bucket and corrected by later waits.
+
+    Attributes:
+        rate (float): Target rate in events per second.
+        capacity (float): Maximum number of tokens the bucket can hold.
+        jitter (str): Jitter distribution, one of JITTER_DISTRIBUTIONS.
+        jitter_amount (float): Spread of the jitter factor.
+        tokens (float): Current token balance (negative while ahead of the target rate).
+        total_events (int): Events consumed since the governor started.
+        rate_limited (int): Number of bursts that finished with a full bucket, meaning the
+            bursts themselves are too slow to reach the target rate.
+    """
+
+    def __init__(self, rate, capacity=None, jitter="exponential", jitter_amount=0.3):
+        """
+        Initialize the governor.
+
+        Args:
+            rate (float): Target rate in events per second.
+            capacity (float, optional): Bucket size in tokens. Defaults to five seconds of events.
+            jitter (str, optional): Jitter distribution. Defaults to "exponential".
+            jitter_amount (float, optional): Spread of the jitter factor. Defaults to 0.3.
+
+        Raises:
+            ValueError: If the rate is not positive or the jitter distribution is unknown.
+        """
+        if rate <= 0:
+            raise ValueError(f"Target rate must be positive, got {rate}")
+        if jitter not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution: {jitter}. Expected one of {', '.join(JITTER_DISTRIBUTIONS)}")
+
+        self.rate = rate
+        self.capacity = capacity if capacity else max(1.0, rate * 5.0)
+        self.jitter = jitter
+        self.jitter_amount = max(0.0, jitter_amount)
+
+        self.tokens = 0.0
+        self.total_events = 0
+        self.rate_limited = 0
+
+        self._start_time = time.monotonic()
+        self._last_update = self._start_time
+
+    @classmethod
+    def from_config(cls, target_rate):
+        """
+        Create a governor from a "target_rate" configuration value.
+
+        Args:
+            target_rate (float or dict): Target rate specification. A dict may also contain
+                "jitter", "jitter_amount" and "burst_seconds" keys.
+
+        Returns:
+            TokenBucketGovernor: The configured governor.
+        """
+        rate = target_rate_to_events_per_sec(target_rate)
+        if not isinstance(target_rate, dict):
+            return cls(rate)
+        return cls(
+            rate,
+            capacity=rate * target_rate.get("burst_seconds", 5.0),
+            jitter=target_rate.get("jitter", "exponential"),
+            jitter_amount=target_rate.get("jitter_amount", 0.3),
+        )
+
+    def next_interval(self, events):
+        """
+        Consume the tokens for a finished burst and get the wait before the next one.
+
+        Args:
+            events (int): Number of events emitted by the burst that just finished.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_update) * self.rate)
+        self._last_update = now
+
+        self.tokens -= events
+        self.total_events += events
+
+        if self.tokens >= 0:
+            # The burst took longer than its share of the budget; start the next one now
+            if self.tokens >= self.capacity - events:
+                self.rate_limited += 1
+            return 0.0
+
+        return (-self.tokens / self.rate) * self._jitter_factor()
+
+    def achieved_rate(self):
+        """
+        Get the average event rate since the governor started.
+
+        Returns:
+            float: Events per second.
+        """
+        elapsed = time.monotonic() - self._start_time
+        return self.total_events / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        """
+        Get the governor counters.
+
+        Returns:
+            dict: Target and achieved rates and bucket state.
+        """
+        return {
+            "mode": "target_rate",
+            "target_rate": round(self.rate, 3),
+            "achieved_rate": round(self.achieved_rate(), 3),
+            "tokens": round(self.tokens, 2),
+            "total_events": self.total_events,
+            "rate_limited": self.rate_limited,
+        }
+
+    def _jitter_factor(self):
+        """
+        Draw a random factor with mean one from the configured distribution.
+
+        Returns:
+            float: Non-negative scale factor for the next wait.
+        """
+        amount = self.jitter_amount
+        if self.jitter == "none" or amount == 0:
+            return 1.0
+        if self.jitter == "uniform":
+            return random.uniform(max(0.0, 1.0 - amount), 1.0 + amount)
+        if self.jitter == "normal":
+            return max(0.0, random.gauss(1.0, amount))
+        # Exponential: a fixed part plus an exponentially distributed part, mean one
+        amount = min(1.0, amount)
+        return (1.0 - amount) + amount * random.expovariate(1.0)
+
+
+class ActivityProcess:
+    """
+    Bursty inter-burst gaps drawn from a stochastic activity process.
+
+    Gaps are generated ahead of time in fixed-size blocks held in a compact
+    array('d'), so the per-burst scheduling cost is a single index lookup no matter
+    how expensive the process is to simulate. Gaps are measured between burst
+    starts: the time a burst spends emitting is subtracted from the following wait.
+
+    Supported processes:
+        poisson: memoryless arrivals at a constant rate.
+        hawkes: self-exciting arrivals; every burst temporarily raises the rate,
+            producing clusters of activity followed by quiet stretches.
+        onoff: Poisson arrivals during active periods, separated by idle periods,
+            with exponentially distributed period lengths.
+
+    Attributes:
+        process (str): Name of the process, one of ACTIVITY_PROCESSES.
+        rate (float): Base arrival rate in bursts per second.
+        excitation (float): Hawkes branching ratio (expected follow-up bursts per burst, below 1).
+        decay (float): Hawkes excitation decay rate per second.
+        mean_active (float): On/off mean active period length in seconds.
+        mean_idle (float): On/off mean idle period length in seconds.
+        min_gap (float): Smallest gap returned, in seconds.
+        block_size (int): Number of gaps generated per block.
+        blocks_generated (int): Number of blocks generated so far.
+        gaps_used (int): Number of gaps handed to the scheduler.
+    """
+
+    def __init__(self, process="poisson", rate=0.2, excitation=0.5, decay=1.0,
+                 mean_active=300.0, mean_idle=600.0, min_gap=0.0, block_size=256):
+        """
+        Initialize the activity process.
+
+        Args:
+            process (str, optional): Process name. Defaults to "poisson".
+            rate (float, optional): Base arrival rate in bursts per second. Defaults to 0.2.
+            excitation (float, optional): Hawkes branching ratio. Defaults to 0.5.
+            decay (float, optional): Hawkes decay rate per second. Defaults to 1.0.
+            mean_active (float, optional): On/off mean active period in seconds. Defaults to 300.0.
+            mean_idle (float, optional): On/off mean idle period in seconds. Defaults to 600.0.
+            min_gap (float, optional): Smallest gap returned in seconds. Defaults to 0.0.
+            block_size (int, optional): Gaps generated per block. Defaults to 256.
+
+        Raises:
+            ValueError: If the process is unknown or a parameter is out of range.
+        """
+        if process not in ACTIVITY_PROCESSES:
+            raise ValueError(f"Unknown activity process: {process}. Expected one of {', '.join(ACTIVITY_PROCESSES)}")
+        if rate <= 0:
+            raise ValueError(f"Activity rate must be positive, got {rate}")
+        if process == "hawkes" and not (0 <= excitation < 1 and decay > 0):
+            raise ValueError("Hawkes process needs 0 <= excitation < 1 and decay > 0")
+        if process == "onoff" and not (mean_active > 0 and mean_idle >= 0):
+            raise ValueError("On/off process needs mean_active > 0 and mean_idle >= 0")
+
+        self.process = process
+        self.rate = rate
+        self.excitation = excitation
+        self.decay = decay
+        self.mean_active = mean_active
+        self.mean_idle = mean_idle
+        self.min_gap = max(0.0, min_gap)
+        self.block_size = max(1, int(block_size))
+
+        self.blocks_generated = 0
+        self.gaps_used = 0
+
+        # Process state carried across blocks
+        self._excitation_level = 0.0  # Hawkes intensity above the base rate
+        self._active_remaining = random.expovariate(1.0 / mean_active) if process == "onoff" else 0.0
+
+        self._draw = {"poisson": self._draw_poisson, "hawkes": self._draw_hawkes, "onoff": self._draw_onoff}[process]
+        self._block = array("d")
+        self._index = 0
+        self._next_start = None
+
+    @classmethod
+    def from_config(cls, activity_model):
+        """
+        Create an activity process from an "activity_model" configuration value.
+
+        Args:
+            activity_model (dict): Process name and parameters, for example
+                {"process": "hawkes", "rate": 0.1, "excitation": 0.6, "decay": 0.5}.
+
+        Returns:
+            ActivityProcess: The configured process.
+        """
+        known = ("process", "rate", "excitation", "decay", "mean_active", "mean_idle", "min_gap", "block_size")
+        return cls(**{key: value for key, value in activity_model.items() if key in known})
+
+    def next_interval(self, events):
+        """
+        Get the wait before the next burst.
+
+        Args:
+            events (int): Number of events emitted by the burst that just finished (unused).
+
+        Returns:
+            float: Seconds to wait.
+        """
+        if self._index >= len(self._block):
+            self._refill()
+        gap = self._block[self._index]
+        self._index += 1
+        self.gaps_used += 1
+
+        now = time.monotonic()
+        if self._next_start is None:
+            self._next_start = now
+        # Never schedule in the past; a burst that overran its gap delays the timeline
+        self._next_start = max(now, self._next_start + gap)
+        return self._next_start - now
+
+    def stats(self):
+        """
+        Get the activity process counters.
+
+        Returns:
+            dict: Process parameters and generation counters.
+        """
+        return {
+            "mode": "activity",
+            "process": self.process,
+            "rate": self.rate,
+            "blocks_generated": self.blocks_generated,
+            "gaps_used": self.gaps_used,
+        }
+
+    def _refill(self):
+        """
+        Generate the next block of gaps.
+        """
+        draw = self._draw
+        min_gap = self.min_gap
+        self._block = array("d", [max(min_gap, draw()) for _ in range(self.block_size)])
+        self._index = 0
+        self.blocks_generated += 1
+
+    def _draw_poisson(self):
+        """
+        Draw one gap of a Poisson process.
+
+        Returns:
+            float: Gap in seconds.
+        """
+        return random.expovariate(self.rate)
+
+    def _draw_hawkes(self):
+        """
+        Draw one gap of a Hawkes process with an exponential kernel (Ogata thinning).
+
+        Returns:
+            float: Gap in seconds.
+        """
+        gap = 0.0
+        while True:
+            # Intensity only decays between arrivals, so its current value bounds the future
+            bound = self.rate + self._excitation_level
+            step = random.expovariate(bound)
+            gap += step
+            self._excitation_level *= math.exp(-self.decay * step)
+            if random.random() * bound <= self.rate + self._excitation_level:
+                self._excitation_level += self.excitation * self.decay
+                return gap
+
+    def _draw_onoff(self):
+        """
+        Draw one gap of an on/off modulated Poisson process.
+
+        Returns:
+            float: Gap in seconds, including any idle periods crossed.
+        """
+        gap = 0.0
+        while True:
+            step = random.expovariate(self.rate)
+            if step <= self._active_remaining:
+                self._active_remaining -= step
+                return gap + step
+            # The active period ends before the next arrival; sit out an idle period
+            gap += self._active_remaining
+            if self.mean_idle > 0:
+                gap += random.expovariate(1.0 / self.mean_idle)
+            self._active_remaining = random.expovariate(1.0 / self.mean_active)
+
+
+class ActivityCalendar:
+    """
+    Time-of-day activity schedule that modulates event rates over multi-day runs.
+
+    The calendar is a list of rules, each covering some days of the week and a time
+    window with a rate multiplier. Later rules override earlier ones, so a lunch dip
+    can be layered over working hours. Outside every rule the default rate applies;
+    a multiplier of 0 means the tester is idle.
+
+    Waits from an interval source are treated as "activity time" that passes at the
+    current multiplier: at 0.5 a 10 second gap takes 20 seconds of wall time, and idle
+    windows are skipped entirely. Because the wake-up instant is computed directly,
+    the testing loop can sleep through an idle window in a single wait.
+
+    Attributes:
+        rules (list): Parsed rules as (weekday set, start second, end second, multiplier).
+        default_rate (float): Multiplier outside every rule.
+    """
+
+    def __init__(self, rules, default_rate=0.0):
+        """
+        Initialize the calendar.
+
+        Args:
+            rules (list): Rule dicts with "days", "start", "end" and "rate" keys. Days are
+                names ("mon".."sun") or "daily", "weekdays" or "weekends"; start and end are
+                "HH:MM" strings, with "24:00" allowed as an end.
+            default_rate (float, optional): Multiplier outside every rule. Defaults to 0.0.
+
+        Raises:
+            ValueError: If a rule is malformed.
+        """
+        if default_rate < 0:
+            raise ValueError(f"default_rate must not be negative, got {default_rate}")
+        self.rules = [self._parse_rule(rule) for rule in rules]
+        self.default_rate = default_rate
+
+    @classmethod
+    def from_config(cls, activity_calendar):
+        """
+        Create a calendar from an "activity_calendar" configuration value.
+
+        Args:
+            activity_calendar (dict): Dict with a "rules" list and optional "default_rate".
+
+        Returns:
+            ActivityCalendar: The configured calendar.
+        """
+        return cls(activity_calendar.get("rules", []), activity_calendar.get("default_rate", 0.0))
+
+    def rate_multiplier(self, when):
+        """
+        Get the rate multiplier in effect at a given time.
+
+        Args:
+            when (datetime): Local time to check.
+
+        Returns:
+            float: The multiplier (0 when idle).
+        """
+        return self._segment(when)[0]
+
+    def next_active_time(self, when):
+        """
+        Get the first instant at or after a given time when the tester is active.
+
+        Args:
+            when (datetime): Local time to start from.
+
+        Returns:
+            datetime: The next active instant, or None if the calendar is never active.
+        """
+        return self.advance(when, 0.0)
+
+    def advance(self, when, activity_seconds):
+        """
+        Get the wall-clock time at which a given amount of activity time has elapsed.
+
+        Args:
+            when (datetime): Local time to start from.
+            activity_seconds (float): Activity time to let pass, in seconds.
+
+        Returns:
+            datetime: The resulting local time, or None if the calendar is never active.
+        """
+        current = when
+        remaining = activity_seconds
+        # A week always repeats, so eight days of segments is enough to find activity
+        for _ in range(8 * (2 * len(self.rules) + 2)):
+            multiplier, segment_end = self._segment(current)
+            if multiplier > 0:
+                available = (segment_end - current).total_seconds() * multiplier
+                if remaining <= available:
+                    return current + timedelta(seconds=remaining / multiplier)
+                remaining -= available
+            current = segment_end
+        return None
+
+    def _segment(self, when):
+        """
+        Find the multiplier at a given time and the end of the constant-rate segment.
+
+        Args:
+            when (datetime): Local time to check.
+
+        Returns:
+            tuple: (multiplier, datetime at which the segment ends).
+        """
+        weekday = when.weekday()
+        midnight = datetime.combine(when.date(), dt_time())
+        second = (when - midnight).total_seconds()
+
+        multiplier = self.default_rate
+        segment_end = SECONDS_PER_DAY
+        for days, start, end, rate in self.rules:
+            if weekday not in days:
+                continue
+            if start <= second < end:
+                multiplier = rate
+            for boundary in (start, end):
+                if second < boundary < segment_end:
+                    segment_end = boundary
+
+        return multiplier, midnight + timedelta(seconds=segment_end)
+
+    @staticmethod
+    def _parse_rule(rule):
+        """
+        Parse one calendar rule.
+
+        Args:
+            rule (dict): Rule with "days", "start", "end" and "rate" keys.
+
+        Returns:
+            tuple: (weekday set, start second, end second, multiplier).
+
+        Raises:
+            ValueError: If the rule is malformed.
+        """
+        days = rule.get("days", "daily")
+        if isinstance(days, str):
+            days = [days]
+        weekdays = set()
+        for day in days:
+            day = str(day).lower()
+            if day not in DAY_GROUPS:
+                raise ValueError(f"Unknown day in activity calendar: {day}")
+            weekdays.update(DAY_GROUPS[day])
+
+        start = ActivityCalendar._parse_time(rule.get("start", "00:00"))
+        end = ActivityCalendar._parse_time(rule.get("end", "24:00"))
+        if start >= end:
+            raise ValueError(f"Calendar rule must end after it starts: {rule}")
+
+        rate = float(rule.get("rate", 1.0))
+        if rate < 0:
+            raise ValueError(f"Calendar rate must not be negative: {rule}")
+        return weekdays, start, end, rate
+
+    @staticmethod
+    def _parse_time(value):
+        """
+        Parse an "HH:MM" string into seconds since midnight.
+
+        Args:
+            value (str): Time of day; "24:00" is accepted as the end of the day.
+
+        Returns:
+            int: Seconds since midnight.
+
+        Raises:
+            ValueError: If the time is malformed.
+        """
+        try:
+            hours, minutes = (int(part) for part in str(value).split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid time of day in activity calendar: {value}") from None
+        seconds = hours * 3600 + minutes * 60
+        if not (0 <= minutes < 60 and 0 <= seconds <= SECONDS_PER_DAY):
+            raise ValueError(f"Invalid time of day in activity calendar: {value}")
+        return seconds
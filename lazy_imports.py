@@ -0,0 +1,117 @@
+# lazy_imports.py
+import importlib
+import sys
+import threading
+
+"""
+LazyImports - Import modules on first use instead of at import time.
+
+The tester modules depend on pywin32, psutil and parts of the standard library
+that take noticeable time to load but are only needed once a tester is built or a
+feature is enabled. A module bound with lazy_import() is a placeholder that imports
+the real module the first time one of its attributes is used, so importing a tester
+module (to build a command-line parser, load a class in a runtime or measure it)
+costs only what is actually used.
+
+Attributes of the real module are copied onto the placeholder as they are used,
+so later lookups cost the same as on the module itself. Assigning an attribute on
+the placeholder assigns it on the real module.
+"""
+
+# Placeholders by module name, so every user of a module shares one placeholder
+_placeholders = {}
+_placeholders_lock = threading.Lock()
+
+
+class LazyModule:
+    """
+    Placeholder for a module that is imported when one of its attributes is first used.
+
+    Attributes:
+        lazy_name (str): Name of the module.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize the LazyModule.
+
+        Args:
+            name (str): Name of the module, such as "psutil" or "multiprocessing.connection".
+        """
+        object.__setattr__(self, "lazy_name", name)
+        object.__setattr__(self, "_lazy_module", None)
+
+    def lazy_load(self):
+        """
+        Import the module if it has not been imported yet.
+
+        Returns:
+            module: The real module.
+
+        Raises:
+            ImportError: If the module cannot be imported.
+        """
+        module = self._lazy_module
+        if module is None:
+            module = importlib.import_module(self.lazy_name)
+            object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    def __getattr__(self, attribute):
+        """
+        Look up an attribute of the real module, importing it if needed.
+
+        Only called for attributes the placeholder does not have yet.
+
+        Args:
+            attribute (str): Name of the attribute.
+
+        Returns:
+            object: The attribute's value.
+        """
+        value = getattr(self.lazy_load(), attribute)
+        object.__setattr__(self, attribute, value)
+        return value
+
+    def __setattr__(self, attribute, value):
+        """
+        Set an attribute on the real module, importing it if needed.
+
+        Args:
+            attribute (str): Name of the attribute.
+            value (object): The new value.
+        """
+        setattr(self.lazy_load(), attribute, value)
+        object.__setattr__(self, attribute, value)
+
+    def __repr__(self):
+        """
+        Describe the placeholder.
+
+        Returns:
+            str: The module name and whether it has been imported.
+        """
+        state = "imported" if self._lazy_module is not None else "not imported"
+        return f"<lazy module {self.lazy_name!r} ({state})>"
+
+
+def lazy_import(name):
+    """
+    Get a module that is imported when it is first used.
+
+    Args:
+        name (str): Name of the module.
+
+    Returns:
+        object: The module itself if it has already been imported, otherwise a shared
+            LazyModule placeholder for it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _placeholders_lock:
+        placeholder = _placeholders.get(name)
+        if placeholder is None:
+            placeholder = _placeholders[name] = LazyModule(name)
+        return placeholder
+
@@ -0,0 +1,378 @@
+# leak_detector.py
+import argparse
+import logging
+import os
+import time
+import tracemalloc
+from collections import deque
+
+"""
+LeakDetector - Find the allocation sites behind memory growth in long runs.
+
+The testers recycle their window every few minutes because of suspected leaks,
+and multi-day runs still end with more memory than they started with. The
+detector tells where that memory went. It traces Python allocations with
+tracemalloc, snapshots them at each check, and reports the allocation sites that
+grew the most since the previous check and since the run started. It also fits a
+line through the recent resident-set-size samples, and flags sustained growth
+when the slope stays above a threshold.
+
+Growth since the start is split by origin:
+    tester      Allocations made by the tester modules themselves
+    logging     Allocations made by the logging package (records, handlers, buffers)
+    python      Allocations made by the rest of the standard library and other packages
+    untraced    RSS growth that tracemalloc does not see: memory allocated by Windows,
+                pywin32, the C runtime or heap fragmentation
+
+Tracing costs memory and slows allocation-heavy code, so the detector is only
+started when "leak_detection" is configured. Run this file directly for a soak
+run of a tester against the headless stand-in window used by the benchmark
+suite. The soak run works on Linux as well as Windows:
+
+    python leak_detector.py --kind keyboard --duration 600 --interval 30
+"""
+
+# Number of RSS samples the growth slope is fitted to
+SLOPE_WINDOW = 12
+
+# Allocations that say nothing about the testers, including the detector's own reports
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, f"*{os.path.basename(__file__)}"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# Directory of the tester modules, whose allocations count as "tester"
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory of the logging package, whose allocations count as "logging"
+LOGGING_DIR = os.path.dirname(os.path.abspath(logging.__file__))
+
+
+def growth_slope(samples):
+    """
+    Fit a least-squares line through (time, megabytes) samples.
+
+    Args:
+        samples (sequence): (time.time(), megabytes) pairs.
+
+    Returns:
+        float: Growth in megabytes per hour, or 0.0 with fewer than two distinct times.
+    """
+    if len(samples) < 2:
+        return 0.0
+    start = samples[0][0]
+    hours = [(t - start) / 3600.0 for t, _ in samples]
+    values = [mb for _, mb in samples]
+    mean_hours = sum(hours) / len(hours)
+    mean_value = sum(values) / len(values)
+    variance = sum((h - mean_hours) ** 2 for h in hours)
+    if variance == 0:
+        return 0.0
+    covariance = sum((h - mean_hours) * (v - mean_value) for h, v in zip(hours, values))
+    return covariance / variance
+
+
+def allocation_origin(filename):
+    """
+    Classify an allocation site by the file that made it.
+
+    Args:
+        filename (str): File name of the allocating frame.
+
+    Returns:
+        str: "tester", "logging" or "python".
+    """
+    if filename.startswith("<"):
+        return "python"  # Frozen and generated code
+    path = os.path.abspath(filename)
+    if path.startswith(LOGGING_DIR + os.sep):
+        return "logging"
+    if os.path.dirname(path) == SOURCE_DIR:
+        return "tester"
+    return "python"
+
+
+def site_name(frame):
+    """
+    Describe an allocating frame briefly.
+
+    Args:
+        frame (tracemalloc.Frame): The frame.
+
+    Returns:
+        str: "file.py:line" for tester modules, "package/file.py:line" for others.
+    """
+    if frame.filename.startswith("<"):
+        return f"{frame.filename}:{frame.lineno}"
+    path = os.path.abspath(frame.filename)
+    if os.path.dirname(path) == SOURCE_DIR:
+        return f"{os.path.basename(path)}:{frame.lineno}"
+    parent = os.path.basename(os.path.dirname(path))
+    return f"{parent}/{os.path.basename(path)}:{frame.lineno}"
+
+
+class LeakDetector:
+    """
+    Compare tracemalloc snapshots and RSS samples to locate memory growth.
+
+    Attributes:
+        frames (int): Frames stored per traced allocation.
+        top_sites (int): Number of growing allocation sites reported per check.
+        growth_threshold (float): RSS growth in MB per hour above which growth counts as sustained.
+        slope_window (int): Number of RSS samples the growth slope is fitted to.
+        checks (int): Number of checks since the detector was started.
+        last_report (dict): Report of the latest check, or None.
+    """
+
+    def __init__(self, frames=1, top_sites=10, growth_threshold=20.0, slope_window=SLOPE_WINDOW):
+        """
+        Initialize the LeakDetector.
+
+        Args:
+            frames (int, optional): Frames stored per traced allocation. Defaults to 1.
+            top_sites (int, optional): Growing sites reported per check. Defaults to 10.
+            growth_threshold (float, optional): Sustained-growth threshold in MB per hour.
+                Defaults to 20.0.
+            slope_window (int, optional): RSS samples the slope is fitted to. Defaults to SLOPE_WINDOW.
+        """
+        self.frames = frames
+        self.top_sites = top_sites
+        self.growth_threshold = growth_threshold
+        self.slope_window = slope_window
+        self.checks = 0
+        self.last_report = None
+        self._baseline = None
+        self._previous = None
+        self._start_rss = None
+        self._rss_samples = deque(maxlen=slope_window)
+        self._started_tracing = False
+
+    @property
+    def tracing(self):
+        """
+        Check whether the detector has a baseline to compare against.
+
+        Returns:
+            bool: True between start() and stop().
+        """
+        return self._baseline is not None
+
+    def start(self, rss_mb=None):
+        """
+        Start tracing, if it is not on already, and take the baseline snapshot.
+
+        Args:
+            rss_mb (float, optional): Current resident set size in megabytes.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.checks = 0
+        self.last_report = None
+        self._rss_samples.clear()
+        self._start_rss = rss_mb
+        if rss_mb is not None:
+            self._rss_samples.append((time.time(), rss_mb))
+        self._baseline = self._previous = self.take_snapshot()
+
+    def stop(self):
+        """
+        Stop tracing, if this detector started it, and release the snapshots.
+        """
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        self._baseline = self._previous = None
+
+    @staticmethod
+    def take_snapshot():
+        """
+        Take a snapshot of the traced allocations, without the detector's own.
+
+        Returns:
+            tracemalloc.Snapshot: The filtered snapshot.
+        """
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def growing_sites(self, snapshot, reference):
+        """
+        Get the allocation sites that grew the most between two snapshots.
+
+        Args:
+            snapshot (tracemalloc.Snapshot): The newer snapshot.
+            reference (tracemalloc.Snapshot): The older snapshot.
+
+        Returns:
+            list: Dicts with "site", "origin", "size_kb", "size_diff_kb", "count_diff" and,
+                when more than one frame is traced, "stack" (most recent frame first).
+        """
+        key_type = "traceback" if self.frames > 1 else "lineno"
+        sites = []
+        for stat in snapshot.compare_to(reference, key_type):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[-1]
+            entry = {
+                "site": site_name(frame),
+                "origin": allocation_origin(frame.filename),
+                "size_kb": round(stat.size / 1024, 1),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+            }
+            if self.frames > 1:
+                entry["stack"] = [site_name(f) for f in reversed(stat.traceback)]
+            sites.append(entry)
+            if len(sites) >= self.top_sites:
+                break
+        return sites
+
+    def growth_by_origin(self, snapshot):
+        """
+        Total the traced growth since the baseline by origin.
+
+        Args:
+            snapshot (tracemalloc.Snapshot): The newer snapshot.
+
+        Returns:
+            dict: Origin to growth in megabytes.
+        """
+        growth = {"tester": 0, "logging": 0, "python": 0}
+        for stat in snapshot.compare_to(self._baseline, "filename"):
+            growth[allocation_origin(stat.traceback[-1].filename)] += stat.size_diff
+        return {origin: round(size / (1024 * 1024), 3) for origin, size in growth.items()}
+
+    def check(self, rss_mb=None):
+        """
+        Snapshot the traced allocations and compare them with the previous check and the baseline.
+
+        Args:
+            rss_mb (float, optional): Current resident set size in megabytes.
+
+        Returns:
+            dict: The report: traced and RSS sizes, the RSS growth slope, whether growth is
+                sustained, growth since the start by origin, and the top growing sites since
+                the previous check and since the start.
+
+        Raises:
+            RuntimeError: If the detector has not been started.
+        """
+        if not self.tracing:
+            raise RuntimeError("the leak detector has not been started")
+
+        snapshot = self.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        self.checks += 1
+
+        if rss_mb is not None:
+            self._rss_samples.append((time.time(), rss_mb))
+            if self._start_rss is None:
+                self._start_rss = rss_mb
+        slope = growth_slope(self._rss_samples)
+        sustained = len(self._rss_samples) >= self.slope_window and slope > self.growth_threshold
+
+        growth = self.growth_by_origin(snapshot)
+        growth["traced"] = round(sum(growth.values()), 3)
+        if rss_mb is not None:
+            growth["rss"] = round(rss_mb - self._start_rss, 3)
+            growth["untraced"] = round(growth["rss"] - growth["traced"], 3)
+
+        report = {
+            "check": self.checks,
+            "rss_mb": round(rss_mb, 2) if rss_mb is not None else None,
+            "traced_mb": round(traced / (1024 * 1024), 3),
+            "traced_peak_mb": round(peak / (1024 * 1024), 3),
+            "rss_slope_mb_per_hour": round(slope, 3),
+            "sustained_growth": sustained,
+            "growth_since_start_mb": growth,
+            "top_growth": self.growing_sites(snapshot, self._previous),
+            "top_growth_since_start": self.growing_sites(snapshot, self._baseline),
+        }
+        self._previous = snapshot
+        self.last_report = report
+        return report
+
+    def summary(self):
+        """
+        Summarize the detector's findings for the run summary.
+
+        Returns:
+            dict: The latest report without the per-check growth list, plus the settings,
+                or None if no check has run.
+        """
+        if self.last_report is None:
+            return None
+        summary = {key: value for key, value in self.last_report.items() if key != "top_growth"}
+        summary["checks"] = summary.pop("check")
+        summary["growth_threshold_mb_per_hour"] = self.growth_threshold
+        return summary
+
+
+def describe_report(report, sites=5):
+    """
+    Describe a report in a few log lines.
+
+    Args:
+        report (dict): Report from LeakDetector.check().
+        sites (int, optional): Number of growing sites to list. Defaults to 5.
+
+    Returns:
+        list: The lines.
+    """
+    growth = report["growth_since_start_mb"]
+    lines = [
+        f"Memory check {report['check']}: RSS {report['rss_mb']} MB, traced {report['traced_mb']} MB, "
+        f"RSS slope {report['rss_slope_mb_per_hour']:+.2f} MB/h; growth since start (MB): "
+        + ", ".join(f"{origin} {value:+.3f}" for origin, value in growth.items())
+    ]
+    for entry in report["top_growth"][:sites]:
+        lines.append(f"  {entry['size_diff_kb']:+.1f} KB ({entry['count_diff']:+d} blocks) at "
+                     f"{entry['site']} [{entry['origin']}]")
+    return lines
+
+
+if __name__ == "__main__":
+    """
+    Soak-run a tester against the headless stand-in window and report memory growth.
+
+    Example:
+        python leak_detector.py --kind mouse --duration 300 --interval 15 --frames 5
+    """
+    import tempfile
+    from benchmark_suite import HeadlessWin32gui, create_headless_tester, load_win32gui, sleeps_disabled
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Leak detection soak run")
+    parser.add_argument("--kind", choices=("keyboard", "mouse"), default="keyboard", help="Tester to run")
+    parser.add_argument("--duration", type=float, default=120.0, help="Seconds to run for")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between memory checks")
+    parser.add_argument("--frames", type=int, default=1, help="Frames stored per traced allocation")
+    parser.add_argument("--top", type=int, default=10, help="Growing allocation sites reported per check")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="RSS growth in MB per hour that counts as sustained")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, sleeps_disabled():
+        tester, _ = create_headless_tester("1.8", args.kind, HeadlessWin32gui(load_win32gui()), directory)
+        tester.config = dict(tester.config, leak_detection=True, leak_check_interval=args.interval,
+                             leak_trace_frames=args.frames, leak_top_sites=args.top,
+                             leak_growth_threshold=args.threshold, resource_monitor_interval=args.interval)
+        tester.prepare_run(seed=args.seed)
+        deadline = time.time() + args.duration
+        reported = 0
+        while time.time() < deadline:
+            tester.run_burst()
+            detector = tester.leak_detector
+            if detector.checks > reported:
+                reported = detector.checks
+                for line in describe_report(detector.last_report):
+                    print(line)
+        summary = tester.finish_run()
+
+    memory = summary["memory"] or {}
+    print(f"\n{tester.event_count} events; sustained growth: {memory.get('sustained_growth')}, "
+          f"RSS slope {memory.get('rss_slope_mb_per_hour')} MB/h")
+    for entry in memory.get("top_growth_since_start", []):
+        print(f"  {entry['size_diff_kb']:+.1f} KB since start at {entry['site']} [{entry['origin']}]")
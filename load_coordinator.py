@@ -0,0 +1,895 @@
+# load_coordinator.py
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import psutil
+from fleet_runner import FleetRunner, create_testers, create_runner, snapshot_testers, DEFAULT_REPORT_INTERVAL
+
+"""
+Load coordinator - run tester fleets on several machines as one test.
+
+A coordinator hands tester configurations, seeds and run bounds to agent processes,
+which may run on other machines. Before anything starts it estimates each agent's
+clock offset (NTP-style, keeping the ping with the shortest round trip), then
+releases every agent at the same coordinator-clock instant, translated into the
+agent's own clock. While the test runs, agents stream counter snapshots; at the end
+they send their run summaries and captured log records, which the coordinator
+merges into one summary and one trace on the coordinator's clock.
+
+Agents wrap the usual tester lifecycle: one tester runs through start_testing(),
+several share a MultiTesterRuntime. The transport is pluggable; SocketTransport
+connects agents on other machines, and LocalProcessTransport runs agents as local
+processes (with optional artificial clock skew) to exercise the protocol on one box.
+
+Messages are JSON-compatible dictionaries with a "type" key:
+    agent -> coordinator: hello, pong, ready, counters, final, error
+    coordinator -> agent: ping, assign, start, stop, release
+"""
+
+# Default TCP port of the coordinator
+DEFAULT_PORT = 7400
+
+# Number of clock-offset pings per agent
+DEFAULT_SYNC_ROUNDS = 8
+
+# Seconds between the last agent reporting ready and the common start
+DEFAULT_START_DELAY = 3.0
+
+# Largest number of log records an agent keeps for the merged trace
+TRACE_CAPACITY = 100000
+
+
+class LocalProcessTransport:
+    """
+    Coordinator transport that runs agents as local processes.
+
+    Messages travel over multiprocessing queues. Each agent can be given an artificial
+    clock skew so that clock synchronization can be tested on a single machine.
+
+    Attributes:
+        agents (int): Number of agents.
+        clock_skews (list): Clock skew of each agent in seconds.
+    """
+
+    def __init__(self, agents, clock_skews=None):
+        """
+        Initialize the LocalProcessTransport.
+
+        Args:
+            agents (int): Number of agent processes to start.
+            clock_skews (list, optional): Clock skew of each agent in seconds. Defaults to none.
+        """
+        self.agents = agents
+        self.clock_skews = list(clock_skews or []) + [0.0] * agents
+        self._context = multiprocessing.get_context()
+        self._inbox = None
+        self._outboxes = []
+        self._processes = []
+
+    def start(self, timeout=None):
+        """
+        Start the agent processes.
+
+        Args:
+            timeout (float, optional): Unused; local agents are always available.
+
+        Returns:
+            list: Agent identifiers.
+        """
+        self._inbox = self._context.Queue()
+        for agent_id in range(self.agents):
+            outbox = self._context.Queue()
+            channel = QueueChannel(agent_id, outbox, self._inbox)
+            process = self._context.Process(target=run_agent, args=(channel, self.clock_skews[agent_id]),
+                                            name=f"tester-agent-{agent_id}")
+            process.daemon = True
+            process.start()
+            self._outboxes.append(outbox)
+            self._processes.append(process)
+        return list(range(self.agents))
+
+    def send(self, agent_id, message):
+        """
+        Send a message to an agent.
+
+        Args:
+            agent_id (int): Agent identifier.
+            message (dict): Message to send.
+        """
+        self._outboxes[agent_id].put(message)
+
+    def receive(self, timeout=None):
+        """
+        Receive the next message from any agent.
+
+        Args:
+            timeout (float, optional): Longest wait in seconds.
+
+        Returns:
+            tuple: (agent identifier, message), or None if nothing arrived in time.
+        """
+        try:
+            return self._inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """
+        Wait for the agent processes to exit.
+        """
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+
+
+class QueueChannel:
+    """
+    Agent end of a LocalProcessTransport.
+    """
+
+    def __init__(self, agent_id, inbox, outbox):
+        """
+        Initialize the QueueChannel.
+
+        Args:
+            agent_id (int): Identifier of the agent.
+            inbox (multiprocessing.Queue): Messages from the coordinator.
+            outbox (multiprocessing.Queue): Messages to the coordinator.
+        """
+        self.agent_id = agent_id
+        self.inbox = inbox
+        self.outbox = outbox
+
+    def send(self, message):
+        """
+        Send a message to the coordinator.
+
+        Args:
+            message (dict): Message to send.
+        """
+        self.outbox.put((self.agent_id, message))
+
+    def receive(self, timeout=None):
+        """
+        Receive the next message from the coordinator.
+
+        Args:
+            timeout (float, optional): Longest wait in seconds.
+
+        Returns:
+            dict: The message, or None if nothing arrived in time.
+        """
+        try:
+            return self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """
+        Release the channel.
+        """
+
+
+class SocketTransport:
+    """
+    Coordinator transport for agents on other machines.
+
+    The coordinator listens on a TCP port and waits for the expected number of agents
+    to connect. Messages are sent as one JSON document per line.
+
+    Attributes:
+        agents (int): Number of agents to wait for.
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+    """
+
+    def __init__(self, agents, host="0.0.0.0", port=DEFAULT_PORT):
+        """
+        Initialize the SocketTransport.
+
+        Args:
+            agents (int): Number of agents to wait for.
+            host (str, optional): Address to listen on. Defaults to all interfaces.
+            port (int, optional): Port to listen on. Defaults to 7400.
+        """
+        self.agents = agents
+        self.host = host
+        self.port = port
+        self._inbox = queue.Queue()
+        self._connections = []
+        self._send_lock = threading.Lock()
+        self._server = None
+
+    def start(self, timeout=None):
+        """
+        Listen and wait for every agent to connect.
+
+        Args:
+            timeout (float, optional): Longest wait for all agents, in seconds.
+
+        Returns:
+            list: Identifiers of the connected agents.
+
+        Raises:
+            TimeoutError: If not every agent connected in time.
+        """
+        self._server = socket.create_server((self.host, self.port))
+        self._server.settimeout(timeout)
+        for agent_id in range(self.agents):
+            try:
+                connection, _ = self._server.accept()
+            except socket.timeout:
+                raise TimeoutError(f"Only {agent_id} of {self.agents} agents connected")
+            connection.settimeout(None)
+            self._connections.append(connection)
+            reader = threading.Thread(target=self._read, args=(agent_id, connection))
+            reader.daemon = True
+            reader.start()
+        return list(range(self.agents))
+
+    def _read(self, agent_id, connection):
+        """
+        Forward the messages of one agent to the inbox until it disconnects.
+        """
+        try:
+            for line in connection.makefile("r", encoding="utf-8"):
+                if line.strip():
+                    self._inbox.put((agent_id, json.loads(line)))
+        except (OSError, ValueError):
+            pass
+        self._inbox.put((agent_id, {"type": "error", "error": "agent disconnected"}))
+
+    def send(self, agent_id, message):
+        """
+        Send a message to an agent.
+
+        Args:
+            agent_id (int): Agent identifier.
+            message (dict): Message to send.
+        """
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._send_lock:
+            try:
+                self._connections[agent_id].sendall(data)
+            except OSError as e:
+                logging.getLogger().error(f"Error sending to agent {agent_id}: {e}")
+
+    def receive(self, timeout=None):
+        """
+        Receive the next message from any agent.
+
+        Args:
+            timeout (float, optional): Longest wait in seconds.
+
+        Returns:
+            tuple: (agent identifier, message), or None if nothing arrived in time.
+        """
+        try:
+            return self._inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """
+        Close every connection and the listening socket.
+        """
+        for connection in self._connections:
+            try:
+                connection.close()
+            except OSError:
+                pass
+        if self._server is not None:
+            self._server.close()
+
+
+class SocketChannel:
+    """
+    Agent end of a SocketTransport.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=60.0):
+        """
+        Connect to the coordinator.
+
+        Args:
+            host (str): Coordinator address.
+            port (int, optional): Coordinator port. Defaults to 7400.
+            timeout (float, optional): Connection timeout in seconds. Defaults to 60.
+        """
+        self._connection = socket.create_connection((host, port), timeout=timeout)
+        self._connection.settimeout(None)
+        self._inbox = queue.Queue()
+        self._send_lock = threading.Lock()
+        reader = threading.Thread(target=self._read)
+        reader.daemon = True
+        reader.start()
+
+    def _read(self):
+        """
+        Forward the coordinator's messages to the inbox until it disconnects.
+        """
+        try:
+            for line in self._connection.makefile("r", encoding="utf-8"):
+                if line.strip():
+                    self._inbox.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        self._inbox.put({"type": "stop", "reason": "coordinator_disconnected"})
+
+    def send(self, message):
+        """
+        Send a message to the coordinator.
+
+        Args:
+            message (dict): Message to send.
+        """
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._send_lock:
+            self._connection.sendall(data)
+
+    def receive(self, timeout=None):
+        """
+        Receive the next message from the coordinator.
+
+        Args:
+            timeout (float, optional): Longest wait in seconds.
+
+        Returns:
+            dict: The message, or None if nothing arrived in time.
+        """
+        try:
+            return self._inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        try:
+            self._connection.close()
+        except OSError:
+            pass
+
+
+class TraceHandler(logging.Handler):
+    """
+    Logging handler that keeps recent log records for the merged trace.
+
+    Attributes:
+        clock_skew (float): Added to record times so that they are on the agent's clock.
+        records (deque): (agent time, level, message) tuples.
+    """
+
+    def __init__(self, clock_skew=0.0, capacity=TRACE_CAPACITY):
+        """
+        Initialize the TraceHandler.
+
+        Args:
+            clock_skew (float, optional): Agent clock skew in seconds. Defaults to 0.
+            capacity (int, optional): Largest number of records kept. Defaults to 100000.
+        """
+        super().__init__()
+        self.clock_skew = clock_skew
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        """
+        Keep a log record.
+
+        Args:
+            record (logging.LogRecord): The record.
+        """
+        try:
+            self.records.append((record.created + self.clock_skew, record.levelname, record.getMessage()))
+        except Exception:
+            self.handleError(record)
+
+
+def run_agent(channel, clock_skew=0.0):
+    """
+    Run one agent: answer clock pings, create the assigned testers, start them at the
+    common start time and report counters, the run summary and the trace.
+
+    Args:
+        channel (object): Agent end of a transport (QueueChannel or SocketChannel).
+        clock_skew (float, optional): Artificial clock skew in seconds, for testing. Defaults to 0.
+    """
+    def clock():
+        """
+        Get the agent's clock time.
+        """
+        return time.time() + clock_skew
+
+    channel.send({"type": "hello", "host": socket.gethostname(), "pid": os.getpid(), "time": clock()})
+
+    testers = None
+    start = stop_runner = None
+    assignment = None
+    config_dir = tempfile.mkdtemp(prefix="tester_agent_")
+
+    # Handshake: answer pings until the coordinator says when to start
+    while True:
+        message = channel.receive(timeout=1.0)
+        if message is None:
+            continue
+        kind = message.get("type")
+        if kind == "ping":
+            channel.send({"type": "pong", "t0": message["t0"], "t1": clock()})
+        elif kind == "assign":
+            assignment = message
+            try:
+                testers = create_testers(write_agent_configs(config_dir, message["testers"]))
+                start, stop_runner = create_runner(testers)
+            except Exception as e:
+                channel.send({"type": "error", "error": f"{type(e).__name__}: {e}"})
+                return
+            channel.send({"type": "ready"})
+        elif kind == "start" and start is not None:
+            start_at = message["start_at"]
+            break
+        elif kind in ("stop", "release"):
+            channel.close()
+            return
+
+    # Capture log records for the merged trace (after the testers configured logging)
+    trace = TraceHandler(clock_skew)
+    logging.getLogger().addHandler(trace)
+
+    process = psutil.Process(os.getpid())
+    report_interval = assignment.get("report_interval", DEFAULT_REPORT_INTERVAL)
+    done = threading.Event()
+
+    def control_loop():
+        """
+        Stream counters and handle stop messages while the testers run.
+        """
+        process.cpu_percent(interval=None)
+        next_report = time.time() + report_interval
+        while not done.is_set():
+            message = channel.receive(timeout=0.1)
+            if message and message.get("type") == "stop":
+                stop_runner(message.get("reason", "coordinator_stop"))
+            elif message and message.get("type") == "ping":
+                channel.send({"type": "pong", "t0": message["t0"], "t1": clock()})
+            if time.time() >= next_report:
+                channel.send({"type": "counters", "snapshot": snapshot_testers(testers, process)})
+                next_report += report_interval
+
+    controller = threading.Thread(target=control_loop)
+    controller.daemon = True
+    controller.start()
+
+    # Wait for the common start time on the agent's clock
+    while clock() < start_at and not done.is_set():
+        time.sleep(min(0.05, max(0.0, start_at - clock())))
+    started_at = clock()
+
+    bounds = assignment.get("bounds", {})
+    summary = None
+    try:
+        summary = start(
+            max_events=bounds.get("max_events"),
+            max_duration=bounds.get("max_duration"),
+            max_bursts=bounds.get("max_bursts"),
+            seed=assignment["seed"],
+        )
+    except Exception as e:
+        channel.send({"type": "error", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        done.set()
+        controller.join(timeout=1.0)
+        logging.getLogger().removeHandler(trace)
+
+    channel.send({
+        "type": "final",
+        "snapshot": snapshot_testers(testers, process),
+        "summary": summary,
+        "started_at": started_at,
+        "trace": list(trace.records),
+    })
+    channel.close()
+
+
+def write_agent_configs(config_dir, testers):
+    """
+    Write the configuration text received from the coordinator to local files.
+
+    Args:
+        config_dir (str): Directory for the files.
+        testers (list): (kind, configuration text) pairs; the text may be None.
+
+    Returns:
+        list: (kind, config file) pairs for create_testers().
+    """
+    assignments = []
+    for index, (kind, config_text) in enumerate(testers):
+        config_file = None
+        if config_text is not None:
+            config_file = os.path.join(config_dir, f"{kind}_{index}.config.json")
+            with open(config_file, "w") as f:
+                f.write(config_text)
+        assignments.append((kind, config_file))
+    return assignments
+
+
+class LoadCoordinator(FleetRunner):
+    """
+    Coordinate tester agents on several machines.
+
+    Workers of the underlying FleetRunner are agents reached through a transport, so
+    the live view, snapshot merging and fleet summary are shared with the fleet runner.
+
+    Attributes:
+        transport (object): Coordinator end of a transport.
+        agents (list): Agent identifiers.
+        hosts (dict): Host name and process id per agent.
+        clock_offsets (dict): Estimated agent clock minus coordinator clock, per agent.
+        round_trips (dict): Round-trip time of the best clock ping, per agent.
+        start_times (dict): Actual start time per agent, on the coordinator's clock.
+        traces (dict): Log records per agent, on the coordinator's clock.
+        start_at (float): Common start time on the coordinator's clock.
+    """
+
+    def __init__(self, transport, testers, seed=None, max_events=None, max_duration=None, max_bursts=None,
+                 report_interval=DEFAULT_REPORT_INTERVAL, sync_rounds=DEFAULT_SYNC_ROUNDS,
+                 start_delay=DEFAULT_START_DELAY, connect_timeout=300.0):
+        """
+        Initialize the LoadCoordinator.
+
+        Args:
+            transport (object): Coordinator end of a transport.
+            testers (list): (kind, config file) pairs, dealt to the agents in turn.
+            seed (int, optional): Fleet seed; agent seeds are derived from it.
+            max_events (int, optional): Stop each agent after this many events.
+            max_duration (float, optional): Stop each agent after this many seconds.
+            max_bursts (int, optional): Stop each agent after this many bursts.
+            report_interval (float, optional): Seconds between counter snapshots. Defaults to 5.
+            sync_rounds (int, optional): Clock-offset pings per agent. Defaults to 8.
+            start_delay (float, optional): Seconds from the last ready agent to the start. Defaults to 3.
+            connect_timeout (float, optional): Longest wait for agents to connect, in seconds.
+        """
+        super().__init__(testers, workers=transport.agents, seed=seed, max_events=max_events,
+                         max_duration=max_duration, max_bursts=max_bursts, report_interval=report_interval)
+        self.transport = transport
+        self.sync_rounds = sync_rounds
+        self.start_delay = start_delay
+        self.connect_timeout = connect_timeout
+
+        self.agents = []
+        self.hosts = {}
+        self.clock_offsets = {}
+        self.round_trips = {}
+        self.start_times = {}
+        self.traces = {}
+        self.start_at = None
+        self._stop_requested = False
+
+    def stop(self):
+        """
+        Ask every agent to stop.
+        """
+        self._stop_requested = True
+        for agent_id in self.agents:
+            self.transport.send(agent_id, {"type": "stop", "reason": "coordinator_stop"})
+
+    def wait_for(self, kind, agents, timeout):
+        """
+        Wait until every given agent has sent a message of one type.
+
+        Errors are recorded and end the wait for that agent.
+
+        Args:
+            kind (str): Message type to wait for.
+            agents (iterable): Agent identifiers.
+            timeout (float): Longest wait in seconds.
+
+        Returns:
+            dict: Message of that type per agent that sent one.
+        """
+        pending = set(agents)
+        received = {}
+        deadline = time.time() + timeout
+        while pending and time.time() < deadline:
+            item = self.transport.receive(timeout=min(1.0, max(0.0, deadline - time.time())))
+            if item is None:
+                continue
+            agent_id, message = item
+            if message.get("type") == kind and agent_id in pending:
+                received[agent_id] = message
+                pending.discard(agent_id)
+            elif message.get("type") == "error":
+                self.handle_report(("error", agent_id, message.get("error")))
+                pending.discard(agent_id)
+        for agent_id in pending:
+            self.handle_report(("error", agent_id, f"no {kind} message within {timeout:.0f}s"))
+        return received
+
+    def synchronize_clocks(self):
+        """
+        Estimate every agent's clock offset from several ping round trips.
+
+        Each round pings all agents; for every agent the sample with the shortest round
+        trip is kept, because it bounds the error of the offset most tightly.
+        """
+        for _ in range(self.sync_rounds):
+            for agent_id in self.agents:
+                self.transport.send(agent_id, {"type": "ping", "t0": time.time()})
+            for agent_id, pong in self.wait_for("pong", self.agents, 10.0).items():
+                t2 = time.time()
+                round_trip = t2 - pong["t0"]
+                if round_trip < self.round_trips.get(agent_id, float("inf")):
+                    self.round_trips[agent_id] = round_trip
+                    self.clock_offsets[agent_id] = pong["t1"] - (pong["t0"] + t2) / 2
+
+    def run(self, summary_file=None, trace_file=None):
+        """
+        Run the coordinated test until every agent has finished.
+
+        Args:
+            summary_file (str, optional): Path of the JSON summary, or None to not write one.
+            trace_file (str, optional): Path of the merged trace, or None to not write one.
+
+        Returns:
+            dict: Summary with the fleet view, the coordinator's clock data and each agent's summary.
+        """
+        self.agents = self.transport.start(self.connect_timeout)
+        for agent_id, hello in self.wait_for("hello", self.agents, 30.0).items():
+            self.hosts[agent_id] = {"host": hello.get("host"), "pid": hello.get("pid")}
+        self.logger.info(f"{len(self.hosts)} agents connected: {self.hosts}")
+
+        self.synchronize_clocks()
+        for agent_id in self.agents:
+            if agent_id in self.clock_offsets:
+                self.logger.info(f"Agent {agent_id} clock offset {self.clock_offsets[agent_id] * 1000:.3f} ms "
+                                 f"(round trip {self.round_trips[agent_id] * 1000:.3f} ms)")
+
+        # Hand out the work; agents without testers are released
+        specs = {spec["worker"]: spec for spec in self.specs}
+        for agent_id in self.agents:
+            spec = specs.get(agent_id)
+            if spec is None:
+                self.transport.send(agent_id, {"type": "release"})
+                continue
+            self.transport.send(agent_id, {
+                "type": "assign",
+                "testers": [(kind, read_config_text(config_file)) for kind, config_file in spec["testers"]],
+                "seed": spec["seed"],
+                "bounds": self.bounds,
+                "report_interval": self.report_interval,
+            })
+        ready = self.wait_for("ready", [agent_id for agent_id in self.agents if agent_id in specs], 120.0)
+
+        # Release every ready agent at the same instant on the coordinator's clock
+        started_at = datetime.now()
+        self.start_at = time.time() + self.start_delay
+        for agent_id in ready:
+            offset = self.clock_offsets.get(agent_id, 0.0)
+            self.transport.send(agent_id, {"type": "start", "start_at": self.start_at + offset})
+        self.logger.info(f"Starting {len(ready)} agents at {datetime.fromtimestamp(self.start_at):%H:%M:%S.%f}")
+
+        psutil.cpu_percent(interval=None, percpu=True)
+        last_view = (self.start_at, 0)
+        next_view = self.start_at + self.report_interval
+        try:
+            while len(self.finals) + len(self.errors) < len(self.specs):
+                item = self.transport.receive(timeout=min(1.0, self.report_interval))
+                if item is not None:
+                    self.handle_agent_message(*item)
+                if time.time() >= next_view:
+                    last_view = self.log_live_view(self.start_at, last_view)
+                    next_view += self.report_interval
+        except KeyboardInterrupt:
+            self.stop_reason = "interrupted"
+            self.stop()
+            deadline = time.time() + 10.0
+            while len(self.finals) + len(self.errors) < len(self.specs) and time.time() < deadline:
+                item = self.transport.receive(timeout=0.5)
+                if item is not None:
+                    self.handle_agent_message(*item)
+        finally:
+            self.transport.close()
+
+        if self.stop_reason is None:
+            self.stop_reason = "stopped" if self._stop_requested else "completed"
+
+        summary = self.build_summary(started_at, datetime.now())
+        self.logger.info(f"Coordinated test completed. Total events simulated: {summary['fleet']['events']['total']}")
+        if summary_file:
+            self.write_summary(summary, summary_file)
+        if trace_file:
+            self.write_trace(trace_file)
+        return summary
+
+    def handle_agent_message(self, agent_id, message):
+        """
+        Store a message received from an agent while the test runs.
+
+        Args:
+            agent_id (int): Agent identifier.
+            message (dict): The message.
+        """
+        kind = message.get("type")
+        if kind == "counters":
+            self.handle_report(("snapshot", agent_id, message["snapshot"]))
+        elif kind == "final":
+            offset = self.clock_offsets.get(agent_id, 0.0)
+            self.start_times[agent_id] = message["started_at"] - offset
+            self.traces[agent_id] = [(when - offset, level, text) for when, level, text in message.get("trace", [])]
+            self.handle_report(("final", agent_id, message["snapshot"], message.get("summary")))
+        elif kind == "error":
+            self.handle_report(("error", agent_id, message.get("error")))
+
+    def build_summary(self, started_at, ended_at):
+        """
+        Build the summary, adding clock synchronization and start skew to the fleet view.
+
+        Args:
+            started_at (datetime): Start time of the test.
+            ended_at (datetime): End time of the test.
+
+        Returns:
+            dict: Summary suitable for JSON serialization.
+        """
+        summary = super().build_summary(started_at, ended_at)
+        starts = list(self.start_times.values())
+        summary["coordinator"] = {
+            "start_at": datetime.fromtimestamp(self.start_at).isoformat(timespec="milliseconds")
+            if self.start_at else None,
+            "start_skew_ms": round((max(starts) - min(starts)) * 1000, 3) if starts else None,
+            "agents": [
+                {
+                    "agent": agent_id,
+                    "host": self.hosts.get(agent_id, {}).get("host"),
+                    "pid": self.hosts.get(agent_id, {}).get("pid"),
+                    "clock_offset_ms": round(self.clock_offsets[agent_id] * 1000, 3)
+                    if agent_id in self.clock_offsets else None,
+                    "round_trip_ms": round(self.round_trips[agent_id] * 1000, 3)
+                    if agent_id in self.round_trips else None,
+                    "start_error_ms": round((self.start_times[agent_id] - self.start_at) * 1000, 3)
+                    if agent_id in self.start_times else None,
+                }
+                for agent_id in self.agents
+            ],
+        }
+        return summary
+
+    def write_trace(self, trace_file):
+        """
+        Write the log records of every agent as one trace ordered by coordinator time.
+
+        Args:
+            trace_file (str): Output path.
+
+        Returns:
+            str: Path of the written file, or None if it could not be written.
+        """
+        records = sorted((when, agent_id, level, text)
+                         for agent_id, trace in self.traces.items() for when, level, text in trace)
+        try:
+            with open(trace_file, "w") as f:
+                for when, agent_id, level, text in records:
+                    host = self.hosts.get(agent_id, {}).get("host", "")
+                    stamp = datetime.fromtimestamp(when).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                    f.write(f"{stamp} - agent {agent_id} ({host}) - {level} - {text}\n")
+        except OSError as e:
+            self.logger.error(f"Error writing merged trace to {trace_file}: {e}")
+            return None
+        self.logger.info(f"Merged trace written to: {os.path.abspath(trace_file)}")
+        return trace_file
+
+
+def read_config_text(config_file):
+    """
+    Read a configuration file so that it can be sent to an agent.
+
+    Args:
+        config_file (str): Path of the file, or None.
+
+    Returns:
+        str: The file contents, or None if there is no readable file.
+    """
+    if not config_file:
+        return None
+    try:
+        with open(config_file, "r") as f:
+            return f.read()
+    except OSError as e:
+        logging.getLogger().error(f"Error reading config file {config_file}: {e}. The agent will use defaults.")
+        return None
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for the load coordinator and its agents.
+
+    Examples:
+        python load_coordinator.py agent --connect coordinator-host:7400
+        python load_coordinator.py coordinator --agents 40 --keyboard 40 --max-duration 600
+        python load_coordinator.py coordinator --local 4 --keyboard 4 --mouse 4 --max-duration 60
+
+    --local starts the agents as local processes instead of waiting for remote ones.
+    """
+    import argparse
+    from fleet_runner import setup_fleet_logging
+
+    parser = argparse.ArgumentParser(description="Input Testing Utility Suite v1.8 - Load coordinator")
+    roles = parser.add_subparsers(dest="role", required=True)
+
+    agent_parser = roles.add_parser("agent", help="Run an agent that connects to a coordinator")
+    agent_parser.add_argument("--connect", required=True, metavar="HOST:PORT", help="Coordinator address")
+
+    coordinator_parser = roles.add_parser("coordinator", help="Coordinate agents")
+    coordinator_parser.add_argument("--agents", type=int, default=0, help="Number of remote agents to wait for")
+    coordinator_parser.add_argument("--local", type=int, default=0, help="Number of local agent processes to start")
+    coordinator_parser.add_argument("--listen", default=f"0.0.0.0:{DEFAULT_PORT}", metavar="HOST:PORT",
+                                    help="Address to listen on for remote agents")
+    coordinator_parser.add_argument("--keyboard", type=int, default=0, help="Number of keyboard testers")
+    coordinator_parser.add_argument("--mouse", type=int, default=0, help="Number of mouse testers")
+    coordinator_parser.add_argument("--keyboard-config", default=None, help="Keyboard configuration file")
+    coordinator_parser.add_argument("--mouse-config", default=None, help="Mouse configuration file")
+    coordinator_parser.add_argument("--max-events", type=int, default=None, help="Stop each agent after this many events")
+    coordinator_parser.add_argument("--max-duration", type=float, default=None, help="Stop after this many seconds")
+    coordinator_parser.add_argument("--max-bursts", type=int, default=None, help="Stop each agent after this many bursts")
+    coordinator_parser.add_argument("--seed", type=int, default=None, help="Fleet seed; agent seeds are derived from it")
+    coordinator_parser.add_argument("--start-delay", type=float, default=DEFAULT_START_DELAY,
+                                    help="Seconds between the agents being ready and the common start")
+    coordinator_parser.add_argument("--summary", default=None, help="Path of the JSON summary")
+    coordinator_parser.add_argument("--trace", default=None, help="Path of the merged trace")
+    args = parser.parse_args()
+
+    if args.role == "agent":
+        host, _, port = args.connect.rpartition(":")
+        print(f"Input Testing Utility Suite v1.8 - Agent connecting to {args.connect}")
+        run_agent(SocketChannel(host, int(port)))
+        sys.exit(0)
+
+    if args.agents <= 0 and args.local <= 0:
+        parser.error("give the number of agents with --agents (remote) or --local")
+    if args.keyboard <= 0 and args.mouse <= 0:
+        parser.error("request at least one tester, e.g. --keyboard 4")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    assignments = [("keyboard", args.keyboard_config or os.path.join(script_dir, "skt-1.8.config.json"))] * args.keyboard
+    assignments += [("mouse", args.mouse_config or os.path.join(script_dir, "smt-1.8.config.json"))] * args.mouse
+
+    if args.local > 0:
+        transport = LocalProcessTransport(args.local)
+    else:
+        host, _, port = args.listen.rpartition(":")
+        transport = SocketTransport(args.agents, host, int(port))
+
+    log_filename = setup_fleet_logging("load_coordinator")
+    print("Input Testing Utility Suite v1.8 - Load coordinator")
+    print("Use Ctrl+C to stop testing")
+
+    try:
+        coordinator = LoadCoordinator(
+            transport,
+            assignments,
+            seed=args.seed,
+            max_events=args.max_events,
+            max_duration=args.max_duration,
+            max_bursts=args.max_bursts,
+            start_delay=args.start_delay,
+        )
+        base_name = os.path.splitext(log_filename)[0]
+        coordinator.run(args.summary or base_name + "_summary.json", args.trace or base_name + "_trace.log")
+    except Exception as e:
+        logging.error(f"\nAn error occurred: {e}")
+        print(f"\nError: {e}")
+        print("Check the log file for more details.")
+        # Only wait for a keypress when someone is watching the console
+        if sys.stdin and sys.stdin.isatty():
+            input("Press Enter to exit...")
+        raise
@@ -0,0 +1,164 @@
+# phase_profiler.py
+import functools
+import logging
+import time
+from run_metrics import LatencyHistogram
+
+"""
+PhaseProfiler - Per-phase latency histograms for the testers' hot path.
+
+When a run is slower than expected, the question is which part of each event took
+the time: choosing the pattern, generating the text or trajectory, resolving
+virtual-key codes, posting messages, pumping the queue, logging, or the sleeps
+between keys and between events. The profiler answers it with one
+LatencyHistogram per phase.
+
+Profiling is opt-in. A tester that enables it wraps the methods of each phase
+with a timing wrapper once, when its first run is prepared; a tester that does
+not enable it never wraps anything, so its hot path is unchanged. The
+"generate" phase is not timed directly: it is the part of each burst that no
+other phase accounts for, which is the tester's own generation code.
+
+Phases:
+    select      Choosing a typing or movement pattern
+    generate    Remaining burst time: building words, typos, sentences and trajectories
+    vk_lookup   Resolving characters to virtual-key codes
+    post        Posting messages through the emitter, including backpressure
+    pump        Processing the window's message queue
+    log         Creating and writing log records
+    sleep       Delays inside a burst (between keys, clicks and movement steps)
+    wait        Waiting between bursts
+    burst       Whole bursts, from the start of the input event to its end
+"""
+
+PHASES = ("select", "generate", "vk_lookup", "post", "pump", "log", "sleep", "wait", "burst")
+
+# Phases timed inside a burst, whose time is not part of "generate"
+INNER_PHASES = ("select", "vk_lookup", "post", "pump", "log", "sleep")
+
+
+class PhaseProfiler:
+    """
+    Collect a latency histogram per phase.
+
+    Attributes:
+        histograms (dict): Phase name to LatencyHistogram for the current run.
+    """
+
+    def __init__(self):
+        """
+        Initialize the PhaseProfiler with empty histograms.
+        """
+        self.histograms = {}
+        self._inner_time = 0.0
+        self.reset()
+
+    def reset(self):
+        """
+        Start new histograms, for a new run.
+        """
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self._inner_time = 0.0
+
+    def wrap(self, phase, function):
+        """
+        Time every call of a function as a phase.
+
+        Args:
+            phase (str): One of INNER_PHASES, or "wait".
+            function (callable): The function to time.
+
+        Returns:
+            callable: A wrapper with the same signature.
+        """
+        perf_counter = time.perf_counter
+        inner = phase in INNER_PHASES
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            """
+            Call the function and record how long it took.
+            """
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.histograms[phase].record(elapsed)
+                if inner:
+                    self._inner_time += elapsed
+
+        return timed
+
+    def wrap_burst(self, function):
+        """
+        Time every call of a function as a whole burst, and its untimed part as "generate".
+
+        Args:
+            function (callable): The burst function, such as simulate_input_event.
+
+        Returns:
+            callable: A wrapper with the same signature.
+        """
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            """
+            Call the burst function and record its total and generation times.
+            """
+            self._inner_time = 0.0
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.histograms["burst"].record(elapsed)
+                self.histograms["generate"].record(max(0.0, elapsed - self._inner_time))
+
+        return timed
+
+    def summary(self):
+        """
+        Summarize the phases that were timed.
+
+        Returns:
+            dict: Phase name to histogram summary in milliseconds, plus the phase's total
+                time in seconds.
+        """
+        result = {}
+        for phase, histogram in self.histograms.items():
+            if histogram.count:
+                result[phase] = dict(histogram.summary(), total_s=round(histogram.total / 1_000_000, 3))
+        return result
+
+    def brief(self):
+        """
+        Describe the phases in one line, for the periodic log.
+
+        Returns:
+            str: "phase p50/p99 total" for each timed phase, or an empty string.
+        """
+        parts = []
+        for phase, histogram in self.histograms.items():
+            if histogram.count:
+                parts.append(f"{phase} {histogram.percentile(50) * 1000:.3f}/{histogram.percentile(99) * 1000:.3f} ms "
+                             f"({histogram.total / 1_000_000:.1f} s)")
+        return ", ".join(parts)
+
+
+class ProfiledLogger(logging.LoggerAdapter):
+    """
+    Logger that times each record it writes as the "log" phase.
+    """
+
+    def __init__(self, logger, profiler):
+        """
+        Initialize the ProfiledLogger.
+
+        Args:
+            logger (logging.Logger): The logger that writes the records.
+            profiler (PhaseProfiler): Profiler that receives the timings.
+        """
+        super().__init__(logger, {})
+        self.log = profiler.wrap("log", self.log)
@@ -0,0 +1,287 @@
+# run_metrics.py
+import time
+from collections import deque
+
+"""
+Run metrics for the input testing utilities.
+
+LatencyHistogram is a compact log-linear histogram in the style of HdrHistogram:
+values are bucketed with a fixed relative precision, so recording is O(1) and
+memory stays small no matter how long a run lasts. RunMetrics collects the
+per-run counters that go into the end-of-run summary: events by type, timing
+errors, emit latency and resource samples.
+"""
+
+# Sub-buckets per power of two; 32 gives roughly 3% relative precision
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+# Percentiles reported in summaries
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram with microsecond resolution.
+
+    Values below 64 microseconds are counted exactly; larger values fall into
+    buckets whose width grows with the value, keeping the relative error near 3%.
+
+    Attributes:
+        count (int): Number of recorded values.
+        total (int): Sum of recorded values in microseconds.
+        min_value (int): Smallest recorded value in microseconds, or None.
+        max_value (int): Largest recorded value in microseconds, or None.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty histogram.
+        """
+        self._counts = []
+        self.count = 0
+        self.total = 0
+        self.min_value = None
+        self.max_value = None
+
+    def record(self, seconds):
+        """
+        Record a duration.
+
+        Args:
+            seconds (float): Duration in seconds; negative values are recorded as zero.
+        """
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+
+        self.count += 1
+        self.total += value
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other):
+        """
+        Add the counts of another histogram to this one.
+
+        Args:
+            other (LatencyHistogram): Histogram to merge.
+        """
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) - len(self._counts)))
+        for index, bucket_count in enumerate(other._counts):
+            self._counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min_value, other.max_value):
+            if value is None:
+                continue
+            if self.min_value is None or value < self.min_value:
+                self.min_value = value
+            if self.max_value is None or value > self.max_value:
+                self.max_value = value
+
+    def to_dict(self):
+        """
+        Get the histogram state in a form that can be pickled or serialized to JSON.
+
+        Returns:
+            dict: Bucket counts and totals.
+        """
+        return {
+            "counts": list(self._counts),
+            "count": self.count,
+            "total": self.total,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a histogram from the output of to_dict().
+
+        Args:
+            state (dict): Histogram state.
+
+        Returns:
+            LatencyHistogram: The rebuilt histogram.
+        """
+        histogram = cls()
+        histogram._counts = list(state.get("counts", []))
+        histogram.count = state.get("count", 0)
+        histogram.total = state.get("total", 0)
+        histogram.min_value = state.get("min_value")
+        histogram.max_value = state.get("max_value")
+        return histogram
+
+    def percentile(self, percent):
+        """
+        Get the value at a given percentile.
+
+        Args:
+            percent (float): Percentile between 0 and 100.
+
+        Returns:
+            float: Value in seconds (0.0 if the histogram is empty).
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * percent / 100.0)))
+        cumulative = 0
+        for index, bucket_count in enumerate(self._counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                low, width = self._bucket_range(index)
+                value = min(self.max_value, low + width // 2)
+                return value / 1_000_000
+        return self.max_value / 1_000_000
+
+    def summary(self):
+        """
+        Get a summary of the histogram in milliseconds.
+
+        Returns:
+            dict: Count, min, mean, max and percentiles in milliseconds.
+        """
+        if not self.count:
+            return {"count": 0}
+        result = {
+            "count": self.count,
+            "min_ms": round(self.min_value / 1000, 3),
+            "mean_ms": round(self.total / self.count / 1000, 3),
+            "max_ms": round(self.max_value / 1000, 3),
+        }
+        for percent in SUMMARY_PERCENTILES:
+            result[f"p{percent:g}_ms"] = round(self.percentile(percent) * 1000, 3)
+        return result
+
+    @staticmethod
+    def _index(value):
+        """
+        Get the bucket index of a value.
+
+        Args:
+            value (int): Value in microseconds.
+
+        Returns:
+            int: Bucket index.
+        """
+        shift = max(0, value.bit_length() - (SUB_BUCKET_BITS + 1))
+        return shift * SUB_BUCKET_COUNT + (value >> shift)
+
+    @staticmethod
+    def _bucket_range(index):
+        """
+        Get the lowest value and width of a bucket.
+
+        Args:
+            index (int): Bucket index.
+
+        Returns:
+            tuple: (lowest value, bucket width) in microseconds.
+        """
+        if index < 2 * SUB_BUCKET_COUNT:
+            return index, 1
+        shift = index // SUB_BUCKET_COUNT - 1
+        return (index - shift * SUB_BUCKET_COUNT) << shift, 1 << shift
+
+
+class RunMetrics:
+    """
+    Counters and histograms collected over one testing run.
+
+    Attributes:
+        started_at (float): Wall-clock start time of the run.
+        events_by_type (dict): Number of events emitted per event type.
+        bursts (int): Number of simulated input bursts.
+        timing_error (LatencyHistogram): Lateness of each scheduled event start.
+        emit_latency (LatencyHistogram): Duration of each PostMessage call.
+        resource_samples (deque): Recent (elapsed seconds, CPU percent, RSS in MB) samples.
+    """
+
+    def __init__(self, max_resource_samples=2000):
+        """
+        Initialize empty run metrics.
+
+        Args:
+            max_resource_samples (int, optional): Number of resource samples kept. Defaults to 2000.
+        """
+        self.started_at = time.time()
+        self.events_by_type = {}
+        self.bursts = 0
+        self.timing_error = LatencyHistogram()
+        self.emit_latency = LatencyHistogram()
+        self.resource_samples = deque(maxlen=max_resource_samples)
+        self._peak_rss_mb = 0.0
+
+    def count_event(self, event_type, count=1):
+        """
+        Count emitted events of a given type.
+
+        Args:
+            event_type (str): Event type, such as "keystroke" or "move".
+            count (int, optional): Number of events. Defaults to 1.
+        """
+        self.events_by_type[event_type] = self.events_by_type.get(event_type, 0) + count
+
+    def add_resource_sample(self, cpu_percent, rss_mb):
+        """
+        Record a resource usage sample.
+
+        Args:
+            cpu_percent (float): Process CPU usage in percent.
+            rss_mb (float): Resident set size in megabytes.
+        """
+        elapsed = round(time.time() - self.started_at, 3)
+        self.resource_samples.append((elapsed, round(cpu_percent, 1), round(rss_mb, 2)))
+        self._peak_rss_mb = max(self._peak_rss_mb, rss_mb)
+
+    def resource_summary(self):
+        """
+        Summarize the recorded resource samples.
+
+        Returns:
+            dict: RSS and CPU statistics plus the retained samples.
+        """
+        if not self.resource_samples:
+            return {"samples": []}
+        cpu = [sample[1] for sample in self.resource_samples]
+        rss = [sample[2] for sample in self.resource_samples]
+        return {
+            "rss_mb": {
+                "first": rss[0],
+                "last": rss[-1],
+                "peak": round(self._peak_rss_mb, 2),
+                "mean": round(sum(rss) / len(rss), 2),
+            },
+            "cpu_percent": {
+                "mean": round(sum(cpu) / len(cpu), 1),
+                "max": max(cpu),
+            },
+            "samples": [
+                {"elapsed_s": elapsed, "cpu_percent": cpu_percent, "rss_mb": rss_mb}
+                for elapsed, cpu_percent, rss_mb in self.resource_samples
+            ],
+        }
+
+    def rates(self, duration):
+        """
+        Get achieved event rates per event type.
+
+        Args:
+            duration (float): Run duration in seconds.
+
+        Returns:
+            dict: Events per second, per type and in total.
+        """
+        if duration <= 0:
+            return {}
+        rates = {event_type: round(count / duration, 4) for event_type, count in self.events_by_type.items()}
+        rates["total"] = round(sum(self.events_by_type.values()) / duration, 4)
+        return rates
@@ -1,18 +1,12 @@
 # skt-1.8.py
-import win32api
-import win32gui
-import win32con
 import random
 import time
 import string
 import os
-from ctypes import (
-    windll,
-    Structure,
-    c_long,
-    POINTER,
-)
-from base_input_tester_1_8 import BaseInputTester  # Updated import path
+from base_input_tester_1_8 import BaseInputTester, build_argument_parser  # Updated import path
+from config_compiler import read_cache, write_cache
+from lazy_imports import lazy_import
+from tester_settings import KeyboardSettings
 
 """
 SafeKeyboardTester v1.8 - An advanced utility for testing keyboard input in an isolated environment.
@@ -30,50 +24,128 @@ New in v1.8:
 - Implemented console_logging_enabled configuration option
 - Standardized version numbering throughout code
 - Added validation of keyboard configurations
+- Keypresses are posted through the backpressure-aware emitter; dropped keys are no longer counted
+- Added command-line options for bounded runs, random seed and JSON run summary
+- Virtual-key codes are looked up when the first tester is created instead of at import,
+  and cached on disk per keyboard layout
 """
 
+# Only loaded once a tester is created
+win32api = lazy_import("win32api")
+win32gui = lazy_import("win32gui")
+win32con = lazy_import("win32con")
+
 # Windows message constants for keyboard events
 WM_KEYDOWN = 0x0100
 WM_KEYUP = 0x0101
 WM_CHAR = 0x0102
 
-# Initialize virtual key code mapping at module level for efficiency
-VK_CODES = {char: win32api.VkKeyScan(char) & 0xFF for char in string.ascii_lowercase + string.ascii_uppercase + string.digits}
+# Characters typed through the letter and digit table, and the other characters of
+# sentences and code snippets
+VK_CHARACTERS = string.ascii_lowercase + string.ascii_uppercase + string.digits
+SYMBOL_CHARACTERS = string.punctuation + " "
 
-# Special keys mapping
-SPECIAL_KEYS = {
-    "space": win32con.VK_SPACE,
-    "enter": win32con.VK_RETURN,
-    "backspace": win32con.VK_BACK,
-    "tab": win32con.VK_TAB,
-    "shift": win32con.VK_SHIFT,
-    "ctrl": win32con.VK_CONTROL,
-    "alt": win32con.VK_MENU,
-    "capslock": win32con.VK_CAPITAL,
-    "escape": win32con.VK_ESCAPE,
-}
+# Virtual-key code tables for the active keyboard layout, built on first use
+_key_tables = None
 
-class KBDLLHOOKSTRUCT(Structure):
+# KBDLLHOOKSTRUCT structure class, defined on first use
+_hook_structure = None
+
+
+def load_key_tables():
     """
-    Structure that contains information about a low-level keyboard input event.
+    Get the virtual-key codes of the typed characters for the active keyboard layout.
 
-    This structure mirrors the Windows KBDLLHOOKSTRUCT used by the keyboard hook procedure
-    to pass keyboard input to an application.
+    The codes depend on the keyboard layout, so they are looked up with VkKeyScan the
+    first time a layout is seen and kept in the disk cache (see config_compiler.py).
+    Nothing is looked up when this module is imported.
 
-    Attributes:
-        vkCode (c_long): Virtual-key code of the key.
-        scanCode (c_long): Hardware scan code for the key.
-        flags (c_long): Flags that indicate various aspects of the keystroke.
-        time (c_long): Timestamp for the event, in milliseconds.
-        dwExtraInfo (POINTER(c_long)): Additional information associated with the message.
+    Returns:
+        tuple: (codes of the letters and digits, codes of every typed character), as dicts.
+    """
+    global _key_tables
+    if _key_tables is None:
+        name = f"vk-codes-{win32api.GetKeyboardLayout(0) & 0xFFFFFFFF:08x}.pickle"
+        codes = read_cache(name)
+        if not isinstance(codes, dict) or not set(VK_CHARACTERS + SYMBOL_CHARACTERS) <= codes.keys():
+            codes = {char: win32api.VkKeyScan(char) & 0xFF for char in VK_CHARACTERS + SYMBOL_CHARACTERS}
+            write_cache(name, codes)
+        _key_tables = ({char: codes[char] for char in VK_CHARACTERS}, codes)
+    return _key_tables
+
+
+def load_hook_structure():
+    """
+    Get the KBDLLHOOKSTRUCT structure, defining it the first time it is needed.
+
+    The structure is a ctypes type, so it is not defined when this module is imported.
+
+    Returns:
+        type: The KBDLLHOOKSTRUCT structure class.
+    """
+    global _hook_structure
+    if _hook_structure is None:
+        from ctypes import Structure, c_long, POINTER
+
+        class KBDLLHOOKSTRUCT(Structure):
+            """
+            Structure that contains information about a low-level keyboard input event.
+
+            This structure mirrors the Windows KBDLLHOOKSTRUCT used by the keyboard hook procedure
+            to pass keyboard input to an application.
+
+            Attributes:
+                vkCode (c_long): Virtual-key code of the key.
+                scanCode (c_long): Hardware scan code for the key.
+                flags (c_long): Flags that indicate various aspects of the keystroke.
+                time (c_long): Timestamp for the event, in milliseconds.
+                dwExtraInfo (POINTER(c_long)): Additional information associated with the message.
+            """
+            _fields_ = [
+                ("vkCode", c_long),
+                ("scanCode", c_long),
+                ("flags", c_long),
+                ("time", c_long),
+                ("dwExtraInfo", POINTER(c_long)),
+            ]
+
+        _hook_structure = KBDLLHOOKSTRUCT
+    return _hook_structure
+
+
+def __getattr__(name):
     """
-    _fields_ = [
-        ("vkCode", c_long),
-        ("scanCode", c_long),
-        ("flags", c_long),
-        ("time", c_long),
-        ("dwExtraInfo", POINTER(c_long)),
-    ]
+    Build VK_CODES and KBDLLHOOKSTRUCT on first use, for code that imports them from this module.
+
+    Args:
+        name (str): Name of the module attribute.
+
+    Returns:
+        object: The letter and digit codes for VK_CODES, or the structure class for
+            KBDLLHOOKSTRUCT.
+
+    Raises:
+        AttributeError: For any other name.
+    """
+    if name == "VK_CODES":
+        return load_key_tables()[0]
+    if name == "KBDLLHOOKSTRUCT":
+        return load_hook_structure()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Special keys mapping (virtual-key codes, same values as win32con)
+SPECIAL_KEYS = {
+    "space": 0x20,      # VK_SPACE
+    "enter": 0x0D,      # VK_RETURN
+    "backspace": 0x08,  # VK_BACK
+    "tab": 0x09,        # VK_TAB
+    "shift": 0x10,      # VK_SHIFT
+    "ctrl": 0x11,       # VK_CONTROL
+    "alt": 0x12,        # VK_MENU
+    "capslock": 0x14,   # VK_CAPITAL
+    "escape": 0x1B,     # VK_ESCAPE
+}
 
 
 class SafeKeyboardTester(BaseInputTester):
@@ -88,10 +160,29 @@ class SafeKeyboardTester(BaseInputTester):
     Attributes:
         letters (list): List of lowercase letters that can be typed.
         special_keys (dict): Dictionary mapping special key names to virtual key codes.
+        vk_codes (dict): Virtual-key codes of the letters and digits for the active keyboard layout.
+        key_codes (dict): Virtual-key codes of every character typed so far, including punctuation.
+        vk_lookup (callable): Looks up a letter or digit in vk_codes, like vk_codes.get; timed
+            when phase profiling is on.
         current_typing_pattern (str): The currently active typing pattern.
         typing_pattern_weights (list): Weights for selecting different typing patterns.
     """
 
+    # Settings class that defines and validates the keyboard configuration keys
+    SETTINGS_CLASS = KeyboardSettings
+
+    # Keys applied by reload_config() in addition to the base ones
+    RELOADABLE_KEYS = BaseInputTester.RELOADABLE_KEYS + (
+        "typing_patterns", "typing_pattern_weights", "common_words", "key_interval_min", "key_interval_max",
+        "word_length_min", "word_length_max", "typo_probability", "correction_probability",
+        "capitalization_probability", "common_words_probability", "special_key_probability",
+        "space_after_word_probability",
+    )
+
+    # Keyboard methods timed by phase profiling
+    PROFILED_PHASES = dict(BaseInputTester.PROFILED_PHASES,
+                           select_typing_pattern="select", vk_lookup="vk_lookup", key_code="vk_lookup")
+
     def __init__(self, config_file="skt-1.8.config.json"):  # Updated default config filename
         """
         Initialize the SafeKeyboardTester with parameters from config file.
@@ -108,78 +199,48 @@ class SafeKeyboardTester(BaseInputTester):
         # Define character sets
         self.letters = list(string.ascii_lowercase)
         self.special_keys = SPECIAL_KEYS
+        self.vk_codes, self.key_codes = load_key_tables()
+        self.vk_lookup = self.vk_codes.get
+
+        self.current_typing_pattern = None
+
+        # Typing patterns, common words and cached config values
+        self.apply_settings(self.derive_settings(self.settings))
+
+    def derive_settings(self, settings):
+        """
+        Build the keyboard attributes from validated settings, in addition to the base ones.
+
+        Args:
+            settings (KeyboardSettings): Validated settings.
+
+        Returns:
+            dict: Attribute name to value.
+        """
+        values = super().derive_settings(settings)
 
         # Typing patterns
-        self.typing_patterns = self.config.get("typing_patterns", ["common_word", "random_word"])
+        values["typing_patterns"] = list(settings.typing_patterns)
 
         # Create equal weights if none provided or if length doesn't match
-        if "typing_pattern_weights" not in self.config or len(self.config.get("typing_pattern_weights", [])) != len(self.typing_patterns):
-            self.typing_pattern_weights = [1.0] * len(self.typing_patterns)
+        weights = settings.typing_pattern_weights
+        if weights is None or len(weights) != len(settings.typing_patterns):
+            values["typing_pattern_weights"] = [1.0] * len(settings.typing_patterns)
         else:
-            self.typing_pattern_weights = self.config.get("typing_pattern_weights")
-
-        self.current_typing_pattern = None
+            values["typing_pattern_weights"] = list(weights)
 
         # Common words list
-        self.common_words = self.config.get("common_words", ["the", "and", "to"])
-        if not self.common_words:
+        values["common_words"] = settings.common_words
+        if not values["common_words"]:
             self.logger.warning("No common words found in configuration. Using default set.")
-            self.common_words = ["the", "and", "to", "of", "a", "in", "is", "it", "you", "that"]
+            values["common_words"] = ("the", "and", "to", "of", "a", "in", "is", "it", "you", "that")
 
         # Cache frequently used config values
-        self.key_interval_min = self.config.get("key_interval_min", 0.1)
-        self.key_interval_max = self.config.get("key_interval_max", 0.3)
-        self.word_length_min = self.config.get("word_length_min", 3)
-        self.word_length_max = self.config.get("word_length_max", 8)
-        self.typo_probability = self.config.get("typo_probability", 0.05)
-        self.correction_probability = self.config.get("correction_probability", 0.8)
-        self.capitalization_probability = self.config.get("capitalization_probability", 0.2)
-        self.common_words_probability = self.config.get("common_words_probability", 0.7)
-        self.special_key_probability = self.config.get("special_key_probability", 0.05)
-        self.space_after_word_probability = self.config.get("space_after_word_probability", 0.9)
-
-        # Validate configuration values
-        self._validate_config()
-
-    def _validate_config(self):
-        """
-        Validate configuration values and adjust if needed.
-
-        This checks that probability values are between 0 and 1,
-        and that interval values make logical sense.
-        """
-        # Validate probability values (must be between 0 and 1)
-        prob_values = [
-            ("typo_probability", self.typo_probability),
-            ("correction_probability", self.correction_probability),
-            ("capitalization_probability", self.capitalization_probability),
-            ("common_words_probability", self.common_words_probability),
-            ("special_key_probability", self.special_key_probability),
-            ("space_after_word_probability", self.space_after_word_probability)
-        ]
-
-        for name, value in prob_values:
-            if not 0 <= value <= 1:
-                self.logger.warning(f"Invalid probability value for {name}: {value}. Must be between 0 and 1. Setting to default.")
-                setattr(self, name, self.config.get(name, 0.5))
-
-        # Validate interval values
-        if self.key_interval_min < 0 or self.key_interval_min > self.key_interval_max:
-            self.logger.warning(f"Invalid key_interval_min value: {self.key_interval_min}. Setting to default.")
-            self.key_interval_min = 0.1
-
-        if self.key_interval_max <= 0:
-            self.logger.warning(f"Invalid key_interval_max value: {self.key_interval_max}. Setting to default.")
-            self.key_interval_max = 0.3
-
-        # Validate word length values
-        if self.word_length_min < 1 or self.word_length_min > self.word_length_max:
-            self.logger.warning(f"Invalid word_length_min value: {self.word_length_min}. Setting to default.")
-            self.word_length_min = 3
-
-        if self.word_length_max < 1:
-            self.logger.warning(f"Invalid word_length_max value: {self.word_length_max}. Setting to default.")
-            self.word_length_max = 8
+        for name in ("key_interval_min", "key_interval_max", "word_length_min", "word_length_max",
+                     "typo_probability", "correction_probability", "capitalization_probability",
+                     "common_words_probability", "special_key_probability", "space_after_word_probability"):
+            values[name] = getattr(settings, name)
+        return values
 
     def create_test_window(self):
         """
@@ -191,6 +252,7 @@ class SafeKeyboardTester(BaseInputTester):
 
         The window is DPI-aware to ensure proper scaling on high-resolution displays.
         """
+        from ctypes import windll
         windll.user32.SetProcessDPIAware()
 
         # Register window class
@@ -248,20 +310,27 @@ class SafeKeyboardTester(BaseInputTester):
         """
         if self.transparent_window:
             try:
-                # Send key down
-                win32gui.PostMessage(self.transparent_window, WM_KEYDOWN, vk_code, 0)
+                # Send key down; nothing else is sent if the queue rejects it
+                if not self.emitter.post(self.transparent_window, WM_KEYDOWN, vk_code, 0):
+                    self.logger.warning(f"Keypress dropped: key down for VK {vk_code} could not be posted")
+                    return False
 
                 # Send character if provided
+                delivered = True
                 if char:
-                    win32gui.PostMessage(self.transparent_window, WM_CHAR, ord(char), 0)
+                    delivered = self.emitter.post(self.transparent_window, WM_CHAR, ord(char), 0)
 
                 # Slight delay between down and up events
-                time.sleep(0.08)
+                self.sleep(0.08)
 
-                # Send key up
-                win32gui.PostMessage(self.transparent_window, WM_KEYUP, vk_code, 0)
+                # Send key up (always attempted so the key is not left pressed)
+                delivered = self.emitter.post(self.transparent_window, WM_KEYUP, vk_code, 0) and delivered
 
-                self.event_count += 1
+                if not delivered:
+                    self.logger.warning(f"Keypress dropped: messages for VK {vk_code} could not be posted")
+                    return False
+
+                self.record_event("keystroke")
                 return True
 
             except Exception as e:
@@ -269,6 +338,32 @@ class SafeKeyboardTester(BaseInputTester):
                 return False
         return False
 
+    def flood_event(self):
+        """
+        Press one random letter key, for a flood ramp.
+
+        Returns:
+            bool: True if the keypress was simulated, False otherwise.
+        """
+        char = random.choice(self.letters)
+        return self.simulate_keypress(self.vk_lookup(char, 0), char)
+
+    def key_code(self, char):
+        """
+        Get the virtual-key code of any character.
+
+        Characters outside the cached table are looked up once and then remembered.
+
+        Args:
+            char (str): The character.
+
+        Returns:
+            int: The virtual-key code (255 if the layout has no key for the character).
+        """
+        vk_code = self.key_codes.get(char)
+        if vk_code is None:
+            vk_code = self.key_codes[char] = win32api.VkKeyScan(char) & 0xFF
+        return vk_code
 
     def get_adjacent_keys(self, char):
         """
@@ -327,6 +422,33 @@ class SafeKeyboardTester(BaseInputTester):
             return random.choice(adjacent_keys)
         return random.choice(self.letters)
 
+    def set_pattern_weights(self, weights):
+        """
+        Change the typing pattern weights of the running test.
+
+        Args:
+            weights (dict): New weight for each typing pattern to change.
+
+        Returns:
+            dict: The weight of every typing pattern now in effect.
+        """
+        self.typing_pattern_weights = self.merge_pattern_weights(
+            self.typing_patterns, self.typing_pattern_weights, weights)
+        return dict(zip(self.typing_patterns, self.typing_pattern_weights))
+
+    def select_typing_pattern(self):
+        """
+        Choose the next typing pattern based on the configured weights.
+
+        Returns:
+            str: Name of the chosen pattern.
+        """
+        return random.choices(
+            self.typing_patterns,
+            weights=self.typing_pattern_weights,
+            k=1
+        )[0]
+
     def simulate_typing_pattern(self):
         """
         Select and simulate a typing pattern based on weighted probabilities.
@@ -339,11 +461,7 @@ class SafeKeyboardTester(BaseInputTester):
             bool: True if the pattern was simulated successfully, False otherwise.
         """
         # Select a typing pattern
-        self.current_typing_pattern = random.choices(
-            self.typing_patterns,
-            weights=self.typing_pattern_weights,
-            k=1
-        )[0]
+        self.current_typing_pattern = self.select_typing_pattern()
 
         # Execute the selected pattern
         if self.current_typing_pattern == "common_word":
@@ -376,7 +494,7 @@ class SafeKeyboardTester(BaseInputTester):
             return self.simulate_random_word()
 
         word = random.choice(self.common_words)
-        typed_chars = []
+        start = len(self.burst_events)
 
         # Apply capitalization sometimes
         if random.random() < self.capitalization_probability:
@@ -386,43 +504,39 @@ class SafeKeyboardTester(BaseInputTester):
             # Decide if we make a typo
             if random.random() < self.typo_probability:
                 typo = self.generate_typo(char)
-                vk_code = VK_CODES.get(typo, VK_CODES.get(typo.lower(), 0))
+                vk_code = self.vk_lookup(typo, self.vk_lookup(typo.lower(), 0))
 
                 if vk_code and self.simulate_keypress(vk_code, typo):
-                    typed_chars.append(typo)
                     char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                    time.sleep(char_delay)
+                    self.sleep(char_delay)
 
                     # Decide if we correct the typo
                     if random.random() < self.correction_probability:
                         # Press backspace
                         if self.simulate_keypress(win32con.VK_BACK):
-                            typed_chars.pop()  # Remove the typo
                             char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                            time.sleep(char_delay)
+                            self.sleep(char_delay)
 
                             # Type the correct character
-                            vk_code = VK_CODES.get(char, VK_CODES.get(char.lower(), 0))
-                            if vk_code and self.simulate_keypress(vk_code, char):
-                                typed_chars.append(char)
+                            vk_code = self.vk_lookup(char, self.vk_lookup(char.lower(), 0))
+                            if vk_code:
+                                self.simulate_keypress(vk_code, char)
             else:
                 # Type the correct character
-                vk_code = VK_CODES.get(char, VK_CODES.get(char.lower(), 0))
+                vk_code = self.vk_lookup(char, self.vk_lookup(char.lower(), 0))
 
                 if vk_code and self.simulate_keypress(vk_code, char):
-                    typed_chars.append(char)
                     char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                    time.sleep(char_delay)
+                    self.sleep(char_delay)
 
             # Process messages periodically during typing to prevent queue buildup
             self.check_and_process_messages()
 
         # Add space after word (with configured probability)
         if random.random() < self.space_after_word_probability:
-            if self.simulate_keypress(win32con.VK_SPACE, " "):
-                typed_chars.append(" ")
+            self.simulate_keypress(win32con.VK_SPACE, " ")
 
-        self.logger.info(f"Burst {self.event_count}: Simulated common word '{''.join(typed_chars)}'")
+        self.logger.info(f"Burst {self.event_count}: Simulated common word '{self.burst_events.typed_text(start)}'")
         return True
 
     def simulate_random_word(self):
@@ -436,7 +550,7 @@ class SafeKeyboardTester(BaseInputTester):
             bool: True if the word was typed successfully, False otherwise.
         """
         word_length = random.randint(self.word_length_min, self.word_length_max)
-        typed_chars = []
+        start = len(self.burst_events)
 
         for _ in range(word_length):
             char = random.choice(self.letters)
@@ -444,43 +558,39 @@ class SafeKeyboardTester(BaseInputTester):
             # Decide if we make a typo
             if random.random() < self.typo_probability:
                 typo = self.generate_typo(char)
-                vk_code = VK_CODES.get(typo, 0)
+                vk_code = self.vk_lookup(typo, 0)
 
                 if vk_code and self.simulate_keypress(vk_code, typo):
-                    typed_chars.append(typo)
                     char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                    time.sleep(char_delay)
+                    self.sleep(char_delay)
 
                     # Decide if we correct the typo
                     if random.random() < self.correction_probability:
                         # Press backspace
                         if self.simulate_keypress(win32con.VK_BACK):
-                            typed_chars.pop()  # Remove the typo
                             char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                            time.sleep(char_delay)
+                            self.sleep(char_delay)
 
                             # Type the correct character
-                            vk_code = VK_CODES.get(char, 0)
-                            if vk_code and self.simulate_keypress(vk_code, char):
-                                typed_chars.append(char)
+                            vk_code = self.vk_lookup(char, 0)
+                            if vk_code:
+                                self.simulate_keypress(vk_code, char)
             else:
                 # Type the correct character
-                vk_code = VK_CODES.get(char, 0)
+                vk_code = self.vk_lookup(char, 0)
 
                 if vk_code and self.simulate_keypress(vk_code, char):
-                    typed_chars.append(char)
                     char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                    time.sleep(char_delay)
+                    self.sleep(char_delay)
 
             # Process messages periodically during typing to prevent queue buildup
             self.check_and_process_messages()
 
         # Add space after word (with configured probability)
         if random.random() < self.space_after_word_probability:
-            if self.simulate_keypress(win32con.VK_SPACE, " "):
-                typed_chars.append(" ")
+            self.simulate_keypress(win32con.VK_SPACE, " ")
 
-        self.logger.info(f"Burst {self.event_count}: Simulated random word '{''.join(typed_chars)}'")
+        self.logger.info(f"Burst {self.event_count}: Simulated random word '{self.burst_events.typed_text(start)}'")
         return True
 
     def simulate_sentence(self):
@@ -494,7 +604,7 @@ class SafeKeyboardTester(BaseInputTester):
             bool: True if the sentence was typed successfully, False otherwise.
         """
         sentence_length = random.randint(3, 8)  # Number of words in the sentence
-        typed_chars = []
+        start = len(self.burst_events)
 
         # First word is capitalized
         if random.random() < self.common_words_probability and self.common_words:
@@ -504,15 +614,13 @@ class SafeKeyboardTester(BaseInputTester):
 
         # Type the first word
         for char in word:
-            vk_code = VK_CODES.get(char, VK_CODES.get(char.lower(), 0))
+            vk_code = self.vk_lookup(char, self.vk_lookup(char.lower(), 0))
             if vk_code and self.simulate_keypress(vk_code, char):
-                typed_chars.append(char)
                 char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                time.sleep(char_delay)
+                self.sleep(char_delay)
 
         # Type space after first word
-        if self.simulate_keypress(win32con.VK_SPACE, " "):
-            typed_chars.append(" ")
+        self.simulate_keypress(win32con.VK_SPACE, " ")
 
         # Type the rest of the words
         for i in range(1, sentence_length):
@@ -527,24 +635,21 @@ class SafeKeyboardTester(BaseInputTester):
 
             # Type the word
             for char in word:
-                vk_code = VK_CODES.get(char, 0)
+                vk_code = self.vk_lookup(char, 0)
                 if vk_code and self.simulate_keypress(vk_code, char):
-                    typed_chars.append(char)
                     char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                    time.sleep(char_delay)
+                    self.sleep(char_delay)
 
             # Add space after word unless it's the last word
             if i < sentence_length - 1:
-                if self.simulate_keypress(win32con.VK_SPACE, " "):
-                    typed_chars.append(" ")
+                self.simulate_keypress(win32con.VK_SPACE, " ")
 
         # End the sentence with punctuation
         punctuation = random.choice(['.', '!', '?'])
-        vk_code = win32api.VkKeyScan(punctuation) & 0xFF
-        if self.simulate_keypress(vk_code, punctuation):
-            typed_chars.append(punctuation)
+        vk_code = self.key_code(punctuation)
+        self.simulate_keypress(vk_code, punctuation)
 
-        self.logger.info(f"Burst {self.event_count}: Simulated sentence '{''.join(typed_chars)}'")
+        self.logger.info(f"Burst {self.event_count}: Simulated sentence '{self.burst_events.typed_text(start)}'")
         return True
 
     def simulate_code_snippet(self):
@@ -571,30 +676,30 @@ class SafeKeyboardTester(BaseInputTester):
         ]
 
         code = random.choice(code_patterns)
-        typed_chars = []
+        start = len(self.burst_events)
+        after_newline = False
 
         for char in code:
             # Handle special characters
             if char == '\n':
-                vk_code = win32con.VK_RETURN
-                if self.simulate_keypress(vk_code):
-                    typed_chars.append('\n')
-            elif char == '\t' or (char == ' ' and typed_chars and typed_chars[-1] == '\n'):
-                vk_code = win32con.VK_TAB
-                if self.simulate_keypress(vk_code):
-                    typed_chars.append('    ')  # Represent tab as 4 spaces
+                after_newline = self.simulate_keypress(win32con.VK_RETURN)
+            elif char == '\t' or (char == ' ' and after_newline):
+                # Indentation after a line break is typed as a tab
+                self.simulate_keypress(win32con.VK_TAB)
+                after_newline = False
             else:
-                vk_code = win32api.VkKeyScan(char) & 0xFF
-                if vk_code != -1 and self.simulate_keypress(vk_code, char):
-                    typed_chars.append(char)
+                vk_code = self.key_code(char)
+                if vk_code != -1:
+                    self.simulate_keypress(vk_code, char)
+                after_newline = False
 
             char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-            time.sleep(char_delay)
+            self.sleep(char_delay)
 
             # Process messages periodically
             self.check_and_process_messages()
 
-        self.logger.info(f"Burst {self.event_count}: Simulated code snippet '{''.join(typed_chars)}'")
+        self.logger.info(f"Burst {self.event_count}: Simulated code snippet '{self.burst_events.typed_text(start)}'")
         return True
 
     def simulate_number_sequence(self):
@@ -609,21 +714,20 @@ class SafeKeyboardTester(BaseInputTester):
         """
         # Determine length of number sequence
         length = random.randint(3, 10)
-        typed_chars = []
+        start = len(self.burst_events)
 
         for _ in range(length):
             digit = str(random.randint(0, 9))
-            vk_code = VK_CODES.get(digit, 0)
+            vk_code = self.vk_lookup(digit, 0)
 
             if vk_code and self.simulate_keypress(vk_code, digit):
-                typed_chars.append(digit)
                 char_delay = random.uniform(self.key_interval_min, self.key_interval_max)
-                time.sleep(char_delay)
+                self.sleep(char_delay)
 
             # Process messages periodically
             self.check_and_process_messages()
 
-        self.logger.info(f"Burst {self.event_count}: Simulated number sequence '{''.join(typed_chars)}'")
+        self.logger.info(f"Burst {self.event_count}: Simulated number sequence '{self.burst_events.typed_text(start)}'")
         return True
 
     def simulate_special_key(self):
@@ -640,7 +744,10 @@ class SafeKeyboardTester(BaseInputTester):
         vk_code = self.special_keys[key_name]
 
         if self.simulate_keypress(vk_code):
-            self.logger.info(f"Burst {self.event_count}: Simulated special key '{key_name}'")
+            # The key-up that ended the keypress carries the virtual-key code that was sent
+            event = self.last_emitted_event()
+            self.logger.info(f"Burst {self.event_count}: Simulated special key '{key_name}' "
+                             f"(virtual-key {event.code:#04x})")
             return True
         return False
 
@@ -675,6 +782,7 @@ class SafeKeyboardTester(BaseInputTester):
             win32gui.DestroyWindow(self.transparent_window)
             self.transparent_window = None
             self.test_window = None
+            self.emitter.reset_queue()
 
         # Short delay to ensure cleanup completes
         time.sleep(0.5)
@@ -684,6 +792,18 @@ class SafeKeyboardTester(BaseInputTester):
         self.last_cleanup_time = time.time()
         self.logger.info("Window cleanup completed")
 
+    def attach_window(self, hwnd):
+        """
+        Use a window created elsewhere as the test window.
+
+        This overrides the base class method to also set the transparent_window attribute.
+
+        Args:
+            hwnd (int): Handle of the shared window, or None to detach.
+        """
+        self.transparent_window = hwnd
+        super().attach_window(hwnd)
+
 
 if __name__ == "__main__":
     """
@@ -693,26 +813,21 @@ if __name__ == "__main__":
     with parameters from the configuration file. Any exceptions are logged and re-raised.
 
     The script accepts optional command-line arguments for min and max intervals,
-    which override the configuration file values if provided.
+    which override the configuration file values if provided, and options that bound
+    the run (--max-events, --max-duration, --max-bursts), fix the random seed (--seed)
+    and choose where the JSON run summary is written (--summary). --flood ramps the event
+    rate without pacing to find where the target saturates (see flood_ramp.py).
     """
     import sys
     import logging
 
+    args = build_argument_parser("SafeKeyboardTester v1.8 - Test keyboard input in an isolated environment").parse_args()
+
     print("SafeKeyboardTester v1.8 - Test keyboard input in an isolated environment")
     print("Use 'ESC' key to stop testing")
 
-    # Parse command line arguments for min/max intervals (optional)
-    min_interval = None
-    max_interval = None
-
-    if len(sys.argv) > 1:
-        try:
-            min_interval = float(sys.argv[1])
-            if len(sys.argv) > 2:
-                max_interval = float(sys.argv[2])
-            print(f"Using custom intervals: min={min_interval}s, max={max_interval}s")
-        except ValueError:
-            print("Invalid interval argument. Using config file values.")
+    if args.min_interval is not None:
+        print(f"Using custom intervals: min={args.min_interval}s, max={args.max_interval}s")
 
     # Find config file in the same directory as the script
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -721,10 +836,22 @@ if __name__ == "__main__":
     # Create tester instance
     try:
         tester = SafeKeyboardTester(config_path if os.path.exists(config_path) else None)
-        tester.start_testing(min_interval, max_interval)
+        if args.flood:
+            tester.config["flood_mode"] = True
+        tester.start_testing(
+            args.min_interval,
+            args.max_interval,
+            max_events=args.max_events,
+            max_duration=args.max_duration,
+            max_bursts=args.max_bursts,
+            seed=args.seed,
+            summary_file=args.summary,
+        )
     except Exception as e:
         logging.error(f"\nAn error occurred: {e}")
         print(f"\nError: {e}")
         print("Check the log file for more details.")
-        input("Press Enter to exit...")
+        # Only wait for a keypress when someone is watching the console
+        if sys.stdin and sys.stdin.isatty():
+            input("Press Enter to exit...")
         raise
@@ -0,0 +1,949 @@
+# smt-1.8.py
+import random
+import time
+import os
+import math
+from base_input_tester_1_8 import BaseInputTester, build_argument_parser
+from config_compiler import ConfigError
+from display_geometry import WM_DISPLAYCHANGE, WM_DPICHANGED, create_display_geometry, pack_point
+from input_emitter import POSTED, DROPPED
+from lazy_imports import lazy_import
+from tester_settings import MouseSettings
+from trajectory_library import GENERATED_KINDS, TrajectoryLibrary
+
+"""
+SafeMouseTester v1.8 - An advanced utility for testing mouse input in an isolated environment.
+
+This script creates a hidden window to simulate mouse events without affecting other
+applications. It generates advanced mouse movement patterns, clicks, and scrolls with
+configurable timing and behavior, logging all activities for analysis.
+
+It inherits common functionality from BaseInputTester and adds mouse-specific features.
+
+New in v1.8:
+- Updated to work with BaseInputTester v1.8
+- Default configuration file renamed to smt-1.8.config.json
+- Mouse messages are posted through the backpressure-aware emitter; moves are coalesced
+  while the target queue is saturated and dropped events are no longer counted
+- Added command-line options for bounded runs, random seed and JSON run summary
+- Moves that round to the current pixel are skipped, and moves can be coalesced to a
+  report rate ("move_dedup", "move_report_rate"); the final position of every movement
+  pattern is still posted
+- Added the "trajectory" movement pattern, which maps Bezier, arc, overshoot or recorded
+  human path shapes, precomputed once in a trajectory library, onto each movement
+- Movements use every monitor of the virtual desktop (or only the primary one, with
+  "display_monitors"), read through a cached geometry provider that is refreshed when the
+  display changes; positions are clamped against the monitor set
+"""
+
+# Only loaded once a tester is created
+win32api = lazy_import("win32api")
+win32gui = lazy_import("win32gui")
+win32con = lazy_import("win32con")
+
+# Windows message constants for mouse events
+WM_MOUSEMOVE = 0x0200
+WM_LBUTTONDOWN = 0x0201
+WM_LBUTTONUP = 0x0202
+WM_RBUTTONDOWN = 0x0204
+WM_RBUTTONUP = 0x0205
+WM_MBUTTONDOWN = 0x0207
+WM_MBUTTONUP = 0x0208
+WM_MOUSEWHEEL = 0x020A
+WM_LBUTTONDBLCLK = 0x0203
+
+# MSLLHOOKSTRUCT structure class, defined on first use
+_hook_structure = None
+
+
+def load_hook_structure():
+    """
+    Get the MSLLHOOKSTRUCT structure, defining it the first time it is needed.
+
+    The structure is a ctypes type, so it is not defined when this module is imported.
+
+    Returns:
+        type: The MSLLHOOKSTRUCT structure class.
+    """
+    global _hook_structure
+    if _hook_structure is None:
+        from ctypes import Structure, c_long, POINTER
+
+        class MSLLHOOKSTRUCT(Structure):
+            """
+            Structure that contains information about a low-level mouse input event.
+
+            This structure mirrors the Windows MSLLHOOKSTRUCT used by the mouse hook procedure
+            to pass mouse input to an application.
+
+            Attributes:
+                pt_x (c_long): x-coordinate of the mouse position.
+                pt_y (c_long): y-coordinate of the mouse position.
+                mouseData (c_long): Additional data for the mouse event (like wheel delta).
+                flags (c_long): Flags that indicate various aspects of the mouse event.
+                time (c_long): Timestamp for the event, in milliseconds.
+                dwExtraInfo (POINTER(c_long)): Additional information associated with the message.
+            """
+            _fields_ = [
+                ("pt_x", c_long),
+                ("pt_y", c_long),
+                ("mouseData", c_long),
+                ("flags", c_long),
+                ("time", c_long),
+                ("dwExtraInfo", POINTER(c_long)),
+            ]
+
+        _hook_structure = MSLLHOOKSTRUCT
+    return _hook_structure
+
+
+def __getattr__(name):
+    """
+    Build MSLLHOOKSTRUCT on first use, for code that imports it from this module.
+
+    Args:
+        name (str): Name of the module attribute.
+
+    Returns:
+        type: The structure class.
+
+    Raises:
+        AttributeError: For any other name.
+    """
+    if name == "MSLLHOOKSTRUCT":
+        return load_hook_structure()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class SafeMouseTester(BaseInputTester):
+    """
+    An advanced class for testing mouse input in an isolated environment.
+
+    This class inherits from BaseInputTester and adds mouse-specific functionality.
+    It creates a hidden window that simulates mouse events without interfering
+    with other applications. It generates complex mouse movements, clicks, and scrolls
+    to test mouse functionality.
+
+    Attributes:
+        hidden_window (int): Handle to the hidden window.
+        geometry (DisplayGeometry): Monitor layout of the virtual desktop.
+        current_x (int): Current x-coordinate of the simulated mouse position.
+        current_y (int): Current y-coordinate of the simulated mouse position.
+        movement_patterns (list): List of available movement patterns.
+        movement_pattern_weights (list): Weights for selecting different movement patterns.
+        current_movement_pattern (str): The currently active movement pattern.
+        trajectory_library (TrajectoryLibrary): Path shapes of the "trajectory" pattern, or
+            None until first needed.
+    """
+
+    # Settings class that defines and validates the mouse configuration keys
+    SETTINGS_CLASS = MouseSettings
+
+    # Keys applied by reload_config() in addition to the base ones
+    RELOADABLE_KEYS = BaseInputTester.RELOADABLE_KEYS + (
+        "movement_patterns", "movement_pattern_weights", "movement_min_distance", "movement_max_distance",
+        "click_probability", "scroll_probability", "double_click_probability", "button_types", "button_weights",
+        "targeted_targets", "circular_min_radius", "circular_max_radius", "circular_min_steps",
+        "circular_max_steps", "linear_min_steps", "linear_max_steps", "trajectory_kinds", "trajectory_shapes",
+        "trajectory_file",
+    )
+
+    # Mouse methods timed by phase profiling
+    PROFILED_PHASES = dict(BaseInputTester.PROFILED_PHASES, select_movement_pattern="select")
+
+    def __init__(self, config_file="smt-1.8.config.json"):
+        """
+        Initialize the SafeMouseTester with parameters from config file.
+
+        Args:
+            config_file (str, optional): Path to configuration file. Defaults to "smt-1.8.config.json".
+        """
+        super().__init__(config_file)
+
+        # Initialize window handles to None
+        self.hidden_window = None
+        self.test_window = None
+
+        # Monitor layout of the virtual desktop, refreshed when the display changes
+        self.geometry = create_display_geometry(self.config)
+        self.logger.info(f"Display: {self.geometry.describe()}")
+
+        # Set default starting position to center of the primary screen
+        primary = self.geometry.primary
+        self.current_x = (primary.left + primary.right) // 2
+        self.current_y = (primary.top + primary.bottom) // 2
+
+        self.current_movement_pattern = None
+        self.trajectory_library = None
+        self._trajectory_library_key = None
+
+        # Movement patterns, targets and cached config values
+        self.apply_settings(self.derive_settings(self.settings))
+
+        # Precompute the path shapes at startup when the trajectory pattern is in use
+        if "trajectory" in self.movement_patterns:
+            self.get_trajectory_library()
+
+    def derive_settings(self, settings):
+        """
+        Build the mouse attributes from validated settings, in addition to the base ones.
+
+        Args:
+            settings (MouseSettings): Validated settings.
+
+        Returns:
+            dict: Attribute name to value.
+        """
+        values = super().derive_settings(settings)
+
+        # Movement patterns
+        values["movement_patterns"] = list(settings.movement_patterns)
+        values["movement_pattern_weights"] = list(settings.movement_pattern_weights)
+        # Ensure weights list is the same length as patterns list
+        if len(values["movement_pattern_weights"]) < len(values["movement_patterns"]):
+            values["movement_pattern_weights"].extend(
+                [1.0] * (len(values["movement_patterns"]) - len(values["movement_pattern_weights"])))
+
+        # Cached config values, button types and weights, targets and movement parameters
+        for name in ("movement_min_distance", "movement_max_distance", "click_probability",
+                     "scroll_probability", "double_click_probability", "button_types", "button_weights",
+                     "targeted_targets", "circular_min_radius", "circular_max_radius", "circular_min_steps",
+                     "circular_max_steps", "linear_min_steps", "linear_max_steps", "trajectory_kinds",
+                     "trajectory_shapes", "trajectory_file"):
+            values[name] = getattr(settings, name)
+
+        # Target positions as screen ratios and their weights, so that picking a target builds no lists
+        values["target_ratios"] = tuple((target["x_ratio"], target["y_ratio"]) for target in settings.targeted_targets)
+        values["target_weights"] = tuple(target.get("weight", 1) for target in settings.targeted_targets)
+        return values
+
+    def create_test_window(self):
+        """
+        Create a hidden window for mouse event simulation.
+
+        This window is invisible to the user but can receive and process mouse events.
+        It is used as a target for the simulated mouse events without affecting
+        other applications.
+        """
+        from ctypes import windll
+        windll.user32.SetProcessDPIAware()
+
+        # Register window class
+        wc = win32gui.WNDCLASS()
+        wc.lpfnWndProc = self.window_proc
+        wc.lpszClassName = "IsolatedMouseTester"
+        wc.hInstance = win32api.GetModuleHandle(None)
+
+        try:
+            win32gui.RegisterClass(wc)
+        except Exception:
+            # Class might already be registered, which is fine
+            pass
+
+        # Create hidden window (1x1 pixel)
+        self.hidden_window = win32gui.CreateWindowEx(
+            win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT | win32con.WS_EX_TOPMOST,
+            wc.lpszClassName,
+            "Isolated Mouse Test",
+            win32con.WS_POPUP,  # Hidden window
+            0,
+            0,
+            1,
+            1,  # 1x1 pixel size
+            0,
+            0,
+            wc.hInstance,
+            None,
+        )
+
+        # Set layered window attributes (just in case we make it visible for debugging)
+        win32gui.SetLayeredWindowAttributes(
+            self.hidden_window, 0, 1, win32con.LWA_ALPHA
+        )
+
+        # Store window handle in both attributes for compatibility
+        self.test_window = self.hidden_window
+
+        self.logger.info(f"Created new hidden window with handle: {self.hidden_window}")
+
+    def window_proc(self, hwnd, msg, wparam, lparam):
+        """
+        Window procedure that also drops the cached monitor layout when the display changes.
+
+        Args:
+            hwnd (int): Handle to the window.
+            msg (int): The message identifier.
+            wparam (int): Additional message-specific information.
+            lparam (int): Additional message-specific information.
+
+        Returns:
+            int: The result of the message processing.
+        """
+        if msg == WM_DISPLAYCHANGE or msg == WM_DPICHANGED:
+            self.geometry.invalidate()
+            self.logger.info("Display changed; the monitor layout will be read again")
+        return super().window_proc(hwnd, msg, wparam, lparam)
+
+    def simulate_mouse_move(self, to_x, to_y):
+        """
+        Simulate a mouse movement to a specific position.
+
+        Sends a mouse move message to the hidden window. The coordinates
+        are packed into the lparam parameter according to Windows API conventions.
+
+        Args:
+            to_x (int): The x-coordinate to move to.
+            to_y (int): The y-coordinate to move to.
+
+        Returns:
+            bool: True if the movement was simulated, False otherwise.
+        """
+        if self.hidden_window:
+            try:
+                # Ensure coordinates are on a monitor
+                to_x, to_y = self.geometry.clamp(to_x, to_y)
+
+                # Pack coordinates into lparam (low-order word has x, high-order word has y)
+                lparam = pack_point(to_x, to_y)
+
+                # Send mouse move message (skipped if the position is unchanged, coalesced with later
+                # moves while the queue is saturated or before the next report is due)
+                result = self.emitter.post_mouse_move(self.hidden_window, WM_MOUSEMOVE, 0, lparam)
+                if result == DROPPED:
+                    return False
+
+                # Update current position
+                self.current_x = to_x
+                self.current_y = to_y
+
+                # Coalesced moves are counted when the emitter flushes them, duplicates not at all
+                if result == POSTED:
+                    self.record_event("move")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error simulating mouse move: {e}")
+                return False
+        return False
+
+    def flood_event(self):
+        """
+        Move the mouse to a random point on the monitors in use, for a flood ramp.
+
+        Returns:
+            bool: True if the move was posted or coalesced, False if it was dropped.
+        """
+        return self.simulate_mouse_move(*self.geometry.random_point())
+
+    def simulate_mouse_click(self, button_type="left", double_click=False):
+        """
+        Simulate a mouse click at the current position.
+
+        Sends mouse button down and up messages to the hidden window to simulate a click.
+        Can also simulate double-click by sending the sequence twice with appropriate timing.
+
+        Args:
+            button_type (str, optional): The type of mouse button to simulate.
+                Can be "left", "right", or "middle". Defaults to "left".
+            double_click (bool, optional): Whether to simulate a double-click. Defaults to False.
+
+        Returns:
+            bool: True if the click was simulated, False otherwise.
+        """
+        if self.hidden_window:
+            try:
+                # Pack coordinates into lparam
+                lparam = pack_point(self.current_x, self.current_y)
+
+                # Determine message types based on button
+                if button_type == "left":
+                    down_msg = WM_LBUTTONDOWN
+                    up_msg = WM_LBUTTONUP
+                    dblclk_msg = WM_LBUTTONDBLCLK
+                elif button_type == "right":
+                    down_msg = WM_RBUTTONDOWN
+                    up_msg = WM_RBUTTONUP
+                    dblclk_msg = None  # No standard right double-click message
+                elif button_type == "middle":
+                    down_msg = WM_MBUTTONDOWN
+                    up_msg = WM_MBUTTONUP
+                    dblclk_msg = None  # No standard middle double-click message
+                else:
+                    self.logger.warning(f"Invalid button type: {button_type}")
+                    return False
+
+                emit = self.emitter.post
+                if double_click and button_type == "left":
+                    # Send double-click message directly
+                    delivered = emit(self.hidden_window, dblclk_msg, 0, lparam)
+
+                    # Brief delay
+                    self.sleep(0.05)
+
+                    # Send button up to complete the double-click
+                    delivered = emit(self.hidden_window, up_msg, 0, lparam) and delivered
+                else:
+                    # Send button down
+                    delivered = emit(self.hidden_window, down_msg, 0, lparam)
+
+                    # Brief delay between down and up
+                    self.sleep(0.08)
+
+                    # Send button up
+                    delivered = emit(self.hidden_window, up_msg, 0, lparam) and delivered
+
+                    # For double click, repeat the sequence with appropriate timing
+                    if double_click:
+                        self.sleep(0.05)  # Brief delay between clicks
+
+                        # Send second click
+                        delivered = emit(self.hidden_window, down_msg, 0, lparam) and delivered
+                        self.sleep(0.08)
+                        delivered = emit(self.hidden_window, up_msg, 0, lparam) and delivered
+
+                if not delivered:
+                    self.logger.warning(f"Mouse {button_type} click dropped: messages could not be posted")
+                    return False
+
+                self.record_event("double_click" if double_click else "click")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error simulating mouse click: {e}")
+                return False
+        return False
+
+    def simulate_mouse_scroll(self, delta=120):
+        """
+        Simulate a mouse wheel scroll at the current position.
+
+        Sends a mouse wheel message to the hidden window. The delta parameter
+        determines the direction and amount of scrolling.
+
+        Args:
+            delta (int, optional): The scroll amount. Positive for scroll up,
+                negative for scroll down. Defaults to 120 (scroll up).
+
+        Returns:
+            bool: True if the scroll was simulated, False otherwise.
+        """
+        if self.hidden_window:
+            try:
+                # Pack coordinates into lparam
+                lparam = pack_point(self.current_x, self.current_y)
+
+                # Set mouseData to the scroll delta
+                mouseData = delta << 16
+
+                # Send mousewheel message
+                if not self.emitter.post(self.hidden_window, WM_MOUSEWHEEL, mouseData, lparam):
+                    self.logger.warning("Mouse scroll dropped: message could not be posted")
+                    return False
+
+                self.record_event("scroll")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error simulating mouse scroll: {e}")
+                return False
+        return False
+
+    def simulate_random_movement(self):
+        """
+        Simulate a random mouse movement.
+
+        Moves the mouse in a random direction by a random distance,
+        ensuring the movement is at least the minimum distance and
+        stays within screen boundaries.
+
+        Returns:
+            bool: True if the movement was simulated, False otherwise.
+        """
+        # Calculate random movement within bounds
+        delta_x = random.randint(-self.movement_max_distance, self.movement_max_distance)
+        delta_y = random.randint(-self.movement_max_distance, self.movement_max_distance)
+
+        # Ensure movement is at least minimum distance
+        distance = math.sqrt(delta_x**2 + delta_y**2)
+        if distance < self.movement_min_distance:
+            if distance == 0:
+                # A zero-length step has no direction to scale; pick one at random
+                angle = random.uniform(0, 2 * math.pi)
+                delta_x, delta_y, distance = math.cos(angle), math.sin(angle), 1.0
+            # Scale up to minimum distance
+            scale_factor = self.movement_min_distance / distance
+            delta_x = int(delta_x * scale_factor)
+            delta_y = int(delta_y * scale_factor)
+
+        # Calculate new position
+        new_x, new_y = self.geometry.clamp(self.current_x + delta_x, self.current_y + delta_y)
+
+        # Simulate the movement
+        if self.simulate_mouse_move(new_x, new_y):
+            self.logger.info(f"Event {self.event_count}: Mouse moved randomly from "
+                           f"({self.current_x - delta_x}, {self.current_y - delta_y}) "
+                           f"to ({new_x}, {new_y})")
+            return True
+        return False
+
+    def simulate_linear_movement(self):
+        """
+        Simulate a linear mouse movement.
+
+        Moves the mouse in a straight line from the current position to a
+        random end position, with intermediate steps along the line to
+        simulate realistic cursor movement.
+
+        Returns:
+            bool: True if the movement was simulated successfully, False otherwise.
+        """
+        # Determine random end point
+        delta_x = random.randint(-self.movement_max_distance, self.movement_max_distance)
+        delta_y = random.randint(-self.movement_max_distance, self.movement_max_distance)
+
+        # Ensure movement is at least minimum distance
+        distance = math.sqrt(delta_x**2 + delta_y**2)
+        if distance < self.movement_min_distance:
+            if distance == 0:
+                # A zero-length step has no direction to scale; pick one at random
+                angle = random.uniform(0, 2 * math.pi)
+                delta_x, delta_y, distance = math.cos(angle), math.sin(angle), 1.0
+            # Scale up to minimum distance
+            scale_factor = self.movement_min_distance / distance
+            delta_x = int(delta_x * scale_factor)
+            delta_y = int(delta_y * scale_factor)
+
+        # Calculate end position
+        end_x, end_y = self.geometry.clamp(self.current_x + delta_x, self.current_y + delta_y)
+
+        # Determine number of steps for this linear movement
+        steps = random.randint(self.linear_min_steps, self.linear_max_steps)
+
+        # Store starting position for logging
+        start_x, start_y = self.current_x, self.current_y
+
+        # Move in steps
+        success = True
+        for step in range(1, steps + 1):
+            # Calculate position at this step
+            step_x = int(start_x + (end_x - start_x) * step / steps)
+            step_y = int(start_y + (end_y - start_y) * step / steps)
+
+            # Simulate the movement
+            if not self.simulate_mouse_move(step_x, step_y):
+                success = False
+                break
+
+            # Small delay between steps
+            self.sleep(0.01)
+
+            # Process messages periodically
+            self.check_and_process_messages()
+
+        if success:
+            self.logger.info(f"Event {self.event_count}: Mouse moved linearly from "
+                           f"({start_x}, {start_y}) to ({end_x}, {end_y}) in {steps} steps")
+            return True
+        self.logger.warning(f"Linear movement aborted at step {step} of {steps}: mouse move dropped")
+        return False
+
+    def simulate_circular_movement(self):
+        """
+        Simulate a circular mouse movement.
+
+        Moves the mouse in a circular pattern around the current position,
+        creating a realistic circular motion with configurable radius and steps.
+
+        Returns:
+            bool: True if the movement was simulated successfully, False otherwise.
+        """
+        # Determine circle parameters
+        radius = random.randint(self.circular_min_radius, self.circular_max_radius)
+        steps = random.randint(self.circular_min_steps, self.circular_max_steps)
+
+        # Ensure circle stays within the bounds of the current monitor
+        monitor = self.geometry.nearest_monitor(self.current_x, self.current_y)
+        center_x = max(monitor.left + radius, min(monitor.right - radius, self.current_x))
+        center_y = max(monitor.top + radius, min(monitor.bottom - radius, self.current_y))
+
+        # Calculate positions on circle (kept on the monitors, should the circle not fit)
+        points = self.geometry.clamp_points(
+            [(int(center_x + radius * math.cos(2 * math.pi * step / steps)),
+              int(center_y + radius * math.sin(2 * math.pi * step / steps))) for step in range(steps)])
+
+        # Move in a circle
+        success = True
+        for step, (x, y) in enumerate(points):
+            # Simulate the movement
+            if not self.simulate_mouse_move(x, y):
+                success = False
+                break
+
+            # Small delay between steps
+            self.sleep(0.02)
+
+            # Process messages periodically
+            self.check_and_process_messages()
+
+        if success:
+            self.logger.info(f"Event {self.event_count}: Mouse moved in circular pattern "
+                           f"around ({center_x}, {center_y}) with radius {radius}")
+            return True
+        self.logger.warning(f"Circular movement aborted at step {step + 1} of {steps}: mouse move dropped")
+        return False
+
+    def simulate_targeted_movement(self):
+        """
+        Simulate a mouse movement targeted at a specific location.
+
+        Selects a target position from a predefined list of weighted targets, on a
+        monitor picked in proportion to its area, then moves the mouse to that target
+        with a realistic motion pattern.
+        Useful for simulating clicks on UI elements.
+
+        Returns:
+            bool: True if the movement was simulated successfully, False otherwise.
+        """
+        if not self.targeted_targets:
+            return self.simulate_random_movement()
+
+        # Select a target based on weights
+        x_ratio, y_ratio = random.choices(self.target_ratios, weights=self.target_weights, k=1)[0]
+        monitor = self.geometry.random_monitor()
+        target_x, target_y = self.geometry.clamp(monitor.left + int(x_ratio * (monitor.right - monitor.left)),
+                                                 monitor.top + int(y_ratio * (monitor.bottom - monitor.top)))
+
+        # Calculate distance to target
+        distance = math.sqrt((target_x - self.current_x)**2 + (target_y - self.current_y)**2)
+
+        # Determine number of steps based on distance
+        steps = max(5, min(20, int(distance / 10)))
+
+        # Store starting position for logging
+        start_x, start_y = self.current_x, self.current_y
+
+        # Add slight curve to movement for realism
+        curve_offset = int(distance * 0.1)  # 10% of distance
+        midpoint_x = (start_x + target_x) / 2 + random.randint(-curve_offset, curve_offset)
+        midpoint_y = (start_y + target_y) / 2 + random.randint(-curve_offset, curve_offset)
+
+        # Quadratic Bezier curve formula, with t running from 0 to 1 (kept on the monitors)
+        points = self.geometry.clamp_points(
+            [(int((1-t)**2 * start_x + 2*(1-t)*t * midpoint_x + t**2 * target_x),
+              int((1-t)**2 * start_y + 2*(1-t)*t * midpoint_y + t**2 * target_y))
+             for t in (step / steps for step in range(1, steps + 1))])
+
+        # Move in steps with a slight curve
+        success = True
+        for step, (x, y) in enumerate(points, 1):
+            # Simulate the movement
+            if not self.simulate_mouse_move(x, y):
+                success = False
+                break
+
+            # Varying delay to simulate human acceleration/deceleration
+            delay = 0.02
+            if step < steps * 0.2 or step > steps * 0.8:
+                delay = 0.03  # Slower at start and end
+            self.sleep(delay)
+
+            # Process messages periodically
+            self.check_and_process_messages()
+
+        if success:
+            self.logger.info(f"Event {self.event_count}: Mouse moved to target "
+                           f"from ({start_x}, {start_y}) to ({target_x}, {target_y})")
+            return True
+        self.logger.warning(f"Targeted movement aborted at step {step} of {steps}: mouse move dropped")
+        return False
+
+    def get_trajectory_library(self):
+        """
+        Get the trajectory library, building it if the trajectory settings have changed.
+
+        If the recorded paths cannot be loaded, the error is logged and the library is
+        built from the generated kinds only.
+
+        Returns:
+            TrajectoryLibrary: The library, or None if it holds no shapes.
+        """
+        key = (self.trajectory_kinds, self.trajectory_shapes, self.trajectory_file)
+        if key == self._trajectory_library_key:
+            return self.trajectory_library
+        self._trajectory_library_key = key
+
+        start = time.perf_counter()
+        try:
+            library = TrajectoryLibrary.build(self.trajectory_kinds, self.trajectory_shapes, self.trajectory_file)
+        except (OSError, ConfigError) as e:
+            self.logger.error(f"Error loading recorded trajectories from {self.trajectory_file}: {e}")
+            library = TrajectoryLibrary.build([kind for kind in self.trajectory_kinds if kind in GENERATED_KINDS],
+                                              self.trajectory_shapes)
+        self.trajectory_library = library if library.kinds else None
+        self.logger.info(f"Trajectory library ready in {(time.perf_counter() - start) * 1000:.1f} ms: "
+                         f"{library.counts()}")
+        return self.trajectory_library
+
+    def simulate_trajectory_movement(self):
+        """
+        Simulate a mouse movement along a precomputed path shape.
+
+        Picks a random end point, as a linear movement does, and a shape from the
+        trajectory library, which is scaled, rotated and moved onto the start and end
+        points. The shape's points are spaced by a minimum-jerk velocity profile, so
+        steps are short at the start and end of the movement.
+
+        Returns:
+            bool: True if the movement was simulated successfully, False otherwise.
+        """
+        library = self.get_trajectory_library()
+        if library is None:
+            return self.simulate_linear_movement()
+
+        # Determine random end point
+        delta_x = random.randint(-self.movement_max_distance, self.movement_max_distance)
+        delta_y = random.randint(-self.movement_max_distance, self.movement_max_distance)
+
+        # Ensure movement is at least minimum distance
+        distance = math.sqrt(delta_x**2 + delta_y**2)
+        if distance < self.movement_min_distance:
+            if distance == 0:
+                # A zero-length step has no direction to scale; pick one at random
+                angle = random.uniform(0, 2 * math.pi)
+                delta_x, delta_y, distance = math.cos(angle), math.sin(angle), 1.0
+            # Scale up to minimum distance
+            scale_factor = self.movement_min_distance / distance
+            delta_x = int(delta_x * scale_factor)
+            delta_y = int(delta_y * scale_factor)
+            distance = math.sqrt(delta_x**2 + delta_y**2)
+
+        # Calculate end position
+        start_x, start_y = self.current_x, self.current_y
+        end_x, end_y = self.geometry.clamp(start_x + delta_x, start_y + delta_y)
+
+        # Map a shape onto the movement, with more steps for longer movements
+        kind = random.choice(library.kinds)
+        steps = max(5, min(20, int(distance / 10)))
+        points = self.geometry.clamp_points(library.path(start_x, start_y, end_x, end_y, steps, library.choose(kind)))
+
+        # Move in steps
+        success = True
+        for step, (x, y) in enumerate(points, 1):
+            # Simulate the movement
+            if not self.simulate_mouse_move(x, y):
+                success = False
+                break
+
+            # Small delay between steps
+            self.sleep(0.01)
+
+            # Process messages periodically
+            self.check_and_process_messages()
+
+        if success:
+            self.logger.info(f"Event {self.event_count}: Mouse moved along a trajectory ({kind}) from "
+                           f"({start_x}, {start_y}) to ({end_x}, {end_y}) in {steps} steps")
+            return True
+        self.logger.warning(f"Trajectory movement aborted at step {step} of {steps}: mouse move dropped")
+        return False
+
+    def set_pattern_weights(self, weights):
+        """
+        Change the movement pattern weights of the running test.
+
+        Args:
+            weights (dict): New weight for each movement pattern to change.
+
+        Returns:
+            dict: The weight of every movement pattern now in effect.
+        """
+        self.movement_pattern_weights = self.merge_pattern_weights(
+            self.movement_patterns, self.movement_pattern_weights, weights)
+        return dict(zip(self.movement_patterns, self.movement_pattern_weights))
+
+    def select_movement_pattern(self):
+        """
+        Choose the next movement pattern based on the configured weights.
+
+        Returns:
+            str: Name of the chosen pattern.
+        """
+        return random.choices(
+            self.movement_patterns,
+            weights=self.movement_pattern_weights[:len(self.movement_patterns)],
+            k=1
+        )[0]
+
+    def simulate_movement_pattern(self):
+        """
+        Select and simulate a mouse movement pattern based on weighted probabilities.
+
+        Chooses a movement pattern from the configured list based on their weights,
+        then simulates that pattern. This creates more realistic mouse behavior
+        with varied patterns of movement. A final position held back by the report
+        rate is posted once its report is due.
+
+        Returns:
+            bool: True if the pattern was simulated successfully, False otherwise.
+        """
+        # Select a movement pattern
+        self.current_movement_pattern = self.select_movement_pattern()
+
+        # Execute the selected pattern
+        if self.current_movement_pattern == "random":
+            moved = self.simulate_random_movement()
+        elif self.current_movement_pattern == "linear":
+            moved = self.simulate_linear_movement()
+        elif self.current_movement_pattern == "circular":
+            moved = self.simulate_circular_movement()
+        elif self.current_movement_pattern == "targeted":
+            moved = self.simulate_targeted_movement()
+        elif self.current_movement_pattern == "trajectory":
+            moved = self.simulate_trajectory_movement()
+        else:
+            # Fall back to random movement if pattern not recognized
+            self.logger.warning(f"Unknown movement pattern: {self.current_movement_pattern}. Falling back to random.")
+            moved = self.simulate_random_movement()
+
+        # Report where the movement ended
+        self.emitter.flush_report_move(self.sleep)
+        return moved
+
+    def simulate_input_event(self):
+        """
+        Simulate a mouse input event.
+
+        Generates a random mouse event - either a movement pattern, a click, or a scroll,
+        based on configured probabilities. This method is called by the base class's
+        testing loop.
+
+        Returns:
+            bool: True if the event was simulated successfully, False otherwise.
+        """
+        # Decide what type of event to generate
+        random_value = random.random()
+
+        # Move the mouse (highest probability)
+        if random_value >= (self.click_probability + self.scroll_probability):
+            return self.simulate_movement_pattern()
+
+        # Generate a mouse click
+        elif random_value < self.click_probability:
+            # Choose random button type based on weights
+            button_type = random.choices(
+                self.button_types,
+                weights=self.button_weights[:len(self.button_types)],
+                k=1
+            )[0]
+
+            # Decide if this is a double-click
+            double_click = random.random() < self.double_click_probability and button_type == "left"
+
+            # Simulate the click
+            if self.simulate_mouse_click(button_type, double_click):
+                click_type = "double-click" if double_click else "click"
+                event = self.last_emitted_event()
+                self.logger.info(f"Event {self.event_count}: {button_type.capitalize()} {click_type} at "
+                               f"({event.x}, {event.y})")
+                return True
+
+        # Generate a mouse scroll
+        else:
+            # Random scroll amount (positive for up, negative for down)
+            scroll_direction = 1 if random.random() > 0.5 else -1
+            scroll_amount = random.randint(1, 3) * 120 * scroll_direction
+
+            # Simulate the scroll
+            if self.simulate_mouse_scroll(scroll_amount):
+                # The wheel message as posted: its code is the signed wheel delta
+                event = self.last_emitted_event()
+                direction = "up" if event.code > 0 else "down"
+                self.logger.info(f"Event {self.event_count}: Mouse scrolled {direction} at "
+                               f"({event.x}, {event.y})")
+                return True
+
+        return False
+
+    def cleanup_window(self):
+        """
+        Perform periodic cleanup by destroying and recreating the window.
+
+        This overrides the base class method to handle the hidden_window attribute.
+        This helps prevent resource leaks and message queue buildup by completely
+        refreshing the window and its associated resources.
+        """
+        self.logger.info("Performing window cleanup...")
+        if self.hidden_window:
+            win32gui.DestroyWindow(self.hidden_window)
+            self.hidden_window = None
+            self.test_window = None
+            self.emitter.reset_queue()
+
+        # Short delay to ensure cleanup completes
+        time.sleep(0.5)
+
+        # Create a new window
+        self.create_test_window()
+        self.last_cleanup_time = time.time()
+        self.logger.info("Window cleanup completed")
+
+    def attach_window(self, hwnd):
+        """
+        Use a window created elsewhere as the test window.
+
+        This overrides the base class method to also set the hidden_window attribute.
+
+        Args:
+            hwnd (int): Handle of the shared window, or None to detach.
+        """
+        self.hidden_window = hwnd
+        super().attach_window(hwnd)
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for the SafeMouseTester script.
+
+    Creates an instance of the SafeMouseTester class and starts the testing process
+    with parameters from the configuration file. Any exceptions are logged and re-raised.
+
+    The script accepts optional command-line arguments for min and max intervals,
+    which override the configuration file values if provided, and options that bound
+    the run (--max-events, --max-duration, --max-bursts), fix the random seed (--seed)
+    and choose where the JSON run summary is written (--summary). --flood ramps the event
+    rate without pacing to find where the target saturates (see flood_ramp.py).
+    """
+    import sys
+    import logging
+
+    args = build_argument_parser("SafeMouseTester v1.8 - Test mouse input in an isolated environment").parse_args()
+
+    print("SafeMouseTester v1.8 - Test mouse input in an isolated environment")
+    print("Use 'ESC' key to stop testing")
+
+    if args.min_interval is not None:
+        print(f"Using custom intervals: min={args.min_interval}s, max={args.max_interval}s")
+
+    # Find config file in the same directory as the script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(script_dir, "smt-1.8.config.json")
+
+    # Create tester instance
+    try:
+        tester = SafeMouseTester(config_path if os.path.exists(config_path) else None)
+        if args.flood:
+            tester.config["flood_mode"] = True
+        tester.start_testing(
+            args.min_interval,
+            args.max_interval,
+            max_events=args.max_events,
+            max_duration=args.max_duration,
+            max_bursts=args.max_bursts,
+            seed=args.seed,
+            summary_file=args.summary,
+        )
+    except Exception as e:
+        logging.error(f"\nAn error occurred: {e}")
+        print(f"\nError: {e}")
+        print("Check the log file for more details.")
+        # Only wait for a keypress when someone is watching the console
+        if sys.stdin and sys.stdin.isatty():
+            input("Press Enter to exit...")
+        raise
@@ -0,0 +1,234 @@
+# stack_sampler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+"""
+StackSampler - Low-frequency sampling profiler for the testing thread.
+
+Attaching an external profiler to a tester running on a Windows machine in the
+field is rarely practical, so a tester can profile itself: a background thread
+wakes at a fixed interval, reads the testing thread's current frame through
+sys._current_frames() and counts the call stack it finds.
+
+Stacks are written in the collapsed ("folded") format read by standard flamegraph
+tools such as flamegraph.pl, inferno and speedscope: one line per distinct stack,
+frames from the outermost to the innermost separated by semicolons, followed by a
+space and the number of samples. Frames are named "function (file.py)", so a
+function's samples are merged whatever line it was on.
+
+Sampling never touches the testing thread itself. At the default 20 samples per
+second it costs the process well under one percent of a core, so it can stay on
+for a multi-day soak run. The file is rewritten every FLUSH_INTERVAL seconds, so
+a run that is killed still leaves its profile behind.
+"""
+
+# Default seconds between samples
+DEFAULT_INTERVAL = 0.05
+
+# Seconds between rewrites of the output file while sampling
+FLUSH_INTERVAL = 60.0
+
+# Deepest stack recorded; deeper stacks keep their innermost frames
+MAX_DEPTH = 128
+
+
+def collapse_stack(frame):
+    """
+    Describe a call stack as a collapsed-stack key.
+
+    Args:
+        frame (frame): The innermost frame of the stack.
+
+    Returns:
+        str: Frame names from the outermost to the innermost, separated by semicolons.
+    """
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        names.append(f"{name} ({os.path.basename(code.co_filename)})".replace(";", ":"))
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+class StackSampler:
+    """
+    Sample one thread's call stack at a fixed interval and count the stacks seen.
+
+    Attributes:
+        thread_id (int): Identifier of the sampled thread, as from threading.get_ident().
+        interval (float): Seconds between samples.
+        duration (float): Seconds to sample for, or None to sample until stopped.
+        output_file (str): Path of the collapsed-stack file, or None to keep the stacks in memory.
+        stacks (Counter): Collapsed stack to number of samples.
+        samples (int): Number of samples taken.
+        started_at (float): time.time() when sampling started, or None.
+        stopped_at (float): time.time() when sampling stopped, or None while sampling.
+    """
+
+    def __init__(self, thread_id, interval=DEFAULT_INTERVAL, duration=None, output_file=None, logger=None):
+        """
+        Initialize the StackSampler.
+
+        Args:
+            thread_id (int): Identifier of the thread to sample.
+            interval (float, optional): Seconds between samples. Defaults to DEFAULT_INTERVAL.
+            duration (float, optional): Stop after this many seconds. Defaults to None (until stopped).
+            output_file (str, optional): Path of the collapsed-stack file. Defaults to None.
+            logger (logging.Logger, optional): Logger for errors. Defaults to None.
+
+        Raises:
+            ValueError: If interval or duration is not positive.
+        """
+        if not interval > 0:
+            raise ValueError(f"the sampling interval must be positive, got {interval}")
+        if duration is not None and not duration > 0:
+            raise ValueError(f"the sampling duration must be positive or null, got {duration}")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.duration = duration
+        self.output_file = output_file
+        self.logger = logger
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        """
+        Check whether the sampler is still sampling.
+
+        Returns:
+            bool: True between start() and the end of sampling.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start sampling on a background thread.
+        """
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and write the output file.
+
+        Returns:
+            dict: The sampler's statistics, as from stats().
+        """
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=max(1.0, self.interval * 2))
+        return self.stats()
+
+    def sample(self):
+        """
+        Take one sample of the thread's stack.
+
+        Returns:
+            bool: True if the thread was found, False if it has exited.
+        """
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return False
+        stack = collapse_stack(frame)
+        del frame
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+        return True
+
+    def _sample_loop(self):
+        """
+        Sample until stopped, the duration ends or the thread exits, then write the output file.
+        """
+        deadline = self.started_at + self.duration if self.duration is not None else None
+        next_flush = time.monotonic() + FLUSH_INTERVAL
+        try:
+            while not self._stop_event.wait(self.interval):
+                if not self.sample():
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    break
+                if self.output_file and time.monotonic() >= next_flush:
+                    self.write()
+                    next_flush = time.monotonic() + FLUSH_INTERVAL
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error sampling stacks: {e}")
+        finally:
+            self.stopped_at = time.time()
+            if self.output_file:
+                self.write()
+
+    def collapsed_lines(self):
+        """
+        Get the counted stacks in the collapsed-stack format.
+
+        Returns:
+            list: "stack count" lines, most frequent stack first.
+        """
+        with self._lock:
+            counts = self.stacks.most_common()
+        return [f"{stack} {count}" for stack, count in counts]
+
+    def write(self, output_file=None):
+        """
+        Write the counted stacks to a collapsed-stack file, replacing it atomically.
+
+        Args:
+            output_file (str, optional): Output path. Defaults to output_file.
+
+        Returns:
+            str: Path of the written file, or None if it could not be written.
+        """
+        output_file = output_file or self.output_file
+        if not output_file:
+            return None
+        temp_file = f"{output_file}.tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                for line in self.collapsed_lines():
+                    f.write(line + "\n")
+            os.replace(temp_file, output_file)
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"Error writing stack samples to {output_file}: {e}")
+            return None
+        return output_file
+
+    def stats(self):
+        """
+        Get the sampler's statistics.
+
+        Returns:
+            dict: Whether it is running, the interval, duration, sample and stack counts,
+                seconds sampled and the output file.
+        """
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.stopped_at or time.time()) - self.started_at
+        with self._lock:
+            samples, stacks = self.samples, len(self.stacks)
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "duration_s": self.duration,
+            "samples": samples,
+            "distinct_stacks": stacks,
+            "sampled_s": round(elapsed, 3),
+            "output_file": os.path.abspath(self.output_file) if self.output_file else None,
+        }
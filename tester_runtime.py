@@ -0,0 +1,616 @@
+# tester_runtime.py
+import heapq
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from run_metrics import RunMetrics
+from base_input_tester_1_8 import build_argument_parser
+
+"""
+MultiTesterRuntime - Run several input testers in one process.
+
+Running the keyboard and mouse testers side by side normally means two processes,
+each with its own window, scheduler thread, Escape poll and resource monitor. The
+runtime hosts any number of testers instead: one scheduler thread decides which
+tester fires next, all testers post to a single window owned by the first tester,
+and the Escape poll, message pump, window recycling and resource monitoring are
+done once for the whole group.
+
+Each tester keeps its own pacing (interval source, activity calendar, backpressure)
+and its own run summary; the runtime adds a combined summary on top. Each tester
+also keeps its own control socket and configuration watcher: commands and reloads
+are applied by the scheduler thread between bursts, and a paused tester keeps its
+place in the schedule without firing. Flood mode needs a tester to itself and is
+not supported here.
+"""
+
+# Scheduling orders supported by MultiTesterRuntime
+SCHEDULING_ORDERS = ("timeline", "round_robin")
+
+# Seconds between checks of whether a paused tester has been resumed
+PAUSED_RECHECK_INTERVAL = 0.1
+
+# Tester scripts that can be loaded from the command line: option -> (script, class)
+TESTER_SCRIPTS = {
+    "keyboard": ("skt-1.8.py", "SafeKeyboardTester"),
+    "mouse": ("smt-1.8.py", "SafeMouseTester"),
+}
+
+
+def load_tester_class(script_path, class_name):
+    """
+    Load a tester class from one of the tester scripts.
+
+    The scripts have hyphenated file names, so they cannot be imported with a plain
+    import statement.
+
+    Args:
+        script_path (str): Path of the script, relative to this module if not absolute.
+        class_name (str): Name of the tester class defined by the script.
+
+    Returns:
+        type: The tester class.
+    """
+    if not os.path.isabs(script_path):
+        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script_path)
+
+    module_name = os.path.splitext(os.path.basename(script_path))[0].replace("-", "_").replace(".", "_")
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return getattr(module, class_name)
+
+
+class MultiTesterRuntime:
+    """
+    Drive several testers from a single scheduler, window and monitor.
+
+    In "timeline" order every tester keeps its own next-event time and the scheduler
+    always runs the tester that is due first. In "round_robin" order the testers take
+    turns in a fixed sequence, each waiting the interval chosen by the previous one.
+
+    A tester that reaches its own run bounds leaves the schedule; the runtime stops
+    when no testers remain, when its own bounds are reached, or when Escape is pressed.
+
+    Attributes:
+        testers (list): The hosted testers; the first one owns the shared window.
+        order (str): Scheduling order, "timeline" or "round_robin".
+        running (bool): Whether the runtime is currently running.
+        seed (int): Random seed shared by all testers for the current run.
+        stop_reason (str): Why the last run ended, or None while running.
+        max_events (int): Stop after this many events across all testers, or None.
+        max_duration (float): Stop after this many seconds, or None.
+        max_bursts (int): Stop after this many bursts across all testers, or None.
+        metrics (RunMetrics): Resource samples for the whole process.
+    """
+
+    def __init__(self, testers, order="timeline"):
+        """
+        Initialize the runtime.
+
+        Args:
+            testers (list): Tester instances to host. Must not be empty.
+            order (str, optional): "timeline" or "round_robin". Defaults to "timeline".
+
+        Raises:
+            ValueError: If no testers are given, the order is unknown or a tester is
+                configured for flood mode.
+        """
+        if not testers:
+            raise ValueError("MultiTesterRuntime needs at least one tester")
+        if order not in SCHEDULING_ORDERS:
+            raise ValueError(f"Unknown scheduling order '{order}', expected one of {SCHEDULING_ORDERS}")
+        for tester in testers:
+            if tester.config.get("flood_mode", False):
+                raise ValueError(f"{tester.__class__.__name__} is configured for flood mode, which is not "
+                                 f"supported in a shared runtime; run its script on its own")
+
+        self.testers = list(testers)
+        self.order = order
+        self.running = False
+        self.seed = None
+        self.stop_reason = None
+        self.max_events = None
+        self.max_duration = None
+        self.max_bursts = None
+        self.metrics = RunMetrics()
+
+        # Housekeeping follows the settings of the window owner
+        owner = self.owner
+        self.message_process_interval = owner.message_process_interval
+        self.cleanup_interval = owner.cleanup_interval
+        self.resource_monitor_interval = owner.resource_monitor_interval
+        self.last_message_process_time = time.time()
+        self.last_cleanup_time = time.time()
+        self.last_resource_monitor_time = time.time()
+
+        self._run_deadline = None
+        self._wake_event = threading.Event()
+
+        # Control commands and stop requests for any tester wake the shared scheduler
+        for tester in self.testers:
+            tester.runtime = self
+            tester._wake_event = self._wake_event
+
+    @property
+    def owner(self):
+        """
+        Get the tester that creates and recycles the shared window.
+
+        Returns:
+            BaseInputTester: The first hosted tester.
+        """
+        return self.testers[0]
+
+    @property
+    def logger(self):
+        """
+        Get the logger instance.
+
+        Returns:
+            logging.Logger: The logger instance.
+        """
+        return logging.getLogger()
+
+    @property
+    def event_count(self):
+        """
+        Get the number of events emitted by all testers in the current run.
+
+        Returns:
+            int: Total event count.
+        """
+        return sum(tester.event_count for tester in self.testers)
+
+    @property
+    def burst_count(self):
+        """
+        Get the number of bursts run by all testers in the current run.
+
+        Returns:
+            int: Total burst count.
+        """
+        return sum(tester.burst_count for tester in self.testers)
+
+    def attach_window(self):
+        """
+        Share the owner's current window with every other tester.
+        """
+        hwnd = self.owner.test_window
+        for tester in self.testers[1:]:
+            tester.attach_window(hwnd)
+
+    def process_messages(self):
+        """
+        Pump the shared window once on behalf of every tester.
+
+        The pump empties the shared queue, so every emitter is told that all of its
+        in-flight messages have drained.
+        """
+        self.owner.pump_window_messages()
+        for tester in self.testers:
+            tester.emitter.note_drained(tester.emitter.in_flight)
+            tester.last_message_process_time = time.time()
+        self.last_message_process_time = time.time()
+
+    def apply_control_commands(self):
+        """
+        Apply the control commands and configuration reloads waiting for any tester.
+        """
+        for tester in self.testers:
+            tester.apply_control_commands()
+
+    def check_and_process_messages(self):
+        """
+        Check if it's time to process messages and do so if needed.
+        """
+        if time.time() - self.last_message_process_time >= self.message_process_interval:
+            self.process_messages()
+
+    def check_and_cleanup_window(self):
+        """
+        Recycle the shared window if the cleanup interval has passed.
+
+        The owner destroys and recreates the window, and the new handle is handed to
+        the other testers.
+        """
+        if time.time() - self.last_cleanup_time < self.cleanup_interval:
+            return
+        self.process_messages()
+        self.owner.cleanup_window()
+        self.attach_window()
+        self.last_cleanup_time = time.time()
+
+    def monitor_resources(self):
+        """
+        Sample and log process resource usage once for all testers.
+
+        The sample is added to the runtime's metrics and to every tester's metrics,
+        so the per-tester summaries still report resource usage.
+        """
+        try:
+            cpu_percent = self.owner.process.cpu_percent(interval=0.1)
+            memory_mb = self.owner.process.memory_info().rss / (1024 * 1024)
+
+            self.logger.info(f"Resource usage - CPU: {cpu_percent:.1f}%, Memory: {memory_mb:.2f} MB")
+            self.metrics.add_resource_sample(cpu_percent, memory_mb)
+            for tester in self.testers:
+                tester.metrics.add_resource_sample(cpu_percent, memory_mb)
+                self.logger.info(f"{tester.__class__.__name__} emit statistics: {tester.emitter.stats()}")
+
+            self.last_resource_monitor_time = time.time()
+        except Exception as e:
+            self.logger.error(f"Error monitoring resources: {e}")
+
+    def check_and_monitor_resources(self):
+        """
+        Check if it's time to monitor resources and do so if needed.
+
+        Testers leave resource monitoring to the runtime, so the runtime also runs the
+        memory check of every tester with leak detection on, each at its own
+        leak_check_interval.
+        """
+        current_time = time.time()
+        if current_time - self.last_resource_monitor_time >= self.resource_monitor_interval:
+            self.monitor_resources()
+        for tester in self.testers:
+            if (tester.leak_detector is not None and tester.leak_detector.tracing
+                    and current_time - tester.last_leak_check_time >= tester.leak_check_interval):
+                tester.check_memory_growth()
+
+    def wait_until(self, due):
+        """
+        Wait until a scheduled time, or until the runtime stops.
+
+        Like BaseInputTester.wait_for_next_event(), the wait only wakes early to pump
+        messages that are still in flight or to apply control commands, and a wait
+        that would run past max_duration ends the run instead.
+
+        Args:
+            due (float): Wall-clock time (time.time()) to wait for.
+
+        Returns:
+            bool: True if the scheduled time was reached, False if the run ended first.
+        """
+        deadline = due
+        bounded = self._run_deadline is not None and deadline >= self._run_deadline
+        if bounded:
+            deadline = self._run_deadline
+
+        while self.running:
+            now = time.time()
+            timeout = deadline - now
+            if timeout <= 0:
+                break
+
+            # Only wake early when there is something to pump
+            if any(tester.emitter.in_flight for tester in self.testers):
+                next_process_time = self.last_message_process_time + self.message_process_interval
+                timeout = min(timeout, max(0.0, next_process_time - now))
+
+            if self._wake_event.wait(timeout):
+                self._wake_event.clear()
+                self.apply_control_commands()
+                continue
+            self.check_and_process_messages()
+
+        if bounded:
+            self.check_run_bounds()
+        return self.running
+
+    def check_run_bounds(self):
+        """
+        Stop the runtime if any of its run bounds has been reached.
+
+        Returns:
+            bool: True if a bound was reached, False otherwise.
+        """
+        if self.max_events is not None and self.event_count >= self.max_events:
+            reason = "max_events"
+        elif self.max_bursts is not None and self.burst_count >= self.max_bursts:
+            reason = "max_bursts"
+        elif self._run_deadline is not None and time.time() >= self._run_deadline:
+            reason = "max_duration"
+        else:
+            return False
+
+        if self.running:
+            self.logger.info(f"Runtime bound reached: {reason}")
+            self.stop_reason = reason
+            self.stop()
+        return True
+
+    def stop(self):
+        """
+        Stop the runtime and every hosted tester.
+        """
+        self.running = False
+        self._wake_event.set()
+        for tester in self.testers:
+            tester.stop_testing()
+
+    def run_scheduled_burst(self, index, due):
+        """
+        Run one burst of a tester and get the time of its next burst.
+
+        A tester that was stopped by a control command leaves the schedule, and a paused
+        tester is checked again after PAUSED_RECHECK_INTERVAL without firing.
+
+        Args:
+            index (int): Index of the tester in self.testers.
+            due (float): Time at which the burst was scheduled.
+
+        Returns:
+            float: Time of the tester's next burst, or None if it left the schedule.
+        """
+        tester = self.testers[index]
+        self.apply_control_commands()
+        if not tester.running or tester.check_run_bounds():
+            return None
+        if tester.paused:
+            return time.time() + PAUSED_RECHECK_INTERVAL
+        tester.metrics.timing_error.record(time.time() - due)
+
+        try:
+            events = tester.run_burst()
+        except Exception as e:
+            self.logger.error(f"Error in {tester.__class__.__name__} burst: {e}")
+            # Allow recovery from transient errors
+            self._wake_event.wait(5)
+            if not self.owner.test_window:
+                self.owner.create_test_window()
+                self.attach_window()
+            return time.time()
+
+        self.check_and_cleanup_window()
+        self.check_and_monitor_resources()
+
+        if self.check_run_bounds() or tester.check_run_bounds():
+            return None
+
+        return time.time() + tester.next_event_interval(events)
+
+    def run_timeline(self):
+        """
+        Run the testers in earliest-deadline order until the runtime stops.
+        """
+        now = time.time()
+        timeline = [(now + tester.apply_activity_calendar(0.0), index) for index, tester in enumerate(self.testers)]
+        heapq.heapify(timeline)
+
+        while self.running and timeline:
+            due, index = heapq.heappop(timeline)
+            if not self.wait_until(due):
+                break
+            next_due = self.run_scheduled_burst(index, due)
+            if next_due is not None:
+                heapq.heappush(timeline, (next_due, index))
+
+    def run_round_robin(self):
+        """
+        Run the testers in turn until the runtime stops.
+        """
+        active = list(range(len(self.testers)))
+        position = 0
+        due = time.time() + self.owner.apply_activity_calendar(0.0)
+
+        while self.running and active:
+            if not self.wait_until(due):
+                break
+            index = active[position]
+            next_due = self.run_scheduled_burst(index, due)
+            if next_due is None:
+                active.remove(index)
+                due = time.time()
+            else:
+                position += 1
+                due = next_due
+            if active:
+                position %= len(active)
+
+    def start(self, min_interval=None, max_interval=None, max_events=None, max_duration=None,
+              max_bursts=None, seed=None, summary_file=None):
+        """
+        Run all testers until Escape is pressed, a bound is reached or every tester is done.
+
+        Args:
+            min_interval (float, optional): Minimum time between events for every tester.
+                If None, each tester uses its own configuration.
+            max_interval (float, optional): Maximum time between events for every tester.
+                If None, each tester uses its own configuration.
+            max_events (int, optional): Stop after this many events across all testers.
+            max_duration (float, optional): Stop after this many seconds.
+            max_bursts (int, optional): Stop after this many bursts across all testers.
+            seed (int, optional): Random seed shared by all testers.
+            summary_file (str, optional): Path of the combined JSON summary. Defaults to the
+                owner's log file path with a "_runtime_summary.json" suffix.
+
+        Returns:
+            dict: Combined summary with a "runtime" section and one summary per tester.
+        """
+        self.max_events = max_events
+        self.max_duration = max_duration
+        self.max_bursts = max_bursts
+
+        # The testers share one random generator, so they share one seed
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), "big")
+        for tester in self.testers:
+            tester.prepare_run(min_interval, max_interval, seed=self.seed)
+
+        names = ", ".join(tester.__class__.__name__ for tester in self.testers)
+        self.logger.info(f"Starting runtime with {names} in {self.order} order")
+        self.logger.info("Press 'Esc' to stop testing")
+
+        self.running = True
+        self.stop_reason = None
+        self._wake_event.clear()
+        self.metrics = RunMetrics()
+        started_at = datetime.now()
+        self._run_deadline = time.time() + max_duration if max_duration is not None else None
+        self.last_cleanup_time = time.time()
+        self.last_resource_monitor_time = time.time()
+        self.monitor_resources()
+        for tester in self.testers:
+            tester.start_control_server()
+            tester.start_config_watcher()
+
+        def scheduler_loop():
+            """
+            Inner function that runs every tester from the shared scheduler thread.
+            """
+            try:
+                with self.owner.test_window_context():
+                    self.attach_window()
+                    if self.order == "round_robin":
+                        self.run_round_robin()
+                    else:
+                        self.run_timeline()
+                    if self.running:
+                        self.stop_reason = "completed"
+            finally:
+                for tester in self.testers[1:]:
+                    tester.attach_window(None)
+                self.stop()
+
+        scheduler_thread = threading.Thread(target=scheduler_loop)
+        scheduler_thread.daemon = True
+        scheduler_thread.start()
+
+        try:
+            while self.running:
+                if self.owner.escape_pressed():
+                    self.stop_reason = "escape"
+                    break
+                time.sleep(0.1)
+        finally:
+            if self.stop_reason is None:
+                self.stop_reason = "stopped"
+            self.stop()
+            scheduler_thread.join(timeout=1.0)
+            for tester in self.testers:
+                tester.stop_control_server()
+                tester.stop_config_watcher()
+
+        # Testers that were still scheduled stopped for the runtime's reason
+        for tester in self.testers:
+            if tester.stop_reason is None:
+                tester.stop_reason = self.stop_reason
+
+        self._run_deadline = None
+        self.monitor_resources()
+        ended_at = datetime.now()
+
+        tester_summaries = [tester.finish_run() for tester in self.testers]
+        summary = {
+            "runtime": self.build_summary(started_at, ended_at),
+            "testers": tester_summaries,
+        }
+
+        if not summary_file and self.owner.log_filename:
+            summary_file = os.path.splitext(self.owner.log_filename)[0] + "_runtime_summary.json"
+        self.owner.write_run_summary(summary, summary_file)
+        return summary
+
+    def build_summary(self, started_at, ended_at):
+        """
+        Build the runtime section of the combined summary.
+
+        Args:
+            started_at (datetime): Start time of the run.
+            ended_at (datetime): End time of the run.
+
+        Returns:
+            dict: Runtime summary suitable for JSON serialization.
+        """
+        duration = (ended_at - started_at).total_seconds()
+        events_by_type = {}
+        for tester in self.testers:
+            for event_type, count in tester.metrics.events_by_type.items():
+                events_by_type[event_type] = events_by_type.get(event_type, 0) + count
+        self.metrics.events_by_type = events_by_type
+
+        return {
+            "testers": [tester.__class__.__name__ for tester in self.testers],
+            "order": self.order,
+            "seed": self.seed,
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "ended_at": ended_at.isoformat(timespec="seconds"),
+            "duration_s": round(duration, 3),
+            "stop_reason": self.stop_reason,
+            "bounds": {
+                "max_events": self.max_events,
+                "max_duration": self.max_duration,
+                "max_bursts": self.max_bursts,
+            },
+            "events": {
+                "total": self.event_count,
+                "bursts": self.burst_count,
+                "by_type": events_by_type,
+            },
+            "rates_per_sec": self.metrics.rates(duration),
+            "resources": self.metrics.resource_summary(),
+        }
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for running several testers in one process.
+
+    Example:
+        python tester_runtime.py --keyboard --mouse --order timeline --max-duration 600
+
+    Each tester option takes an optional configuration file; without one the tester's
+    default configuration next to its script is used.
+    """
+    parser = build_argument_parser("Input Testing Utility Suite v1.8 - Run several testers in one process")
+    for option, (script, class_name) in TESTER_SCRIPTS.items():
+        parser.add_argument(f"--{option}", nargs="?", const="", default=None, metavar="CONFIG",
+                            help=f"Run {class_name}, optionally with the given configuration file")
+    parser.add_argument("--order", choices=SCHEDULING_ORDERS, default="timeline",
+                        help="How the scheduler picks the next tester (default: timeline)")
+    args = parser.parse_args()
+    if args.flood:
+        parser.error("--flood is not supported by the multi-tester runtime; run skt-1.8.py or smt-1.8.py on its own")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    testers = []
+    for option, (script, class_name) in TESTER_SCRIPTS.items():
+        config_path = getattr(args, option)
+        if config_path is None:
+            continue
+        if not config_path:
+            config_path = os.path.join(script_dir, script.replace(".py", ".config.json"))
+        tester_class = load_tester_class(script, class_name)
+        testers.append(tester_class(config_path if os.path.exists(config_path) else None))
+
+    if not testers:
+        parser.error("select at least one tester, e.g. --keyboard --mouse")
+
+    print("Input Testing Utility Suite v1.8 - Multi-tester runtime")
+    print("Use 'ESC' key to stop testing")
+
+    try:
+        MultiTesterRuntime(testers, order=args.order).start(
+            args.min_interval,
+            args.max_interval,
+            max_events=args.max_events,
+            max_duration=args.max_duration,
+            max_bursts=args.max_bursts,
+            seed=args.seed,
+            summary_file=args.summary,
+        )
+    except Exception as e:
+        logging.error(f"\nAn error occurred: {e}")
+        print(f"\nError: {e}")
+        print("Check the log file for more details.")
+        # Only wait for a keypress when someone is watching the console
+        if sys.stdin and sys.stdin.isatty():
+            input("Press Enter to exit...")
+        raise
@@ -0,0 +1,378 @@
+# tester_settings.py
+import dataclasses
+import typing
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from config_compiler import ConfigError
+from display_geometry import MONITOR_SELECTIONS, check_layout
+from trajectory_library import TRAJECTORY_KINDS
+
+"""
+TesterSettings - Typed, validated and immutable tester settings.
+
+Each tester has a settings class that lists every configuration key it
+understands, with its type and default. A configuration dictionary is checked
+against the class as a whole: values of the wrong type and values outside their
+valid range are all reported together in one ConfigError, instead of being
+silently replaced by defaults. Lists become tuples, so a settings object cannot be
+changed once built; nested objects such as "target_rate" or "activity_model" stay
+dictionaries and are validated by the classes that consume them.
+
+Keys the class does not know are kept out of the settings object and reported,
+so that a misspelled key does not go unnoticed.
+"""
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+def check_value(name, value, expected):
+    """
+    Check a value against a type annotation, converting lists to tuples.
+
+    Supports bool, int, float (which accepts int), str, dict, Optional, Union and
+    homogeneous tuples such as tuple[str, ...].
+
+    Args:
+        name (str): Key name, for error messages.
+        value (object): The configured value.
+        expected (object): The type annotation.
+
+    Returns:
+        object: The value, converted where needed.
+
+    Raises:
+        ConfigError: If the value does not match the annotation.
+    """
+    origin = typing.get_origin(expected)
+    if origin is Union:
+        problems = []
+        for option in typing.get_args(expected):
+            if option is type(None):
+                if value is None:
+                    return None
+                continue
+            try:
+                return check_value(name, value, option)
+            except ConfigError as e:
+                problems.extend(e.problems)
+        raise ConfigError(problems[0] if len(problems) == 1 else
+                          f"{name} has an unsupported value {value!r}")
+
+    if origin is tuple:
+        if not isinstance(value, (list, tuple)):
+            raise ConfigError(f"{name} must be a list, got {type(value).__name__}")
+        item_type = typing.get_args(expected)[0]
+        return tuple(check_value(f"{name}[{index}]", item, item_type) for index, item in enumerate(value))
+
+    if expected is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"{name} must be a number, got {value!r}")
+        return float(value)
+    if expected is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ConfigError(f"{name} must be a whole number, got {value!r}")
+        return value
+    if not isinstance(value, expected):
+        raise ConfigError(f"{name} must be of type {expected.__name__}, got {value!r}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class BaseSettings:
+    """
+    Settings shared by every tester.
+
+    Each attribute is the configuration key of the same name; see the configuration
+    files for their meaning.
+    """
+
+    cleanup_interval: float = 600
+    message_process_interval: float = 5
+    resource_monitor_interval: float = 30
+    log_level: str = "INFO"
+    console_logging_enabled: bool = True
+    emit_queue_capacity: int = 10000
+    emit_high_watermark: float = 0.8
+    emit_low_watermark: float = 0.5
+    emit_backoff_base: float = 0.01
+    emit_backoff_max: float = 0.5
+    max_events: Optional[int] = None
+    max_duration: Optional[float] = None
+    max_bursts: Optional[int] = None
+    random_seed: Optional[int] = None
+    run_summary_file: Optional[str] = None
+    event_interval_min: float = 1.0
+    event_interval_max: float = 5.0
+    target_rate: Optional[Union[float, dict]] = None
+    activity_model: Optional[dict] = None
+    activity_calendar: Optional[dict] = None
+    event_bus: Optional[Union[str, dict]] = None
+    control_address: Optional[Union[bool, str]] = None
+    control_authkey: Optional[str] = None
+    watch_config: bool = False
+    watch_config_interval: float = 2.0
+    phase_profiling: bool = False
+    sampling_profiler: bool = False
+    sampling_interval: float = 0.05
+    sampling_duration: Optional[float] = None
+    sampling_output: Optional[str] = None
+    leak_detection: bool = False
+    leak_check_interval: float = 600
+    leak_trace_frames: int = 1
+    leak_top_sites: int = 10
+    leak_growth_threshold: float = 20.0
+    gc_monitoring: bool = False
+    gc_freeze: bool = False
+    gc_thresholds: Optional[tuple[int, ...]] = None
+    flood_mode: bool = False
+    flood_start_rate: float = 50.0
+    flood_max_rate: float = 2000.0
+    flood_steps: int = 8
+    flood_step_duration: float = 10.0
+    flood_output: Optional[str] = None
+    delivery_tracking: bool = False
+    delivery_loss_timeout: float = 5.0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build and validate settings from a configuration dictionary.
+
+        Missing keys take their defaults.
+
+        Args:
+            config (dict): Configuration parameters.
+
+        Returns:
+            tuple: (settings, unknown keys). The settings are an instance of this class.
+
+        Raises:
+            ConfigError: Listing every invalid value.
+        """
+        hints = typing.get_type_hints(cls)
+        names = {field.name for field in dataclasses.fields(cls)}
+        values = {}
+        problems = []
+        for name in names:
+            if name not in config:
+                continue
+            try:
+                values[name] = check_value(name, config[name], hints[name])
+            except ConfigError as e:
+                problems.extend(e.problems)
+        if problems:
+            raise ConfigError(problems)
+
+        settings = cls(**values)
+        problems = settings.validate()
+        if problems:
+            raise ConfigError(problems)
+        return settings, sorted(set(config) - names)
+
+    def validate(self):
+        """
+        Check the ranges of the values and the relationships between them.
+
+        Subclasses extend the list with their own checks.
+
+        Returns:
+            list: One message per problem found.
+        """
+        problems = []
+        for name in ("cleanup_interval", "message_process_interval", "resource_monitor_interval",
+                     "emit_backoff_base", "emit_backoff_max", "watch_config_interval", "sampling_interval",
+                     "leak_check_interval", "leak_growth_threshold", "flood_start_rate", "flood_step_duration",
+                     "delivery_loss_timeout"):
+            if not getattr(self, name) > 0:
+                problems.append(f"{name} must be positive, got {getattr(self, name)}")
+        if self.log_level not in LOG_LEVELS:
+            problems.append(f"log_level must be one of {', '.join(LOG_LEVELS)}, got {self.log_level!r}")
+        if self.emit_queue_capacity < 1:
+            problems.append(f"emit_queue_capacity must be at least 1, got {self.emit_queue_capacity}")
+        for name in ("leak_trace_frames", "leak_top_sites", "flood_steps"):
+            if getattr(self, name) < 1:
+                problems.append(f"{name} must be at least 1, got {getattr(self, name)}")
+        if self.gc_thresholds is not None and (not 1 <= len(self.gc_thresholds) <= 3
+                                               or any(value < 0 for value in self.gc_thresholds)):
+            problems.append(f"gc_thresholds must be one to three whole numbers of at least 0, got {list(self.gc_thresholds)}")
+        if not 0 < self.emit_low_watermark < self.emit_high_watermark <= 1:
+            problems.append("watermarks must satisfy 0 < emit_low_watermark < emit_high_watermark <= 1")
+        if not self.emit_backoff_base <= self.emit_backoff_max:
+            problems.append("backoff delays must satisfy emit_backoff_base <= emit_backoff_max")
+        for name in ("max_events", "max_duration", "max_bursts", "sampling_duration"):
+            value = getattr(self, name)
+            if value is not None and not value > 0:
+                problems.append(f"{name} must be positive or null, got {value}")
+        if not self.flood_start_rate <= self.flood_max_rate:
+            problems.append("flood rates must satisfy flood_start_rate <= flood_max_rate")
+        if not 0 <= self.event_interval_min <= self.event_interval_max:
+            problems.append("event intervals must satisfy 0 <= event_interval_min <= event_interval_max")
+        return problems
+
+    def to_dict(self):
+        """
+        Get the settings as a plain configuration dictionary.
+
+        Returns:
+            dict: Key to value, with lists as tuples.
+        """
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+
+def check_probabilities(settings, names):
+    """
+    Check that settings are probabilities.
+
+    Args:
+        settings (BaseSettings): The settings.
+        names (tuple): Names of the probability settings.
+
+    Returns:
+        list: One message per value outside 0..1.
+    """
+    return [f"{name} must be between 0 and 1, got {getattr(settings, name)}"
+            for name in names if not 0 <= getattr(settings, name) <= 1]
+
+
+def check_weights(settings, choices, weights, required=True):
+    """
+    Check a list of choices and their weights.
+
+    Args:
+        settings (BaseSettings): The settings.
+        choices (str): Name of the list of choices.
+        weights (str): Name of the list of weights.
+        required (bool, optional): Whether a weight is needed for every choice. Defaults to True.
+
+    Returns:
+        list: One message per problem found.
+    """
+    choice_values, weight_values = getattr(settings, choices), getattr(settings, weights)
+    if not choice_values:
+        return [f"{choices} must not be empty"]
+    if weight_values is None:
+        return []
+    problems = []
+    if required and len(weight_values) < len(choice_values):
+        problems.append(f"{weights} needs a weight for each of the {len(choice_values)} {choices}")
+    if any(weight < 0 for weight in weight_values) or not any(weight_values[:len(choice_values)]):
+        problems.append(f"{weights} must not be negative, and at least one must be positive")
+    return problems
+
+
+@dataclass(frozen=True, slots=True)
+class KeyboardSettings(BaseSettings):
+    """
+    Settings of SafeKeyboardTester.
+    """
+
+    typing_patterns: tuple[str, ...] = ("common_word", "random_word")
+    typing_pattern_weights: Optional[tuple[float, ...]] = None
+    common_words: tuple[str, ...] = ("the", "and", "to")
+    key_interval_min: float = 0.1
+    key_interval_max: float = 0.3
+    word_length_min: int = 3
+    word_length_max: int = 8
+    typo_probability: float = 0.05
+    correction_probability: float = 0.8
+    capitalization_probability: float = 0.2
+    common_words_probability: float = 0.7
+    special_key_probability: float = 0.05
+    space_after_word_probability: float = 0.9
+
+    def validate(self):
+        """
+        Check the keyboard settings, in addition to the base settings.
+
+        Returns:
+            list: One message per problem found.
+        """
+        problems = BaseSettings.validate(self)
+        problems += check_probabilities(self, (
+            "typo_probability", "correction_probability", "capitalization_probability",
+            "common_words_probability", "special_key_probability", "space_after_word_probability"))
+        # Weights that do not match the patterns are replaced by equal weights
+        if self.typing_pattern_weights is not None and len(self.typing_pattern_weights) == len(self.typing_patterns):
+            problems += check_weights(self, "typing_patterns", "typing_pattern_weights")
+        elif not self.typing_patterns:
+            problems.append("typing_patterns must not be empty")
+        if not 0 <= self.key_interval_min <= self.key_interval_max:
+            problems.append("key intervals must satisfy 0 <= key_interval_min <= key_interval_max")
+        if not 1 <= self.word_length_min <= self.word_length_max:
+            problems.append("word lengths must satisfy 1 <= word_length_min <= word_length_max")
+        if not all(self.common_words):
+            problems.append("common_words must not contain empty strings")
+        return problems
+
+
+@dataclass(frozen=True, slots=True)
+class MouseSettings(BaseSettings):
+    """
+    Settings of SafeMouseTester.
+    """
+
+    movement_patterns: tuple[str, ...] = ("random",)
+    movement_pattern_weights: tuple[float, ...] = (1.0,)
+    movement_min_distance: int = 10
+    movement_max_distance: int = 100
+    click_probability: float = 0.2
+    scroll_probability: float = 0.1
+    double_click_probability: float = 0.05
+    button_types: tuple[str, ...] = ("left", "right", "middle")
+    button_weights: tuple[float, ...] = (0.7, 0.2, 0.1)
+    targeted_targets: tuple[dict, ...] = ({"x_ratio": 0.5, "y_ratio": 0.5, "weight": 5},)
+    circular_min_radius: int = 20
+    circular_max_radius: int = 150
+    circular_min_steps: int = 8
+    circular_max_steps: int = 24
+    linear_min_steps: int = 5
+    linear_max_steps: int = 20
+    move_dedup: bool = True
+    move_report_rate: float = 0.0
+    trajectory_kinds: tuple[str, ...] = ("bezier", "arc", "overshoot")
+    trajectory_shapes: int = 32
+    trajectory_file: Optional[str] = None
+    display_monitors: str = "all"
+    display_layout: Optional[tuple[dict, ...]] = None
+    display_check_interval: float = 2.0
+
+    def validate(self):
+        """
+        Check the mouse settings, in addition to the base settings.
+
+        Returns:
+            list: One message per problem found.
+        """
+        problems = BaseSettings.validate(self)
+        problems += check_probabilities(self, ("click_probability", "scroll_probability", "double_click_probability"))
+        # Missing movement weights default to 1.0
+        problems += check_weights(self, "movement_patterns", "movement_pattern_weights", required=False)
+        problems += check_weights(self, "button_types", "button_weights")
+        for low, high in (("movement_min_distance", "movement_max_distance"),
+                          ("circular_min_radius", "circular_max_radius"),
+                          ("circular_min_steps", "circular_max_steps"),
+                          ("linear_min_steps", "linear_max_steps")):
+            if not 0 <= getattr(self, low) <= getattr(self, high):
+                problems.append(f"{low} and {high} must satisfy 0 <= {low} <= {high}")
+        if self.move_report_rate < 0:
+            problems.append(f"move_report_rate must be 0 or more, got {self.move_report_rate}")
+        unknown_kinds = [kind for kind in self.trajectory_kinds if kind not in TRAJECTORY_KINDS]
+        if not self.trajectory_kinds or unknown_kinds:
+            problems.append(f"trajectory_kinds must be a non-empty list of {', '.join(TRAJECTORY_KINDS)}")
+        if "recorded" in self.trajectory_kinds and not self.trajectory_file:
+            problems.append("trajectory_kinds includes \"recorded\", which needs a trajectory_file")
+        if self.trajectory_shapes < 1:
+            problems.append(f"trajectory_shapes must be at least 1, got {self.trajectory_shapes}")
+        if self.display_monitors not in MONITOR_SELECTIONS:
+            problems.append(f"display_monitors must be one of {', '.join(MONITOR_SELECTIONS)}, "
+                            f"got {self.display_monitors!r}")
+        if self.display_layout is not None:
+            problems += check_layout(self.display_layout)
+        if self.display_check_interval < 0:
+            problems.append(f"display_check_interval must be 0 or more, got {self.display_check_interval}")
+        for index, target in enumerate(self.targeted_targets):
+            x_ratio, y_ratio = target.get("x_ratio"), target.get("y_ratio")
+            if not all(isinstance(ratio, (int, float)) and 0 <= ratio <= 1 for ratio in (x_ratio, y_ratio)):
+                problems.append(f"targeted_targets[{index}] needs x_ratio and y_ratio between 0 and 1")
+        return problems
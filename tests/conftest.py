@@ -0,0 +1,13 @@
+# conftest.py
+import os
+import sys
+
+"""
+Shared pytest setup: the utilities are top-level modules next to this directory, not an
+installed package, so the repository root is put on the import path.
+"""
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,77 @@
+# test_benchmark_suite.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_suite import KEYBOARD_PATTERNS, MOUSE_PATTERNS, compare_results
+from conftest import REPO_DIR
+
+"""
+Tests of the benchmark suite: both tester versions run headless, as from the command line.
+"""
+
+
+@pytest.fixture
+def keep_logs_clean():
+    """
+    Remove the log files the testers write next to their scripts during a test.
+    """
+    logs_dir = os.path.join(REPO_DIR, "logs")
+    existed = os.path.isdir(logs_dir)
+    before = set(os.listdir(logs_dir)) if existed else set()
+    yield
+    if not os.path.isdir(logs_dir):
+        return
+    for name in set(os.listdir(logs_dir)) - before:
+        os.remove(os.path.join(logs_dir, name))
+    if not existed and not os.listdir(logs_dir):
+        os.rmdir(logs_dir)
+
+
+def run_suite(tmp_path, *options):
+    """
+    Run benchmark_suite.py in a fresh interpreter and load its results document.
+    """
+    output = tmp_path / "results.json"
+    environment = dict(os.environ, INPUT_TESTER_CACHE_DIR=str(tmp_path / "cache"))
+    completed = subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "benchmark_suite.py"), "--only", "keyboard", "mouse", "loop",
+         "logging", "--duration", "0.05", "--output", str(output), *options],
+        cwd=REPO_DIR, env=environment, capture_output=True, text=True, timeout=300)
+    return completed, json.loads(output.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("version", ["1.7", "1.8"])
+def test_suite_runs_every_pattern(tmp_path, keep_logs_clean, version):
+    completed, document = run_suite(tmp_path, "--version", version)
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    assert document["tester_version"] == version
+    assert document["failures"] == {}
+
+    expected = {"loop.keyboard", "loop.mouse", "logging.record"}
+    expected |= {f"keyboard.{pattern}" for pattern in KEYBOARD_PATTERNS}
+    expected |= {f"mouse.{pattern}" for pattern in MOUSE_PATTERNS}
+    if version == "1.7":
+        expected.discard("mouse.trajectory_movement")  # Added in 1.8
+    results = document["results"]
+    assert set(results) == expected
+    assert all(entry["value"] > 0 for entry in results.values())
+
+
+def test_compare_results_flags_regressions_beyond_the_tolerance():
+    baseline = {"results": {
+        "keyboard.sentence": {"value": 100.0, "higher_is_better": True},
+        "loop.keyboard": {"value": 10.0, "higher_is_better": False},
+        "logging.record": {"value": 20.0, "higher_is_better": False},
+    }}
+    current = {"results": {
+        "keyboard.sentence": {"value": 85.0, "higher_is_better": True},
+        "loop.keyboard": {"value": 10.5, "higher_is_better": False},
+        "mouse.linear_movement": {"value": 1.0, "higher_is_better": True},
+    }}
+    rows = {row["name"]: row["status"] for row in compare_results(current, baseline, tolerance=0.10)}
+    assert rows == {"keyboard.sentence": "regressed", "loop.keyboard": "ok", "logging.record": "missing",
+                    "mouse.linear_movement": "new"}
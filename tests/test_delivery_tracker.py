@@ -0,0 +1,168 @@
+# test_delivery_tracker.py
+import random
+from collections import deque
+
+import pytest
+
+from delivery_tracker import REORDER_WINDOW, DeliveryTracker
+
+"""
+Tests of DeliveryTracker matching under loss and reordering.
+"""
+
+WM_KEYDOWN = 0x0100
+WM_KEYUP = 0x0101
+WM_CHAR = 0x0102
+WM_MOUSEMOVE = 0x0200
+
+
+def post_all(tracker, messages):
+    """
+    Post messages at time 0.0 and return them with their sequence numbers.
+    """
+    return [(tracker.record_post(*message, timestamp=0.0), message) for message in messages]
+
+
+def deliver(tracker, messages):
+    """
+    Dispatch messages to the tracker at time 0.001, counting unmatched ones as a window would.
+    """
+    for message in messages:
+        if not tracker.match(*message, timestamp=0.001):
+            tracker.record_unmatched(message[0])
+
+
+def keystrokes(text):
+    """
+    Get the key-down, character and key-up messages of typing text.
+    """
+    messages = []
+    for char in text:
+        messages += [(WM_KEYDOWN, ord(char.upper()), 0), (WM_CHAR, ord(char), 0), (WM_KEYUP, ord(char.upper()), 0)]
+    return messages
+
+
+def test_in_order_delivery_matches_every_post():
+    tracker = DeliveryTracker()
+    messages = keystrokes("hello world")
+    post_all(tracker, messages)
+    deliver(tracker, messages)
+
+    summary = tracker.summary()
+    assert summary["delivered"] == summary["posted"] == len(messages)
+    assert (summary["lost"], summary["reordered"], summary["unmatched"], summary["in_flight"]) == (0, 0, 0, 0)
+
+
+def test_lost_messages_are_counted_once_discarded():
+    tracker = DeliveryTracker()
+    messages = keystrokes("abcdef")
+    post_all(tracker, messages)
+    deliver(tracker, messages[:4] + messages[5:])
+    assert tracker.in_flight == 1
+
+    assert tracker.discard_pending() == 1
+    assert (tracker.lost, tracker.reordered, tracker.unmatched) == (1, 0, 0)
+
+
+def test_lost_identical_message_does_not_shift_later_matches():
+    tracker = DeliveryTracker()
+    # "ll": the first "l" key-up is lost, the second arrives in order
+    messages = keystrokes("ll")
+    post_all(tracker, messages)
+    deliver(tracker, messages[:2] + messages[3:])
+
+    assert (tracker.delivered, tracker.reordered) == (5, 0)
+    tracker.discard_pending()
+    assert tracker.lost == 1
+
+
+def test_adjacent_swap_is_a_reorder_of_distance_one():
+    tracker = DeliveryTracker()
+    messages = keystrokes("xyz")
+    post_all(tracker, messages)
+    swapped = list(messages)
+    swapped[3], swapped[4] = swapped[4], swapped[3]
+    deliver(tracker, swapped)
+
+    assert (tracker.delivered, tracker.lost, tracker.reordered, tracker.max_reorder_distance) == (9, 0, 1, 1)
+
+
+def test_identical_messages_passed_over_are_swapped_back():
+    tracker = DeliveryTracker()
+    # "ll" with the first key-up pushed behind the second key-down and character
+    messages = keystrokes("ll")
+    post_all(tracker, messages)
+    deliver(tracker, [messages[0], messages[1], messages[3], messages[4], messages[2], messages[5]])
+
+    assert (tracker.delivered, tracker.lost, tracker.reordered, tracker.max_reorder_distance) == (6, 0, 1, 2)
+
+
+def test_stale_identical_post_is_dropped_outside_the_window():
+    tracker = DeliveryTracker()
+    move = (WM_MOUSEMOVE, 0, 0x00640064)
+    tracker.record_post(*move, timestamp=0.0)  # lost
+    others = [(WM_MOUSEMOVE, 0, index + 1) for index in range(REORDER_WINDOW * 3)]
+    post_all(tracker, others)
+    deliver(tracker, others)
+
+    # The position is visited again much later; it is not the long-lost first visit
+    tracker.record_post(*move, timestamp=1.0)
+    assert tracker.match(*move, timestamp=1.001)
+    assert (tracker.lost, tracker.reordered, tracker.max_reorder_distance) == (1, 0, 0)
+    assert tracker.latency.percentile(100) == pytest.approx(0.001)
+
+
+def test_late_arrival_after_expiry_is_counted_as_late():
+    tracker = DeliveryTracker(loss_timeout=1.0)
+    message = (WM_KEYDOWN, 0x41, 0)
+    tracker.record_post(*message, timestamp=0.0)
+    assert tracker.expire(now=2.0) == 1
+    assert tracker.lost == 1
+
+    assert tracker.match(*message, timestamp=2.5)
+    assert (tracker.lost, tracker.late, tracker.delivered) == (0, 1, 1)
+
+
+def test_unmatched_counts_only_tracked_types():
+    tracker = DeliveryTracker()
+    post_all(tracker, keystrokes("a"))
+    deliver(tracker, [(WM_KEYDOWN, ord("Q"), 0), (WM_MOUSEMOVE, 0, 0)])
+    assert tracker.unmatched == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_loss_and_reordering_are_measured_exactly(seed):
+    """
+    Mouse moves through a queue that loses messages and moves some ahead of the last one
+    queued, as LocalQueueWin32gui does.
+    """
+    rng = random.Random(seed)
+    tracker = DeliveryTracker()
+    queue = deque()
+    lost = 0
+    max_distance = 0
+    last_queued = 0
+    x, y = 500, 500
+    for sequence in range(20000):
+        # A random walk revisits positions, so identical moves are common
+        x += rng.randint(-3, 3)
+        y += rng.randint(-3, 3)
+        message = (WM_MOUSEMOVE, 0, (y << 16) | x)
+        tracker.record_post(*message, timestamp=0.0)
+        if rng.random() < 0.05:
+            lost += 1
+        elif queue and rng.random() < 0.05:
+            queue.insert(len(queue) - 1, message)
+            max_distance = max(max_distance, sequence - last_queued)
+        else:
+            queue.append(message)
+            last_queued = sequence
+        if rng.random() < 0.1:
+            deliver(tracker, queue)
+            queue.clear()
+    deliver(tracker, queue)
+    tracker.discard_pending()
+
+    assert tracker.lost == lost
+    assert tracker.unmatched == 0
+    assert 0 < tracker.max_reorder_distance <= max_distance
@@ -0,0 +1,153 @@
+# test_input_emitter.py
+import pytest
+
+from event_bus import STATUS_COALESCED, STATUS_DROPPED, STATUS_POSTED
+from input_emitter import COALESCED, DROPPED, DUPLICATE, POSTED, MessageEmitter
+from input_events import EventBatch
+
+"""
+Tests of MessageEmitter watermarks, backpressure and mouse-move deduplication.
+"""
+
+WM_KEYDOWN = 0x0100
+WM_MOUSEMOVE = 0x0200
+
+
+class FakeQueue:
+    """
+    A post function that records what was posted and can be told to fail.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.fail = False
+
+    def __call__(self, hwnd, msg, wparam, lparam):
+        if self.fail:
+            raise OSError("queue full")
+        self.messages.append((hwnd, msg, wparam, lparam))
+
+
+def test_watermarks_from_capacity():
+    emitter = MessageEmitter(FakeQueue(), queue_capacity=100, high_watermark=0.8, low_watermark=0.5)
+    assert (emitter.high_watermark, emitter.low_watermark) == (80, 50)
+
+
+def test_saturates_at_high_watermark_and_drops_at_capacity():
+    queue = FakeQueue()
+    emitter = MessageEmitter(queue, queue_capacity=10, high_watermark=0.8, low_watermark=0.5)
+    for _ in range(8):
+        assert emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert not emitter.saturated
+
+    # Without a drain callback posting goes on up to the capacity, then drops
+    assert emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert emitter.saturated and emitter.saturation_events == 1
+    assert emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert not emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert (emitter.posted, emitter.dropped, emitter.in_flight, emitter.max_in_flight) == (10, 1, 10, 10)
+    assert len(queue.messages) == 10
+
+    # Backpressure holds until the queue drains to the low watermark
+    emitter.note_drained(4)
+    assert emitter.saturated
+    emitter.note_drained(1)
+    assert not emitter.saturated and emitter.in_flight == 5
+
+
+def test_drain_callback_keeps_the_queue_below_capacity():
+    emitter = MessageEmitter(FakeQueue(), queue_capacity=10, high_watermark=0.8, low_watermark=0.5)
+    emitter.drain = lambda: emitter.note_drained(emitter.in_flight)
+    for _ in range(100):
+        assert emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert emitter.dropped == 0
+    assert emitter.max_in_flight <= emitter.high_watermark
+
+
+def test_failed_post_is_retried_after_draining():
+    queue = FakeQueue()
+    drains = []
+
+    def drain():
+        drains.append(True)
+        queue.fail = False
+
+    emitter = MessageEmitter(queue, drain=drain)
+    queue.fail = True
+    assert emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert (emitter.failures, emitter.dropped, emitter.posted, len(drains)) == (1, 0, 1, 1)
+
+
+def test_backpressure_delay_doubles_up_to_the_maximum():
+    emitter = MessageEmitter(FakeQueue(), queue_capacity=10, backoff_base=0.01, backoff_max=0.03)
+    assert emitter.backpressure_delay() == 0.0
+    for _ in range(9):
+        emitter.post(1, WM_KEYDOWN, 0x41, 0)
+    assert emitter.saturated
+    assert [emitter.backpressure_delay() for _ in range(3)] == pytest.approx([0.01, 0.02, 0.03])
+
+    emitter.note_drained(emitter.in_flight)
+    emitter.backpressure_delay()  # The saturated period that just ended
+    assert emitter.backpressure_delay() == 0.0
+
+
+def test_moves_coalesce_while_saturated_and_flush_when_drained():
+    queue = FakeQueue()
+    deferred = []
+    emitter = MessageEmitter(queue, queue_capacity=10, high_watermark=0.8, low_watermark=0.5)
+    emitter.on_deferred_post = lambda: deferred.append(True)
+    emitter.event_batch = batch = EventBatch()
+    for position in range(9):
+        assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, position) == POSTED
+    assert emitter.saturated
+
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 100) == COALESCED
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 101) == COALESCED
+    assert emitter.coalesced == 1
+    assert batch.count(WM_MOUSEMOVE, STATUS_COALESCED) == 2
+
+    emitter.note_drained(emitter.in_flight)
+    assert queue.messages[-1] == (1, WM_MOUSEMOVE, 0, 101)
+    assert (emitter.deferred_posted, len(deferred)) == (1, 1)
+    assert batch.count(WM_MOUSEMOVE, STATUS_POSTED) == 10
+
+
+def test_duplicate_moves_are_skipped_by_default():
+    emitter = MessageEmitter(FakeQueue())
+    assert emitter.dedupe_moves
+    assert MessageEmitter.from_config({}, FakeQueue()).dedupe_moves
+    assert not MessageEmitter.from_config({"move_dedup": False}, FakeQueue()).dedupe_moves
+
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 5) == POSTED
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 5) == DUPLICATE
+    assert emitter.post_mouse_move(2, WM_MOUSEMOVE, 0, 5) == POSTED
+    assert emitter.duplicate_moves == 1
+
+
+def test_retry_of_a_dropped_move_is_not_a_duplicate():
+    queue = FakeQueue()
+    emitter = MessageEmitter(queue)
+    emitter.drain = lambda: emitter.note_drained(emitter.in_flight)
+    emitter.event_batch = batch = EventBatch()
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 5) == POSTED
+
+    queue.fail = True
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 6) == DROPPED
+    assert batch.count(WM_MOUSEMOVE, STATUS_DROPPED) == 1
+
+    queue.fail = False
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 6) == POSTED
+    assert emitter.duplicate_moves == 0
+
+
+def test_report_rate_holds_moves_until_the_next_report():
+    queue = FakeQueue()
+    emitter = MessageEmitter(queue, move_report_rate=1.0)
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 1) == POSTED
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 2) == COALESCED
+    assert emitter.post_mouse_move(1, WM_MOUSEMOVE, 0, 3) == COALESCED
+    assert emitter.rate_coalesced == 1
+
+    assert emitter.flush_report_move()
+    assert [message[3] for message in queue.messages] == [1, 3]
+    assert not emitter.flush_report_move()
@@ -0,0 +1,75 @@
+# test_input_scheduler.py
+import random
+
+import pytest
+
+import input_scheduler
+from input_scheduler import TokenBucketGovernor
+
+"""
+Tests of TokenBucketGovernor pacing, on a simulated clock.
+"""
+
+
+class FakeClock:
+    """
+    Stands in for time.monotonic(); the test advances it.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(input_scheduler.time, "monotonic", fake)
+    return fake
+
+
+def run(governor, clock, bursts, burst_events, burst_seconds):
+    """
+    Alternate bursts and the governor's waits, as the testing loop does.
+    """
+    for _ in range(bursts):
+        clock.now += burst_seconds
+        clock.now += governor.next_interval(burst_events)
+
+
+@pytest.mark.parametrize("jitter", ["none", "uniform", "normal", "exponential"])
+def test_achieved_rate_converges_to_the_target(clock, jitter):
+    random.seed(1)
+    governor = TokenBucketGovernor(20.0, jitter=jitter)
+    run(governor, clock, bursts=2000, burst_events=3, burst_seconds=0.05)
+    assert governor.achieved_rate() == pytest.approx(20.0, rel=0.02)
+    assert governor.rate_limited == 0
+
+
+def test_time_spent_in_bursts_is_subtracted_from_the_wait(clock):
+    governor = TokenBucketGovernor(10.0, jitter="none")
+    clock.now += 0.04
+    assert governor.next_interval(1) == pytest.approx(0.06)
+
+
+def test_bursts_slower_than_the_target_are_rate_limited(clock):
+    governor = TokenBucketGovernor(10.0, capacity=5.0, jitter="none")
+    # Ten events per second are wanted, but one event takes a second
+    run(governor, clock, bursts=20, burst_events=1, burst_seconds=1.0)
+    assert governor.next_interval(0) == 0.0
+    assert governor.rate_limited > 0
+    assert governor.achieved_rate() == pytest.approx(1.0, rel=0.1)
+
+
+def test_from_config_accepts_a_rate_or_a_dict(clock):
+    assert TokenBucketGovernor.from_config(5.0).rate == 5.0
+    governor = TokenBucketGovernor.from_config({"value": 4.0, "unit": "events_per_sec", "burst_seconds": 2.0,
+                                                 "jitter": "none"})
+    assert (governor.rate, governor.capacity, governor.jitter) == (4.0, 8.0, "none")
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucketGovernor(0.0)
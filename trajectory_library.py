@@ -0,0 +1,372 @@
+# trajectory_library.py
+import math
+import random
+from array import array
+from config_compiler import ConfigError, compile_config, read_cache, write_cache
+from lazy_imports import lazy_import
+
+"""
+TrajectoryLibrary - Precomputed mouse path shapes, reused through affine transforms.
+
+A realistic mouse path is expensive to compute: a curve with a human velocity
+profile, an overshoot that is corrected, or a path recorded from a real hand. The
+library computes such shapes once, in a normalized frame where every path starts
+at (0, 0) and ends at (1, 0): u runs along the line from start to end and v across
+it. A movement then picks a shape and maps it onto its start and end points with
+one scale, rotation and translation:
+
+    x = start_x + u * dx - v * dy
+    y = start_y + u * dy + v * dx
+
+where (dx, dy) is the movement's vector. The cost per movement is one
+interpolation and four multiplications per point, whatever the shape cost to build.
+
+Shape kinds:
+    bezier      Cubic Bezier curves with randomly offset control points
+    arc         Circular arcs bowing to either side of the line
+    overshoot   Paths that pass the end point, then correct back onto it
+    recorded    Human paths loaded from a JSON file of point lists
+
+Generated shapes are sampled with a minimum-jerk time profile, so that points are
+dense where a hand is slow (the start and the end) and sparse in between. Every
+shape holds SAMPLES points in two array.array columns, and a movement resamples
+them to its own number of steps.
+
+The generated kinds come from a fixed seed, so the same parameters always build
+the same library; it is kept in the disk cache of config_compiler and loaded from
+there on later starts. Recorded paths are read through the configuration compiler,
+so their file may contain comments and is cached once parsed. The file is a JSON
+object with a "paths" list, each path a list of [x, y] points in any units:
+
+    {"paths": [[[0, 0], [4, 1], [11, 3], ...], ...]}
+"""
+
+# Only loaded when the cache is first used
+hashlib = lazy_import("hashlib")
+
+# Bump when generated shapes change, to invalidate existing cache entries
+LIBRARY_VERSION = 1
+
+# Shape kinds the library can hold, and those it generates itself
+TRAJECTORY_KINDS = ("bezier", "arc", "overshoot", "recorded")
+GENERATED_KINDS = ("bezier", "arc", "overshoot")
+
+# Points per normalized shape
+SAMPLES = 64
+
+# Default number of shapes generated per kind
+DEFAULT_SHAPES_PER_KIND = 32
+
+# Seed of the shape generator
+GENERATOR_SEED = 1
+
+# Largest offset of a Bezier control point from the line, as a fraction of its length
+BEZIER_CONTROL_OFFSET = 0.35
+
+# Smallest and largest bow of an arc, as a fraction of the line's length
+ARC_MIN_SAGITTA = 0.05
+ARC_MAX_SAGITTA = 0.4
+
+# Smallest and largest overshoot past the end point, as a fraction of the line's length
+OVERSHOOT_MIN = 0.03
+OVERSHOOT_MAX = 0.15
+
+# Fraction of an overshoot path's samples spent correcting back onto the end point
+CORRECTION_FRACTION = 0.25
+
+# Shortest recorded path kept, in the file's units
+MIN_RECORDED_LENGTH = 1.0
+
+
+def minimum_jerk(t):
+    """
+    Get the progress of a minimum-jerk movement at time t.
+
+    Args:
+        t (float): Time from 0.0 (start) to 1.0 (end).
+
+    Returns:
+        float: Progress from 0.0 to 1.0; slow at both ends, fastest halfway.
+    """
+    return t * t * t * (10.0 - 15.0 * t + 6.0 * t * t)
+
+
+def _timeline(count):
+    """
+    Get count minimum-jerk progress values from 0.0 to 1.0.
+
+    Args:
+        count (int): Number of values, at least 2.
+
+    Returns:
+        list: Progress values.
+    """
+    return [minimum_jerk(index / (count - 1)) for index in range(count)]
+
+
+def bezier_shape(rng, samples=SAMPLES):
+    """
+    Build a cubic Bezier shape with random control points.
+
+    Args:
+        rng (random.Random): Source of the control point offsets.
+        samples (int, optional): Number of points. Defaults to SAMPLES.
+
+    Returns:
+        tuple: (us, vs) arrays of the normalized points.
+    """
+    u1, v1 = rng.uniform(0.15, 0.45), rng.uniform(-BEZIER_CONTROL_OFFSET, BEZIER_CONTROL_OFFSET)
+    u2, v2 = rng.uniform(0.55, 0.85), rng.uniform(-BEZIER_CONTROL_OFFSET, BEZIER_CONTROL_OFFSET)
+    us, vs = array("d"), array("d")
+    for t in _timeline(samples):
+        s = 1.0 - t
+        a, b, c = 3.0 * s * s * t, 3.0 * s * t * t, t * t * t
+        us.append(a * u1 + b * u2 + c)
+        vs.append(a * v1 + b * v2)
+    return us, vs
+
+
+def arc_shape(rng, samples=SAMPLES):
+    """
+    Build a circular arc shape bowing to a random side of the line.
+
+    Args:
+        rng (random.Random): Source of the bow.
+        samples (int, optional): Number of points. Defaults to SAMPLES.
+
+    Returns:
+        tuple: (us, vs) arrays of the normalized points.
+    """
+    sagitta = rng.uniform(ARC_MIN_SAGITTA, ARC_MAX_SAGITTA) * rng.choice((-1.0, 1.0))
+    # Circle through (0, 0), (1, 0) and (0.5, sagitta)
+    radius = (0.25 + sagitta * sagitta) / (2.0 * abs(sagitta))
+    center_v = sagitta - math.copysign(radius, sagitta)
+    start_angle = math.atan2(-center_v, -0.5)
+    end_angle = math.atan2(-center_v, 0.5)
+    # Sweep through the side of the circle that holds the bow
+    sweep = end_angle - start_angle
+    if sagitta > 0 and sweep > 0:
+        sweep -= 2.0 * math.pi
+    elif sagitta < 0 and sweep < 0:
+        sweep += 2.0 * math.pi
+    us, vs = array("d"), array("d")
+    for t in _timeline(samples):
+        angle = start_angle + sweep * t
+        us.append(0.5 + radius * math.cos(angle))
+        vs.append(center_v + radius * math.sin(angle))
+    us[-1], vs[-1] = 1.0, 0.0
+    return us, vs
+
+
+def overshoot_shape(rng, samples=SAMPLES):
+    """
+    Build a shape that passes the end point, then corrects back onto it.
+
+    Args:
+        rng (random.Random): Source of the overshoot.
+        samples (int, optional): Number of points. Defaults to SAMPLES.
+
+    Returns:
+        tuple: (us, vs) arrays of the normalized points.
+    """
+    overshoot_u = 1.0 + rng.uniform(OVERSHOOT_MIN, OVERSHOOT_MAX)
+    overshoot_v = rng.uniform(-OVERSHOOT_MAX, OVERSHOOT_MAX) / 2.0
+    bow = rng.uniform(-BEZIER_CONTROL_OFFSET, BEZIER_CONTROL_OFFSET) / 2.0
+    correction = max(2, int(samples * CORRECTION_FRACTION))
+    us, vs = array("d"), array("d")
+    # Main movement: a quadratic curve to the overshoot point
+    for t in _timeline(samples - correction + 1):
+        s = 1.0 - t
+        us.append(2.0 * s * t * 0.5 + t * t * overshoot_u)
+        vs.append(2.0 * s * t * bow + t * t * overshoot_v)
+    # Correction: a short straight movement back to the end point
+    for t in _timeline(correction)[1:]:
+        us.append(overshoot_u + (1.0 - overshoot_u) * t)
+        vs.append(overshoot_v * (1.0 - t))
+    return us, vs
+
+
+SHAPE_BUILDERS = {"bezier": bezier_shape, "arc": arc_shape, "overshoot": overshoot_shape}
+
+
+def normalize_path(points, samples=SAMPLES):
+    """
+    Map a recorded path into the normalized frame and resample it.
+
+    Args:
+        points (list): [x, y] points of the path, in recording order.
+        samples (int, optional): Number of points of the shape. Defaults to SAMPLES.
+
+    Returns:
+        tuple: (us, vs) arrays of the normalized points, or None if the path is too
+            short or its start and end points are too close together.
+    """
+    if len(points) < 2:
+        return None
+    start_x, start_y = points[0]
+    dx, dy = points[-1][0] - start_x, points[-1][1] - start_y
+    length_squared = dx * dx + dy * dy
+    if length_squared < MIN_RECORDED_LENGTH * MIN_RECORDED_LENGTH:
+        return None
+    raw_us = [((x - start_x) * dx + (y - start_y) * dy) / length_squared for x, y in points]
+    raw_vs = [((y - start_y) * dx - (x - start_x) * dy) / length_squared for x, y in points]
+    us, vs = array("d"), array("d")
+    last = len(points) - 1
+    for index in range(samples):
+        position = index * last / (samples - 1)
+        low = min(int(position), last - 1)
+        fraction = position - low
+        us.append(raw_us[low] + (raw_us[low + 1] - raw_us[low]) * fraction)
+        vs.append(raw_vs[low] + (raw_vs[low + 1] - raw_vs[low]) * fraction)
+    return us, vs
+
+
+def load_recorded_paths(path, samples=SAMPLES):
+    """
+    Load and normalize human paths from a JSON file.
+
+    Args:
+        path (str): Path of the file.
+        samples (int, optional): Number of points per shape. Defaults to SAMPLES.
+
+    Returns:
+        list: (us, vs) arrays of each usable path.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ConfigError: If the file is not an object with a "paths" list of point lists.
+    """
+    paths = compile_config(path).get("paths")
+    if not isinstance(paths, list):
+        raise ConfigError(f"{path} needs a \"paths\" list")
+    shapes = []
+    for index, points in enumerate(paths):
+        if not (isinstance(points, list) and all(
+                isinstance(point, list) and len(point) == 2
+                and all(isinstance(value, (int, float)) for value in point) for point in points)):
+            raise ConfigError(f"paths[{index}] in {path} must be a list of [x, y] points")
+        shape = normalize_path(points, samples)
+        if shape is not None:
+            shapes.append(shape)
+    return shapes
+
+
+class TrajectoryLibrary:
+    """
+    Normalized path shapes by kind, mapped onto movements with an affine transform.
+
+    Attributes:
+        shapes (dict): Kind name to list of (us, vs) arrays.
+        kinds (list): Kinds that hold at least one shape.
+        samples (int): Points per shape.
+    """
+
+    def __init__(self, shapes, samples=SAMPLES):
+        """
+        Initialize the TrajectoryLibrary.
+
+        Args:
+            shapes (dict): Kind name to list of (us, vs) arrays.
+            samples (int, optional): Points per shape. Defaults to SAMPLES.
+        """
+        self.shapes = {kind: list(kind_shapes) for kind, kind_shapes in shapes.items() if kind_shapes}
+        self.kinds = list(self.shapes)
+        self.samples = samples
+
+    @classmethod
+    def build(cls, kinds=GENERATED_KINDS, shapes_per_kind=DEFAULT_SHAPES_PER_KIND, recorded_file=None,
+              samples=SAMPLES, use_cache=True):
+        """
+        Generate the shapes of the requested kinds, using the disk cache when possible.
+
+        Args:
+            kinds (sequence, optional): Kinds to include. Defaults to GENERATED_KINDS.
+            shapes_per_kind (int, optional): Shapes generated per kind. Defaults to
+                DEFAULT_SHAPES_PER_KIND.
+            recorded_file (str, optional): JSON file of recorded paths, used when "recorded"
+                is among the kinds. Defaults to None.
+            samples (int, optional): Points per shape. Defaults to SAMPLES.
+            use_cache (bool, optional): Whether to read and update the disk cache. Defaults to True.
+
+        Returns:
+            TrajectoryLibrary: The library.
+
+        Raises:
+            OSError: If the recorded paths cannot be read.
+            ConfigError: If the recorded paths file is invalid.
+        """
+        generated = [kind for kind in kinds if kind in SHAPE_BUILDERS]
+        key = f"trajectory-{LIBRARY_VERSION}-{','.join(generated)}-{shapes_per_kind}-{samples}-{GENERATOR_SEED}"
+        name = f"trajectories-{hashlib.sha256(key.encode()).hexdigest()}.pickle"
+        shapes = read_cache(name) if use_cache else None
+        if not isinstance(shapes, dict):
+            rng = random.Random(GENERATOR_SEED)
+            shapes = {kind: [SHAPE_BUILDERS[kind](rng, samples) for _ in range(shapes_per_kind)]
+                      for kind in generated}
+            if use_cache:
+                write_cache(name, shapes)
+        if "recorded" in kinds and recorded_file:
+            shapes = dict(shapes, recorded=load_recorded_paths(recorded_file, samples))
+        return cls(shapes, samples)
+
+    def choose(self, kind=None):
+        """
+        Pick a shape at random.
+
+        Args:
+            kind (str, optional): Kind to pick from. Defaults to None (any kind).
+
+        Returns:
+            tuple: (us, vs) arrays of the shape.
+
+        Raises:
+            KeyError: If the library holds no shape of that kind.
+        """
+        return random.choice(self.shapes[kind or random.choice(self.kinds)])
+
+    def path(self, start_x, start_y, end_x, end_y, steps, shape=None, mirror=None):
+        """
+        Map a shape onto a movement and resample it to the requested number of steps.
+
+        Args:
+            start_x (int): Start x-coordinate.
+            start_y (int): Start y-coordinate.
+            end_x (int): End x-coordinate.
+            end_y (int): End y-coordinate.
+            steps (int): Number of points to return.
+            shape (tuple, optional): (us, vs) arrays to use. Defaults to None (a random shape).
+            mirror (bool, optional): Flip the shape to the other side of the line. Defaults
+                to None (at random).
+
+        Returns:
+            list: (x, y) integer points after the start, the last one being the end point.
+        """
+        us, vs = shape or self.choose()
+        if mirror is None:
+            mirror = random.random() < 0.5
+        dx, dy = end_x - start_x, end_y - start_y
+        # Rotation and scale of the v axis, with the mirror folded in
+        across_x, across_y = (dy, -dx) if mirror else (-dy, dx)
+        last = len(us) - 1
+        scale = last / max(1, steps)
+        points = []
+        for step in range(1, steps + 1):
+            position = step * scale
+            index = int(position)
+            if index >= last:
+                u, v = us[last], vs[last]
+            else:
+                fraction = position - index
+                u = us[index] + (us[index + 1] - us[index]) * fraction
+                v = vs[index] + (vs[index + 1] - vs[index]) * fraction
+            points.append((round(start_x + u * dx + v * across_x), round(start_y + u * dy + v * across_y)))
+        return points
+
+    def counts(self):
+        """
+        Count the shapes of each kind.
+
+        Returns:
+            dict: Kind name to number of shapes.
+        """
+        return {kind: len(kind_shapes) for kind, kind_shapes in self.shapes.items()}